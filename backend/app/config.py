@@ -2,6 +2,8 @@
 Configurações da aplicação
 """
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -17,6 +19,13 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     LOG_LEVEL: str = "INFO"
 
+    # Servidor (fora de development): processos e tempo para drenar requisições no shutdown
+    WEB_CONCURRENCY: int = 1
+    SHUTDOWN_TIMEOUT: int = 30
+
+    # Warm-up no startup (pool, planos e análises da empresa); /ready responde 503 até concluir
+    WARMUP_ENABLED: bool = True
+
     # Database
     DB_HOST: str = "postgres"
     DB_PORT: int = 5432
@@ -24,6 +33,43 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = "tech_password"
     DB_NAME: str = "tech_playground"
 
+    # Pool por worker: min(DB_POOL_MAX, (max_connections - DB_RESERVED_CONNECTIONS) / WEB_CONCURRENCY)
+    DB_POOL_MIN: int = 2
+    DB_POOL_MAX: int = 10
+    DB_RESERVED_CONNECTIONS: int = 10
+    # Leituras dos repositórios via PREPARE/EXECUTE (desligar atrás de pooler em modo transação)
+    DB_PREPARED_STATEMENTS: bool = True
+
+    # Réplicas de leitura para as análises (DSNs separados por vírgula; vazio = tudo no primário)
+    DB_REPLICAS: str = ""
+    # Atraso máximo aceito de uma réplica em segundos (0 = sem limite)
+    DB_REPLICA_MAX_LAG: float = 0
+    # Segundos fora do rodízio após uma falha da réplica
+    DB_REPLICA_RETRY: int = 30
+
+    # Índice em memória da listagem de funcionários (bitmaps por valor de filtro, por worker)
+    FUNCIONARIO_INDEX_ENABLED: bool = False
+    # Segundos que o índice anterior segue servindo após uma escrita, e intervalo mínimo entre
+    # recargas (0 = só o índice da versão atual; uma recarga a cada escrita)
+    FUNCIONARIO_INDEX_MAX_STALENESS: float = 10
+
+    # Total da listagem de funcionários: exact (COUNT a cada página), cached (COUNT guardado por
+    # filtros e versão dos dados) ou estimated (como cached; acima do mínimo, estimativa do planner)
+    FUNCIONARIO_COUNT_STRATEGY: Literal["exact", "cached", "estimated"] = "exact"
+    FUNCIONARIO_COUNT_CACHE_SIZE: int = 256
+    FUNCIONARIO_COUNT_ESTIMATE_MIN: int = 10000
+
+    # Máximo de sub-requisições por chamada de POST /api/v1/batch
+    BATCH_MAX_REQUESTS: int = 20
+    # Tempo máximo (s) de cada sub-requisição do batch (resposta 504 ao esgotar)
+    BATCH_SUBREQUEST_TIMEOUT: float = 30
+
+    # Compressão de respostas
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_CACHE_SIZE: int = 128
+    # Corpos a partir deste tamanho são comprimidos no threadpool (fora do event loop)
+    COMPRESSION_THREADPOOL_MIN_SIZE: int = 65536
+
     # CORS
     ALLOWED_ORIGINS: list[str] = [
         "http://localhost:3000",
@@ -35,6 +81,10 @@ class Settings(BaseSettings):
     def database_url(self) -> str:
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def replicas(self) -> list[str]:
+        return [dsn.strip() for dsn in self.DB_REPLICAS.split(",") if dsn.strip()]
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -3,11 +3,17 @@ Analytics Controller
 Endpoints para análises e métricas
 """
 
+from datetime import date
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
-from app.services.analytics_service import AnalyticsService
+from app.database.connection import DatabaseConnection
+from app.repositories.base_repository import prepared_statements
+from app.responses import ORJSONResponse
+from app.services.analytics_service import AnalyticsService, single_flight
+from app.services.notificacoes import ouvinte_avaliacoes
 
 
 router = APIRouter()
@@ -17,9 +23,17 @@ def get_analytics_service():
     return AnalyticsService()
 
 
+def validar_periodo(data_inicio: date | None, data_fim: date | None) -> None:
+    """Valida intervalo de datas usado no filtro de período"""
+    if data_inicio and data_fim and data_inicio > data_fim:
+        raise HTTPException(status_code=422, detail="data_inicio deve ser anterior ou igual a data_fim")
+
+
 @router.get("/enps")
 async def get_enps_distribution(
     empresa_id: UUID | None = Query(None, description="Filtrar por empresa"),
+    data_inicio: date | None = Query(None, description="Início do período (data da avaliação)"),
+    data_fim: date | None = Query(None, description="Fim do período (data da avaliação)"),
     service: AnalyticsService = Depends(get_analytics_service),
 ):
     """
@@ -30,7 +44,8 @@ async def get_enps_distribution(
     - **Detratores**: Respostas 0-6
     - **eNPS Score**: % Promotores - % Detratores (-100 a +100)
     """
-    return service.get_enps_distribution(empresa_id)
+    validar_periodo(data_inicio, data_fim)
+    return ORJSONResponse(await service.coalescer("get_enps_distribution", empresa_id, data_inicio, data_fim))
 
 
 @router.get("/tenure-distribution")
@@ -43,12 +58,14 @@ async def get_tenure_distribution(
     
     Agrupa funcionários por categorias de tempo na empresa
     """
-    return service.get_tenure_distribution(empresa_id)
+    return ORJSONResponse(await service.coalescer("get_tenure_distribution", empresa_id))
 
 
 @router.get("/satisfaction-scores")
 async def get_satisfaction_scores(
     empresa_id: UUID | None = Query(None, description="Filtrar por empresa"),
+    data_inicio: date | None = Query(None, description="Início do período (data da avaliação)"),
+    data_fim: date | None = Query(None, description="Fim do período (data da avaliação)"),
     service: AnalyticsService = Depends(get_analytics_service),
 ):
     """
@@ -63,7 +80,8 @@ async def get_satisfaction_scores(
     6. Equilíbrio
     7. Recomendação (usado para eNPS)
     """
-    return service.get_satisfaction_scores(empresa_id)
+    validar_periodo(data_inicio, data_fim)
+    return ORJSONResponse(await service.coalescer("get_satisfaction_scores", empresa_id, data_inicio, data_fim))
 
 
 # ===== TASK 7: AREA LEVEL ANALYTICS =====
@@ -72,6 +90,8 @@ async def get_satisfaction_scores(
 @router.get("/areas/scores-comparison")
 async def get_areas_scores_comparison(
     empresa_id: UUID | None = Query(None, description="Filtrar por empresa"),
+    data_inicio: date | None = Query(None, description="Início do período (data da avaliação)"),
+    data_fim: date | None = Query(None, description="Fim do período (data da avaliação)"),
     service: AnalyticsService = Depends(get_analytics_service),
 ):
     """
@@ -90,12 +110,15 @@ async def get_areas_scores_comparison(
     - Total de funcionários e respostas
     - Hierarquia completa (diretoria → gerência → coordenação)
     """
-    return service.get_areas_scores_comparison(empresa_id)
+    validar_periodo(data_inicio, data_fim)
+    return ORJSONResponse(await service.coalescer("get_areas_scores_comparison", empresa_id, data_inicio, data_fim))
 
 
 @router.get("/areas/enps-comparison")
 async def get_areas_enps_comparison(
     empresa_id: UUID | None = Query(None, description="Filtrar por empresa"),
+    data_inicio: date | None = Query(None, description="Início do período (data da avaliação)"),
+    data_fim: date | None = Query(None, description="Fim do período (data da avaliação)"),
     service: AnalyticsService = Depends(get_analytics_service),
 ):
     """
@@ -119,12 +142,15 @@ async def get_areas_enps_comparison(
     - Pior área (menor eNPS)
     - Áreas que precisam atenção
     """
-    return service.get_areas_enps_comparison(empresa_id)
+    validar_periodo(data_inicio, data_fim)
+    return ORJSONResponse(await service.coalescer("get_areas_enps_comparison", empresa_id, data_inicio, data_fim))
 
 
 @router.get("/areas/{area_id}/detailed-metrics")
 async def get_area_detailed_metrics(
     area_id: UUID,
+    data_inicio: date | None = Query(None, description="Início do período (data da avaliação)"),
+    data_fim: date | None = Query(None, description="Fim do período (data da avaliação)"),
     service: AnalyticsService = Depends(get_analytics_service),
 ):
     """
@@ -141,4 +167,83 @@ async def get_area_detailed_metrics(
     - Comparação área vs empresa
     - Identificar gaps de performance
     """
-    return service.get_area_detailed_metrics(area_id)
+    validar_periodo(data_inicio, data_fim)
+    return ORJSONResponse(await service.coalescer("get_area_detailed_metrics", area_id, data_inicio, data_fim))
+
+
+@router.get("/stream", summary="Atualizações ao vivo (Server-Sent Events)")
+async def stream_atualizacoes(empresa_id: UUID | None = Query(None, description="Filtrar por empresa")):
+    """
+    **Deltas das métricas a cada carga de novas avaliações (SSE)**
+
+    Eventos:
+    - **delta**: o que uma página do import acrescentou para a empresa: `avaliacoes`,
+      `enps` (promotores/neutros/detratores) e `dimensoes` (soma e total de respostas),
+      somente funcionários ativos e sem filtro de período
+    - **resync**: deltas podem ter sido perdidos (cliente lento ou reconexão ao banco);
+      recarregar as métricas
+
+    **Uso:** abrir o stream antes de carregar as métricas e somar os deltas recebidos.
+    Todos os streams do worker compartilham uma conexão LISTEN com o banco.
+    """
+    return StreamingResponse(
+        ouvinte_avaliacoes.eventos(str(empresa_id) if empresa_id else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stream-metrics")
+async def get_stream_metrics():
+    """
+    Métricas do stream de atualizações (por worker)
+
+    - **conectado**: Conexão LISTEN aberta
+    - **assinantes**: Streams SSE abertos
+    - **notificacoes**: Deltas recebidos do banco
+    - **entregues**: Deltas enfileirados para os assinantes
+    - **resyncs**: Pedidos de recarga (cliente lento ou conexão perdida)
+    - **reconexoes**: Tentativas de reabrir a conexão LISTEN
+    """
+    return ouvinte_avaliacoes.metricas()
+
+
+@router.get("/coalescing-metrics")
+async def get_coalescing_metrics():
+    """
+    Métricas do single-flight das consultas de analytics
+
+    - **chamadas**: Total de chamadas recebidas
+    - **execucoes**: Consultas efetivamente executadas
+    - **coalescidas**: Chamadas que reaproveitaram uma execução em andamento
+    - **em_andamento**: Execuções ativas no momento
+    """
+    return single_flight.metricas()
+
+
+@router.get("/prepared-statements-metrics")
+async def get_prepared_statements_metrics():
+    """
+    Métricas do registro de prepared statements dos repositórios (por worker)
+
+    - **formatos**: Formatos de query distintos já preparados
+    - **prepares**: PREPAREs executados (um por formato e conexão)
+    - **executes**: Consultas executadas via EXECUTE
+    - **execucoes_diretas**: Consultas executadas sem preparo
+    - **nao_preparaveis**: Formatos que o Postgres não conseguiu preparar
+    """
+    return prepared_statements.metricas()
+
+
+@router.get("/connection-metrics")
+async def get_connection_metrics():
+    """
+    Métricas de uso do pool de conexões (por worker)
+
+    - **checkouts**: Conexões retiradas do pool
+    - **requisicoes**: Requisições de leitura com escopo de conexão
+    - **checkouts_por_requisicao**: Média de checkouts por requisição (no máximo 1)
+    - **consultas_por_requisicao**: Média de consultas atendidas pela conexão da requisição
+    - **em_uso**: Conexões fora do pool no momento
+    """
+    return DatabaseConnection.metricas()
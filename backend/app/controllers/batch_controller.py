@@ -0,0 +1,133 @@
+"""
+Batch Controller
+Várias leituras da API em uma única chamada HTTP
+"""
+
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+
+import orjson
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+from starlette.exceptions import HTTPException
+
+from app.config import settings
+from app.database.connection import DatabaseConnection
+from app.schemas.batch import BatchRequest, SubRequisicao
+
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Chaves do scope ASGI herdadas da requisição externa (servidor, cliente, app e handlers de exceção)
+CHAVES_SCOPE = (
+    "type",
+    "asgi",
+    "http_version",
+    "scheme",
+    "server",
+    "client",
+    "root_path",
+    "app",
+    "state",
+    "starlette.exception_handlers",
+)
+
+# Cabeçalhos do POST que não se aplicam às sub-requisições (GET sem corpo, resposta não comprimida)
+CABECALHOS_IGNORADOS = (b"content-length", b"content-type", b"accept-encoding")
+
+
+async def executar_subrequisicao(request: Request, sub: SubRequisicao) -> tuple[int, str, bytes]:
+    """
+    Despacha a sub-requisição direto no router da aplicação (sem passar de novo pelos
+    middlewares) e retorna (status, content-type, corpo)
+    """
+    path, _, query = sub.path.partition("?")
+    scope = {chave: request.scope[chave] for chave in CHAVES_SCOPE if chave in request.scope}
+    scope.update(
+        method=sub.method,
+        path=path,
+        raw_path=path.encode(),
+        query_string=query.encode(),
+        headers=[(nome, valor) for nome, valor in request.scope["headers"] if nome not in CABECALHOS_IGNORADOS],
+    )
+    resposta = {"status": 500, "tipo": "", "corpo": []}
+    corpo_enviado = False
+    concluida = asyncio.Event()
+
+    async def receive():
+        # Corpo vazio uma vez; depois, como um cliente real, desconecta ao fim da resposta
+        nonlocal corpo_enviado
+        if not corpo_enviado:
+            corpo_enviado = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await concluida.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(mensagem):
+        if mensagem["type"] == "http.response.start":
+            resposta["status"] = mensagem["status"]
+            cabecalhos = dict(mensagem.get("headers", []))
+            resposta["tipo"] = cabecalhos.get(b"content-type", b"").decode("latin-1")
+        elif mensagem["type"] == "http.response.body":
+            resposta["corpo"].append(mensagem.get("body", b""))
+            if not mensagem.get("more_body", False):
+                concluida.set()
+
+    try:
+        # Pilha de saída própria, como a do AsyncExitStackMiddleware na requisição externa
+        async with AsyncExitStack() as pilha:
+            scope["fastapi_middleware_astack"] = pilha
+            await asyncio.wait_for(request.app.router(scope, receive, send), settings.BATCH_SUBREQUEST_TIMEOUT)
+    except TimeoutError:
+        logger.warning(f"⚠️  Sub-requisição {sub.path} excedeu {settings.BATCH_SUBREQUEST_TIMEOUT}s")
+        return 504, "application/json", orjson.dumps({"detail": "Tempo esgotado"})
+    except HTTPException as e:
+        # Rota inexistente: o router lança 404 fora do tratamento de exceções das rotas
+        return e.status_code, "application/json", orjson.dumps({"detail": e.detail})
+    except Exception as e:
+        logger.error(f"❌ Erro na sub-requisição {sub.path}: {e}")
+        return 500, "application/json", orjson.dumps({"detail": "Erro interno"})
+    return resposta["status"], resposta["tipo"], b"".join(resposta["corpo"])
+
+
+def montar_item(sub: SubRequisicao, status: int, tipo: str, corpo: bytes) -> bytes:
+    """Item da resposta; corpos JSON entram como vieram, sem desserializar e serializar de novo"""
+    if not corpo:
+        corpo = b"null"
+    elif not tipo.startswith("application/json"):
+        corpo = orjson.dumps(corpo.decode(errors="replace"))
+    cabecalho = orjson.dumps({"id": sub.id, "path": sub.path, "status": status})
+    return cabecalho[:-1] + b',"body":' + corpo + b"}"
+
+
+@router.post("", summary="Executar várias leituras em uma chamada")
+async def executar_batch(lote: BatchRequest, request: Request):
+    """
+    Executa sub-requisições GET da API em uma única chamada
+
+    Cada item da resposta traz o status HTTP e o corpo da sua sub-requisição, na
+    ordem do pedido; falhas em uma não afetam as demais, e uma sub-requisição que
+    passa de BATCH_SUBREQUEST_TIMEOUT segundos responde 504. Rotas em streaming
+    (SSE) não são aceitas.
+
+    Limitações:
+    - As sub-requisições não rodam em paralelo: são despachadas juntas
+      (asyncio.gather), mas as rotas chamam os repositórios (síncronos) no event
+      loop, uma de cada vez. O ganho é uma chamada HTTP e um checkout de conexão,
+      não concorrência.
+    - Só as rotas que consultam os repositórios direto compartilham o escopo de
+      conexão do batch (uma conexão e um snapshot REPEATABLE READ). As rotas de
+      analytics coalescidas (single-flight) executam no threadpool, fora do escopo
+      (contexto_sem_escopo): usam checkout próprio e não veem o mesmo snapshot.
+    - O tempo limite vale entre awaits: não interrompe uma consulta síncrona em
+      andamento no event loop.
+
+    - **requests**: Lista de `{id?, method: "GET", path}` (até BATCH_MAX_REQUESTS)
+    """
+    with DatabaseConnection.request_scope():
+        resultados = await asyncio.gather(*(executar_subrequisicao(request, sub) for sub in lote.requests))
+
+    itens = [montar_item(sub, *resultado) for sub, resultado in zip(lote.requests, resultados, strict=True)]
+    return Response(b'{"responses":[' + b",".join(itens) + b"]}", media_type="application/json")
@@ -6,7 +6,16 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.schemas.schemas import FuncionarioCreate, FuncionarioPaginada, FuncionarioResponse
+from app.repositories.funcionario_repository import totais_listagem
+from app.repositories.indice_funcionarios import indice_funcionarios
+from app.responses import ORJSONResponse
+from app.schemas.schemas import (
+    FacetasFuncionarios,
+    FuncionarioCreate,
+    FuncionarioLoteCreate,
+    FuncionarioPaginada,
+    FuncionarioResponse,
+)
 from app.services.funcionario_service import FuncionarioService
 
 
@@ -34,7 +43,7 @@ async def listar_funcionarios(
     service: FuncionarioService = Depends(get_funcionario_service),
 ):
     """Lista funcionários com paginação e filtros avançados"""
-    return service.listar_funcionarios(
+    resultado = service.listar_funcionarios(
         empresa_id=empresa_id,
         page=page,
         page_size=page_size,
@@ -48,6 +57,8 @@ async def listar_funcionarios(
         order_by=order_by,
         order_dir=order_dir,
     )
+    # Shape já garantido pelo repositório: serializa direto, sem revalidar o response_model
+    return ORJSONResponse(resultado)
 
 
 @router.get("/buscar", response_model=FuncionarioPaginada)
@@ -68,7 +79,7 @@ async def buscar_funcionarios(
     service: FuncionarioService = Depends(get_funcionario_service),
 ):
     """Busca funcionários por nome ou email com filtros avançados"""
-    return service.buscar_funcionarios(
+    resultado = service.buscar_funcionarios(
         empresa_id=empresa_id,
         termo=termo,
         page=page,
@@ -83,6 +94,8 @@ async def buscar_funcionarios(
         order_by=order_by,
         order_dir=order_dir,
     )
+    # Shape já garantido pelo repositório: serializa direto, sem revalidar o response_model
+    return ORJSONResponse(resultado)
 
 
 @router.get("/filtros")
@@ -93,6 +106,70 @@ async def obter_filtros(
     return service.obter_filtros_disponiveis(empresa_id)
 
 
+@router.get("/facets", response_model=FacetasFuncionarios)
+async def obter_facetas(
+    empresa_id: UUID | None = Query(None),
+    areas: list[UUID] | None = Query(None),
+    cargos: list[UUID] | None = Query(None),
+    localidades: list[UUID] | None = Query(None),
+    tempo_casa: list[UUID] | None = Query(None),
+    score_min: float | None = Query(None, ge=1, le=7),
+    score_max: float | None = Query(None, ge=1, le=7),
+    enps_status: str | None = Query(None, pattern="^(promotor|neutro|detrator)$"),
+    service: FuncionarioService = Depends(get_funcionario_service),
+):
+    """
+    Contagens por faceta da listagem de funcionários (mesmos filtros de GET /funcionarios)
+
+    Cada opção de área, cargo, localidade, tempo de casa e status eNPS traz quantos
+    funcionários a listagem retornaria ao selecioná-la, mantendo os demais filtros;
+    `total` é o total da listagem com todos os filtros. Uma única consulta.
+    """
+    return service.obter_facetas(
+        empresa_id=empresa_id,
+        areas=areas,
+        cargos=cargos,
+        localidades=localidades,
+        tempo_casa=tempo_casa,
+        score_min=score_min,
+        score_max=score_max,
+        enps_status=enps_status,
+    )
+
+
+@router.get("/employee-index-metrics")
+async def obter_metricas_indice():
+    """
+    Métricas do índice em memória da listagem de funcionários (por worker)
+
+    - **carregado**: Índice pronto para uso
+    - **versao**: Versão dos dados (contador de versao_dados) do índice carregado
+    - **funcionarios**: Funcionários ativos no índice
+    - **score_indexado**: Filtro e ordenação por score atendidos pelo índice
+    - **usos**: Listagens e facetas atendidas pelo índice da versão atual
+    - **usos_desatualizado**: Atendidas pelo índice anterior, dentro de FUNCIONARIO_INDEX_MAX_STALENESS
+    - **fallbacks**: Consultas pelo SQL com o índice desatualizado além da tolerância ou em carga
+    - **reconstrucoes**: Cargas concluídas
+    - **erros**: Cargas que falharam
+    - **duracao_ultima_carga**: Duração da última carga (s)
+    """
+    return indice_funcionarios.metricas()
+
+
+@router.get("/listing-count-metrics")
+async def obter_metricas_totais():
+    """
+    Métricas do total da listagem de funcionários (por worker)
+
+    - **estrategia**: FUNCIONARIO_COUNT_STRATEGY (exact, cached ou estimated)
+    - **entradas**: Totais guardados por filtros e versão dos dados
+    - **acertos**: Páginas servidas sem contar de novo
+    - **faltas**: Totais calculados (COUNT ou EXPLAIN)
+    - **estimativas**: Totais estimados pelo planner (total_exato = false)
+    """
+    return totais_listagem.metricas()
+
+
 @router.get("/{funcionario_id}", response_model=FuncionarioResponse)
 async def obter_funcionario(funcionario_id: UUID, service: FuncionarioService = Depends(get_funcionario_service)):
     """Obtém detalhes de um funcionário"""
@@ -138,3 +215,16 @@ async def criar_funcionario(
     """Cria novo funcionário"""
     funcionario_id = service.criar_funcionario(funcionario)
     return {"id": funcionario_id, "message": "Funcionário criado com sucesso"}
+
+
+@router.post("/lote", status_code=201)
+async def criar_funcionarios(
+    lote: FuncionarioLoteCreate, service: FuncionarioService = Depends(get_funcionario_service)
+):
+    """
+    Cria funcionários em lote (até 10.000 por requisição)
+
+    Uma única transação: se algum funcionário for inválido no banco, nenhum é criado.
+    """
+    ids = service.criar_funcionarios(lote)
+    return {"ids": ids, "total": len(ids), "message": f"{len(ids)} funcionários criados com sucesso"}
@@ -2,53 +2,231 @@
 Gerenciamento de conexões com o banco de dados PostgreSQL
 """
 
+import contextvars
+import itertools
 import logging
+import os
+import threading
+import time
+from collections.abc import Callable
 from contextlib import contextmanager
+from typing import Any, ClassVar
 
-from psycopg2 import pool
+import psycopg2
+from psycopg2 import extensions, pool
 from psycopg2.extras import RealDictCursor
+from starlette.requests import Request
 
 from app.config import settings
+from app.database.replicas import FalhaReplica, Replica
 
 
 logger = logging.getLogger(__name__)
 
+# NUMERIC chega como float: evita conversões Decimal -> float nos services e na serialização
+DEC2FLOAT = extensions.new_type(
+    extensions.DECIMAL.values,
+    "DEC2FLOAT",
+    lambda value, _cursor: float(value) if value is not None else None,
+)
+extensions.register_type(DEC2FLOAT)
+
+
+def pool_size(max_connections: int, workers: int, reserved: int, minconn: int, maxconn: int) -> int:
+    """
+    Conexões por worker: a fatia de max_connections (descontadas as reservadas para
+    migrações, importação e administração) dividida entre os workers, entre minconn e maxconn
+    """
+    return max(minconn, min(maxconn, (max_connections - reserved) // max(workers, 1)))
+
+
+class EscopoRequisicao:
+    """
+    Conexões de uma requisição: obtidas no primeiro uso (lazy) e compartilhadas por
+    todos os repositórios até o fim da requisição. Leituras roteadas para réplica
+    (get_read_connection) usam uma segunda conexão, da réplica escolhida. `valores`
+    guarda leituras feitas uma vez por requisição (valor_da_requisicao).
+    """
+
+    __slots__ = ("conn", "leitura", "replica", "usos", "valores")
+
+    def __init__(self):
+        self.conn = None
+        self.leitura = None
+        self.replica = None
+        self.usos = 0
+        self.valores = {}
+
+
+# Escopo da requisição em andamento (None fora de request_scope)
+_escopo: contextvars.ContextVar[EscopoRequisicao | None] = contextvars.ContextVar("escopo_requisicao", default=None)
+
+
+def contexto_sem_escopo() -> contextvars.Context:
+    """
+    Cópia do contexto atual sem o escopo da requisição, para execuções que podem
+    sobreviver a ela (ex.: single-flight): usam checkout próprio, não a conexão da requisição
+    """
+    contexto = contextvars.copy_context()
+    contexto.run(_escopo.set, None)
+    return contexto
+
 
 class DatabaseConnection:
-    """Gerencia pool de conexões com PostgreSQL"""
+    """
+    Gerencia pool de conexões com PostgreSQL
+
+    Um pool por processo: cada worker do servidor cria o seu no startup (lifespan).
+    Um pool herdado via fork é descartado no filho sem fechar os sockets, que
+    continuam sendo do processo pai.
+
+    Com DB_REPLICAS, cada réplica tem seu pool e get_read_connection distribui as
+    leituras entre elas (a menos ocupada, em rodízio nos empates), respeitando
+    DB_REPLICA_MAX_LAG; sem réplica disponível, a leitura vai para o primário.
+    """
 
     _pool = None
+    _pid = None
+    _maxconn = None
+    _replicas: ClassVar[list[Replica]] = []
+    _rodizio = itertools.count()
+    _leituras_primario = 0
+    _em_uso = 0
+    _livre = threading.Condition()
+    _checkouts = 0
+    _requisicoes = 0
+    _checkouts_requisicoes = 0
+    _usos_requisicoes = 0
+
+    @classmethod
+    def _connect_kwargs(cls) -> dict:
+        return {
+            "host": settings.DB_HOST,
+            "port": settings.DB_PORT,
+            "user": settings.DB_USER,
+            "password": settings.DB_PASSWORD,
+            "database": settings.DB_NAME,
+        }
+
+    @classmethod
+    def _max_por_worker(cls, minconn: int) -> int:
+        """Tamanho máximo do pool a partir do max_connections do servidor"""
+        conn = psycopg2.connect(**cls._connect_kwargs())
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SHOW max_connections")
+                max_connections = int(cursor.fetchone()[0])
+        finally:
+            conn.close()
+        return pool_size(
+            max_connections, settings.WEB_CONCURRENCY, settings.DB_RESERVED_CONNECTIONS, minconn, settings.DB_POOL_MAX
+        )
+
+    @classmethod
+    def _reset_after_fork(cls):
+        """Descarta o estado herdado do processo pai (chamado no filho após fork)"""
+        cls._pool = None
+        cls._pid = None
+        cls._em_uso = 0
+        cls._livre = threading.Condition()
+        cls._replicas = []
 
     @classmethod
-    def init_pool(cls, minconn=2, maxconn=10):
-        """Inicializa o pool de conexões"""
+    def init_pool(cls, minconn=None, maxconn=None):
+        """Inicializa o pool de conexões do processo"""
+        if cls._pool is not None and cls._pid != os.getpid():
+            cls._reset_after_fork()
+
         if cls._pool is None:
             try:
-                cls._pool = pool.SimpleConnectionPool(
+                minconn = settings.DB_POOL_MIN if minconn is None else minconn
+                maxconn = cls._max_por_worker(minconn) if maxconn is None else maxconn
+                cls._pool = pool.ThreadedConnectionPool(
                     minconn,
                     maxconn,
-                    host=settings.DB_HOST,
-                    port=settings.DB_PORT,
-                    user=settings.DB_USER,
-                    password=settings.DB_PASSWORD,
-                    database=settings.DB_NAME,
                     cursor_factory=RealDictCursor,
+                    **cls._connect_kwargs(),
                 )
-                logger.info(f"✅ Pool de conexões inicializado ({minconn}-{maxconn} conexões)")
+                cls._pid = os.getpid()
+                cls._maxconn = maxconn
+                cls._replicas = [Replica(dsn) for dsn in settings.replicas]
+                logger.info(f"✅ Pool de conexões inicializado ({minconn}-{maxconn} conexões, pid {cls._pid})")
+                if cls._replicas:
+                    logger.info(f"📚 Réplicas de leitura: {', '.join(r.nome for r in cls._replicas)}")
             except Exception as e:
                 logger.error(f"❌ Erro ao inicializar pool: {e}")
                 raise
 
+    @classmethod
+    def warm_up(cls) -> int:
+        """
+        Abre e valida as minconn conexões do pool, retiradas ao mesmo tempo
+        (uma de cada backend). Retorna quantas conexões foram aquecidas.
+        """
+        if cls._pool is None or cls._pid != os.getpid():
+            cls.init_pool()
+
+        conexoes = [cls._pool.getconn() for _ in range(cls._pool.minconn)]
+        try:
+            for conn in conexoes:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+        finally:
+            for conn in conexoes:
+                cls._pool.putconn(conn)
+        return len(conexoes)
+
+    @classmethod
+    def _checkout(cls):
+        """Retira uma conexão do pool (contabilizada para a drenagem do close_all)"""
+        if cls._pool is None or cls._pid != os.getpid():
+            cls.init_pool()
+
+        conn = cls._pool.getconn()
+        with cls._livre:
+            cls._em_uso += 1
+            cls._checkouts += 1
+        return conn
+
+    @classmethod
+    def _checkin(cls, conn, close: bool = False, replica: Replica | None = None):
+        """Devolve a conexão ao pool de origem (close=True descarta uma conexão quebrada)"""
+        if replica:
+            replica.devolver(conn, close=close)
+        else:
+            cls._pool.putconn(conn, close=close)
+        with cls._livre:
+            cls._em_uso -= 1
+            if replica:
+                replica.em_uso -= 1
+            cls._livre.notify_all()
+
     @classmethod
     @contextmanager
     def get_connection(cls):
-        """Context manager para obter conexão do pool"""
-        if cls._pool is None:
-            cls.init_pool()
+        """
+        Context manager para obter conexão do pool
+        Dentro de request_scope, retorna a conexão da requisição (sem novo checkout)
+        """
+        escopo = _escopo.get()
+        if escopo is not None:
+            if escopo.conn is None:
+                escopo.conn = cls._checkout()
+                # BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY: um snapshot para todas as queries
+                escopo.conn.set_session(isolation_level=extensions.ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+            escopo.usos += 1
+            try:
+                yield escopo.conn
+            except Exception as e:
+                escopo.conn.rollback()
+                logger.error(f"❌ Erro na conexão: {e}")
+                raise
+            return
 
         conn = None
         try:
-            conn = cls._pool.getconn()
+            conn = cls._checkout()
             yield conn
         except Exception as e:
             if conn:
@@ -57,16 +235,214 @@ class DatabaseConnection:
             raise
         finally:
             if conn:
-                cls._pool.putconn(conn)
+                cls._checkin(conn)
+
+    @classmethod
+    def _checkout_replica(cls):
+        """
+        Retira uma conexão de réplica: disponível e dentro do limite de atraso, a menos
+        ocupada primeiro (rodízio nos empates). Retorna (conexão, réplica) ou None.
+        """
+        agora = time.monotonic()
+        limite = settings.DB_REPLICA_MAX_LAG
+        candidatas = [r for r in cls._replicas if r.disponivel(agora) and r.dentro_do_atraso(agora, limite)]
+        if candidatas:
+            inicio = next(cls._rodizio) % len(candidatas)
+            candidatas = sorted(candidatas[inicio:] + candidatas[:inicio], key=lambda r: r.em_uso)
+
+        for replica in candidatas:
+            try:
+                conn = replica.checkout(settings.DB_POOL_MIN, cls._maxconn or settings.DB_POOL_MAX, limite)
+            except pool.PoolError:
+                continue  # réplica sem conexões livres: tenta a próxima
+            except psycopg2.Error as e:
+                replica.marcar_falha(settings.DB_REPLICA_RETRY, e)
+                continue
+            if conn is None:
+                continue  # atraso acima de DB_REPLICA_MAX_LAG
+            with cls._livre:
+                cls._em_uso += 1
+                cls._checkouts += 1
+                replica.em_uso += 1
+                replica.leituras += 1
+            return conn, replica
+
+        with cls._livre:
+            cls._leituras_primario += 1
+        return None
+
+    @classmethod
+    @contextmanager
+    def get_read_connection(cls):
+        """
+        Context manager para leituras que toleram réplica (análises)
+        Sem DB_REPLICAS, ou sem réplica disponível, equivale a get_connection. Se a réplica
+        cair durante a consulta, ela sai do rodízio por DB_REPLICA_RETRY segundos e
+        FalhaReplica é lançada para que a leitura seja repetida em outro servidor.
+        """
+        escopo = _escopo.get()
+        escolhida = None
+        if cls._replicas and cls._pid == os.getpid():
+            if escopo is not None and escopo.leitura is not None:
+                escolhida = escopo.leitura, escopo.replica
+            else:
+                escolhida = cls._checkout_replica()
+                if escolhida is not None and escopo is not None:
+                    escopo.leitura, escopo.replica = escolhida
+                    escopo.leitura.set_session(
+                        isolation_level=extensions.ISOLATION_LEVEL_REPEATABLE_READ, readonly=True
+                    )
+
+        if escolhida is None:
+            with cls.get_connection() as conn:
+                yield conn
+            return
+
+        conn, replica = escolhida
+        if escopo is not None:
+            escopo.usos += 1
+        descartar = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            if not conn.closed:
+                conn.rollback()
+                raise
+            # Conexão perdida: réplica fora do rodízio e leitura repetida em outro servidor
+            replica.marcar_falha(settings.DB_REPLICA_RETRY, e)
+            descartar = True
+            raise FalhaReplica(str(e)) from e
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ Erro na conexão: {e}")
+            raise
+        finally:
+            if descartar and escopo is not None:
+                escopo.leitura = escopo.replica = None
+            if escopo is None or descartar:
+                cls._checkin(conn, close=descartar, replica=replica)
 
     @classmethod
-    def close_all(cls):
-        """Fecha todas as conexões do pool"""
-        if cls._pool:
-            cls._pool.closeall()
-            logger.info("✅ Pool de conexões fechado")
+    @contextmanager
+    def request_scope(cls):
+        """
+        Escopo de requisição (somente leitura): no máximo um checkout e uma transação
+        REPEATABLE READ READ ONLY para todas as consultas dos repositórios, que usam
+        get_connection normalmente (mais um checkout se houver leituras em réplica).
+        Ao final, a transação é desfeita e a sessão volta ao padrão antes de devolver
+        a conexão ao pool. Dentro de um escopo ativo (sub-requisições de /batch),
+        reaproveita o escopo externo.
+        """
+        if (externo := _escopo.get()) is not None:
+            yield externo
+            return
+
+        escopo = EscopoRequisicao()
+        token = _escopo.set(escopo)
+        try:
+            yield escopo
+        finally:
+            _escopo.reset(token)
+            conexoes = [
+                (conn, replica) for conn, replica in ((escopo.conn, None), (escopo.leitura, escopo.replica)) if conn
+            ]
+            with cls._livre:
+                cls._requisicoes += 1
+                cls._usos_requisicoes += escopo.usos
+                cls._checkouts_requisicoes += len(conexoes)
+            for conn, replica in conexoes:
+                try:
+                    conn.rollback()
+                    conn.set_session(isolation_level="DEFAULT", readonly="DEFAULT")
+                except Exception as e:
+                    logger.warning(f"⚠️  Conexão da requisição descartada: {e}")
+                    cls._checkin(conn, close=True, replica=replica)
+                else:
+                    cls._checkin(conn, replica=replica)
+
+    @classmethod
+    def em_escopo(cls) -> bool:
+        """Indica se há um escopo de requisição ativo no contexto atual"""
+        return _escopo.get() is not None
+
+    @classmethod
+    def valor_da_requisicao(cls, chave: str, carregar: Callable[[], Any]) -> Any:
+        """
+        Valor lido uma vez por escopo de requisição: todas as consultas do escopo veem
+        o mesmo snapshot, então a primeira leitura vale até o fim. Fora de um escopo,
+        carregar() é chamado a cada uso.
+        """
+        escopo = _escopo.get()
+        if escopo is None:
+            return carregar()
+        if chave not in escopo.valores:
+            escopo.valores[chave] = carregar()
+        return escopo.valores[chave]
+
+    @classmethod
+    def metricas(cls) -> dict:
+        """Checkouts do pool e reaproveitamento da conexão por requisição (por processo)"""
+        requisicoes = cls._requisicoes
+        return {
+            "checkouts": cls._checkouts,
+            "requisicoes": requisicoes,
+            "checkouts_por_requisicao": round(cls._checkouts_requisicoes / requisicoes, 3) if requisicoes else 0,
+            "consultas_por_requisicao": round(cls._usos_requisicoes / requisicoes, 3) if requisicoes else 0,
+            "em_uso": cls._em_uso,
+            "leituras_replica_no_primario": cls._leituras_primario,
+            "replicas": [replica.metricas() for replica in cls._replicas],
+        }
+
+    @classmethod
+    def reset_metricas(cls) -> None:
+        """Zera os contadores"""
+        with cls._livre:
+            cls._checkouts = 0
+            cls._requisicoes = 0
+            cls._checkouts_requisicoes = 0
+            cls._usos_requisicoes = 0
+            cls._leituras_primario = 0
+
+    @classmethod
+    def close_all(cls, timeout: float = 0):
+        """
+        Fecha todas as conexões do pool
+        Com timeout, aguarda (drena) as conexões em uso voltarem ao pool antes de fechar
+        """
+        if cls._pool is None or cls._pid != os.getpid():
+            return
+
+        inicio = time.perf_counter()
+        with cls._livre:
+            drenado = cls._livre.wait_for(lambda: cls._em_uso == 0, timeout=timeout)
+        if not drenado:
+            logger.warning(f"⚠️  Fechando o pool com {cls._em_uso} conexões em uso após {timeout:.0f}s")
+
+        cls._pool.closeall()
+        cls._pool = None
+        cls._pid = None
+        for replica in cls._replicas:
+            replica.fechar()
+        logger.info(f"✅ Pool de conexões fechado (drenado em {time.perf_counter() - inicio:.2f}s)")
+
+
+# Workers criados por fork (gunicorn, multiprocessing) não reaproveitam o pool do pai
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=DatabaseConnection._reset_after_fork)
 
 
 def get_db_connection():
     """Helper para obter conexão (dependency injection)"""
     return DatabaseConnection.get_connection()
+
+
+async def request_connection(request: Request):
+    """
+    Dependency das rotas da API: requisições de leitura (GET/HEAD) compartilham uma
+    conexão e um snapshot entre todas as consultas; escritas seguem com checkout por operação
+    """
+    if request.method not in ("GET", "HEAD"):
+        yield
+        return
+    with DatabaseConnection.request_scope():
+        yield
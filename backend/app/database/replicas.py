@@ -0,0 +1,136 @@
+"""
+Réplicas de leitura
+Pool e estado de saúde de cada réplica configurada em DB_REPLICAS
+"""
+
+import logging
+import math
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions, pool
+from psycopg2.extras import RealDictCursor
+
+
+logger = logging.getLogger(__name__)
+
+# Intervalo (s) entre medições do atraso de uma réplica
+INTERVALO_ATRASO = 1.0
+
+# Atraso de replicação em segundos: 0 se o servidor não é standby ou se já aplicou tudo
+# o que recebeu (evita acusar atraso quando o primário está ocioso); infinito se não
+# está recebendo WAL do primário
+QUERY_ATRASO = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() IS NULL THEN 'Infinity'
+        WHEN pg_last_wal_receive_lsn() <= pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8, 'Infinity')
+    END AS atraso
+"""
+
+
+class FalhaReplica(psycopg2.OperationalError):
+    """A réplica caiu durante a consulta; a leitura pode ser repetida em outro servidor"""
+
+
+class Replica:
+    """
+    Réplica de leitura: pool próprio (aberto no primeiro uso, para que uma réplica
+    fora do ar não impeça o startup), atraso medido e janela de indisponibilidade
+    após falha. Os contadores de uso são atualizados pelo DatabaseConnection.
+    """
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        params = extensions.parse_dsn(dsn)
+        self.nome = f"{params.get('host', 'localhost')}:{params.get('port', 5432)}/{params.get('dbname', '')}"
+        self.pool = None
+        self._abrindo = threading.Lock()
+        # Pool de origem de cada conexão em uso (o pool é trocado quando a réplica falha)
+        self._origem: dict[int, pool.ThreadedConnectionPool] = {}
+        self.em_uso = 0
+        self.atraso: float | None = None
+        self._atraso_em = -math.inf
+        self._indisponivel_ate = 0.0
+        self.leituras = 0
+        self.falhas = 0
+
+    def disponivel(self, agora: float) -> bool:
+        """Fora da janela de espera após a última falha"""
+        return agora >= self._indisponivel_ate
+
+    def dentro_do_atraso(self, agora: float, limite: float) -> bool:
+        """Atraso conhecido dentro do limite (atraso desatualizado é medido no checkout)"""
+        if not limite or self.atraso is None or agora - self._atraso_em >= INTERVALO_ATRASO:
+            return True
+        return self.atraso <= limite
+
+    def checkout(self, minconn: int, maxconn: int, limite: float):
+        """
+        Retira uma conexão do pool da réplica, medindo o atraso se necessário
+        Retorna None se a réplica estiver além do limite de atraso
+        """
+        with self._abrindo:
+            if self.pool is None:
+                self.pool = pool.ThreadedConnectionPool(minconn, maxconn, self.dsn, cursor_factory=RealDictCursor)
+                logger.info(f"✅ Pool da réplica {self.nome} inicializado ({minconn}-{maxconn} conexões)")
+            origem = self.pool
+
+        conn = origem.getconn()
+        agora = time.monotonic()
+        try:
+            if limite and agora - self._atraso_em >= INTERVALO_ATRASO:
+                with conn.cursor() as cursor:
+                    cursor.execute(QUERY_ATRASO)
+                    self.atraso = float(cursor.fetchone()["atraso"])
+                conn.rollback()
+                self._atraso_em = agora
+        except Exception:
+            origem.putconn(conn, close=True)
+            raise
+
+        if limite and self.atraso > limite:
+            origem.putconn(conn)
+            return None
+        self._origem[id(conn)] = origem
+        return conn
+
+    def devolver(self, conn, close: bool = False) -> None:
+        """Devolve a conexão ao pool de origem (ou a fecha, se esse pool já foi descartado)"""
+        origem = self._origem.pop(id(conn))
+        if origem.closed:
+            conn.close()
+        else:
+            origem.putconn(conn, close=close)
+
+    def marcar_falha(self, espera: float, erro: Exception) -> None:
+        """
+        Tira a réplica do rodízio por `espera` segundos e descarta o pool: as conexões
+        com o servidor que caiu não voltam a ser usadas quando a réplica retornar
+        """
+        self.falhas += 1
+        self._indisponivel_ate = time.monotonic() + espera
+        logger.warning(f"⚠️  Réplica {self.nome} indisponível por {espera:.0f}s: {erro}")
+        with self._abrindo:
+            antigo, self.pool = self.pool, None
+        if antigo is not None:
+            antigo.closeall()
+
+    def fechar(self) -> None:
+        """Fecha o pool da réplica"""
+        if self.pool is not None:
+            self.pool.closeall()
+            self.pool = None
+
+    def metricas(self) -> dict:
+        """Estado da réplica (por processo)"""
+        return {
+            "replica": self.nome,
+            "disponivel": self.disponivel(time.monotonic()),
+            "em_uso": self.em_uso,
+            "leituras": self.leituras,
+            "falhas": self.falhas,
+            "atraso_segundos": self.atraso,
+        }
@@ -3,6 +3,7 @@ Tech Playground API
 Sistema de análise de eNPS e feedback de funcionários
 """
 
+import asyncio
 import logging
 import sys
 from contextlib import asynccontextmanager
@@ -13,7 +14,11 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.database.connection import DatabaseConnection
+from app.middleware import CompressionMiddleware
+from app.responses import ORJSONResponse
 from app.routes import register_routes
+from app.services.notificacoes import ouvinte_avaliacoes
+from app.services.warmup import warmup
 
 
 # Logging
@@ -34,10 +39,19 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ Erro ao iniciar: {e!s}")
         sys.exit(1)
 
+    # Warm-up em segundo plano: /health responde já, /ready quando o worker estiver aquecido
+    tarefa_warmup = asyncio.create_task(warmup.executar()) if settings.WARMUP_ENABLED else None
+    if tarefa_warmup is None:
+        warmup.concluir()
+
     yield
 
-    # SHUTDOWN
-    DatabaseConnection.close_all()
+    if tarefa_warmup is not None and not tarefa_warmup.done():
+        tarefa_warmup.cancel()
+
+    # SHUTDOWN (requisições em andamento já foram drenadas pelo servidor; aguarda as conexões voltarem)
+    ouvinte_avaliacoes.fechar()
+    DatabaseConnection.close_all(timeout=settings.SHUTDOWN_TIMEOUT)
     logger.info("✅ Aplicação finalizada")
 
 
@@ -60,6 +74,7 @@ app = FastAPI(
     """,
     version=settings.API_VERSION,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS
@@ -71,6 +86,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressão (zstd/br/gzip) com cache dos corpos comprimidos
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    cache_size=settings.COMPRESSION_CACHE_SIZE,
+    threadpool_min_size=settings.COMPRESSION_THREADPOOL_MIN_SIZE,
+)
+
 
 # Health Check
 @app.get("/health", tags=["Health"])
@@ -85,6 +108,13 @@ async def health_check():
     }
 
 
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """Prontidão do worker: 503 enquanto o warm-up não termina"""
+    status = warmup.status()
+    return ORJSONResponse(status, status_code=200 if status["pronto"] else 503)
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint com informações da API"""
@@ -94,6 +124,7 @@ async def root():
         "docs": "/docs",
         "redoc": "/redoc",
         "health": "/health",
+        "ready": "/ready",
     }
 
 
@@ -105,10 +136,12 @@ if __name__ == "__main__":
 
     logger.info(f"🚀 Iniciando {settings.API_TITLE} v{settings.API_VERSION}")
 
+    desenvolvimento = settings.ENVIRONMENT == "development"
     uvicorn.run(
-        app,
+        "app.main:app",
         host=settings.API_HOST,
         port=settings.API_PORT,
-        workers=1 if settings.ENVIRONMENT == "development" else 4,
-        reload=settings.DEBUG,
+        workers=1 if desenvolvimento else settings.WEB_CONCURRENCY,
+        reload=desenvolvimento and settings.DEBUG,
+        timeout_graceful_shutdown=settings.SHUTDOWN_TIMEOUT,
     )
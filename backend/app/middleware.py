@@ -0,0 +1,170 @@
+"""
+Middlewares HTTP
+Compressão de respostas (zstd, brotli, gzip) com cache dos corpos já comprimidos
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+# ZstdCompressor não é thread-safe: um por thread (event loop e threadpool)
+_zstd = threading.local()
+
+
+def _comprimir_zstd(corpo: bytes) -> bytes:
+    compressor = getattr(_zstd, "compressor", None)
+    if compressor is None:
+        compressor = _zstd.compressor = zstandard.ZstdCompressor(level=10)
+    return compressor.compress(corpo)
+
+
+def _compressores() -> dict[str, Callable[[bytes], bytes]]:
+    """Encodings disponíveis, em ordem de preferência do servidor"""
+    compressores = {}
+    if zstandard is not None:
+        compressores["zstd"] = _comprimir_zstd
+    if brotli is not None:
+        compressores["br"] = lambda corpo: brotli.compress(corpo, quality=6)
+    compressores["gzip"] = lambda corpo: gzip.compress(corpo, compresslevel=6, mtime=0)
+    return compressores
+
+
+COMPRESSORES = _compressores()
+
+CONTENT_TYPES_COMPRESSIVEIS = ("application/json", "text/")
+
+
+def escolher_encoding(accept_encoding: str) -> str | None:
+    """
+    Negocia o encoding a partir do header Accept-Encoding
+    Maior q-value vence; empate segue a preferência do servidor (zstd > br > gzip)
+    """
+    aceitos: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        partes = [p.strip() for p in item.split(";")]
+        nome = partes[0].lower()
+        if not nome:
+            continue
+        q = 1.0
+        for parametro in partes[1:]:
+            if parametro.startswith("q="):
+                try:
+                    q = float(parametro[2:])
+                except ValueError:
+                    q = 0.0
+        aceitos[nome] = q
+
+    melhor, melhor_q = None, 0.0
+    for encoding in COMPRESSORES:
+        q = aceitos.get(encoding, aceitos.get("*", 0.0))
+        if q > melhor_q:
+            melhor, melhor_q = encoding, q
+    return melhor
+
+
+class CompressionMiddleware:
+    """
+    Comprime respostas acima de minimum_size conforme o Accept-Encoding
+
+    Corpos idênticos (mesma versão dos dados) reaproveitam o resultado comprimido:
+    o cache LRU é indexado pelo hash do corpo, então a compressão é paga uma vez
+    por versão e não a cada requisição. Corpos a partir de threadpool_min_size são
+    comprimidos no threadpool, sem bloquear o event loop do worker.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, cache_size: int = 128, threadpool_min_size: int = 65536):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache_size = cache_size
+        self.threadpool_min_size = threadpool_min_size
+        self._cache: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = escolher_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message: Message | None = None
+        repassar = False
+
+        async def send_comprimido(message: Message) -> None:
+            nonlocal start_message, repassar
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or repassar:
+                await send(message)
+                return
+
+            corpo = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            compressivel = "content-encoding" not in headers and headers.get("content-type", "").startswith(
+                CONTENT_TYPES_COMPRESSIVEIS
+            )
+            # A representação depende do Accept-Encoding mesmo quando vai sem compressão
+            if compressivel:
+                headers.add_vary_header("Accept-Encoding")
+
+            # Sem encoding aceito, streaming, já comprimido, tipo binário ou corpo pequeno: envia como veio
+            if (
+                encoding is None
+                or not compressivel
+                or message.get("more_body", False)
+                or len(corpo) < self.minimum_size
+            ):
+                repassar = True
+                await send(start_message)
+                await send(message)
+                return
+
+            comprimido = await self._comprimir(encoding, corpo)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(comprimido))
+
+            await send(start_message)
+            await send({"type": "http.response.body", "body": comprimido})
+
+        await self.app(scope, receive, send_comprimido)
+
+    async def _comprimir(self, encoding: str, corpo: bytes) -> bytes:
+        """Comprime o corpo, reaproveitando o resultado de corpos idênticos"""
+        chave = (encoding, hashlib.blake2b(corpo, digest_size=16).digest())
+
+        comprimido = self._cache.get(chave)
+        if comprimido is not None:
+            self._cache.move_to_end(chave)
+            self.cache_hits += 1
+            return comprimido
+
+        self.cache_misses += 1
+        if len(corpo) >= self.threadpool_min_size:
+            comprimido = await run_in_threadpool(COMPRESSORES[encoding], corpo)
+        else:
+            comprimido = COMPRESSORES[encoding](corpo)
+        self._cache[chave] = comprimido
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return comprimido
@@ -3,13 +3,36 @@ Analytics Repository
 Queries para análises e métricas
 """
 
+from datetime import date
 from uuid import UUID
 
 from app.repositories.base_repository import BaseRepository
 
 
 class AnalyticsRepository(BaseRepository):
-    def get_enps_distribution(self, empresa_id: UUID | None = None) -> dict:
+    # Agregações pesadas: podem ler de réplica (DB_REPLICAS) sem competir com importações e escritas
+    LEITURA_EM_REPLICA = True
+
+    def _periodo_filter(self, alias: str, data_inicio: date | None, data_fim: date | None) -> tuple[str, list]:
+        """
+        Monta filtro de período sobre data_avaliacao de um alias (av ou rd)
+        Aplicado na chave de partição para permitir partition pruning
+        """
+        conditions = ""
+        params = []
+
+        if data_inicio:
+            conditions += f" AND {alias}.data_avaliacao >= %s"
+            params.append(data_inicio)
+        if data_fim:
+            conditions += f" AND {alias}.data_avaliacao <= %s"
+            params.append(data_fim)
+
+        return conditions, params
+
+    def get_enps_distribution(
+        self, empresa_id: UUID | None = None, data_inicio: date | None = None, data_fim: date | None = None
+    ) -> dict:
         """
         Retorna distribuição eNPS (Promotores, Neutros, Detratores)
         eNPS é calculado da dimensão 7 (Recomendação)
@@ -34,21 +57,25 @@ class AnalyticsRepository(BaseRepository):
                 WHERE f.ativo = true
             """
 
+        periodo_av, periodo_av_params = self._periodo_filter("av", data_inicio, data_fim)
+        params.extend(periodo_av_params)
+
         query = f"""
             WITH enps_data AS (
                 SELECT 
-                    rd.valor_resposta,
+                    rv.valor_resposta,
                     CASE 
-                        WHEN rd.valor_resposta <= 4 THEN 'detratores'
-                        WHEN rd.valor_resposta = 5 THEN 'neutros'
-                        WHEN rd.valor_resposta >= 6 THEN 'promotores'
+                        WHEN rv.valor_resposta <= 4 THEN 'detratores'
+                        WHEN rv.valor_resposta = 5 THEN 'neutros'
+                        WHEN rv.valor_resposta >= 6 THEN 'promotores'
                     END as categoria
-                FROM resposta_dimensao rd
-                JOIN avaliacao av ON av.id_avaliacao = rd.id_avaliacao
-                JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
+                FROM avaliacao av
+                CROSS JOIN dimensao_avaliacao da
+                CROSS JOIN LATERAL (SELECT av.valores_dimensao[da.posicao] as valor_resposta) rv
                 {empresa_filter}
                 AND (da.nome_dimensao = 'Expectativa de Permanência (eNPS)' 
                      OR da.nome_dimensao = 'Expectativa de Permanência')
+                {periodo_av}
             )
             SELECT 
                 categoria,
@@ -112,7 +139,9 @@ class AnalyticsRepository(BaseRepository):
 
         return self.execute_query(query, tuple(params) if params else ())
 
-    def get_satisfaction_scores(self, empresa_id: UUID | None = None) -> list[dict]:
+    def get_satisfaction_scores(
+        self, empresa_id: UUID | None = None, data_inicio: date | None = None, data_fim: date | None = None
+    ) -> list[dict]:
         """
         Retorna scores médios por dimensão de avaliação
         """
@@ -135,17 +164,30 @@ class AnalyticsRepository(BaseRepository):
                 WHERE f.ativo = true
             """
 
+        periodo_av, periodo_av_params = self._periodo_filter("av", data_inicio, data_fim)
+        params.extend(periodo_av_params)
+
+        # Todas as dimensões entram: sem respostas no período/empresa, score nulo e total 0
         query = f"""
-            SELECT 
+            WITH respostas AS (
+                SELECT
+                    rv.posicao,
+                    ROUND(AVG(rv.valor_resposta), 2) as score_medio,
+                    COUNT(rv.valor_resposta) as total_respostas
+                FROM avaliacao av
+                CROSS JOIN LATERAL unnest(av.valores_dimensao) WITH ORDINALITY AS rv(valor_resposta, posicao)
+                {empresa_filter}
+                AND rv.valor_resposta IS NOT NULL
+                {periodo_av}
+                GROUP BY rv.posicao
+            )
+            SELECT
                 da.nome_dimensao as dimensao,
-                ROUND(AVG(rd.valor_resposta), 2) as score_medio,
-                COUNT(rd.id_resposta_dimensao) as total_respostas
+                r.score_medio,
+                COALESCE(r.total_respostas, 0) as total_respostas
             FROM dimensao_avaliacao da
-            LEFT JOIN resposta_dimensao rd ON rd.id_dimensao_avaliacao = da.id_dimensao_avaliacao
-            LEFT JOIN avaliacao av ON av.id_avaliacao = rd.id_avaliacao
-            {empresa_filter}
-            GROUP BY da.nome_dimensao, da.ordem_exibicao
-            ORDER BY da.ordem_exibicao
+            LEFT JOIN respostas r ON r.posicao = da.posicao
+            ORDER BY da.ordem_exibicao, da.posicao
         """
 
         return self.execute_query(query, tuple(params) if params else ())
@@ -159,13 +201,16 @@ class AnalyticsRepository(BaseRepository):
         query_scores = """
             SELECT 
                 da.nome_dimensao as dimensao,
-                rd.valor_resposta as score,
+                rv.valor_resposta as score,
                 da.tipo_escala,
-                rd.comentario
-            FROM resposta_dimensao rd
-            JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
-            JOIN avaliacao av ON av.id_avaliacao = rd.id_avaliacao
+                cd.comentario
+            FROM avaliacao av
+            CROSS JOIN LATERAL unnest(av.valores_dimensao) WITH ORDINALITY AS rv(valor_resposta, posicao)
+            JOIN dimensao_avaliacao da ON da.posicao = rv.posicao
+            LEFT JOIN comentario_dimensao cd ON cd.id_avaliacao = av.id_avaliacao
+                AND cd.data_avaliacao = av.data_avaliacao AND cd.posicao = rv.posicao
             WHERE av.id_funcionario = %s
+            AND rv.valor_resposta IS NOT NULL
             ORDER BY da.ordem_exibicao
         """
         employee_scores = self.execute_query(query_scores, (str(funcionario_id),))
@@ -174,12 +219,13 @@ class AnalyticsRepository(BaseRepository):
         query_company_avg = """
             SELECT 
                 da.nome_dimensao as dimensao,
-                ROUND(AVG(rd.valor_resposta), 2) as score_medio
-            FROM dimensao_avaliacao da
-            LEFT JOIN resposta_dimensao rd ON rd.id_dimensao_avaliacao = da.id_dimensao_avaliacao
-            LEFT JOIN avaliacao av ON av.id_avaliacao = rd.id_avaliacao
+                ROUND(AVG(rv.valor_resposta), 2) as score_medio
+            FROM avaliacao av
+            CROSS JOIN LATERAL unnest(av.valores_dimensao) WITH ORDINALITY AS rv(valor_resposta, posicao)
+            JOIN dimensao_avaliacao da ON da.posicao = rv.posicao
             JOIN funcionario f ON f.id_funcionario = av.id_funcionario
             WHERE f.ativo = true
+            AND rv.valor_resposta IS NOT NULL
             GROUP BY da.nome_dimensao, da.ordem_exibicao
             ORDER BY da.ordem_exibicao
         """
@@ -189,12 +235,13 @@ class AnalyticsRepository(BaseRepository):
         query_area_avg = """
             SELECT 
                 da.nome_dimensao as dimensao,
-                ROUND(AVG(rd.valor_resposta), 2) as score_medio
-            FROM dimensao_avaliacao da
-            LEFT JOIN resposta_dimensao rd ON rd.id_dimensao_avaliacao = da.id_dimensao_avaliacao
-            LEFT JOIN avaliacao av ON av.id_avaliacao = rd.id_avaliacao
+                ROUND(AVG(rv.valor_resposta), 2) as score_medio
+            FROM avaliacao av
+            CROSS JOIN LATERAL unnest(av.valores_dimensao) WITH ORDINALITY AS rv(valor_resposta, posicao)
+            JOIN dimensao_avaliacao da ON da.posicao = rv.posicao
             JOIN funcionario f ON f.id_funcionario = av.id_funcionario
             WHERE f.ativo = true 
+            AND rv.valor_resposta IS NOT NULL
             AND f.id_area_detalhe = (
                 SELECT id_area_detalhe FROM funcionario WHERE id_funcionario = %s
             )
@@ -209,10 +256,10 @@ class AnalyticsRepository(BaseRepository):
                 av.data_avaliacao,
                 av.periodo_avaliacao,
                 av.comentario_geral,
-                COUNT(rd.id_resposta_dimensao) as total_dimensoes,
-                ROUND(AVG(rd.valor_resposta), 2) as score_medio_geral
+                COUNT(rv.valor_resposta) as total_dimensoes,
+                ROUND(AVG(rv.valor_resposta), 2) as score_medio_geral
             FROM avaliacao av
-            LEFT JOIN resposta_dimensao rd ON rd.id_avaliacao = av.id_avaliacao
+            LEFT JOIN LATERAL unnest(av.valores_dimensao) AS rv(valor_resposta) ON true
             WHERE av.id_funcionario = %s
             GROUP BY av.id_avaliacao, av.data_avaliacao, av.periodo_avaliacao, av.comentario_geral
             ORDER BY av.data_avaliacao DESC
@@ -223,15 +270,13 @@ class AnalyticsRepository(BaseRepository):
         query_comments = """
             SELECT 
                 da.nome_dimensao as dimensao,
-                rd.valor_resposta as score,
-                rd.comentario,
+                av.valores_dimensao[cd.posicao] as score,
+                cd.comentario,
                 av.data_avaliacao
-            FROM resposta_dimensao rd
-            JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
-            JOIN avaliacao av ON av.id_avaliacao = rd.id_avaliacao
+            FROM comentario_dimensao cd
+            JOIN avaliacao av ON av.id_avaliacao = cd.id_avaliacao AND av.data_avaliacao = cd.data_avaliacao
+            JOIN dimensao_avaliacao da ON da.posicao = cd.posicao
             WHERE av.id_funcionario = %s
-            AND rd.comentario IS NOT NULL
-            AND rd.comentario != ''
             ORDER BY av.data_avaliacao DESC, da.ordem_exibicao
         """
         comments = self.execute_query(query_comments, (str(funcionario_id),))
@@ -244,223 +289,79 @@ class AnalyticsRepository(BaseRepository):
             "comments": comments,
         }
 
-    def get_areas_scores_comparison(self, empresa_id: UUID | None = None) -> list[dict]:
+    def get_areas_scores_comparison(
+        self, empresa_id: UUID | None = None, data_inicio: date | None = None, data_fim: date | None = None
+    ) -> list[dict]:
         """
         Retorna scores médios por dimensão para cada área
-        Usado para comparação entre áreas/departamentos
+        Usado para comparação entre áreas (Task 7 - Visualização 1)
         """
         empresa_filter = ""
         params = []
 
         if empresa_id:
-            empresa_filter = "AND d.id_empresa = %s"
+            empresa_filter = """
+                AND dir.id_empresa = %s
+            """
             params.append(str(empresa_id))
 
-        query = f"""
-            SELECT 
-                ad.id_area_detalhe,
-                ad.nome_area_detalhe as area_nome,
-                co.nome_coordenacao,
-                g.nome_gerencia,
-                d.nome_diretoria,
-                da.nome_dimensao as dimensao,
-                ROUND(AVG(rd.valor_resposta), 2) as score_medio,
-                COUNT(DISTINCT f.id_funcionario) as total_funcionarios,
-                COUNT(rd.id_resposta_dimensao) as total_respostas
-            FROM area_detalhe ad
-            JOIN coordenacao co ON co.id_coordenacao = ad.id_coordenacao
-            JOIN gerencia g ON g.id_gerencia = co.id_gerencia
-            JOIN diretoria d ON d.id_diretoria = g.id_diretoria
-            JOIN funcionario f ON f.id_area_detalhe = ad.id_area_detalhe AND f.ativo = true
-            JOIN avaliacao av ON av.id_funcionario = f.id_funcionario
-            JOIN resposta_dimensao rd ON rd.id_avaliacao = av.id_avaliacao
-            JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
-            WHERE 1=1 {empresa_filter}
-            GROUP BY ad.id_area_detalhe, ad.nome_area_detalhe, co.nome_coordenacao, 
-                     g.nome_gerencia, d.nome_diretoria, da.nome_dimensao, da.ordem_exibicao
-            ORDER BY ad.nome_area_detalhe, da.ordem_exibicao
-        """
-
-        return self.execute_query(query, tuple(params) if params else ())
-
-    def get_areas_enps_comparison(self, empresa_id: UUID | None = None) -> list[dict]:
-        """
-        Retorna eNPS por área para comparação entre departamentos
-        """
-        empresa_filter = ""
-        params = []
-
-        if empresa_id:
-            empresa_filter = "AND d.id_empresa = %s"
-            params.append(str(empresa_id))
+        periodo_av, periodo_av_params = self._periodo_filter("av", data_inicio, data_fim)
+        params.extend(periodo_av_params)
 
+        # Cada área com todas as dimensões: sem respostas no período, score nulo e total 0
         query = f"""
-            WITH area_enps AS (
-                SELECT 
+            WITH areas AS (
+                SELECT
                     ad.id_area_detalhe,
                     ad.nome_area_detalhe as area_nome,
                     co.nome_coordenacao,
                     g.nome_gerencia,
-                    d.nome_diretoria,
-                    rd.valor_resposta,
-                    CASE 
-                        WHEN rd.valor_resposta <= 4 THEN 'detratores'
-                        WHEN rd.valor_resposta = 5 THEN 'neutros'
-                        WHEN rd.valor_resposta >= 6 THEN 'promotores'
-                    END as categoria,
-                    COUNT(DISTINCT f.id_funcionario) as total_funcionarios
+                    dir.nome_diretoria,
+                    COUNT(f.id_funcionario) as total_funcionarios
                 FROM area_detalhe ad
                 JOIN coordenacao co ON co.id_coordenacao = ad.id_coordenacao
                 JOIN gerencia g ON g.id_gerencia = co.id_gerencia
-                JOIN diretoria d ON d.id_diretoria = g.id_diretoria
+                JOIN diretoria dir ON dir.id_diretoria = g.id_diretoria
                 JOIN funcionario f ON f.id_area_detalhe = ad.id_area_detalhe AND f.ativo = true
-                JOIN avaliacao av ON av.id_funcionario = f.id_funcionario
-                JOIN resposta_dimensao rd ON rd.id_avaliacao = av.id_avaliacao
-                JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
-                WHERE (da.nome_dimensao = 'Expectativa de Permanência (eNPS)' 
-                       OR da.nome_dimensao = 'Expectativa de Permanência')
+                WHERE ad.ativo = true
                 {empresa_filter}
                 GROUP BY ad.id_area_detalhe, ad.nome_area_detalhe, co.nome_coordenacao,
-                         g.nome_gerencia, d.nome_diretoria, rd.valor_resposta, categoria
+                         g.nome_gerencia, dir.nome_diretoria
+            ),
+            respostas AS (
+                SELECT
+                    f.id_area_detalhe,
+                    rv.posicao,
+                    ROUND(AVG(rv.valor_resposta), 2) as score_medio,
+                    COUNT(rv.valor_resposta) as total_respostas
+                FROM areas a
+                JOIN funcionario f ON f.id_area_detalhe = a.id_area_detalhe AND f.ativo = true
+                JOIN avaliacao av ON av.id_funcionario = f.id_funcionario{periodo_av}
+                CROSS JOIN LATERAL unnest(av.valores_dimensao) WITH ORDINALITY AS rv(valor_resposta, posicao)
+                WHERE rv.valor_resposta IS NOT NULL
+                GROUP BY f.id_area_detalhe, rv.posicao
             )
-            SELECT 
-                id_area_detalhe,
-                area_nome,
-                nome_coordenacao,
-                nome_gerencia,
-                nome_diretoria,
-                MAX(total_funcionarios) as total_funcionarios,
-                SUM(CASE WHEN categoria = 'promotores' THEN 1 ELSE 0 END) as promotores,
-                SUM(CASE WHEN categoria = 'neutros' THEN 1 ELSE 0 END) as neutros,
-                SUM(CASE WHEN categoria = 'detratores' THEN 1 ELSE 0 END) as detratores,
-                ROUND(
-                    (SUM(CASE WHEN categoria = 'promotores' THEN 1 ELSE 0 END) * 100.0 / COUNT(*)) - 
-                    (SUM(CASE WHEN categoria = 'detratores' THEN 1 ELSE 0 END) * 100.0 / COUNT(*)),
-                    2
-                ) as enps_score
-            FROM area_enps
-            GROUP BY id_area_detalhe, area_nome, nome_coordenacao, nome_gerencia, nome_diretoria
-            ORDER BY enps_score DESC
-        """
-
-        return self.execute_query(query, tuple(params) if params else ())
-
-    def get_area_detailed_metrics(self, area_id: UUID) -> dict:
-        """
-        Retorna métricas detalhadas de uma área específica
-        Inclui: scores por dimensão, eNPS, distribuição de funcionários
-        """
-        # 1. Informações básicas da área
-        query_area_info = """
-            SELECT 
-                ad.id_area_detalhe,
-                ad.nome_area_detalhe as area_nome,
-                ad.sigla_area,
-                ad.responsavel_nome,
-                ad.responsavel_email,
-                co.nome_coordenacao,
-                g.nome_gerencia,
-                d.nome_diretoria,
-                COUNT(DISTINCT f.id_funcionario) as total_funcionarios
-            FROM area_detalhe ad
-            JOIN coordenacao co ON co.id_coordenacao = ad.id_coordenacao
-            JOIN gerencia g ON g.id_gerencia = co.id_gerencia
-            JOIN diretoria d ON d.id_diretoria = g.id_diretoria
-            LEFT JOIN funcionario f ON f.id_area_detalhe = ad.id_area_detalhe AND f.ativo = true
-            WHERE ad.id_area_detalhe = %s
-            GROUP BY ad.id_area_detalhe, ad.nome_area_detalhe, ad.sigla_area, 
-                     ad.responsavel_nome, ad.responsavel_email, co.nome_coordenacao,
-                     g.nome_gerencia, d.nome_diretoria
-        """
-        area_info = self.execute_one(query_area_info, (str(area_id),))
-
-        # 2. Scores por dimensão
-        query_scores = """
-            SELECT 
-                da.nome_dimensao as dimensao,
-                da.tipo_escala,
-                ROUND(AVG(rd.valor_resposta), 2) as score_medio,
-                COUNT(rd.id_resposta_dimensao) as total_respostas
-            FROM dimensao_avaliacao da
-            LEFT JOIN resposta_dimensao rd ON rd.id_dimensao_avaliacao = da.id_dimensao_avaliacao
-            LEFT JOIN avaliacao av ON av.id_avaliacao = rd.id_avaliacao
-            LEFT JOIN funcionario f ON f.id_funcionario = av.id_funcionario
-            WHERE f.id_area_detalhe = %s AND f.ativo = true
-            GROUP BY da.nome_dimensao, da.tipo_escala, da.ordem_exibicao
-            ORDER BY da.ordem_exibicao
-        """
-        scores = self.execute_query(query_scores, (str(area_id),))
-
-        # 3. Distribuição eNPS
-        query_enps = """
-            SELECT 
-                CASE 
-                    WHEN rd.valor_resposta <= 4 THEN 'detratores'
-                    WHEN rd.valor_resposta = 5 THEN 'neutros'
-                    WHEN rd.valor_resposta >= 6 THEN 'promotores'
-                END as categoria,
-                COUNT(*) as quantidade
-            FROM resposta_dimensao rd
-            JOIN avaliacao av ON av.id_avaliacao = rd.id_avaliacao
-            JOIN funcionario f ON f.id_funcionario = av.id_funcionario
-            JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
-            WHERE f.id_area_detalhe = %s 
-            AND f.ativo = true
-            AND (da.nome_dimensao = 'Expectativa de Permanência (eNPS)' 
-                 OR da.nome_dimensao = 'Expectativa de Permanência')
-            GROUP BY categoria
-        """
-        enps_dist = self.execute_query(query_enps, (str(area_id),))
-
-        return {
-            "area_info": area_info,
-            "scores_por_dimensao": scores,
-            "enps_distribution": enps_dist,
-        }
-
-    def get_areas_scores_comparison(self, empresa_id: UUID | None = None) -> list[dict]:
-        """
-        Retorna scores médios por dimensão para cada área
-        Usado para comparação entre áreas (Task 7 - Visualização 1)
-        """
-        empresa_filter = ""
-        params = []
-
-        if empresa_id:
-            empresa_filter = """
-                AND d.id_empresa = %s
-            """
-            params.append(str(empresa_id))
-
-        query = f"""
-            SELECT 
-                ad.id_area_detalhe,
-                ad.nome_area_detalhe as area_nome,
-                co.nome_coordenacao,
-                g.nome_gerencia,
-                dir.nome_diretoria,
+            SELECT
+                a.id_area_detalhe,
+                a.area_nome,
+                a.nome_coordenacao,
+                a.nome_gerencia,
+                a.nome_diretoria,
                 da.nome_dimensao as dimensao,
-                ROUND(AVG(rd.valor_resposta), 2) as score_medio,
-                COUNT(rd.id_resposta_dimensao) as total_respostas,
-                COUNT(DISTINCT f.id_funcionario) as total_funcionarios
-            FROM area_detalhe ad
-            JOIN coordenacao co ON co.id_coordenacao = ad.id_coordenacao
-            JOIN gerencia g ON g.id_gerencia = co.id_gerencia
-            JOIN diretoria dir ON dir.id_diretoria = g.id_diretoria
-            JOIN funcionario f ON f.id_area_detalhe = ad.id_area_detalhe AND f.ativo = true
-            LEFT JOIN avaliacao av ON av.id_funcionario = f.id_funcionario
-            LEFT JOIN resposta_dimensao rd ON rd.id_avaliacao = av.id_avaliacao
-            LEFT JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
-            WHERE ad.ativo = true
-            {empresa_filter}
-            GROUP BY ad.id_area_detalhe, ad.nome_area_detalhe, co.nome_coordenacao, 
-                     g.nome_gerencia, dir.nome_diretoria, da.nome_dimensao, da.ordem_exibicao
-            ORDER BY ad.nome_area_detalhe, da.ordem_exibicao
+                r.score_medio,
+                COALESCE(r.total_respostas, 0) as total_respostas,
+                a.total_funcionarios
+            FROM areas a
+            CROSS JOIN dimensao_avaliacao da
+            LEFT JOIN respostas r ON r.id_area_detalhe = a.id_area_detalhe AND r.posicao = da.posicao
+            ORDER BY a.area_nome, a.id_area_detalhe, da.ordem_exibicao, da.posicao
         """
 
         return self.execute_query(query, tuple(params) if params else ())
 
-    def get_areas_enps_comparison(self, empresa_id: UUID | None = None) -> list[dict]:
+    def get_areas_enps_comparison(
+        self, empresa_id: UUID | None = None, data_inicio: date | None = None, data_fim: date | None = None
+    ) -> list[dict]:
         """
         Retorna eNPS segmentado por área
         Usado para comparação de engajamento entre áreas (Task 7 - Visualização 2)
@@ -470,10 +371,13 @@ class AnalyticsRepository(BaseRepository):
 
         if empresa_id:
             empresa_filter = """
-                AND d.id_empresa = %s
+                AND dir.id_empresa = %s
             """
             params.append(str(empresa_id))
 
+        periodo_av, periodo_av_params = self._periodo_filter("av", data_inicio, data_fim)
+        params.extend(periodo_av_params)
+
         query = f"""
             WITH enps_by_area AS (
                 SELECT 
@@ -482,24 +386,25 @@ class AnalyticsRepository(BaseRepository):
                     co.nome_coordenacao,
                     g.nome_gerencia,
                     dir.nome_diretoria,
-                    rd.valor_resposta,
+                    rv.valor_resposta,
                     CASE 
-                        WHEN rd.valor_resposta <= 4 THEN 'detratores'
-                        WHEN rd.valor_resposta = 5 THEN 'neutros'
-                        WHEN rd.valor_resposta >= 6 THEN 'promotores'
+                        WHEN rv.valor_resposta <= 4 THEN 'detratores'
+                        WHEN rv.valor_resposta = 5 THEN 'neutros'
+                        WHEN rv.valor_resposta >= 6 THEN 'promotores'
                     END as categoria
                 FROM area_detalhe ad
                 JOIN coordenacao co ON co.id_coordenacao = ad.id_coordenacao
                 JOIN gerencia g ON g.id_gerencia = co.id_gerencia
                 JOIN diretoria dir ON dir.id_diretoria = g.id_diretoria
                 JOIN funcionario f ON f.id_area_detalhe = ad.id_area_detalhe AND f.ativo = true
-                LEFT JOIN avaliacao av ON av.id_funcionario = f.id_funcionario
-                LEFT JOIN resposta_dimensao rd ON rd.id_avaliacao = av.id_avaliacao
-                LEFT JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
+                JOIN avaliacao av ON av.id_funcionario = f.id_funcionario
+                CROSS JOIN dimensao_avaliacao da
+                CROSS JOIN LATERAL (SELECT av.valores_dimensao[da.posicao] as valor_resposta) rv
                 WHERE ad.ativo = true
                 AND (da.nome_dimensao = 'Expectativa de Permanência (eNPS)' 
                      OR da.nome_dimensao = 'Expectativa de Permanência')
                 {empresa_filter}
+                {periodo_av}
             )
             SELECT 
                 id_area_detalhe,
@@ -525,59 +430,82 @@ class AnalyticsRepository(BaseRepository):
 
         return self.execute_query(query, tuple(params) if params else ())
 
-    def get_area_detailed_metrics(self, area_id: UUID) -> dict:
+    def get_area_detailed_metrics(
+        self, area_id: UUID, data_inicio: date | None = None, data_fim: date | None = None
+    ) -> dict:
         """
         Retorna métricas detalhadas de uma área específica
         Incluindo scores por dimensão, eNPS, e comparação com empresa
         """
-        # 1. Scores por dimensão da área
-        query_area_scores = """
-            SELECT 
+        periodo_av, periodo_params = self._periodo_filter("av", data_inicio, data_fim)
+
+        # 1. Scores por dimensão da área (todas as dimensões; sem respostas, score nulo e totais 0)
+        query_area_scores = f"""
+            WITH respostas AS (
+                SELECT
+                    rv.posicao,
+                    ROUND(AVG(rv.valor_resposta), 2) as score_medio,
+                    COUNT(rv.valor_resposta) as total_respostas,
+                    COUNT(DISTINCT f.id_funcionario) as total_funcionarios
+                FROM funcionario f
+                JOIN avaliacao av ON av.id_funcionario = f.id_funcionario
+                CROSS JOIN LATERAL unnest(av.valores_dimensao) WITH ORDINALITY AS rv(valor_resposta, posicao)
+                WHERE f.id_area_detalhe = %s AND f.ativo = true
+                AND rv.valor_resposta IS NOT NULL
+                {periodo_av}
+                GROUP BY rv.posicao
+            )
+            SELECT
                 da.nome_dimensao as dimensao,
-                ROUND(AVG(rd.valor_resposta), 2) as score_medio,
-                COUNT(rd.id_resposta_dimensao) as total_respostas,
-                COUNT(DISTINCT f.id_funcionario) as total_funcionarios
+                r.score_medio,
+                COALESCE(r.total_respostas, 0) as total_respostas,
+                COALESCE(r.total_funcionarios, 0) as total_funcionarios
             FROM dimensao_avaliacao da
-            LEFT JOIN resposta_dimensao rd ON rd.id_dimensao_avaliacao = da.id_dimensao_avaliacao
-            LEFT JOIN avaliacao av ON av.id_avaliacao = rd.id_avaliacao
-            LEFT JOIN funcionario f ON f.id_funcionario = av.id_funcionario
-            WHERE f.id_area_detalhe = %s AND f.ativo = true
-            GROUP BY da.nome_dimensao, da.ordem_exibicao
-            ORDER BY da.ordem_exibicao
+            LEFT JOIN respostas r ON r.posicao = da.posicao
+            ORDER BY da.ordem_exibicao, da.posicao
         """
-        area_scores = self.execute_query(query_area_scores, (str(area_id),))
+        area_scores = self.execute_query(query_area_scores, (str(area_id), *periodo_params))
 
         # 2. Médias da empresa para comparação
-        query_company_avg = """
-            SELECT 
+        query_company_avg = f"""
+            WITH respostas AS (
+                SELECT
+                    rv.posicao,
+                    ROUND(AVG(rv.valor_resposta), 2) as score_medio
+                FROM avaliacao av
+                CROSS JOIN LATERAL unnest(av.valores_dimensao) WITH ORDINALITY AS rv(valor_resposta, posicao)
+                JOIN funcionario f ON f.id_funcionario = av.id_funcionario
+                WHERE f.ativo = true
+                AND rv.valor_resposta IS NOT NULL
+                {periodo_av}
+                GROUP BY rv.posicao
+            )
+            SELECT
                 da.nome_dimensao as dimensao,
-                ROUND(AVG(rd.valor_resposta), 2) as score_medio
+                r.score_medio
             FROM dimensao_avaliacao da
-            LEFT JOIN resposta_dimensao rd ON rd.id_dimensao_avaliacao = da.id_dimensao_avaliacao
-            LEFT JOIN avaliacao av ON av.id_avaliacao = rd.id_avaliacao
-            JOIN funcionario f ON f.id_funcionario = av.id_funcionario
-            WHERE f.ativo = true
-            GROUP BY da.nome_dimensao, da.ordem_exibicao
-            ORDER BY da.ordem_exibicao
+            LEFT JOIN respostas r ON r.posicao = da.posicao
+            ORDER BY da.ordem_exibicao, da.posicao
         """
-        company_averages = self.execute_query(query_company_avg, ())
+        company_averages = self.execute_query(query_company_avg, tuple(periodo_params))
 
         # 3. eNPS da área
-        query_enps = """
+        query_enps = f"""
             SELECT 
-                COUNT(CASE WHEN rd.valor_resposta <= 4 THEN 1 END) as detratores,
-                COUNT(CASE WHEN rd.valor_resposta = 5 THEN 1 END) as neutros,
-                COUNT(CASE WHEN rd.valor_resposta >= 6 THEN 1 END) as promotores
+                COUNT(CASE WHEN rv.valor_resposta <= 4 THEN 1 END) as detratores,
+                COUNT(CASE WHEN rv.valor_resposta = 5 THEN 1 END) as neutros,
+                COUNT(CASE WHEN rv.valor_resposta >= 6 THEN 1 END) as promotores
             FROM funcionario f
-            LEFT JOIN avaliacao av ON av.id_funcionario = f.id_funcionario
-            LEFT JOIN resposta_dimensao rd ON rd.id_avaliacao = av.id_avaliacao
-            LEFT JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
+            JOIN avaliacao av ON av.id_funcionario = f.id_funcionario
+            CROSS JOIN dimensao_avaliacao da
+            CROSS JOIN LATERAL (SELECT av.valores_dimensao[da.posicao] as valor_resposta) rv
             WHERE f.id_area_detalhe = %s 
             AND f.ativo = true
             AND (da.nome_dimensao = 'Expectativa de Permanência (eNPS)' 
                  OR da.nome_dimensao = 'Expectativa de Permanência')
+            {periodo_av}
         """
-        enps_data = self.execute_query(query_enps, (str(area_id),))
+        enps_data = self.execute_query(query_enps, (str(area_id), *periodo_params))
 
         # 4. Informações da área
         query_area_info = """
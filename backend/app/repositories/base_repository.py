@@ -3,42 +3,316 @@ Base Repository
 Classe base com métodos comuns para acesso a dados
 """
 
+import hashlib
+import io
+import itertools
 import logging
+import re
+import threading
+import weakref
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
 from typing import Any
 
+from psycopg2 import Error as DatabaseError
+from psycopg2 import extensions, sql
+from psycopg2.extras import execute_values
+
+from app.config import settings
 from app.database.connection import DatabaseConnection
+from app.database.replicas import FalhaReplica
 
 
 logger = logging.getLogger(__name__)
 
+# Placeholders do psycopg2: listas "IN (%s, %s, ...)", "%s" simples e "%%" (literal)
+PLACEHOLDERS = re.compile(r"\b(NOT\s+)?IN\s*\(\s*%s(?:\s*,\s*%s)*\s*\)|%s|%%", re.IGNORECASE)
+
+
+def array_literal(valores: list) -> str:
+    """Lista como literal de array do Postgres ('{"a","b"}'), convertido para o tipo do parâmetro no EXECUTE"""
+    itens = (str(v).replace("\\", "\\\\").replace('"', '\\"') for v in valores)
+    return "{" + ",".join(f'"{item}"' for item in itens) + "}"
+
+
+def indice_colunas(description) -> dict[str, int]:
+    """Mapa coluna -> posição na tupla, compartilhado por todas as linhas do resultado"""
+    return {coluna.name: indice for indice, coluna in enumerate(description)}
+
+
+def copy_valor(valor: Any) -> str:
+    """Valor no formato texto do COPY (NULL = \\N; barra, tab e quebras de linha escapadas)"""
+    if valor is None:
+        return "\\N"
+    if isinstance(valor, bool):
+        return "t" if valor else "f"
+    return str(valor).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class LinhasCopy(io.TextIOBase):
+    """
+    Arquivo somente leitura que gera o texto do COPY sob demanda a partir de um iterável
+    de linhas: copy_expert lê blocos de tamanho fixo, sem materializar o lote inteiro
+    """
+
+    def __init__(self, linhas: Iterable):
+        self._linhas = iter(linhas)
+        self._buffer = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            linha = next(self._linhas, None)
+            if linha is None:
+                break
+            self._buffer += "\t".join(copy_valor(valor) for valor in linha) + "\n"
+        if size < 0:
+            size = len(self._buffer)
+        bloco, self._buffer = self._buffer[:size], self._buffer[size:]
+        return bloco
+
+    def readline(self, size: int = -1) -> str:
+        return self.read(size)
+
+
+def normalizar_query(query: str, params: tuple) -> tuple[str, list]:
+    """
+    Normaliza a query para PREPARE: placeholders viram $n e cada lista IN (%s, ...)
+    vira um único parâmetro array (= ANY($n)). Assim a mesma combinação de filtros
+    tem o mesmo formato, independente de quantos valores cada filtro recebeu.
+    Retorna (sql com $n, parâmetros do EXECUTE).
+    """
+    valores = iter(params)
+    parametros: list = []
+
+    def substituir(match: re.Match) -> str:
+        trecho = match.group(0)
+        if trecho == "%%":
+            return "%"
+        if trecho == "%s":
+            parametros.append(next(valores))
+            return f"${len(parametros)}"
+        lista = [next(valores) for _ in range(trecho.count("%s"))]
+        parametros.append(array_literal(lista))
+        operador = "<> ALL" if match.group(1) else "= ANY"
+        return f"{operador}(${len(parametros)})"
+
+    return PLACEHOLDERS.sub(substituir, query), parametros
+
+
+class PreparedStatements:
+    """
+    Registro de prepared statements do servidor.
+    Cada formato de query (após normalizar_query) recebe um nome estável e é
+    preparado uma vez por conexão (PREPARE); as chamadas seguintes só fazem
+    EXECUTE, sem parse e, após as primeiras execuções, sem replanejamento.
+    Formatos que o Postgres não consegue preparar (tipo de parâmetro indeterminado)
+    passam a ser executados direto.
+    """
+
+    def __init__(self):
+        self._preparados: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._nao_preparaveis: set[str] = set()
+        self._formatos: set[str] = set()
+        self._lock = threading.Lock()
+        self._prepares = 0
+        self._executes = 0
+        self._diretas = 0
+
+    @staticmethod
+    def nome(sql: str) -> str:
+        """Nome do statement derivado do formato da query"""
+        return "ps_" + hashlib.sha1(sql.encode()).hexdigest()[:16]
+
+    def executar(self, conn, cursor, query: str, params: tuple | None) -> None:
+        """Executa a query no cursor via EXECUTE, preparando-a na conexão se necessário"""
+        sql, parametros = normalizar_query(query, params or ())
+        nome = self.nome(sql)
+
+        if nome in self._nao_preparaveis:
+            self._contar("_diretas")
+            cursor.execute(query, params or ())
+            return
+
+        preparados = self._preparados.setdefault(conn, set())
+        if nome not in preparados:
+            # Um PREPARE que falha só desfaz o próprio SAVEPOINT: a transação em curso
+            # (snapshot do escopo da requisição, escritas da unidade de trabalho) segue válida
+            cursor.execute("SAVEPOINT preparar")
+            try:
+                cursor.execute(f"PREPARE {nome} AS {sql}")
+            except DatabaseError as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT preparar")
+                with self._lock:
+                    self._nao_preparaveis.add(nome)
+                logger.warning(f"⚠️  Query não preparável, executando direto: {e}")
+                self._contar("_diretas")
+                cursor.execute(query, params or ())
+                return
+            cursor.execute("RELEASE SAVEPOINT preparar")
+            preparados.add(nome)
+            with self._lock:
+                self._prepares += 1
+                self._formatos.add(nome)
+
+        self._contar("_executes")
+        if parametros:
+            cursor.execute(f"EXECUTE {nome} ({', '.join(['%s'] * len(parametros))})", parametros)
+        else:
+            cursor.execute(f"EXECUTE {nome}")
+
+    def _contar(self, contador: str) -> None:
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    def metricas(self) -> dict:
+        """Contadores de PREPARE e EXECUTE (por processo)"""
+        return {
+            "formatos": len(self._formatos),
+            "prepares": self._prepares,
+            "executes": self._executes,
+            "execucoes_diretas": self._diretas,
+            "nao_preparaveis": len(self._nao_preparaveis),
+        }
+
+    def reset_metricas(self) -> None:
+        """Zera os contadores (não esquece os statements já preparados)"""
+        with self._lock:
+            self._prepares = 0
+            self._executes = 0
+            self._diretas = 0
+
+
+prepared_statements = PreparedStatements()
+
+# Nomes únicos (no processo) para os cursores nomeados do streaming
+_cursores = itertools.count()
+
 
 class BaseRepository:
     """Repositório base com operações CRUD genéricas"""
 
+    # Leituras do repositório podem ir para réplicas (DB_REPLICAS): só consultas que toleram atraso
+    LEITURA_EM_REPLICA = False
+
     def __init__(self):
         self.db = DatabaseConnection
 
+    def _conexao_leitura(self):
+        """Conexão para leitura: de réplica quando o repositório permite, senão do primário"""
+        return self.db.get_read_connection() if self.LEITURA_EM_REPLICA else self.db.get_connection()
+
+    def _ler(self, query: str, params: tuple | None, buscar: Callable, cursor_factory=None) -> Any:
+        """
+        Executa a leitura e retorna buscar(cursor); repetida uma vez (em outra réplica
+        ou no primário) se a réplica cair durante a consulta
+        """
+
+        def ler() -> Any:
+            with self._conexao_leitura() as conn:
+                cursor = conn.cursor(cursor_factory=cursor_factory)
+                self._execute_read(conn, cursor, query, params)
+                resultado = buscar(cursor)
+                cursor.close()
+                return resultado
+
+        try:
+            return ler()
+        except FalhaReplica as e:
+            logger.warning(f"⚠️  Leitura repetida após falha da réplica: {e}")
+            return ler()
+
+    def _execute_read(self, conn, cursor, query: str, params: tuple | None) -> None:
+        """Consultas de leitura passam pelo registro de prepared statements (DB_PREPARED_STATEMENTS)"""
+        if settings.DB_PREPARED_STATEMENTS and not isinstance(params, dict):
+            prepared_statements.executar(conn, cursor, query, params)
+        else:
+            cursor.execute(query, params or ())
+
     def execute_query(self, query: str, params: tuple | None = None) -> list[dict[str, Any]]:
         """
         Executa query SELECT e retorna lista de dicionários
         """
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params or ())
-            results = cursor.fetchall()
-            cursor.close()
-            return [dict(row) for row in results]
+        # RealDictRow já é um dict: sem cópia por linha
+        return self._ler(query, params, lambda cursor: cursor.fetchall())
+
+    def execute_rows(self, query: str, params: tuple | None = None) -> tuple[dict[str, int], list[tuple]]:
+        """
+        Executa query SELECT e retorna (mapa coluna -> índice, linhas como tuplas)
+        Caminho enxuto para resultados grandes: sem dict nem chaves por linha
+        """
+        return self._ler(
+            query,
+            params,
+            lambda cursor: (indice_colunas(cursor.description), cursor.fetchall()),
+            cursor_factory=extensions.cursor,
+        )
+
+    def iter_rows(self, query: str, params: tuple | None = None, lote: int = 2000) -> Iterator[tuple]:
+        """
+        Executa query SELECT e gera as linhas como tuplas, em lotes de fetchmany
+        (só um lote de objetos Python por vez; a conexão fica retida até o fim da iteração)
+        """
+        with self._conexao_leitura() as conn:
+            cursor = conn.cursor(cursor_factory=extensions.cursor)
+            try:
+                self._execute_read(conn, cursor, query, params)
+                while results := cursor.fetchmany(lote):
+                    yield from results
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def stream_query(
+        self, query: str, params: tuple | None = None, itersize: int = 2000, tuplas: bool = False
+    ) -> Iterator[Iterator[list]]:
+        """
+        Executa query SELECT em cursor nomeado (server-side) e fornece um iterador de lotes
+        de até itersize linhas: o resultado nunca é materializado, nem no Python nem no libpq.
+        Ao sair do with (inclusive com o consumidor parando antes do fim ou com erro) o cursor
+        é fechado, a transação encerrada e a conexão devolvida ao pool.
+
+        Cursores nomeados não passam pelo registro de prepared statements (DECLARE não aceita EXECUTE).
+        """
+        with self._conexao_leitura() as conn:
+            cursor = conn.cursor(name=f"stream_{next(_cursores)}", cursor_factory=extensions.cursor if tuplas else None)
+            cursor.itersize = itersize
+            try:
+                cursor.execute(query, params or ())
+
+                def lotes() -> Iterator[list]:
+                    while lote := cursor.fetchmany(itersize):
+                        yield lote
+
+                yield lotes()
+            finally:
+                try:
+                    cursor.close()
+                finally:
+                    # O cursor nomeado vive numa transação: a conexão volta limpa ao pool
+                    # (no escopo da requisição, a transação é encerrada pelo próprio escopo)
+                    if not self.db.em_escopo():
+                        conn.rollback()
+
+    def iter_query(
+        self, query: str, params: tuple | None = None, itersize: int = 2000, tuplas: bool = False
+    ) -> Iterator:
+        """
+        Gera as linhas de stream_query uma a uma (dicts, ou tuplas com tuplas=True)
+        A conexão é liberada ao esgotar o gerador ou ao fechá-lo (close(), break num for)
+        """
+        with self.stream_query(query, params, itersize, tuplas) as lotes:
+            for lote in lotes:
+                yield from lote
 
     def execute_one(self, query: str, params: tuple | None = None) -> dict[str, Any] | None:
         """
         Executa query SELECT e retorna um único registro
         """
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params or ())
-            result = cursor.fetchone()
-            cursor.close()
-            return dict(result) if result else None
+        result = self._ler(query, params, lambda cursor: cursor.fetchone())
+        return dict(result) if result else None
 
     def execute_insert(self, query: str, params: tuple | None = None) -> str | None:
         """
@@ -91,19 +365,80 @@ class BaseRepository:
                 logger.error(f"Erro no DELETE: {e}")
                 raise
 
-    def execute_scalar(self, query: str, params: tuple | None = None) -> Any:
+    @contextmanager
+    def unit_of_work(self) -> Iterator:
         """
-        Executa query e retorna um único valor escalar
+        Unidade de trabalho: uma conexão e uma transação para várias operações.
+        Fornece o cursor, que pode ser passado a execute_batch/copy_rows; commit ao
+        final do bloco, rollback se qualquer operação falhar.
         """
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, params or ())
-            result = cursor.fetchone()
-            cursor.close()
-            # Se result é um dicionário (RealDictCursor), pega o primeiro valor
-            if result:
-                return next(iter(result.values())) if isinstance(result, dict) else result[0]
-            return None
+            try:
+                yield cursor
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Erro na unidade de trabalho: {e}")
+                raise
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def _cursor_escrita(self, cursor) -> Iterator:
+        """Cursor da unidade de trabalho em andamento ou uma nova unidade só para a operação"""
+        if cursor is not None:
+            yield cursor
+        else:
+            with self.unit_of_work() as novo:
+                yield novo
+
+    def execute_batch(
+        self,
+        query: str,
+        rows: Iterable[tuple],
+        template: str | None = None,
+        page_size: int = 1000,
+        fetch: bool = False,
+        cursor=None,
+    ) -> list[dict[str, Any]] | int:
+        """
+        Executa INSERT/UPDATE em lote via execute_values: a query tem um único
+        VALUES %s, expandido em páginas de page_size linhas (um round trip por página).
+        Com fetch=True retorna as linhas do RETURNING; senão, o total de linhas afetadas.
+        """
+        with self._cursor_escrita(cursor) as cur:
+            if fetch:
+                return [dict(row) for row in execute_values(cur, query, rows, template, page_size, fetch=True)]
+            total = 0
+            linhas = iter(rows)
+            # execute_values expõe só o rowcount da última página: uma página por chamada
+            while pagina := list(itertools.islice(linhas, page_size)):
+                execute_values(cur, query, pagina, template, page_size)
+                total += cur.rowcount
+            return total
+
+    def copy_rows(self, table: str, columns: list[str], rows: Iterable[tuple], cursor=None) -> int:
+        """
+        Insere linhas via COPY FROM STDIN (formato texto), gerado sob demanda a partir
+        de rows (lista, gerador ou cursor). Retorna o número de linhas copiadas.
+        """
+        query = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, columns))
+        )
+        with self._cursor_escrita(cursor) as cur:
+            cur.copy_expert(query, LinhasCopy(rows))
+            return cur.rowcount
+
+    def execute_scalar(self, query: str, params: tuple | None = None) -> Any:
+        """
+        Executa query e retorna um único valor escalar
+        """
+        result = self._ler(query, params, lambda cursor: cursor.fetchone())
+        # Se result é um dicionário (RealDictCursor), pega o primeiro valor
+        if result:
+            return next(iter(result.values())) if isinstance(result, dict) else result[0]
+        return None
 
     def execute_count(self, table: str, where: str = "", params: tuple | None = None) -> int:
         """
@@ -114,6 +449,24 @@ class BaseRepository:
             query += f" WHERE {where}"
         return self.execute_scalar(query, params) or 0
 
+    def estimate_rows(self, query: str, params: tuple | None = None) -> int:
+        """
+        Linhas que o planner estima para a query (EXPLAIN, sem executá-la)
+        Direto no cursor: EXPLAIN não pode ser preparado
+        """
+
+        def estimar(cursor) -> int:
+            plano = cursor.fetchone()[0]
+            return int(plano[0]["Plan"]["Plan Rows"])
+
+        with self._conexao_leitura() as conn:
+            cursor = conn.cursor(cursor_factory=extensions.cursor)
+            try:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {query}", params or ())
+                return estimar(cursor)
+            finally:
+                cursor.close()
+
     def build_pagination(self, page: int, page_size: int) -> tuple[int, int]:
         """
         Calcula LIMIT e OFFSET para paginação
@@ -2,9 +2,148 @@
 Funcionário Repository
 """
 
+import threading
+from collections import OrderedDict
 from uuid import UUID
 
-from app.repositories.base_repository import BaseRepository
+from app.config import settings
+from app.database.connection import DatabaseConnection
+from app.repositories.base_repository import BaseRepository, array_literal
+from app.repositories.indice_funcionarios import IndiceFuncionarios, indice_funcionarios
+
+
+# Score médio por funcionário a partir de avaliacao.valores_dimensao (posições 1-7)
+# Apenas avaliações com as 7 dimensões respondidas entram na média
+SCORES_AVALIACAO = """
+    SELECT
+        av.id_funcionario,
+        AVG((av.valores_dimensao[1] + av.valores_dimensao[2] + av.valores_dimensao[3] +
+             av.valores_dimensao[4] + av.valores_dimensao[5] + av.valores_dimensao[6] +
+             av.valores_dimensao[7]) / 7.0) as score_medio_geral,
+        AVG(av.valores_dimensao[7]) as expectativa_permanencia
+    FROM avaliacao av
+    WHERE cardinality(av.valores_dimensao) >= 7
+    AND array_position(av.valores_dimensao[1:7], NULL) IS NULL
+    GROUP BY av.id_funcionario
+"""
+
+# Mesmos scores, só dos funcionários de uma lista de ids (página servida pelo índice em memória)
+SCORES_POR_IDS = SCORES_AVALIACAO.replace(
+    "GROUP BY av.id_funcionario", "AND av.id_funcionario = ANY(%s::uuid[])\n    GROUP BY av.id_funcionario"
+)
+
+# Colunas e joins da listagem (FuncionarioResponse), após o LEFT JOIN dos scores
+COLUNAS_LISTAGEM = """
+    f.id_funcionario as id,
+    f.nome_funcionario as nome,
+    f.email,
+    f.email_corporativo,
+    f.tipo_contratacao as funcao,
+    d.id_empresa as empresa_id,
+    f.id_area_detalhe as area_detalhe_id,
+    f.id_cargo as cargo_id,
+    f.id_genero_catgo as genero_id,
+    f.id_geracao_catgo as geracao_id,
+    f.id_tempo_empresa_catgo as tempo_empresa_id,
+    f.id_localidade as localidade_id,
+    f.ativo,
+    f.created_at,
+    c.nome_cargo as cargo_nome,
+    a.nome_area_detalhe as area_nome,
+    l.nome_localidade as localidade_nome,
+    gen.nome_genero as genero_nome,
+    ger.nome_geracao as geracao_nome,
+    t.nome_tempo_empresa as tempo_empresa_nome,
+    COALESCE(scores.score_medio_geral, 0) as score_medio_geral,
+    COALESCE(scores.expectativa_permanencia, 0) as expectativa_permanencia
+"""
+
+JOINS_LISTAGEM = """
+    JOIN area_detalhe a ON a.id_area_detalhe = f.id_area_detalhe
+    JOIN coordenacao co ON co.id_coordenacao = a.id_coordenacao
+    JOIN gerencia g ON g.id_gerencia = co.id_gerencia
+    JOIN diretoria d ON d.id_diretoria = g.id_diretoria
+    LEFT JOIN cargo c ON c.id_cargo = f.id_cargo
+    LEFT JOIN localidade l ON l.id_localidade = f.id_localidade
+    LEFT JOIN genero_catgo gen ON gen.id_genero_catgo = f.id_genero_catgo
+    LEFT JOIN geracao_catgo ger ON ger.id_geracao_catgo = f.id_geracao_catgo
+    LEFT JOIN tempo_empresa_catgo t ON t.id_tempo_empresa_catgo = f.id_tempo_empresa_catgo
+"""
+
+# Status eNPS do funcionário (média da dimensão 7), nos mesmos limites do filtro enps_status
+ENPS_STATUS = """
+    CASE
+        WHEN scores.expectativa_permanencia >= 6 THEN 'promotor'
+        WHEN scores.expectativa_permanencia = 5 THEN 'neutro'
+        WHEN scores.expectativa_permanencia <= 4 THEN 'detrator'
+    END
+"""
+
+# Facetas da listagem: nome -> coluna agrupada na CTE base
+FACETAS = {
+    "area": "f.id_area_detalhe",
+    "cargo": "f.id_cargo",
+    "localidade": "f.id_localidade",
+    "tempo_casa": "f.id_tempo_empresa_catgo",
+    "enps_status": ENPS_STATUS,
+}
+
+
+class CacheTotais:
+    """
+    Totais da listagem (total, exato) por filtros e versão dos dados
+
+    A chave são os filtros normalizados (chave_filtros): página e ordenação não
+    entram, então as páginas seguintes da mesma listagem não contam de novo, e a
+    mesma seleção em outra ordem na URL encontra o mesmo total. Uma escrita muda a
+    versão (migração 008) e as entradas antigas saem pelo LRU.
+    """
+
+    def __init__(self, tamanho: int):
+        self.tamanho = tamanho
+        self._totais: OrderedDict[tuple, tuple[int, bool]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.estimativas = 0
+
+    def obter(self, chave: tuple) -> tuple[int, bool] | None:
+        with self._lock:
+            total = self._totais.get(chave)
+            if total is None:
+                self.faltas += 1
+                return None
+            self._totais.move_to_end(chave)
+            self.acertos += 1
+            return total
+
+    def guardar(self, chave: tuple, total: tuple[int, bool]) -> None:
+        with self._lock:
+            self._totais[chave] = total
+            self.estimativas += not total[1]
+            while len(self._totais) > self.tamanho:
+                self._totais.popitem(last=False)
+
+    def metricas(self) -> dict:
+        """Uso do cache de totais (por worker)"""
+        return {
+            "estrategia": settings.FUNCIONARIO_COUNT_STRATEGY,
+            "entradas": len(self._totais),
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "estimativas": self.estimativas,
+        }
+
+
+def chave_filtros(filtros: tuple) -> tuple:
+    """Filtros da listagem em forma comparável: listas como tuplas ordenadas de str (vazias como None)"""
+    return tuple(
+        (tuple(sorted(str(item) for item in valor)) or None) if isinstance(valor, list) else valor for valor in filtros
+    )
+
+
+# Instância global (por worker)
+totais_listagem = CacheTotais(settings.FUNCIONARIO_COUNT_CACHE_SIZE)
 
 
 class FuncionarioRepository(BaseRepository):
@@ -22,8 +161,17 @@ class FuncionarioRepository(BaseRepository):
         enps_status: str | None = None,
         order_by: str = "nome",
         order_dir: str = "asc",
-    ) -> tuple[list[dict], int]:
+    ) -> tuple[list[dict], int, bool]:
         """Retorna funcionários com paginação e filtros"""
+        # Com o índice em memória ligado e atualizado, só a página vai ao banco
+        if pagina := self._paginar_indice(
+            filtros := (empresa_id, areas, cargos, localidades, tempo_casa, score_min, score_max, enps_status),
+            page,
+            page_size,
+            order_by,
+            order_dir,
+        ):
+            return pagina
 
         params_list = []
         empresa_filter = ""
@@ -54,26 +202,11 @@ class FuncionarioRepository(BaseRepository):
 
         # Filtros de score e eNPS requerem subquery com avaliações
         score_subquery = ""
-        enps_subquery = ""
         
         if score_min is not None or score_max is not None or enps_status:
-            score_subquery = """
+            score_subquery = f"""
                 LEFT JOIN (
-                    SELECT 
-                        av.id_funcionario,
-                        AVG((r1.valor_resposta + r2.valor_resposta + r3.valor_resposta + 
-                             r4.valor_resposta + r5.valor_resposta + r6.valor_resposta + 
-                             r7.valor_resposta) / 7.0) as score_medio_geral,
-                        AVG(r7.valor_resposta) as expectativa_permanencia
-                    FROM avaliacao av
-                    JOIN resposta_dimensao r1 ON r1.id_avaliacao = av.id_avaliacao AND r1.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Interesse no Cargo')
-                    JOIN resposta_dimensao r2 ON r2.id_avaliacao = av.id_avaliacao AND r2.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Contribuição')
-                    JOIN resposta_dimensao r3 ON r3.id_avaliacao = av.id_avaliacao AND r3.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Aprendizado e Desenvolvimento')
-                    JOIN resposta_dimensao r4 ON r4.id_avaliacao = av.id_avaliacao AND r4.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Feedback')
-                    JOIN resposta_dimensao r5 ON r5.id_avaliacao = av.id_avaliacao AND r5.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Interação com Gestor')
-                    JOIN resposta_dimensao r6 ON r6.id_avaliacao = av.id_avaliacao AND r6.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Clareza sobre Possibilidades de Carreira')
-                    JOIN resposta_dimensao r7 ON r7.id_avaliacao = av.id_avaliacao AND r7.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Expectativa de Permanência')
-                    GROUP BY av.id_funcionario
+                    {SCORES_AVALIACAO}
                 ) scores ON scores.id_funcionario = f.id_funcionario
             """
             
@@ -103,7 +236,9 @@ class FuncionarioRepository(BaseRepository):
             WHERE f.ativo = true{empresa_filter}{area_filter}{cargo_filter}{localidade_filter}{tempo_casa_filter}{score_filter}{enps_filter}
         """
 
-        total = self.execute_scalar(count_query, tuple(params_list))
+        total, total_exato = self._contar(
+            count_query, tuple(params_list), filtros, estimavel=not (score_filter or enps_filter)
+        )
 
         limit, offset = self.build_pagination(page, page_size)
         params_list.extend([limit, offset])
@@ -119,64 +254,264 @@ class FuncionarioRepository(BaseRepository):
         order_column = order_map.get(order_by, "f.nome_funcionario")
         order_direction = "DESC" if order_dir.lower() == "desc" else "ASC"
 
+        query = f"""
+            SELECT {COLUNAS_LISTAGEM}
+            FROM funcionario f
+            LEFT JOIN (
+                {SCORES_AVALIACAO}
+            ) scores ON scores.id_funcionario = f.id_funcionario
+            {JOINS_LISTAGEM}
+            WHERE f.ativo = true{empresa_filter}{area_filter}{cargo_filter}{localidade_filter}{tempo_casa_filter}{score_filter}{enps_filter}
+            ORDER BY {order_column} {order_direction}
+            LIMIT %s OFFSET %s
+        """
+
+        results = self.execute_query(query, tuple(params_list))
+        return results, total, total_exato
+
+    def get_funcionarios_por_ids(self, ids: list[str]) -> list[dict]:
+        """Linhas da listagem dos funcionários informados, na ordem da lista"""
+        if not ids:
+            return []
+        query = f"""
+            SELECT {COLUNAS_LISTAGEM}
+            FROM funcionario f
+            LEFT JOIN (
+                {SCORES_POR_IDS}
+            ) scores ON scores.id_funcionario = f.id_funcionario
+            {JOINS_LISTAGEM}
+            WHERE f.id_funcionario = ANY(%s::uuid[])
+        """
+        # Literal de array (sem tipo): convertido para uuid[] também no EXECUTE do statement preparado
+        lista = array_literal(ids)
+        por_id = {str(linha["id"]): linha for linha in self.execute_query(query, (lista, lista))}
+        return [por_id[id_funcionario] for id_funcionario in ids if id_funcionario in por_id]
+
+    def get_versao_dados(self) -> int:
+        """
+        Versão dos dados da listagem (transações de escrita já confirmadas, migração 008),
+        lida uma vez por requisição: índice e cache de totais usam a mesma leitura
+        """
+        return DatabaseConnection.valor_da_requisicao(
+            "versao_dados", lambda: self.execute_scalar("SELECT versao FROM versao_dados")
+        )
+
+    def carregar_indice(self) -> IndiceFuncionarios:
+        """Carrega o índice em memória dos funcionários ativos (uma passada, em streaming)"""
+        versao = self.get_versao_dados()
+        categorias = self.execute_rows(
+            """
+            SELECT 'area', id_area_detalhe, nome_area_detalhe AS nome FROM area_detalhe
+            UNION ALL SELECT 'cargo', id_cargo, nome_cargo FROM cargo
+            UNION ALL SELECT 'localidade', id_localidade, nome_localidade FROM localidade
+            UNION ALL SELECT 'tempo_casa', id_tempo_empresa_catgo, nome_tempo_empresa FROM tempo_empresa_catgo
+            ORDER BY nome
+            """
+        )[1]
         query = f"""
             SELECT
-                f.id_funcionario as id,
-                f.nome_funcionario as nome,
-                f.email,
-                f.email_corporativo,
-                f.tipo_contratacao as funcao,
-                d.id_empresa as empresa_id,
-                f.id_area_detalhe as area_detalhe_id,
-                f.id_cargo as cargo_id,
-                f.id_genero_catgo as genero_id,
-                f.id_geracao_catgo as geracao_id,
-                f.id_tempo_empresa_catgo as tempo_empresa_id,
-                f.id_localidade as localidade_id,
-                f.ativo,
-                f.created_at,
-                c.nome_cargo as cargo_nome,
-                a.nome_area_detalhe as area_nome,
-                l.nome_localidade as localidade_nome,
-                gen.nome_genero as genero_nome,
-                ger.nome_geracao as geracao_nome,
-                t.nome_tempo_empresa as tempo_empresa_nome,
-                COALESCE(scores.score_medio_geral, 0) as score_medio_geral,
-                COALESCE(scores.expectativa_permanencia, 0) as expectativa_permanencia
+                f.id_funcionario,
+                d.id_empresa,
+                f.id_area_detalhe,
+                f.id_cargo,
+                f.id_localidade,
+                f.id_tempo_empresa_catgo,
+                scores.score_medio_geral,
+                {ENPS_STATUS} AS enps_status
             FROM funcionario f
             LEFT JOIN (
-                SELECT 
-                    av.id_funcionario,
-                    AVG((r1.valor_resposta + r2.valor_resposta + r3.valor_resposta + 
-                         r4.valor_resposta + r5.valor_resposta + r6.valor_resposta + 
-                         r7.valor_resposta) / 7.0) as score_medio_geral,
-                    AVG(r7.valor_resposta) as expectativa_permanencia
-                FROM avaliacao av
-                JOIN resposta_dimensao r1 ON r1.id_avaliacao = av.id_avaliacao AND r1.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Interesse no Cargo')
-                JOIN resposta_dimensao r2 ON r2.id_avaliacao = av.id_avaliacao AND r2.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Contribuição')
-                JOIN resposta_dimensao r3 ON r3.id_avaliacao = av.id_avaliacao AND r3.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Aprendizado e Desenvolvimento')
-                JOIN resposta_dimensao r4 ON r4.id_avaliacao = av.id_avaliacao AND r4.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Feedback')
-                JOIN resposta_dimensao r5 ON r5.id_avaliacao = av.id_avaliacao AND r5.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Interação com Gestor')
-                JOIN resposta_dimensao r6 ON r6.id_avaliacao = av.id_avaliacao AND r6.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Clareza sobre Possibilidades de Carreira')
-                JOIN resposta_dimensao r7 ON r7.id_avaliacao = av.id_avaliacao AND r7.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Expectativa de Permanência')
-                GROUP BY av.id_funcionario
+                {SCORES_AVALIACAO}
             ) scores ON scores.id_funcionario = f.id_funcionario
             JOIN area_detalhe a ON a.id_area_detalhe = f.id_area_detalhe
             JOIN coordenacao co ON co.id_coordenacao = a.id_coordenacao
             JOIN gerencia g ON g.id_gerencia = co.id_gerencia
             JOIN diretoria d ON d.id_diretoria = g.id_diretoria
-            LEFT JOIN cargo c ON c.id_cargo = f.id_cargo
-            LEFT JOIN localidade l ON l.id_localidade = f.id_localidade
-            LEFT JOIN genero_catgo gen ON gen.id_genero_catgo = f.id_genero_catgo
-            LEFT JOIN geracao_catgo ger ON ger.id_geracao_catgo = f.id_geracao_catgo
-            LEFT JOIN tempo_empresa_catgo t ON t.id_tempo_empresa_catgo = f.id_tempo_empresa_catgo
-            WHERE f.ativo = true{empresa_filter}{area_filter}{cargo_filter}{localidade_filter}{tempo_casa_filter}{score_filter}{enps_filter}
-            ORDER BY {order_column} {order_direction}
-            LIMIT %s OFFSET %s
+            WHERE f.ativo = true
+            ORDER BY f.nome_funcionario, f.id_funcionario
         """
+        return IndiceFuncionarios(versao, categorias, self.iter_query(query, itersize=10000, tuplas=True))
 
-        results = self.execute_query(query, tuple(params_list))
-        return results, total
+    def _paginar_indice(
+        self, filtros: tuple, page: int, page_size: int, order_by: str, order_dir: str
+    ) -> tuple[list[dict], int, bool] | None:
+        """Página e total (exato) pelo índice em memória; None se o índice não atende a requisição"""
+        indice = self._indice()
+        if indice is None or (mascaras := indice.mascaras(*filtros)) is None:
+            return None
+        bits = indice.filtrar(mascaras)
+        limit, offset = self.build_pagination(page, page_size)
+        ids = indice.pagina(bits, order_by, order_dir, offset, limit)
+        if ids is None:
+            return None
+        return self.get_funcionarios_por_ids(ids), bits.bit_count(), True
+
+    def _contar(self, count_query: str, params: tuple, filtros: tuple, estimavel: bool = True) -> tuple[int, bool]:
+        """
+        Total da listagem pela estratégia FUNCIONARIO_COUNT_STRATEGY: (total, exato)
+
+        exact conta a cada página. cached e estimated guardam o total por filtros
+        (chave_filtros) e versão dos dados, e só contam na primeira página de cada
+        seleção; estimated usa as linhas estimadas pelo planner quando passam
+        de FUNCIONARIO_COUNT_ESTIMATE_MIN (resultados pequenos são contados).
+        Filtros de score e eNPS comparam o agregado das avaliações, que o planner não
+        estima (erra por ordens de grandeza): com eles, o total é sempre contado.
+        """
+        estrategia = settings.FUNCIONARIO_COUNT_STRATEGY
+        if estrategia == "exact":
+            return self.execute_scalar(count_query, params), True
+
+        chave = (chave_filtros(filtros), self.get_versao_dados())
+        if (guardado := totais_listagem.obter(chave)) is not None:
+            return guardado
+
+        total = None
+        if estrategia == "estimated" and estimavel:
+            # Mesmos FROM e WHERE sem o agregado: as linhas estimadas são o total
+            estimativa = self.estimate_rows(count_query.replace("SELECT COUNT(*)", "SELECT 1", 1), params)
+            if estimativa >= settings.FUNCIONARIO_COUNT_ESTIMATE_MIN:
+                total = (estimativa, False)
+        if total is None:
+            total = (self.execute_scalar(count_query, params), True)
+        totais_listagem.guardar(chave, total)
+        return total
+
+    def _indice(self) -> IndiceFuncionarios | None:
+        """Índice em memória atual (None: desligado ou em reconstrução; a consulta segue pelo SQL)"""
+        if not settings.FUNCIONARIO_INDEX_ENABLED:
+            return None
+        return indice_funcionarios.obter(self.get_versao_dados(), self.carregar_indice)
+
+    @staticmethod
+    def query_facetas(
+        empresa_id: UUID | None,
+        areas: list[UUID] | None = None,
+        cargos: list[UUID] | None = None,
+        localidades: list[UUID] | None = None,
+        tempo_casa: list[UUID] | None = None,
+        score_min: float | None = None,
+        score_max: float | None = None,
+        enps_status: str | None = None,
+    ) -> tuple[str, tuple]:
+        """
+        Query das facetas: GROUPING SETS com um conjunto por faceta e o total ()
+
+        Cada faceta conta com todos os filtros aplicados, exceto o dela própria (quantos
+        funcionários cada opção traria mantendo os demais filtros); o total aplica todos.
+        Empresa e faixa de score não são facetas e filtram a base. Linhas que falham em
+        dois ou mais filtros de faceta não entram em nenhuma contagem e são descartadas
+        antes do agrupamento.
+        """
+        selecionados = {
+            "area": areas,
+            "cargo": cargos,
+            "localidade": localidades,
+            "tempo_casa": tempo_casa,
+            "enps_status": [enps_status] if enps_status else None,
+        }
+        params_list = []
+        flags = []
+        for faceta, coluna in FACETAS.items():
+            valores = selecionados[faceta]
+            if valores:
+                flags.append(f"({coluna}) IN (" + ",".join(["%s"] * len(valores)) + f") AS ok_{faceta}")
+                params_list.extend(str(valor) for valor in valores)
+            else:
+                flags.append(f"true AS ok_{faceta}")
+
+        hierarquia_join = ""
+        empresa_filter = ""
+        score_filter = ""
+        if empresa_id:
+            hierarquia_join = """
+                JOIN area_detalhe a ON a.id_area_detalhe = f.id_area_detalhe
+                JOIN coordenacao co ON co.id_coordenacao = a.id_coordenacao
+                JOIN gerencia g ON g.id_gerencia = co.id_gerencia
+                JOIN diretoria d ON d.id_diretoria = g.id_diretoria
+            """
+            empresa_filter = " AND d.id_empresa = %s"
+            params_list.append(str(empresa_id))
+        if score_min is not None:
+            score_filter += " AND scores.score_medio_geral >= %s"
+            params_list.append(score_min)
+        if score_max is not None:
+            score_filter += " AND scores.score_medio_geral <= %s"
+            params_list.append(score_max)
+
+        # Contagem de cada conjunto: todos os filtros menos o da faceta agrupada
+        def filtro_sem(faceta: str | None) -> str:
+            return " AND ".join(f"ok_{outra}" for outra in FACETAS if outra != faceta)
+
+        nome_faceta = "\n".join(f"WHEN GROUPING({faceta}) = 0 THEN '{faceta}'" for faceta in FACETAS)
+        contagem = "\n".join(
+            f"WHEN GROUPING({faceta}) = 0 THEN COUNT(*) FILTER (WHERE {filtro_sem(faceta)})" for faceta in FACETAS
+        )
+        falhas = " + ".join(f"(NOT ok_{faceta})::int" for faceta in FACETAS)
+
+        query = f"""
+            WITH base AS (
+                SELECT
+                    f.id_area_detalhe AS area,
+                    f.id_cargo AS cargo,
+                    f.id_localidade AS localidade,
+                    f.id_tempo_empresa_catgo AS tempo_casa,
+                    {ENPS_STATUS} AS enps_status,
+                    {", ".join(flags)}
+                FROM funcionario f
+                LEFT JOIN (
+                    {SCORES_AVALIACAO}
+                ) scores ON scores.id_funcionario = f.id_funcionario
+                {hierarquia_join}
+                WHERE f.ativo = true{empresa_filter}{score_filter}
+            ),
+            contagens AS (
+                SELECT
+                    CASE {nome_faceta} ELSE 'total' END AS faceta,
+                    COALESCE(area, cargo, localidade, tempo_casa) AS id,
+                    enps_status,
+                    CASE {contagem} ELSE COUNT(*) FILTER (WHERE {filtro_sem(None)}) END AS total
+                FROM base
+                WHERE {falhas} <= 1
+                GROUP BY GROUPING SETS ((area), (cargo), (localidade), (tempo_casa), (enps_status), ())
+            )
+            SELECT
+                c.faceta,
+                COALESCE(c.id::text, c.enps_status) AS id,
+                COALESCE(a.nome_area_detalhe, cg.nome_cargo, l.nome_localidade, t.nome_tempo_empresa) AS nome,
+                c.total
+            FROM contagens c
+            LEFT JOIN area_detalhe a ON c.faceta = 'area' AND a.id_area_detalhe = c.id
+            LEFT JOIN cargo cg ON c.faceta = 'cargo' AND cg.id_cargo = c.id
+            LEFT JOIN localidade l ON c.faceta = 'localidade' AND l.id_localidade = c.id
+            LEFT JOIN tempo_empresa_catgo t ON c.faceta = 'tempo_casa' AND t.id_tempo_empresa_catgo = c.id
+            WHERE c.faceta = 'total' OR (c.total > 0 AND COALESCE(c.id::text, c.enps_status) IS NOT NULL)
+            ORDER BY c.faceta, c.total DESC, nome
+        """
+        return query, tuple(params_list)
+
+    def get_facetas(
+        self,
+        empresa_id: UUID | None,
+        areas: list[UUID] | None = None,
+        cargos: list[UUID] | None = None,
+        localidades: list[UUID] | None = None,
+        tempo_casa: list[UUID] | None = None,
+        score_min: float | None = None,
+        score_max: float | None = None,
+        enps_status: str | None = None,
+    ) -> list[dict]:
+        """Contagens por faceta (faceta, id, nome, total) para o conjunto de filtros atual"""
+        indice = self._indice()
+        if indice is not None:
+            mascaras = indice.mascaras(
+                empresa_id, areas, cargos, localidades, tempo_casa, score_min, score_max, enps_status
+            )
+            if mascaras is not None:
+                return indice.facetas(mascaras)
+
+        query, params = self.query_facetas(
+            empresa_id, areas, cargos, localidades, tempo_casa, score_min, score_max, enps_status
+        )
+        return self.execute_query(query, params)
 
     def buscar_funcionarios(
         self,
@@ -193,7 +528,7 @@ class FuncionarioRepository(BaseRepository):
         enps_status: str | None = None,
         order_by: str = "nome",
         order_dir: str = "asc",
-    ) -> tuple[list[dict], int]:
+    ) -> tuple[list[dict], int, bool]:
         """Busca funcionários por nome ou email com filtros avançados"""
 
         params_list = []
@@ -224,23 +559,9 @@ class FuncionarioRepository(BaseRepository):
             params_list.extend([str(tc) for tc in tempo_casa])
 
         # Sempre incluir subquery de scores para retornar métricas
-        score_subquery = """
+        score_subquery = f"""
             LEFT JOIN (
-                SELECT 
-                    av.id_funcionario,
-                    AVG((r1.valor_resposta + r2.valor_resposta + r3.valor_resposta + 
-                         r4.valor_resposta + r5.valor_resposta + r6.valor_resposta + 
-                         r7.valor_resposta) / 7.0) as score_medio_geral,
-                    AVG(r7.valor_resposta) as expectativa_permanencia
-                FROM avaliacao av
-                JOIN resposta_dimensao r1 ON r1.id_avaliacao = av.id_avaliacao AND r1.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Interesse no Cargo')
-                JOIN resposta_dimensao r2 ON r2.id_avaliacao = av.id_avaliacao AND r2.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Contribuição')
-                JOIN resposta_dimensao r3 ON r3.id_avaliacao = av.id_avaliacao AND r3.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Aprendizado e Desenvolvimento')
-                JOIN resposta_dimensao r4 ON r4.id_avaliacao = av.id_avaliacao AND r4.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Feedback')
-                JOIN resposta_dimensao r5 ON r5.id_avaliacao = av.id_avaliacao AND r5.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Interação com Gestor')
-                JOIN resposta_dimensao r6 ON r6.id_avaliacao = av.id_avaliacao AND r6.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Clareza sobre Possibilidades de Carreira')
-                JOIN resposta_dimensao r7 ON r7.id_avaliacao = av.id_avaliacao AND r7.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Expectativa de Permanência')
-                GROUP BY av.id_funcionario
+                {SCORES_AVALIACAO}
             ) scores ON scores.id_funcionario = f.id_funcionario
         """
         
@@ -278,7 +599,13 @@ class FuncionarioRepository(BaseRepository):
             AND (f.nome_funcionario ILIKE %s OR f.email ILIKE %s OR c.nome_cargo ILIKE %s)
         """
 
-        total = self.execute_scalar(count_query, tuple(params_list))
+        total, total_exato = self._contar(
+            count_query,
+            tuple(params_list),
+            # Termo à frente: a chave do total não coincide com a da listagem sem busca
+            (termo_busca, empresa_id, areas, cargos, localidades, tempo_casa, score_min, score_max, enps_status),
+            estimavel=not (score_filter or enps_filter),
+        )
 
         limit, offset = self.build_pagination(page, page_size)
         params_list.extend([limit, offset])
@@ -320,21 +647,7 @@ class FuncionarioRepository(BaseRepository):
                 scores.expectativa_permanencia
             FROM funcionario f
             LEFT JOIN (
-                SELECT 
-                    av.id_funcionario,
-                    AVG((r1.valor_resposta + r2.valor_resposta + r3.valor_resposta + 
-                         r4.valor_resposta + r5.valor_resposta + r6.valor_resposta + 
-                         r7.valor_resposta) / 7.0) as score_medio_geral,
-                    AVG(r7.valor_resposta) as expectativa_permanencia
-                FROM avaliacao av
-                JOIN resposta_dimensao r1 ON r1.id_avaliacao = av.id_avaliacao AND r1.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Interesse no Cargo')
-                JOIN resposta_dimensao r2 ON r2.id_avaliacao = av.id_avaliacao AND r2.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Contribuição')
-                JOIN resposta_dimensao r3 ON r3.id_avaliacao = av.id_avaliacao AND r3.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Aprendizado e Desenvolvimento')
-                JOIN resposta_dimensao r4 ON r4.id_avaliacao = av.id_avaliacao AND r4.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Feedback')
-                JOIN resposta_dimensao r5 ON r5.id_avaliacao = av.id_avaliacao AND r5.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Interação com Gestor')
-                JOIN resposta_dimensao r6 ON r6.id_avaliacao = av.id_avaliacao AND r6.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Clareza sobre Possibilidades de Carreira')
-                JOIN resposta_dimensao r7 ON r7.id_avaliacao = av.id_avaliacao AND r7.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE nome_dimensao = 'Expectativa de Permanência')
-                GROUP BY av.id_funcionario
+                {SCORES_AVALIACAO}
             ) scores ON scores.id_funcionario = f.id_funcionario
             JOIN area_detalhe a ON a.id_area_detalhe = f.id_area_detalhe
             JOIN coordenacao co ON co.id_coordenacao = a.id_coordenacao
@@ -352,7 +665,7 @@ class FuncionarioRepository(BaseRepository):
         """
 
         results = self.execute_query(query, tuple(params_list))
-        return results, total
+        return results, total, total_exato
 
     def get_funcionario_by_id(self, funcionario_id: UUID) -> dict | None:
         """Busca funcionário por ID"""
@@ -469,20 +782,21 @@ class FuncionarioRepository(BaseRepository):
             """
         return self.execute_query(query)
 
-    def criar_funcionario(self, dados: dict) -> str:
-        """Cria novo funcionário"""
-        query = """
-            INSERT INTO funcionario (
-                nome_funcionario, email, email_corporativo, tipo_contratacao,
-                id_area_detalhe, id_cargo,
-                id_genero_catgo, id_geracao_catgo,
-                id_tempo_empresa_catgo, id_localidade,
-                data_admissao
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_DATE)
-            RETURNING id_funcionario as id
-        """
-        params = (
+    # INSERT de funcionário: VALUES (...) unitário ou template do execute_values em lote
+    COLUNAS_INSERT = """
+        INSERT INTO funcionario (
+            nome_funcionario, email, email_corporativo, tipo_contratacao,
+            id_area_detalhe, id_cargo,
+            id_genero_catgo, id_geracao_catgo,
+            id_tempo_empresa_catgo, id_localidade,
+            data_admissao
+        )
+    """
+    TEMPLATE_INSERT = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_DATE)"
+
+    @staticmethod
+    def _params_funcionario(dados: dict) -> tuple:
+        return (
             dados["nome"],
             dados["email"],
             dados.get("email_corporativo"),
@@ -494,4 +808,26 @@ class FuncionarioRepository(BaseRepository):
             str(dados["tempo_empresa_id"]),
             str(dados["localidade_id"]),
         )
-        return self.execute_insert(query, params)
+
+    def criar_funcionario(self, dados: dict) -> str:
+        """Cria novo funcionário"""
+        query = f"""
+            {self.COLUNAS_INSERT}
+            VALUES {self.TEMPLATE_INSERT}
+            RETURNING id_funcionario as id
+        """
+        return self.execute_insert(query, self._params_funcionario(dados))
+
+    def criar_funcionarios(self, lista: list[dict], cursor=None) -> list[str]:
+        """
+        Cria funcionários em lote: uma transação e um INSERT multi-linha por página
+        de 1000 (execute_values). Retorna os ids na ordem da lista.
+        """
+        query = f"""
+            {self.COLUNAS_INSERT}
+            VALUES %s
+            RETURNING id_funcionario as id
+        """
+        rows = [self._params_funcionario(dados) for dados in lista]
+        resultado = self.execute_batch(query, rows, template=self.TEMPLATE_INSERT, fetch=True, cursor=cursor)
+        return [row["id"] for row in resultado]
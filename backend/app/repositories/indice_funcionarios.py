@@ -0,0 +1,313 @@
+"""
+Índice em memória da listagem de funcionários
+Um bitmap por valor de filtro: filtros, contagens e páginas sem consultar o banco
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from uuid import UUID
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Facetas filtradas por valor, na ordem das colunas carregadas (após o id do funcionário)
+COLUNAS = ("empresa", "area", "cargo", "localidade", "tempo_casa", "score", "enps_status")
+FACETAS = ("area", "cargo", "localidade", "tempo_casa", "enps_status")
+
+# order_by da listagem -> faceta cujos nomes definem a ordem (nome e score à parte)
+ORDENACAO_POR_FACETA = {"cargo": "cargo", "area": "area", "tempo": "tempo_casa"}
+
+# Bytes por bloco ao localizar as posições de uma página (blocos sem a página são pulados pela contagem)
+TAMANHO_BLOCO = 512
+
+# Um bitmap por valor distinto de score: acima disso, filtro e ordenação por score ficam com o SQL
+MAX_VALORES_SCORE = 128
+
+
+def bitmap(posicoes: Iterable[int], total: int) -> int:
+    """Conjunto de posições como inteiro (bit i ligado = posição i)"""
+    bits = bytearray((total + 7) // 8)
+    for posicao in posicoes:
+        bits[posicao >> 3] |= 1 << (posicao & 7)
+    return int.from_bytes(bits, "little")
+
+
+def posicoes_ligadas(bits: int, pular: int, quantidade: int, decrescente: bool = False) -> list[int]:
+    """Até `quantidade` posições de bits ligados, em ordem crescente (ou decrescente), após pular as `pular` primeiras"""
+    dados = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    inicios = range(0, len(dados), TAMANHO_BLOCO)
+    resultado: list[int] = []
+    for inicio in reversed(inicios) if decrescente else inicios:
+        bloco = int.from_bytes(dados[inicio : inicio + TAMANHO_BLOCO], "little")
+        ligados = bloco.bit_count()
+        if pular >= ligados:
+            pular -= ligados
+            continue
+        no_bloco = [inicio * 8 + i for i in range(bloco.bit_length()) if bloco >> i & 1]
+        if decrescente:
+            no_bloco.reverse()
+        resultado.extend(no_bloco[pular : pular + quantidade - len(resultado)])
+        pular = 0
+        if len(resultado) == quantidade:
+            break
+    return resultado
+
+
+class IndiceFuncionarios:
+    """
+    Snapshot dos funcionários ativos para filtrar, contar e paginar a listagem
+
+    As posições seguem a ordem por nome (a ordenação padrão). Cada empresa, área,
+    cargo, localidade, tempo de casa, status eNPS e valor de score tem o bitmap das
+    posições dos seus funcionários: um filtro é a interseção (AND) das uniões (OR)
+    dos valores selecionados e a contagem é bit_count(), sem o agregado de scores
+    por requisição. Só os ids da página vão ao banco buscar os detalhes.
+
+    As demais ordenações percorrem os grupos (cargos, áreas, tempos de casa ou
+    valores de score) na ordem do banco; dentro do grupo, a ordem é por nome (no
+    SQL, o desempate é indefinido).
+    """
+
+    def __init__(self, versao: int, categorias: list[tuple[str, str, str]], linhas: Iterable[tuple]):
+        """
+        versao: versão dos dados lida antes da carga
+        categorias: (faceta, id, nome) de áreas, cargos, localidades e tempos de casa, em ordem de nome
+        linhas: (id, empresa, área, cargo, localidade, tempo de casa, score, status eNPS) por ordem de nome
+        """
+        self.versao = versao
+        self.ids = bytearray()
+        posicoes: dict[str, defaultdict[str | float | None, list[int]]] = {
+            coluna: defaultdict(list) for coluna in COLUNAS
+        }
+        total = 0
+        for id_funcionario, *valores in linhas:
+            self.ids += UUID(str(id_funcionario)).bytes
+            for coluna, valor in zip(COLUNAS, valores, strict=True):
+                posicoes[coluna][str(valor) if valor is not None and coluna != "score" else valor].append(total)
+            total += 1
+
+        self.total = total
+        self.todos = (1 << total) - 1
+        self.bitmaps = {
+            coluna: {valor: bitmap(lista, total) for valor, lista in posicoes[coluna].items()}
+            for coluna in COLUNAS
+            if coluna != "score"
+        }
+        self.nomes: dict[str, dict[str, str]] = defaultdict(dict)
+        self.ordem: dict[str, list[str]] = defaultdict(list)
+        for faceta, valor, nome in categorias:
+            self.nomes[faceta][str(valor)] = nome
+            self.ordem[faceta].append(str(valor))
+
+        # Score: um bitmap por valor distinto, em ordem crescente; sem avaliação completa à parte
+        self.sem_score = bitmap(posicoes["score"].pop(None, []), total)
+        self.valores_score = sorted(posicoes["score"])
+        self.score_indexado = len(self.valores_score) <= MAX_VALORES_SCORE
+        self.bitmaps_score = (
+            [bitmap(posicoes["score"][valor], total) for valor in self.valores_score] if self.score_indexado else []
+        )
+
+    def _uniao(self, coluna: str, valores: Iterable) -> int:
+        bits = 0
+        for valor in valores:
+            bits |= self.bitmaps[coluna].get(str(valor), 0)
+        return bits
+
+    def _faixa_score(self, score_min: float | None, score_max: float | None) -> int:
+        # Scores chegam como float (DEC2FLOAT) e os limites também: a comparação só difere da
+        # numeric do SQL para um score a menos de um ulp do limite
+        inicio = 0 if score_min is None else bisect_left(self.valores_score, score_min)
+        fim = len(self.valores_score) if score_max is None else bisect_right(self.valores_score, score_max)
+        bits = 0
+        for mascara in self.bitmaps_score[inicio:fim]:
+            bits |= mascara
+        return bits
+
+    def mascaras(
+        self,
+        empresa_id: UUID | None = None,
+        areas: list[UUID] | None = None,
+        cargos: list[UUID] | None = None,
+        localidades: list[UUID] | None = None,
+        tempo_casa: list[UUID] | None = None,
+        score_min: float | None = None,
+        score_max: float | None = None,
+        enps_status: str | None = None,
+    ) -> dict[str, int] | None:
+        """Bitmap de cada filtro aplicado; None se algum não é atendido pelo índice"""
+        mascaras = {}
+        if empresa_id:
+            mascaras["empresa"] = self._uniao("empresa", [empresa_id])
+        for coluna, valores in (
+            ("area", areas),
+            ("cargo", cargos),
+            ("localidade", localidades),
+            ("tempo_casa", tempo_casa),
+        ):
+            if valores:
+                mascaras[coluna] = self._uniao(coluna, valores)
+        if score_min is not None or score_max is not None:
+            if not self.score_indexado:
+                return None
+            mascaras["score"] = self._faixa_score(score_min, score_max)
+        if enps_status:
+            mascaras["enps_status"] = self._uniao("enps_status", [enps_status])
+        return mascaras
+
+    def filtrar(self, mascaras: dict[str, int], exceto: str | None = None) -> int:
+        """Funcionários que atendem a todos os filtros (menos o da faceta `exceto`)"""
+        bits = self.todos
+        for coluna, mascara in mascaras.items():
+            if coluna != exceto:
+                bits &= mascara
+        return bits
+
+    def _grupos(self, order_by: str) -> list[int] | None:
+        """Bitmaps na ordem crescente de order_by (nulos por último, como o ASC do Postgres)"""
+        if order_by == "score":
+            return [*self.bitmaps_score, self.sem_score] if self.score_indexado else None
+        faceta = ORDENACAO_POR_FACETA.get(order_by)
+        if faceta is None:
+            return [self.todos]
+        bitmaps = self.bitmaps[faceta]
+        grupos = [bitmaps[valor] for valor in self.ordem[faceta] if valor in bitmaps]
+        return [*grupos, bitmaps[None]] if None in bitmaps else grupos
+
+    def pagina(self, bits: int, order_by: str, order_dir: str, offset: int, limit: int) -> list[str] | None:
+        """Ids da página do conjunto filtrado; None se a ordenação não é atendida pelo índice"""
+        grupos = self._grupos(order_by)
+        if grupos is None:
+            return None
+        decrescente = order_dir.lower() == "desc"
+        posicoes: list[int] = []
+        for grupo in reversed(grupos) if decrescente else grupos:
+            selecionados = bits & grupo
+            ligados = selecionados.bit_count()
+            if offset >= ligados:
+                offset -= ligados
+                continue
+            posicoes += posicoes_ligadas(selecionados, offset, limit - len(posicoes), decrescente)
+            offset = 0
+            if len(posicoes) == limit:
+                break
+        return [str(UUID(bytes=bytes(self.ids[posicao * 16 : posicao * 16 + 16]))) for posicao in posicoes]
+
+    def facetas(self, mascaras: dict[str, int]) -> list[dict]:
+        """Contagens por faceta no formato de FuncionarioRepository.get_facetas"""
+        linhas = [{"faceta": "total", "id": None, "nome": None, "total": self.filtrar(mascaras).bit_count()}]
+        for faceta in FACETAS:
+            bits = self.filtrar(mascaras, exceto=faceta)
+            for valor, mascara in self.bitmaps[faceta].items():
+                if valor is not None and (total := (bits & mascara).bit_count()):
+                    nome = self.nomes[faceta].get(valor)
+                    linhas.append({"faceta": faceta, "id": valor, "nome": nome, "total": total})
+        return sorted(linhas, key=lambda linha: (linha["faceta"], -linha["total"], linha["nome"] or ""))
+
+
+class CacheIndice:
+    """
+    Índice atual do worker e sua reconstrução em segundo plano
+
+    Cada uso compara a versão do índice com a dos dados (contador de versao_dados,
+    somado a cada transação de escrita confirmada); se mudou, uma thread carrega o
+    novo índice. Enquanto isso o índice anterior continua servindo por até
+    `tolerancia` segundos desde que a mudança foi notada; depois, as requisições
+    seguem pelo SQL até a carga terminar. As cargas começam no máximo uma vez por
+    `tolerancia` segundos: durante uma importação (uma versão nova a cada bloco) o
+    worker recarrega em intervalos, em vez de uma carga completa por escrita.
+    Com tolerância 0, só o índice da versão atual é usado, e o anterior é descartado
+    ao iniciar a carga (sem dois índices na memória do worker).
+
+    A versão é lida antes da carga: uma escrita concluída durante a carga causa no
+    máximo uma reconstrução a mais, nunca um índice desatualizado com a versão atual.
+    """
+
+    def __init__(self, tolerancia: float = 0):
+        self.tolerancia = tolerancia
+        self._indice: IndiceFuncionarios | None = None
+        self._lock = threading.Lock()
+        self._construindo = False
+        self._inicio_carga: float | None = None
+        self._desatualizado_desde: float | None = None
+        self.usos = 0
+        self.usos_desatualizado = 0
+        self.fallbacks = 0
+        self.reconstrucoes = 0
+        self.erros = 0
+        self.duracao: float | None = None
+
+    def obter(self, versao: int, construir: Callable[[], IndiceFuncionarios]) -> IndiceFuncionarios | None:
+        """
+        Índice da versão atual dos dados, ou o anterior dentro da tolerância;
+        None (e reconstrução agendada) se desatualizado além dela
+        """
+        indice = self._indice
+        if indice is not None and indice.versao == versao:
+            self.usos += 1
+            return indice
+
+        agora = time.monotonic()
+        with self._lock:
+            if self._desatualizado_desde is None:
+                self._desatualizado_desde = agora
+            desatualizado_desde = self._desatualizado_desde
+            if not self._construindo and (self._inicio_carga is None or agora - self._inicio_carga >= self.tolerancia):
+                self._construindo = True
+                self._inicio_carga = agora
+                if not self.tolerancia:
+                    self._indice = None
+                threading.Thread(
+                    target=self.reconstruir, args=(construir,), name="indice-funcionarios", daemon=True
+                ).start()
+
+        if indice is not None and agora - desatualizado_desde < self.tolerancia:
+            self.usos_desatualizado += 1
+            return indice
+        self.fallbacks += 1
+        return None
+
+    def reconstruir(self, construir: Callable[[], IndiceFuncionarios]) -> None:
+        """Carrega o índice (executado na thread de reconstrução)"""
+        inicio = time.perf_counter()
+        try:
+            indice = construir()
+            with self._lock:
+                self._indice = indice
+                self._desatualizado_desde = None
+            self.reconstrucoes += 1
+            self.duracao = round(time.perf_counter() - inicio, 3)
+            logger.info(
+                f"🗂️  Índice de funcionários: {indice.total} funcionários, versão {indice.versao} ({self.duracao}s)"
+            )
+        except Exception as e:
+            self.erros += 1
+            logger.warning(f"⚠️  Falha ao construir o índice de funcionários: {e}")
+        finally:
+            with self._lock:
+                self._construindo = False
+
+    def metricas(self) -> dict:
+        """Estado e uso do índice (por worker)"""
+        indice = self._indice
+        return {
+            "carregado": indice is not None,
+            "versao": indice.versao if indice else None,
+            "funcionarios": indice.total if indice else 0,
+            "score_indexado": indice.score_indexado if indice else None,
+            "usos": self.usos,
+            "usos_desatualizado": self.usos_desatualizado,
+            "fallbacks": self.fallbacks,
+            "reconstrucoes": self.reconstrucoes,
+            "erros": self.erros,
+            "duracao_ultima_carga": self.duracao,
+        }
+
+
+# Instância global (por worker)
+indice_funcionarios = CacheIndice(settings.FUNCIONARIO_INDEX_MAX_STALENESS)
@@ -0,0 +1,31 @@
+"""
+Respostas HTTP
+Serialização JSON com orjson para payloads grandes
+"""
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Converte tipos que o orjson não serializa nativamente"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Resposta JSON serializada com orjson
+    UUID, datetime e date são nativos; Decimal vira float
+    Retornada diretamente pelos controllers, evita jsonable_encoder e revalidação do response_model
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
@@ -3,9 +3,10 @@ Routes Handler
 Centraliza o registro de todas as rotas da API
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.controllers import analytics_controller, funcionario_controller, hierarquia_controller
+from app.controllers import analytics_controller, batch_controller, funcionario_controller, hierarquia_controller
+from app.database.connection import request_connection
 
 
 def register_routes(app) -> None:
@@ -15,8 +16,8 @@ def register_routes(app) -> None:
     Args:
         app: Instância FastAPI
     """
-    # API Router principal
-    api_router = APIRouter(prefix="/api/v1")
+    # API Router principal (leituras com uma conexão e um snapshot por requisição)
+    api_router = APIRouter(prefix="/api/v1", dependencies=[Depends(request_connection)])
 
     # Hierarquia
     api_router.include_router(hierarquia_controller.router, prefix="/hierarquia", tags=["Hierarquia"])
@@ -27,5 +28,8 @@ def register_routes(app) -> None:
     # Analytics
     api_router.include_router(analytics_controller.router, prefix="/analytics", tags=["Analytics"])
 
+    # Batch (várias leituras em uma chamada, com escopo de conexão compartilhado)
+    api_router.include_router(batch_controller.router, prefix="/batch", tags=["Batch"])
+
     # Registra o router principal
     app.include_router(api_router)
@@ -0,0 +1,36 @@
+"""
+Schemas do endpoint de batch
+"""
+
+from typing import Literal
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.config import settings
+
+
+PREFIXO_API = "/api/v1/"
+
+# Rotas fora do batch: o próprio batch e as respostas em streaming, que não terminam (SSE)
+ROTAS_EXCLUIDAS = ("/api/v1/batch", "/api/v1/analytics/stream")
+
+
+class SubRequisicao(BaseModel):
+    """Chamada a uma rota de leitura da API (caminho com query string opcional)"""
+
+    id: str | None = Field(None, max_length=64, description="Identificador devolvido na resposta")
+    method: Literal["GET"] = "GET"
+    path: str = Field(..., max_length=2048, examples=["/api/v1/funcionarios?page=1&page_size=10"])
+
+    @field_validator("path")
+    @classmethod
+    def validar_path(cls, path: str) -> str:
+        if not path.startswith(PREFIXO_API) or path.split("?", 1)[0].rstrip("/") in ROTAS_EXCLUIDAS:
+            raise ValueError(f"path deve ser uma rota da API ({PREFIXO_API}...), exceto o batch e streams")
+        return path
+
+
+class BatchRequest(BaseModel):
+    """Sub-requisições executadas em uma única chamada"""
+
+    requests: list[SubRequisicao] = Field(..., min_length=1, max_length=settings.BATCH_MAX_REQUESTS)
@@ -41,3 +41,22 @@ class FiltroOpcao(BaseModel):
 
     id: UUID
     nome: str
+
+
+class FacetaOpcao(BaseModel):
+    """Opção de filtro com a contagem de funcionários que ela traria"""
+
+    id: str
+    nome: str
+    total: int
+
+
+class FacetasFuncionarios(BaseModel):
+    """Contagens por faceta da listagem de funcionários, dados os filtros aplicados"""
+
+    total: int
+    areas: list[FacetaOpcao]
+    cargos: list[FacetaOpcao]
+    localidades: list[FacetaOpcao]
+    tempo_casa: list[FacetaOpcao]
+    enps_status: list[FacetaOpcao]
@@ -25,6 +25,12 @@ class FuncionarioCreate(FuncionarioBase):
     localidade_id: UUID
 
 
+class FuncionarioLoteCreate(BaseModel):
+    """Criação de funcionários em lote (uma transação)"""
+
+    funcionarios: list[FuncionarioCreate] = Field(..., min_length=1, max_length=10000)
+
+
 class FuncionarioResponse(FuncionarioBase):
     id: UUID
     empresa_id: UUID
@@ -57,6 +63,7 @@ class FuncionarioPaginada(BaseModel):
     """Resposta paginada de funcionários"""
 
     total: int
+    total_exato: bool = Field(True, description="false quando total é a estimativa do planner (FUNCIONARIO_COUNT_STRATEGY)")
     page: int
     page_size: int
     total_pages: int
@@ -32,6 +32,8 @@ from .filtros import (
     AreaUnica,
     CargoUnico,
     ContagemPorArea,
+    FacetaOpcao,
+    FacetasFuncionarios,
     FiltroOpcao,
     LocalidadeUnica,
 )
@@ -40,6 +42,7 @@ from .filtros import (
 from .funcionario import (
     FuncionarioBase,
     FuncionarioCreate,
+    FuncionarioLoteCreate,
     FuncionarioPaginada,
     FuncionarioResponse,
 )
@@ -85,12 +88,15 @@ __all__ = [
     "EnpsPorArea",
     "EnpsPorCargo",
     "EnpsPorSegmento",
+    "FacetaOpcao",
+    "FacetasFuncionarios",
     "FavorabilidadeDimensao",
     "FavorabilidadePorSegmento",
     "FiltroOpcao",
     # Funcionário
     "FuncionarioBase",
     "FuncionarioCreate",
+    "FuncionarioLoteCreate",
     "FuncionarioPaginada",
     "FuncionarioResponse",
     "GerenciaResponse",
@@ -3,21 +3,36 @@ Analytics Service
 Lógica de negócio para análises e métricas
 """
 
+from datetime import date
 from uuid import UUID
 
 from app.repositories.analytics_repository import AnalyticsRepository
+from app.services.single_flight import SingleFlight
+
+
+# Compartilhado entre instâncias: o serviço é criado a cada requisição
+single_flight = SingleFlight()
 
 
 class AnalyticsService:
     def __init__(self):
         self.repository = AnalyticsRepository()
 
-    def get_enps_distribution(self, empresa_id: UUID | None = None) -> dict:
+    async def coalescer(self, metodo: str, *args):
+        """
+        Executa um método do serviço via single-flight
+        Chamadas concorrentes com mesmo método e argumentos compartilham uma única execução
+        """
+        return await single_flight.executar((metodo, *args), getattr(self, metodo), *args)
+
+    def get_enps_distribution(
+        self, empresa_id: UUID | None = None, data_inicio: date | None = None, data_fim: date | None = None
+    ) -> dict:
         """
         Retorna distribuição eNPS com cálculo do score
         eNPS Score = % Promotores - % Detratores
         """
-        data = self.repository.get_enps_distribution(empresa_id)
+        data = self.repository.get_enps_distribution(empresa_id, data_inicio, data_fim)
         
         # Calcular eNPS Score
         enps_score = data["promotores_percentual"] - data["detratores_percentual"]
@@ -39,12 +54,14 @@ class AnalyticsService:
             "total_funcionarios": total,
         }
 
-    def get_satisfaction_scores(self, empresa_id: UUID | None = None) -> dict:
+    def get_satisfaction_scores(
+        self, empresa_id: UUID | None = None, data_inicio: date | None = None, data_fim: date | None = None
+    ) -> dict:
         """
         Retorna scores médios das dimensões
         Com score geral médio
         """
-        data = self.repository.get_satisfaction_scores(empresa_id)
+        data = self.repository.get_satisfaction_scores(empresa_id, data_inicio, data_fim)
         
         # Calcular score geral (média das médias)
         if data:
@@ -122,12 +139,14 @@ class AnalyticsService:
             },
         }
 
-    def get_areas_scores_comparison(self, empresa_id: UUID | None = None) -> dict:
+    def get_areas_scores_comparison(
+        self, empresa_id: UUID | None = None, data_inicio: date | None = None, data_fim: date | None = None
+    ) -> dict:
         """
         Retorna comparação de scores entre áreas por dimensão
         Task 7 - Visualização 1: Average Feedback Scores by Department
         """
-        data = self.repository.get_areas_scores_comparison(empresa_id)
+        data = self.repository.get_areas_scores_comparison(empresa_id, data_inicio, data_fim)
         
         # Organizar dados por área
         areas_dict = {}
@@ -148,7 +167,7 @@ class AnalyticsService:
             if row["dimensao"]:  # Só adicionar se houver dimensão
                 areas_dict[area_id]["dimensoes"].append({
                     "dimensao": row["dimensao"],
-                    "score_medio": float(row["score_medio"]) if row["score_medio"] else None,
+                    "score_medio": row["score_medio"],
                     "total_respostas": row["total_respostas"],
                 })
         
@@ -164,18 +183,21 @@ class AnalyticsService:
             "total_areas": len(areas_list),
         }
 
-    def get_areas_enps_comparison(self, empresa_id: UUID | None = None) -> dict:
+    def get_areas_enps_comparison(
+        self, empresa_id: UUID | None = None, data_inicio: date | None = None, data_fim: date | None = None
+    ) -> dict:
         """
         Retorna comparação de eNPS entre áreas
         Task 7 - Visualização 2: eNPS Scores Segmented by Department
         """
-        data = self.repository.get_areas_enps_comparison(empresa_id)
+        data = self.repository.get_areas_enps_comparison(empresa_id, data_inicio, data_fim)
         
         # Calcular eNPS score para cada área
         areas_list = []
         for row in data:
-            promotores_pct = float(row["promotores_percentual"]) if row["promotores_percentual"] else 0
-            detratores_pct = float(row["detratores_percentual"]) if row["detratores_percentual"] else 0
+            # NUMERIC já chega como float do cursor
+            promotores_pct = row["promotores_percentual"] or 0
+            detratores_pct = row["detratores_percentual"] or 0
             enps_score = promotores_pct - detratores_pct
             
             areas_list.append({
@@ -188,7 +210,7 @@ class AnalyticsService:
                 "neutros": row["neutros"],
                 "detratores": row["detratores"],
                 "promotores_percentual": promotores_pct,
-                "neutros_percentual": float(row["neutros_percentual"]) if row["neutros_percentual"] else 0,
+                "neutros_percentual": row["neutros_percentual"] or 0,
                 "detratores_percentual": detratores_pct,
                 "enps_score": round(enps_score, 2),
                 "total_respostas": row["total_respostas"],
@@ -215,12 +237,14 @@ class AnalyticsService:
             "pior_area": pior_area,
         }
 
-    def get_area_detailed_metrics(self, area_id: UUID) -> dict:
+    def get_area_detailed_metrics(
+        self, area_id: UUID, data_inicio: date | None = None, data_fim: date | None = None
+    ) -> dict:
         """
         Retorna métricas detalhadas de uma área específica
         Incluindo comparação com empresa e insights
         """
-        data = self.repository.get_area_detailed_metrics(area_id)
+        data = self.repository.get_area_detailed_metrics(area_id, data_inicio, data_fim)
         
         # Calcular eNPS
         enps_data = data["enps"]
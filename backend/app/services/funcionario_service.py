@@ -5,7 +5,20 @@ Funcionário Service
 from uuid import UUID
 
 from app.repositories.funcionario_repository import FuncionarioRepository
-from app.schemas.schemas import FiltroOpcao, FuncionarioCreate, FuncionarioPaginada, FuncionarioResponse
+from app.schemas.schemas import FacetaOpcao, FiltroOpcao, FuncionarioCreate, FuncionarioLoteCreate, FuncionarioResponse
+
+
+# Nomes exibidos para as opções da faceta eNPS
+NOMES_ENPS = {"promotor": "Promotor", "neutro": "Neutro", "detrator": "Detrator"}
+
+# Faceta do repositório -> campo da resposta
+CAMPOS_FACETAS = {
+    "area": "areas",
+    "cargo": "cargos",
+    "localidade": "localidades",
+    "tempo_casa": "tempo_casa",
+    "enps_status": "enps_status",
+}
 
 
 class FuncionarioService:
@@ -26,9 +39,9 @@ class FuncionarioService:
         enps_status: str | None = None,
         order_by: str = "nome",
         order_dir: str = "asc",
-    ) -> FuncionarioPaginada:
+    ) -> dict:
         """Lista funcionários com paginação e filtros"""
-        funcionarios_data, total = self.repository.get_funcionarios_paginado(
+        funcionarios_data, total, total_exato = self.repository.get_funcionarios_paginado(
             empresa_id=empresa_id,
             page=page,
             page_size=page_size,
@@ -43,15 +56,15 @@ class FuncionarioService:
             order_dir=order_dir,
         )
 
-        funcionarios = [FuncionarioResponse(**func) for func in funcionarios_data]
-
-        return FuncionarioPaginada(
-            items=funcionarios,
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=(total + page_size - 1) // page_size,
-        )
+        # Linhas do repositório já têm o formato de FuncionarioResponse: sem revalidação por item
+        return {
+            "items": funcionarios_data,
+            "total": total,
+            "total_exato": total_exato,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total + page_size - 1) // page_size,
+        }
 
     def buscar_funcionarios(
         self,
@@ -68,9 +81,9 @@ class FuncionarioService:
         enps_status: str | None = None,
         order_by: str = "nome",
         order_dir: str = "asc",
-    ) -> FuncionarioPaginada:
+    ) -> dict:
         """Busca funcionários por nome ou email"""
-        funcionarios_data, total = self.repository.buscar_funcionarios(
+        funcionarios_data, total, total_exato = self.repository.buscar_funcionarios(
             empresa_id=empresa_id,
             termo_busca=termo,
             page=page,
@@ -86,15 +99,15 @@ class FuncionarioService:
             order_dir=order_dir,
         )
 
-        funcionarios = [FuncionarioResponse(**func) for func in funcionarios_data]
-
-        return FuncionarioPaginada(
-            items=funcionarios,
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=(total + page_size - 1) // page_size,
-        )
+        # Linhas do repositório já têm o formato de FuncionarioResponse: sem revalidação por item
+        return {
+            "items": funcionarios_data,
+            "total": total,
+            "total_exato": total_exato,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total + page_size - 1) // page_size,
+        }
 
     def obter_funcionario(self, funcionario_id: UUID) -> FuncionarioResponse | None:
         """Obtém funcionário por ID"""
@@ -116,6 +129,45 @@ class FuncionarioService:
             "localidades": [FiltroOpcao(**localidade) for localidade in localidades],
         }
 
+    def obter_facetas(
+        self,
+        empresa_id: UUID | None,
+        areas: list[UUID] | None = None,
+        cargos: list[UUID] | None = None,
+        localidades: list[UUID] | None = None,
+        tempo_casa: list[UUID] | None = None,
+        score_min: float | None = None,
+        score_max: float | None = None,
+        enps_status: str | None = None,
+    ) -> dict:
+        """Contagem de funcionários por opção de filtro, dados os filtros aplicados"""
+        linhas = self.repository.get_facetas(
+            empresa_id=empresa_id,
+            areas=areas,
+            cargos=cargos,
+            localidades=localidades,
+            tempo_casa=tempo_casa,
+            score_min=score_min,
+            score_max=score_max,
+            enps_status=enps_status,
+        )
+
+        facetas = {campo: [] for campo in CAMPOS_FACETAS.values()}
+        total = 0
+        for linha in linhas:
+            if linha["faceta"] == "total":
+                total = linha["total"]
+                continue
+            nome = linha["nome"] or NOMES_ENPS.get(linha["id"], linha["id"])
+            facetas[CAMPOS_FACETAS[linha["faceta"]]].append(
+                FacetaOpcao(id=linha["id"], nome=nome, total=linha["total"])
+            )
+        return {"total": total, **facetas}
+
     def criar_funcionario(self, funcionario: FuncionarioCreate) -> str:
         """Cria novo funcionário"""
         return self.repository.criar_funcionario(funcionario.model_dump())
+
+    def criar_funcionarios(self, lote: FuncionarioLoteCreate) -> list[str]:
+        """Cria funcionários em lote"""
+        return self.repository.criar_funcionarios([funcionario.model_dump() for funcionario in lote.funcionarios])
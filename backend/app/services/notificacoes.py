@@ -0,0 +1,175 @@
+"""
+Notificações de novas avaliações
+Uma conexão LISTEN por worker, repassada aos streams SSE dos dashboards
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+
+import orjson
+import psycopg2
+
+from app.database.connection import DatabaseConnection
+
+
+logger = logging.getLogger(__name__)
+
+# Canal do trigger de resposta_dimensao (migração 007)
+CANAL = "avaliacoes_delta"
+
+# Comentário SSE enviado sem eventos, para proxies não fecharem a conexão ociosa
+INTERVALO_HEARTBEAT = 15.0
+
+# Espera antes de reabrir a conexão LISTEN perdida
+INTERVALO_RECONEXAO = 5.0
+
+# Reconexão do EventSource no navegador (ms)
+RETRY_CLIENTE = 5000
+
+
+class OuvinteAvaliacoes:
+    """
+    Fan-out das notificações do canal avaliacoes_delta
+
+    Uma única conexão dedicada (fora do pool, sempre no primário: réplicas e poolers
+    em modo transação não entregam NOTIFY) aberta no primeiro assinante e lida pelo
+    próprio event loop (add_reader), sem thread nem consulta periódica. Cada delta
+    vai para a fila dos assinantes da empresa; quantos dashboards estiverem abertos,
+    o custo no banco é uma conexão ociosa por worker.
+
+    Quando um assinante não acompanha (fila cheia) ou a conexão cai, deltas podem ter
+    se perdido: o assinante recebe um evento "resync" para recarregar as métricas.
+    """
+
+    def __init__(self, tamanho_fila: int = 100):
+        self.tamanho_fila = tamanho_fila
+        self._conn = None
+        self._fd: int | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._reconexao: asyncio.TimerHandle | None = None
+        self._assinantes: dict[asyncio.Queue, str | None] = {}
+        self._notificacoes = 0
+        self._entregues = 0
+        self._resyncs = 0
+        self._reconexoes = 0
+
+    def assinar(self, empresa_id: str | None = None) -> asyncio.Queue:
+        """Fila de (evento, dados) com os deltas da empresa (todas, se None)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Event loop novo (ex.: outro TestClient): a conexão do anterior não é lida por ele
+            self.fechar()
+            self._assinantes.clear()
+            self._loop = loop
+
+        fila: asyncio.Queue = asyncio.Queue(maxsize=self.tamanho_fila)
+        self._assinantes[fila] = empresa_id
+        if self._conn is None and self._reconexao is None:
+            self._conectar()
+        return fila
+
+    def cancelar(self, fila: asyncio.Queue) -> None:
+        """Remove o assinante (a conexão LISTEN segue aberta para os próximos)"""
+        self._assinantes.pop(fila, None)
+
+    def _conectar(self) -> None:
+        self._reconexao = None
+        try:
+            conn = psycopg2.connect(**DatabaseConnection._connect_kwargs())
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CANAL}")
+        except psycopg2.Error as e:
+            logger.warning(f"⚠️  LISTEN {CANAL} indisponível: {e}")
+            self._agendar_reconexao()
+            return
+
+        self._conn, self._fd = conn, conn.fileno()
+        self._loop.add_reader(self._fd, self._ler)
+        logger.info(f"📡 Ouvindo {CANAL} ({len(self._assinantes)} assinantes)")
+
+    def _agendar_reconexao(self) -> None:
+        if self._assinantes and self._reconexao is None:
+            self._reconexoes += 1
+            self._reconexao = self._loop.call_later(INTERVALO_RECONEXAO, self._conectar)
+
+    def _desconectar(self) -> None:
+        if self._conn is None:
+            return
+        # Descritor guardado na conexão: depois de uma queda, fileno() já não responde
+        self._loop.remove_reader(self._fd)
+        self._conn.close()
+        self._conn = self._fd = None
+
+    def _ler(self) -> None:
+        """Callback do event loop: há dados na conexão LISTEN"""
+        try:
+            self._conn.poll()
+        except psycopg2.Error as e:
+            logger.warning(f"⚠️  Conexão LISTEN {CANAL} perdida: {e}")
+            self._desconectar()
+            for fila in self._assinantes:
+                self._resync(fila)
+            self._agendar_reconexao()
+            return
+
+        while self._conn.notifies:
+            self.distribuir(self._conn.notifies.pop(0).payload)
+
+    def distribuir(self, payload: str) -> None:
+        """Repassa um delta (JSON do trigger) aos assinantes da empresa"""
+        self._notificacoes += 1
+        empresa_id = orjson.loads(payload)["empresa_id"]
+        for fila, filtro in self._assinantes.items():
+            if filtro is not None and filtro != empresa_id:
+                continue
+            try:
+                fila.put_nowait(("delta", payload))
+                self._entregues += 1
+            except asyncio.QueueFull:
+                self._resync(fila)
+
+    def _resync(self, fila: asyncio.Queue) -> None:
+        """Troca os eventos pendentes por um pedido de recarga"""
+        while not fila.empty():
+            fila.get_nowait()
+        fila.put_nowait(("resync", "{}"))
+        self._resyncs += 1
+
+    async def eventos(self, empresa_id: str | None = None) -> AsyncIterator[str]:
+        """Stream SSE: deltas da empresa e heartbeat; a assinatura termina com a conexão do cliente"""
+        fila = self.assinar(empresa_id)
+        try:
+            yield f"retry: {RETRY_CLIENTE}\n\n"
+            while True:
+                try:
+                    evento, dados = await asyncio.wait_for(fila.get(), INTERVALO_HEARTBEAT)
+                except TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: {evento}\ndata: {dados}\n\n"
+        finally:
+            self.cancelar(fila)
+
+    def fechar(self) -> None:
+        """Fecha a conexão LISTEN e cancela a reconexão pendente"""
+        if self._reconexao is not None:
+            self._reconexao.cancel()
+            self._reconexao = None
+        self._desconectar()
+
+    def metricas(self) -> dict:
+        """Assinantes e notificações (por worker)"""
+        return {
+            "conectado": self._conn is not None,
+            "assinantes": len(self._assinantes),
+            "notificacoes": self._notificacoes,
+            "entregues": self._entregues,
+            "resyncs": self._resyncs,
+            "reconexoes": self._reconexoes,
+        }
+
+
+# Instância global (por worker)
+ouvinte_avaliacoes = OuvinteAvaliacoes()
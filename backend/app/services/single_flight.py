@@ -0,0 +1,65 @@
+"""
+Single-flight
+Agrupa chamadas concorrentes idênticas em uma única execução
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from starlette.concurrency import run_in_threadpool
+
+from app.database.connection import contexto_sem_escopo
+
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalescência de requisições: enquanto uma chave está em execução,
+    novas chamadas com a mesma chave aguardam o mesmo resultado (ou exceção)
+    em vez de repetir a consulta.
+    """
+
+    def __init__(self):
+        self._em_andamento: dict[Hashable, asyncio.Task] = {}
+        self._chamadas = 0
+        self._execucoes = 0
+        self._coalescidas = 0
+
+    async def executar(self, chave: Hashable, func: Callable[..., Any], *args: Any) -> Any:
+        """Executa func(*args) no threadpool, compartilhando a execução entre chamadas com a mesma chave"""
+        self._chamadas += 1
+
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is not None:
+            self._coalescidas += 1
+            logger.debug(f"🔗 Chamada coalescida: {chave}")
+        else:
+            self._execucoes += 1
+            # Fora do escopo da requisição: a execução compartilhada pode sobreviver a quem a iniciou
+            tarefa = asyncio.get_running_loop().create_task(
+                run_in_threadpool(func, *args), context=contexto_sem_escopo()
+            )
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+
+        # shield: cancelar um cliente (ex.: desconexão) não cancela a execução dos demais
+        return await asyncio.shield(tarefa)
+
+    def metricas(self) -> dict:
+        """Contadores de chamadas, execuções reais e chamadas coalescidas"""
+        return {
+            "chamadas": self._chamadas,
+            "execucoes": self._execucoes,
+            "coalescidas": self._coalescidas,
+            "em_andamento": len(self._em_andamento),
+        }
+
+    def reset_metricas(self) -> None:
+        """Zera os contadores (não afeta execuções em andamento)"""
+        self._chamadas = 0
+        self._execucoes = 0
+        self._coalescidas = 0
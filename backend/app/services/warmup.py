@@ -0,0 +1,108 @@
+"""
+Warm-up
+Aquece o pool, os backends do Postgres e as análises da empresa no startup
+"""
+
+import asyncio
+import logging
+import time
+from uuid import UUID
+
+from starlette.concurrency import run_in_threadpool
+
+from app.database.connection import DatabaseConnection
+from app.repositories.hierarquia_repository import HierarquiaRepository
+from app.services.analytics_service import AnalyticsService
+
+
+logger = logging.getLogger(__name__)
+
+# Análises do dashboard no nível da empresa: (método do AnalyticsService, argumentos após empresa_id)
+ANALISES_EMPRESA = [
+    ("get_enps_distribution", (None, None)),
+    ("get_tenure_distribution", ()),
+    ("get_satisfaction_scores", (None, None)),
+    ("get_areas_scores_comparison", (None, None)),
+    ("get_areas_enps_comparison", (None, None)),
+]
+
+
+class Warmup:
+    """
+    Aquecimento do worker, executado em segundo plano a partir do lifespan:
+    1. abre e valida as minconn conexões do pool
+    2. calcula as análises da empresa (visão geral e cada empresa ativa) com
+       concorrência = minconn, de modo que cada backend planeja e executa as
+       consultas quentes e carrega os blocos das tabelas no cache do Postgres
+
+    As análises passam pelo single-flight: requisições que chegam durante o
+    aquecimento aguardam a mesma execução em vez de repeti-la.
+    """
+
+    def __init__(self):
+        self.pronto = False
+        self.duracao: float | None = None
+        self.conexoes = 0
+        self.empresas = 0
+        self.analises = 0
+        self.erros = 0
+
+    def concluir(self, inicio: float | None = None) -> None:
+        """Marca o worker como pronto"""
+        self.duracao = round(time.perf_counter() - inicio, 3) if inicio is not None else None
+        self.pronto = True
+
+    async def executar(self) -> None:
+        """Executa o aquecimento; falhas são registradas, mas não impedem a prontidão"""
+        inicio = time.perf_counter()
+        try:
+            self.conexoes = await run_in_threadpool(DatabaseConnection.warm_up)
+
+            empresas = await run_in_threadpool(HierarquiaRepository().get_all_empresas)
+            self.empresas = len(empresas)
+            # None = visão geral (dashboard sem filtro de empresa)
+            empresa_ids = [None] + [UUID(str(empresa["id"])) for empresa in empresas]
+
+            service = AnalyticsService()
+            limite = asyncio.Semaphore(max(self.conexoes, 1))
+
+            async def analisar(metodo: str, empresa_id: UUID | None, argumentos: tuple) -> None:
+                async with limite:
+                    try:
+                        await service.coalescer(metodo, empresa_id, *argumentos)
+                        self.analises += 1
+                    except Exception as e:
+                        self.erros += 1
+                        logger.warning(f"⚠️  Warm-up de {metodo} ({empresa_id}) falhou: {e}")
+
+            await asyncio.gather(
+                *(
+                    analisar(metodo, empresa_id, argumentos)
+                    for empresa_id in empresa_ids
+                    for metodo, argumentos in ANALISES_EMPRESA
+                )
+            )
+        except Exception as e:
+            self.erros += 1
+            logger.warning(f"⚠️  Warm-up interrompido: {e}")
+        finally:
+            self.concluir(inicio)
+            logger.info(
+                f"🔥 Warm-up concluído em {self.duracao:.2f}s "
+                f"({self.conexoes} conexões, {self.empresas} empresas, {self.analises} análises, {self.erros} erros)"
+            )
+
+    def status(self) -> dict:
+        """Estado da prontidão (endpoint /ready)"""
+        return {
+            "status": "ready" if self.pronto else "warming_up",
+            "pronto": self.pronto,
+            "duracao_segundos": self.duracao,
+            "conexoes": self.conexoes,
+            "empresas": self.empresas,
+            "analises": self.analises,
+            "erros": self.erros,
+        }
+
+
+warmup = Warmup()
@@ -0,0 +1,174 @@
+-- 002_partition_avaliacao.sql
+-- Particionamento por período (RANGE em data_avaliacao) de avaliacao e resposta_dimensao
+--
+-- resposta_dimensao passa a carregar data_avaliacao (copiada da avaliação) para que
+-- filtros de período façam partition pruning nas duas tabelas. Cada ano de pesquisa
+-- vira uma partição; ondas antigas podem ser destacadas com arquivar_particoes_avaliacao().
+
+BEGIN;
+
+-- ===== TABELAS ANTIGAS =====
+
+ALTER TABLE resposta_dimensao RENAME TO resposta_dimensao_legado;
+ALTER TABLE avaliacao RENAME TO avaliacao_legado;
+
+-- ===== TABELAS PARTICIONADAS =====
+
+-- Avaliação (particionada por data_avaliacao)
+CREATE TABLE avaliacao (
+    id_avaliacao UUID NOT NULL DEFAULT gen_random_uuid(),
+    id_funcionario UUID NOT NULL,
+    data_avaliacao DATE NOT NULL DEFAULT CURRENT_DATE,
+    periodo_avaliacao VARCHAR(50),
+    comentario_geral TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) PARTITION BY RANGE (data_avaliacao);
+
+-- Resposta Dimensão (mesma chave de partição da avaliação)
+CREATE TABLE resposta_dimensao (
+    id_resposta_dimensao UUID NOT NULL DEFAULT gen_random_uuid(),
+    id_avaliacao UUID NOT NULL,
+    data_avaliacao DATE NOT NULL,
+    id_dimensao_avaliacao UUID NOT NULL,
+    valor_resposta INTEGER NOT NULL,
+    comentario TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) PARTITION BY RANGE (data_avaliacao);
+
+-- Partições default recebem datas fora dos anos já provisionados
+CREATE TABLE avaliacao_default PARTITION OF avaliacao DEFAULT;
+CREATE TABLE resposta_dimensao_default PARTITION OF resposta_dimensao DEFAULT;
+
+-- ===== GESTÃO DE PARTIÇÕES =====
+
+-- Cria as partições anuais de avaliacao e resposta_dimensao (idempotente)
+CREATE OR REPLACE FUNCTION criar_particoes_avaliacao(p_ano INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    v_inicio DATE := make_date(p_ano, 1, 1);
+    v_fim DATE := make_date(p_ano + 1, 1, 1);
+BEGIN
+    IF to_regclass(format('avaliacao_%s', p_ano)) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE avaliacao_%s PARTITION OF avaliacao FOR VALUES FROM (%L) TO (%L)',
+            p_ano, v_inicio, v_fim
+        );
+    END IF;
+
+    IF to_regclass(format('resposta_dimensao_%s', p_ano)) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE resposta_dimensao_%s PARTITION OF resposta_dimensao FOR VALUES FROM (%L) TO (%L)',
+            p_ano, v_inicio, v_fim
+        );
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Destaca as partições de um ano e as move para o schema "arquivo"
+-- Operação apenas de catálogo: os dados não são copiados nem reescritos
+CREATE SCHEMA IF NOT EXISTS arquivo;
+
+CREATE OR REPLACE FUNCTION arquivar_particoes_avaliacao(p_ano INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    v_fk TEXT;
+BEGIN
+    -- Respostas primeiro. A partição destacada mantém a FK herdada como FK própria,
+    -- ainda apontando para avaliacao, que vai perder as linhas do ano: ela é removida
+    -- e recriada para a avaliacao_<ano> arquivada
+    IF to_regclass(format('resposta_dimensao_%s', p_ano)) IS NOT NULL THEN
+        EXECUTE format('ALTER TABLE resposta_dimensao DETACH PARTITION resposta_dimensao_%s', p_ano);
+        FOR v_fk IN
+            SELECT conname FROM pg_constraint
+            WHERE conrelid = format('resposta_dimensao_%s', p_ano)::regclass
+            AND confrelid = 'avaliacao'::regclass
+        LOOP
+            EXECUTE format('ALTER TABLE resposta_dimensao_%s DROP CONSTRAINT %I', p_ano, v_fk);
+        END LOOP;
+        EXECUTE format('ALTER TABLE resposta_dimensao_%s SET SCHEMA arquivo', p_ano);
+    END IF;
+
+    IF to_regclass(format('avaliacao_%s', p_ano)) IS NOT NULL THEN
+        EXECUTE format('ALTER TABLE avaliacao DETACH PARTITION avaliacao_%s', p_ano);
+        EXECUTE format('ALTER TABLE avaliacao_%s SET SCHEMA arquivo', p_ano);
+    END IF;
+
+    -- NOT VALID: os dados já satisfaziam a FK original, sem varrer as partições arquivadas
+    IF to_regclass(format('arquivo.resposta_dimensao_%s', p_ano)) IS NOT NULL
+        AND to_regclass(format('arquivo.avaliacao_%s', p_ano)) IS NOT NULL THEN
+        EXECUTE format(
+            'ALTER TABLE arquivo.resposta_dimensao_%1$s ADD CONSTRAINT resposta_dimensao_%1$s_avaliacao_fkey
+                FOREIGN KEY (id_avaliacao, data_avaliacao)
+                REFERENCES arquivo.avaliacao_%1$s (id_avaliacao, data_avaliacao)
+                ON DELETE CASCADE ON UPDATE CASCADE NOT VALID',
+            p_ano
+        );
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Provisiona do primeiro ano com dados até o ano seguinte ao atual
+DO $$
+DECLARE
+    v_ano_inicial INTEGER;
+    v_ano INTEGER;
+BEGIN
+    SELECT COALESCE(MIN(EXTRACT(YEAR FROM data_avaliacao))::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER)
+    INTO v_ano_inicial
+    FROM avaliacao_legado;
+
+    FOR v_ano IN v_ano_inicial .. EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + 1 LOOP
+        PERFORM criar_particoes_avaliacao(v_ano);
+    END LOOP;
+END;
+$$;
+
+-- ===== MIGRAÇÃO DOS DADOS =====
+
+INSERT INTO avaliacao (
+    id_avaliacao, id_funcionario, data_avaliacao, periodo_avaliacao, comentario_geral, created_at
+)
+SELECT id_avaliacao, id_funcionario, data_avaliacao, periodo_avaliacao, comentario_geral, created_at
+FROM avaliacao_legado;
+
+INSERT INTO resposta_dimensao (
+    id_resposta_dimensao, id_avaliacao, data_avaliacao, id_dimensao_avaliacao,
+    valor_resposta, comentario, created_at
+)
+SELECT rd.id_resposta_dimensao, rd.id_avaliacao, av.data_avaliacao, rd.id_dimensao_avaliacao,
+       rd.valor_resposta, rd.comentario, rd.created_at
+FROM resposta_dimensao_legado rd
+JOIN avaliacao_legado av ON av.id_avaliacao = rd.id_avaliacao;
+
+DROP TABLE resposta_dimensao_legado;
+DROP TABLE avaliacao_legado;
+
+-- ===== CONSTRAINTS =====
+
+-- Em tabelas particionadas a chave de partição precisa fazer parte das chaves únicas
+ALTER TABLE avaliacao
+    ADD CONSTRAINT avaliacao_pkey PRIMARY KEY (id_avaliacao, data_avaliacao),
+    ADD CONSTRAINT avaliacao_id_funcionario_fkey
+        FOREIGN KEY (id_funcionario) REFERENCES funcionario(id_funcionario) ON DELETE CASCADE;
+
+ALTER TABLE resposta_dimensao
+    ADD CONSTRAINT resposta_dimensao_pkey PRIMARY KEY (id_resposta_dimensao, data_avaliacao),
+    ADD CONSTRAINT resposta_dimensao_avaliacao_fkey
+        FOREIGN KEY (id_avaliacao, data_avaliacao) REFERENCES avaliacao(id_avaliacao, data_avaliacao)
+        ON DELETE CASCADE ON UPDATE CASCADE,
+    ADD CONSTRAINT resposta_dimensao_id_dimensao_avaliacao_fkey
+        FOREIGN KEY (id_dimensao_avaliacao) REFERENCES dimensao_avaliacao(id_dimensao_avaliacao),
+    ADD CONSTRAINT resposta_dimensao_avaliacao_dimensao_key
+        UNIQUE (id_avaliacao, id_dimensao_avaliacao, data_avaliacao);
+
+-- ===== ÍNDICES =====
+
+-- Avaliação
+CREATE INDEX idx_avaliacao_funcionario ON avaliacao(id_funcionario);
+CREATE INDEX idx_avaliacao_data ON avaliacao(data_avaliacao);
+
+-- Resposta
+CREATE INDEX idx_resposta_avaliacao ON resposta_dimensao(id_avaliacao);
+CREATE INDEX idx_resposta_dimensao ON resposta_dimensao(id_dimensao_avaliacao);
+
+COMMIT;
@@ -0,0 +1,271 @@
+-- 003_compact_scores.sql
+-- Representação compacta das respostas: um SMALLINT[] por avaliação + comentários esparsos
+--
+-- resposta_dimensao continua sendo a fonte normalizada (escrita pelo import).
+-- Triggers mantêm avaliacao.valores_dimensao e comentario_dimensao sincronizados,
+-- e as leituras quentes (analytics e scores de funcionários) usam a forma compacta.
+
+BEGIN;
+
+-- ===== POSIÇÃO DA DIMENSÃO NO ARRAY =====
+
+ALTER TABLE dimensao_avaliacao ADD COLUMN IF NOT EXISTS posicao SMALLINT UNIQUE;
+
+-- Dimensões da pesquisa ocupam posições fixas (mesma ordem do CSV)
+UPDATE dimensao_avaliacao da
+SET posicao = canonica.posicao
+FROM (VALUES
+    ('Interesse no Cargo', 1),
+    ('Contribuição', 2),
+    ('Aprendizado e Desenvolvimento', 3),
+    ('Feedback', 4),
+    ('Interação com Gestor', 5),
+    ('Clareza sobre Possibilidades de Carreira', 6),
+    ('Expectativa de Permanência', 7)
+) AS canonica(nome, posicao)
+WHERE da.nome_dimensao = canonica.nome;
+
+-- Demais dimensões existentes vão para as posições seguintes
+UPDATE dimensao_avaliacao da
+SET posicao = extra.posicao
+FROM (
+    SELECT id_dimensao_avaliacao,
+           GREATEST((SELECT MAX(posicao) FROM dimensao_avaliacao), 7)
+               + ROW_NUMBER() OVER (ORDER BY ordem_exibicao NULLS LAST, nome_dimensao) AS posicao
+    FROM dimensao_avaliacao
+    WHERE posicao IS NULL
+) extra
+WHERE da.id_dimensao_avaliacao = extra.id_dimensao_avaliacao;
+
+-- Novas dimensões sem posição explícita recebem a próxima livre
+CREATE OR REPLACE FUNCTION definir_posicao_dimensao()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.posicao IS NULL THEN
+        SELECT COALESCE(MAX(posicao), 0) + 1 INTO NEW.posicao FROM dimensao_avaliacao;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_dimensao_posicao
+    BEFORE INSERT ON dimensao_avaliacao
+    FOR EACH ROW EXECUTE FUNCTION definir_posicao_dimensao();
+
+-- ===== ARMAZENAMENTO COMPACTO =====
+
+-- valores_dimensao[posicao] = valor_resposta (NULL quando a dimensão não foi respondida)
+ALTER TABLE avaliacao ADD COLUMN IF NOT EXISTS valores_dimensao SMALLINT[];
+
+-- Comentários são raros: tabela esparsa, uma linha por comentário preenchido
+CREATE TABLE comentario_dimensao (
+    id_avaliacao UUID NOT NULL,
+    data_avaliacao DATE NOT NULL,
+    posicao SMALLINT NOT NULL,
+    comentario TEXT NOT NULL,
+    PRIMARY KEY (id_avaliacao, data_avaliacao, posicao),
+    FOREIGN KEY (id_avaliacao, data_avaliacao) REFERENCES avaliacao(id_avaliacao, data_avaliacao)
+        ON DELETE CASCADE ON UPDATE CASCADE
+) PARTITION BY RANGE (data_avaliacao);
+
+CREATE TABLE comentario_dimensao_default PARTITION OF comentario_dimensao DEFAULT;
+
+-- ===== GESTÃO DE PARTIÇÕES (inclui comentario_dimensao) =====
+
+CREATE OR REPLACE FUNCTION criar_particoes_avaliacao(p_ano INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    v_inicio DATE := make_date(p_ano, 1, 1);
+    v_fim DATE := make_date(p_ano + 1, 1, 1);
+    v_tabela TEXT;
+BEGIN
+    FOREACH v_tabela IN ARRAY ARRAY['avaliacao', 'resposta_dimensao', 'comentario_dimensao'] LOOP
+        IF to_regclass(format('%s_%s', v_tabela, p_ano)) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %s_%s PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+                v_tabela, p_ano, v_tabela, v_inicio, v_fim
+            );
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION arquivar_particoes_avaliacao(p_ano INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    v_tabela TEXT;
+    v_fk TEXT;
+BEGIN
+    -- Tabelas filhas primeiro. A partição destacada mantém a FK herdada como FK própria,
+    -- ainda apontando para avaliacao, que vai perder as linhas do ano: ela é removida aqui
+    -- e recriada abaixo para a avaliacao_<ano> arquivada
+    FOREACH v_tabela IN ARRAY ARRAY['comentario_dimensao', 'resposta_dimensao'] LOOP
+        IF to_regclass(format('%s_%s', v_tabela, p_ano)) IS NOT NULL THEN
+            EXECUTE format('ALTER TABLE %s DETACH PARTITION %s_%s', v_tabela, v_tabela, p_ano);
+            FOR v_fk IN
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = format('%s_%s', v_tabela, p_ano)::regclass
+                AND confrelid = 'avaliacao'::regclass
+            LOOP
+                EXECUTE format('ALTER TABLE %s_%s DROP CONSTRAINT %I', v_tabela, p_ano, v_fk);
+            END LOOP;
+            EXECUTE format('ALTER TABLE %s_%s SET SCHEMA arquivo', v_tabela, p_ano);
+        END IF;
+    END LOOP;
+
+    IF to_regclass(format('avaliacao_%s', p_ano)) IS NOT NULL THEN
+        EXECUTE format('ALTER TABLE avaliacao DETACH PARTITION avaliacao_%s', p_ano);
+        EXECUTE format('ALTER TABLE avaliacao_%s SET SCHEMA arquivo', p_ano);
+    END IF;
+
+    -- NOT VALID: os dados já satisfaziam a FK original, sem varrer as partições arquivadas
+    IF to_regclass(format('arquivo.avaliacao_%s', p_ano)) IS NOT NULL THEN
+        FOREACH v_tabela IN ARRAY ARRAY['comentario_dimensao', 'resposta_dimensao'] LOOP
+            IF to_regclass(format('arquivo.%s_%s', v_tabela, p_ano)) IS NOT NULL THEN
+                EXECUTE format(
+                    'ALTER TABLE arquivo.%1$s_%2$s ADD CONSTRAINT %1$s_%2$s_avaliacao_fkey
+                        FOREIGN KEY (id_avaliacao, data_avaliacao)
+                        REFERENCES arquivo.avaliacao_%2$s (id_avaliacao, data_avaliacao)
+                        ON DELETE CASCADE ON UPDATE CASCADE NOT VALID',
+                    v_tabela, p_ano
+                );
+            END IF;
+        END LOOP;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partições de comentario_dimensao para os anos já provisionados em avaliacao
+DO $$
+DECLARE
+    v_ano INTEGER;
+BEGIN
+    FOR v_ano IN
+        SELECT substring(c.relname FROM '^avaliacao_([0-9]{4})$')::INTEGER
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'avaliacao'::regclass
+        AND c.relname ~ '^avaliacao_[0-9]{4}$'
+    LOOP
+        PERFORM criar_particoes_avaliacao(v_ano);
+    END LOOP;
+END;
+$$;
+
+-- ===== SINCRONIZAÇÃO COM resposta_dimensao =====
+
+-- Recompõe valores_dimensao das avaliações informadas a partir de resposta_dimensao
+-- (mesmo formato do backfill: uma posição por dimensão, NULL sem resposta)
+CREATE OR REPLACE FUNCTION recompor_valores_dimensao(p_ids UUID[], p_datas DATE[])
+RETURNS VOID AS $$
+    UPDATE avaliacao av
+    SET valores_dimensao = novos.valores
+    FROM (
+        SELECT alvo.id_avaliacao, alvo.data_avaliacao,
+               CASE WHEN COUNT(rd.id_resposta_dimensao) > 0
+                    THEN array_agg(rd.valor_resposta::SMALLINT ORDER BY slot.posicao)
+               END AS valores
+        FROM unnest(p_ids, p_datas) AS alvo(id_avaliacao, data_avaliacao)
+        CROSS JOIN generate_series(1, GREATEST((SELECT MAX(posicao) FROM dimensao_avaliacao), 7)) AS slot(posicao)
+        LEFT JOIN dimensao_avaliacao da ON da.posicao = slot.posicao
+        LEFT JOIN resposta_dimensao rd
+            ON rd.id_avaliacao = alvo.id_avaliacao
+            AND rd.data_avaliacao = alvo.data_avaliacao
+            AND rd.id_dimensao_avaliacao = da.id_dimensao_avaliacao
+        GROUP BY alvo.id_avaliacao, alvo.data_avaliacao
+    ) novos
+    WHERE av.id_avaliacao = novos.id_avaliacao
+    AND av.data_avaliacao = novos.data_avaliacao
+    AND av.valores_dimensao IS DISTINCT FROM novos.valores;
+$$ LANGUAGE sql;
+
+-- Por comando (tabelas de transição), não por linha: um UPDATE por avaliação afetada
+-- em cada página do import, em vez de um UPDATE (e uma versão morta) por resposta
+CREATE OR REPLACE FUNCTION sincronizar_resposta_compacta()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_ids UUID[];
+    v_datas DATE[];
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM comentario_dimensao cd
+        USING respostas_antigas o
+        JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = o.id_dimensao_avaliacao
+        WHERE cd.id_avaliacao = o.id_avaliacao AND cd.data_avaliacao = o.data_avaliacao AND cd.posicao = da.posicao;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO comentario_dimensao (id_avaliacao, data_avaliacao, posicao, comentario)
+        SELECT n.id_avaliacao, n.data_avaliacao, da.posicao, n.comentario
+        FROM respostas_novas n
+        JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = n.id_dimensao_avaliacao
+        WHERE NULLIF(TRIM(n.comentario), '') IS NOT NULL
+        ON CONFLICT (id_avaliacao, data_avaliacao, posicao) DO UPDATE SET comentario = EXCLUDED.comentario;
+    END IF;
+
+    -- Avaliações afetadas (cada tabela de transição só existe nos eventos que a declaram)
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(id_avaliacao), array_agg(data_avaliacao) INTO v_ids, v_datas
+        FROM (SELECT DISTINCT id_avaliacao, data_avaliacao FROM respostas_novas) afetadas;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(id_avaliacao), array_agg(data_avaliacao) INTO v_ids, v_datas
+        FROM (SELECT DISTINCT id_avaliacao, data_avaliacao FROM respostas_antigas) afetadas;
+    ELSE
+        SELECT array_agg(id_avaliacao), array_agg(data_avaliacao) INTO v_ids, v_datas
+        FROM (
+            SELECT id_avaliacao, data_avaliacao FROM respostas_antigas
+            UNION
+            SELECT id_avaliacao, data_avaliacao FROM respostas_novas
+        ) afetadas;
+    END IF;
+
+    IF v_ids IS NOT NULL THEN
+        PERFORM recompor_valores_dimensao(v_ids, v_datas);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_resposta_compacta_insert
+    AFTER INSERT ON resposta_dimensao
+    REFERENCING NEW TABLE AS respostas_novas
+    FOR EACH STATEMENT EXECUTE FUNCTION sincronizar_resposta_compacta();
+
+CREATE TRIGGER trigger_resposta_compacta_update
+    AFTER UPDATE ON resposta_dimensao
+    REFERENCING OLD TABLE AS respostas_antigas NEW TABLE AS respostas_novas
+    FOR EACH STATEMENT EXECUTE FUNCTION sincronizar_resposta_compacta();
+
+CREATE TRIGGER trigger_resposta_compacta_delete
+    AFTER DELETE ON resposta_dimensao
+    REFERENCING OLD TABLE AS respostas_antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION sincronizar_resposta_compacta();
+
+-- ===== BACKFILL =====
+
+UPDATE avaliacao av
+SET valores_dimensao = ARRAY(
+    SELECT (
+        SELECT rd.valor_resposta::SMALLINT
+        FROM resposta_dimensao rd
+        JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
+        WHERE rd.id_avaliacao = av.id_avaliacao
+        AND rd.data_avaliacao = av.data_avaliacao
+        AND da.posicao = slot.posicao
+    )
+    FROM generate_series(1, GREATEST((SELECT MAX(posicao) FROM dimensao_avaliacao), 7)) AS slot(posicao)
+    ORDER BY slot.posicao
+)
+WHERE EXISTS (
+    SELECT 1 FROM resposta_dimensao rd
+    WHERE rd.id_avaliacao = av.id_avaliacao AND rd.data_avaliacao = av.data_avaliacao
+);
+
+INSERT INTO comentario_dimensao (id_avaliacao, data_avaliacao, posicao, comentario)
+SELECT rd.id_avaliacao, rd.data_avaliacao, da.posicao, rd.comentario
+FROM resposta_dimensao rd
+JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
+WHERE NULLIF(TRIM(rd.comentario), '') IS NOT NULL;
+
+COMMIT;
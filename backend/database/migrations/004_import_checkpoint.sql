@@ -0,0 +1,24 @@
+-- 004_import_checkpoint.sql
+-- Checkpoint da importação do CSV (scripts/import_csv.py)
+--
+-- Cada bloco gravado avança o checkpoint na mesma transação dos seus dados, e os
+-- commits seguem a ordem do arquivo: byte_offset/ultima_linha são sempre o fim do
+-- maior prefixo já importado. Uma importação interrompida retoma a partir dali.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS importacao_checkpoint (
+    hash_arquivo CHAR(64) PRIMARY KEY,          -- SHA-256 do conteúdo
+    caminho_arquivo TEXT NOT NULL,
+    byte_offset BIGINT NOT NULL,                -- Início do próximo registro a importar
+    ultima_linha INTEGER NOT NULL,              -- Última linha já gravada (1 = cabeçalho)
+    concluida_em TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER trigger_importacao_checkpoint_update_timestamp
+    BEFORE UPDATE ON importacao_checkpoint
+    FOR EACH ROW EXECUTE FUNCTION update_timestamp();
+
+COMMIT;
@@ -0,0 +1,48 @@
+-- 005_normalized_name_indexes.sql
+-- Índices únicos sobre os nomes normalizados (LOWER(TRIM(nome)))
+--
+-- O import compara nomes normalizados e faz upsert de cada nível da hierarquia e de
+-- cada lookup com um único INSERT ... ON CONFLICT ... RETURNING; o ON CONFLICT
+-- precisa de um índice único na mesma expressão. Também passam a ser rejeitados
+-- nomes que só diferem em maiúsculas/espaços.
+
+BEGIN;
+
+-- ===== EMPRESA E HIERARQUIA (nome único dentro do nível pai) =====
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_empresa_nome_normalizado
+    ON empresa (LOWER(TRIM(nome_empresa)));
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_diretoria_nome_normalizado
+    ON diretoria (id_empresa, LOWER(TRIM(nome_diretoria)));
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_gerencia_nome_normalizado
+    ON gerencia (id_diretoria, LOWER(TRIM(nome_gerencia)));
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_coordenacao_nome_normalizado
+    ON coordenacao (id_gerencia, LOWER(TRIM(nome_coordenacao)));
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_area_nome_normalizado
+    ON area_detalhe (id_coordenacao, LOWER(TRIM(nome_area_detalhe)));
+
+-- ===== LOOKUPS =====
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_cargo_nome_normalizado
+    ON cargo (LOWER(TRIM(nome_cargo)));
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_genero_nome_normalizado
+    ON genero_catgo (LOWER(TRIM(nome_genero)));
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_geracao_nome_normalizado
+    ON geracao_catgo (LOWER(TRIM(nome_geracao)));
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tempo_empresa_nome_normalizado
+    ON tempo_empresa_catgo (LOWER(TRIM(nome_tempo_empresa)));
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_localidade_nome_normalizado
+    ON localidade (LOWER(TRIM(nome_localidade)));
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_dimensao_nome_normalizado
+    ON dimensao_avaliacao (LOWER(TRIM(nome_dimensao)));
+
+COMMIT;
@@ -0,0 +1,14 @@
+-- 006_avaliacao_funcionario_data.sql
+-- Uma avaliação por funcionário e data de resposta
+--
+-- A importação delta (scripts/import_csv.py --delta) acrescenta só as avaliações de
+-- uma nova onda que ainda não estão no banco, com INSERT ... ON CONFLICT
+-- (id_funcionario, data_avaliacao) DO NOTHING. O índice inclui a chave de partição,
+-- então vale para a tabela particionada e é criado em cada partição.
+
+BEGIN;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_avaliacao_funcionario_data
+    ON avaliacao (id_funcionario, data_avaliacao);
+
+COMMIT;
@@ -0,0 +1,77 @@
+-- 007_notify_avaliacoes.sql
+-- Deltas das métricas a cada carga de respostas (LISTEN/NOTIFY)
+--
+-- Cada INSERT em resposta_dimensao (o import grava em páginas de até 1000 linhas)
+-- publica no canal avaliacoes_delta um NOTIFY por empresa com o que a página
+-- acrescentou: contagens do eNPS e soma/total de respostas por dimensão, só de
+-- funcionários ativos (mesmo recorte das análises). As notificações são entregues
+-- no commit; cargas desfeitas não notificam. O stream SSE da API
+-- (/api/v1/analytics/stream) repassa os deltas aos dashboards abertos.
+--
+-- O trigger é por comando (tabela de transição), não por linha: uma consulta e um
+-- NOTIFY por página e empresa. statement_timestamp() no payload evita que o
+-- Postgres junte deltas idênticos de páginas diferentes da mesma transação.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION notificar_respostas_avaliacao()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_notificacoes INTEGER;
+BEGIN
+    WITH respostas AS (
+        SELECT d.id_empresa, n.id_avaliacao, n.valor_resposta, da.nome_dimensao, da.ordem_exibicao,
+               da.nome_dimensao IN ('Expectativa de Permanência (eNPS)', 'Expectativa de Permanência') AS enps
+        FROM novas_respostas n
+        JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = n.id_dimensao_avaliacao
+        JOIN avaliacao av ON av.id_avaliacao = n.id_avaliacao AND av.data_avaliacao = n.data_avaliacao
+        JOIN funcionario f ON f.id_funcionario = av.id_funcionario
+        JOIN area_detalhe ad ON ad.id_area_detalhe = f.id_area_detalhe
+        JOIN coordenacao co ON co.id_coordenacao = ad.id_coordenacao
+        JOIN gerencia g ON g.id_gerencia = co.id_gerencia
+        JOIN diretoria d ON d.id_diretoria = g.id_diretoria
+        WHERE f.ativo = true AND n.valor_resposta IS NOT NULL
+    ),
+    por_dimensao AS (
+        SELECT id_empresa,
+               json_agg(json_build_object(
+                   'dimensao', nome_dimensao, 'soma', soma, 'total_respostas', total_respostas
+               ) ORDER BY ordem_exibicao) AS dimensoes
+        FROM (
+            SELECT id_empresa, nome_dimensao, ordem_exibicao,
+                   SUM(valor_resposta) AS soma, COUNT(*) AS total_respostas
+            FROM respostas
+            GROUP BY id_empresa, nome_dimensao, ordem_exibicao
+        ) totais
+        GROUP BY id_empresa
+    ),
+    por_empresa AS (
+        SELECT id_empresa,
+               COUNT(DISTINCT id_avaliacao) AS avaliacoes,
+               COUNT(*) FILTER (WHERE enps AND valor_resposta >= 6) AS promotores,
+               COUNT(*) FILTER (WHERE enps AND valor_resposta = 5) AS neutros,
+               COUNT(*) FILTER (WHERE enps AND valor_resposta <= 4) AS detratores
+        FROM respostas
+        GROUP BY id_empresa
+    )
+    SELECT COUNT(pg_notify('avaliacoes_delta', json_build_object(
+        'empresa_id', e.id_empresa,
+        'avaliacoes', e.avaliacoes,
+        'enps', json_build_object('promotores', e.promotores, 'neutros', e.neutros, 'detratores', e.detratores),
+        'dimensoes', pd.dimensoes,
+        'em', statement_timestamp()
+    )::text))
+    INTO v_notificacoes
+    FROM por_empresa e
+    JOIN por_dimensao pd USING (id_empresa);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_notificar_respostas
+    AFTER INSERT ON resposta_dimensao
+    REFERENCING NEW TABLE AS novas_respostas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_respostas_avaliacao();
+
+COMMIT;
@@ -0,0 +1,79 @@
+-- 008_versao_dados.sql
+-- Versão dos dados da listagem de funcionários
+--
+-- O índice em memória da listagem (FUNCIONARIO_INDEX_ENABLED) e o cache de totais são
+-- invalidados quando funcionários, avaliações ou a hierarquia e os nomes usados na
+-- ordenação mudam. A versão é um contador de uma linha (SELECT versao FROM
+-- versao_dados): cada transação que escreve nessas tabelas soma 1, uma única vez e no
+-- commit.
+--
+-- Os triggers por comando registram a transação em versao_dados_pendente (uma linha
+-- por transação, marcada num parâmetro local), e um constraint trigger adiado
+-- (DEFERRABLE INITIALLY DEFERRED) incrementa o contador ao confirmar. Assim a linha
+-- do contador fica bloqueada só durante o commit: um UPDATE direto no trigger de
+-- comando seguraria o lock até o fim da transação e serializaria as conexões de
+-- escrita da importação paralela. Uma sequência (nextval) não serve: avança antes do
+-- commit, e um índice carregado nesse intervalo ficaria com a versão nova e os dados
+-- antigos. Transações desfeitas (inteiras ou até um savepoint) não mudam a versão.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS versao_dados (
+    id_versao_dados SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id_versao_dados = 1),
+    versao BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO versao_dados (id_versao_dados) VALUES (1) ON CONFLICT DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS versao_dados_pendente (
+    id_versao_dados_pendente BIGSERIAL PRIMARY KEY
+);
+
+-- Trigger por comando: registra a transação uma vez (o parâmetro local volta ao
+-- valor anterior no fim da transação ou num savepoint desfeito, junto com o INSERT)
+CREATE OR REPLACE FUNCTION registrar_versao_dados()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('versao_dados.registrada', true) IS DISTINCT FROM 'on' THEN
+        PERFORM set_config('versao_dados.registrada', 'on', true);
+        INSERT INTO versao_dados_pendente DEFAULT VALUES;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Constraint trigger adiado: executado no commit da transação registrada
+CREATE OR REPLACE FUNCTION confirmar_versao_dados()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM versao_dados_pendente WHERE id_versao_dados_pendente = NEW.id_versao_dados_pendente;
+    UPDATE versao_dados SET versao = versao + 1, updated_at = CURRENT_TIMESTAMP WHERE id_versao_dados = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE CONSTRAINT TRIGGER trigger_confirmar_versao_dados
+    AFTER INSERT ON versao_dados_pendente
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION confirmar_versao_dados();
+
+DO $$
+DECLARE
+    v_tabela TEXT;
+BEGIN
+    FOREACH v_tabela IN ARRAY ARRAY[
+        'funcionario', 'avaliacao', 'empresa', 'diretoria', 'gerencia', 'coordenacao',
+        'area_detalhe', 'cargo', 'localidade', 'tempo_empresa_catgo'
+    ] LOOP
+        EXECUTE format(
+            'CREATE TRIGGER trigger_versao_dados_%1$s
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %1$I
+                FOR EACH STATEMENT EXECUTE FUNCTION registrar_versao_dados()',
+            v_tabela
+        );
+    END LOOP;
+END;
+$$;
+
+COMMIT;
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Benchmark do armazenamento compacto de respostas (migration 003_compact_scores.sql).
+Compara tamanho em disco e tempo de consulta entre resposta_dimensao (normalizado)
+e avaliacao.valores_dimensao + comentario_dimensao (compacto).
+
+Uso: python scripts/benchmark_compact_scores.py [escala] [repeticoes]
+
+Com escala > 1 as avaliações existentes são replicadas dentro de uma transação
+que é desfeita ao final (ROLLBACK): o banco não é alterado.
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import psycopg2
+
+
+# Consultas equivalentes: (descrição, normalizada, compacta)
+CONSULTAS = [
+    (
+        "Score médio por dimensão",
+        """
+            SELECT da.nome_dimensao, ROUND(AVG(rd.valor_resposta), 2), COUNT(rd.id_resposta_dimensao)
+            FROM resposta_dimensao rd
+            JOIN avaliacao av ON av.id_avaliacao = rd.id_avaliacao AND av.data_avaliacao = rd.data_avaliacao
+            JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
+            JOIN funcionario f ON f.id_funcionario = av.id_funcionario
+            WHERE f.ativo = true
+            GROUP BY da.nome_dimensao
+        """,
+        """
+            SELECT da.nome_dimensao, ROUND(AVG(rv.valor_resposta), 2), COUNT(rv.valor_resposta)
+            FROM avaliacao av
+            CROSS JOIN LATERAL unnest(av.valores_dimensao) WITH ORDINALITY AS rv(valor_resposta, posicao)
+            JOIN dimensao_avaliacao da ON da.posicao = rv.posicao
+            JOIN funcionario f ON f.id_funcionario = av.id_funcionario
+            WHERE f.ativo = true
+            AND rv.valor_resposta IS NOT NULL
+            GROUP BY da.nome_dimensao
+        """,
+    ),
+    (
+        "Score médio por funcionário",
+        """
+            SELECT av.id_funcionario,
+                   AVG((r1.valor_resposta + r2.valor_resposta + r3.valor_resposta + r4.valor_resposta +
+                        r5.valor_resposta + r6.valor_resposta + r7.valor_resposta) / 7.0),
+                   AVG(r7.valor_resposta)
+            FROM avaliacao av
+            JOIN resposta_dimensao r1 ON r1.id_avaliacao = av.id_avaliacao AND r1.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE posicao = 1)
+            JOIN resposta_dimensao r2 ON r2.id_avaliacao = av.id_avaliacao AND r2.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE posicao = 2)
+            JOIN resposta_dimensao r3 ON r3.id_avaliacao = av.id_avaliacao AND r3.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE posicao = 3)
+            JOIN resposta_dimensao r4 ON r4.id_avaliacao = av.id_avaliacao AND r4.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE posicao = 4)
+            JOIN resposta_dimensao r5 ON r5.id_avaliacao = av.id_avaliacao AND r5.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE posicao = 5)
+            JOIN resposta_dimensao r6 ON r6.id_avaliacao = av.id_avaliacao AND r6.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE posicao = 6)
+            JOIN resposta_dimensao r7 ON r7.id_avaliacao = av.id_avaliacao AND r7.id_dimensao_avaliacao = (SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE posicao = 7)
+            GROUP BY av.id_funcionario
+        """,
+        """
+            SELECT av.id_funcionario,
+                   AVG((av.valores_dimensao[1] + av.valores_dimensao[2] + av.valores_dimensao[3] +
+                        av.valores_dimensao[4] + av.valores_dimensao[5] + av.valores_dimensao[6] +
+                        av.valores_dimensao[7]) / 7.0),
+                   AVG(av.valores_dimensao[7])
+            FROM avaliacao av
+            WHERE cardinality(av.valores_dimensao) >= 7
+            AND array_position(av.valores_dimensao[1:7], NULL) IS NULL
+            GROUP BY av.id_funcionario
+        """,
+    ),
+    (
+        "Distribuição eNPS",
+        """
+            SELECT COUNT(CASE WHEN rd.valor_resposta <= 4 THEN 1 END),
+                   COUNT(CASE WHEN rd.valor_resposta = 5 THEN 1 END),
+                   COUNT(CASE WHEN rd.valor_resposta >= 6 THEN 1 END)
+            FROM resposta_dimensao rd
+            JOIN dimensao_avaliacao da ON da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao
+            WHERE da.nome_dimensao = 'Expectativa de Permanência'
+        """,
+        """
+            SELECT COUNT(CASE WHEN av.valores_dimensao[da.posicao] <= 4 THEN 1 END),
+                   COUNT(CASE WHEN av.valores_dimensao[da.posicao] = 5 THEN 1 END),
+                   COUNT(CASE WHEN av.valores_dimensao[da.posicao] >= 6 THEN 1 END)
+            FROM avaliacao av
+            CROSS JOIN dimensao_avaliacao da
+            WHERE da.nome_dimensao = 'Expectativa de Permanência'
+        """,
+    ),
+]
+
+TAMANHO_NORMALIZADO = """
+    SELECT COALESCE(SUM(pg_total_relation_size(inhrelid)), 0)
+    FROM pg_inherits
+    WHERE inhparent = 'resposta_dimensao'::regclass
+"""
+
+TAMANHO_COMPACTO = """
+    SELECT
+        (SELECT COALESCE(SUM(pg_column_size(valores_dimensao)), 0) FROM avaliacao)
+        + (SELECT COALESCE(SUM(pg_total_relation_size(inhrelid)), 0)
+           FROM pg_inherits WHERE inhparent = 'comentario_dimensao'::regclass)
+"""
+
+
+def get_connection():
+    """Cria conexão com o banco de dados"""
+    return psycopg2.connect(
+        host=os.getenv("DB_HOST", "db"),
+        port=os.getenv("DB_PORT", "5432"),
+        database=os.getenv("DB_NAME", "tech_db"),
+        user=os.getenv("DB_USER", "tech_user"),
+        password=os.getenv("DB_PASSWORD", "tech_password"),
+    )
+
+
+def replicar_avaliacoes(cursor, escala):
+    """Replica as avaliações existentes (escala - 1) vezes, sem disparar triggers"""
+    # As cópias já trazem valores_dimensao/comentario_dimensao prontos
+    cursor.execute("SET LOCAL session_replication_role = replica")
+    cursor.execute(
+        """
+        CREATE TEMP TABLE copia_avaliacao ON COMMIT DROP AS
+        SELECT av.id_avaliacao AS id_origem, av.data_avaliacao, gen_random_uuid() AS id_avaliacao
+        FROM avaliacao av
+        CROSS JOIN generate_series(1, %s)
+    """,
+        (escala - 1,),
+    )
+    cursor.execute("""
+        INSERT INTO avaliacao (
+            id_avaliacao, id_funcionario, data_avaliacao, periodo_avaliacao, comentario_geral, valores_dimensao
+        )
+        SELECT c.id_avaliacao, av.id_funcionario, av.data_avaliacao, av.periodo_avaliacao,
+               av.comentario_geral, av.valores_dimensao
+        FROM copia_avaliacao c
+        JOIN avaliacao av ON av.id_avaliacao = c.id_origem AND av.data_avaliacao = c.data_avaliacao
+    """)
+    cursor.execute("""
+        INSERT INTO resposta_dimensao (id_avaliacao, data_avaliacao, id_dimensao_avaliacao, valor_resposta, comentario)
+        SELECT c.id_avaliacao, rd.data_avaliacao, rd.id_dimensao_avaliacao, rd.valor_resposta, rd.comentario
+        FROM copia_avaliacao c
+        JOIN resposta_dimensao rd ON rd.id_avaliacao = c.id_origem AND rd.data_avaliacao = c.data_avaliacao
+    """)
+    cursor.execute("""
+        INSERT INTO comentario_dimensao (id_avaliacao, data_avaliacao, posicao, comentario)
+        SELECT c.id_avaliacao, cd.data_avaliacao, cd.posicao, cd.comentario
+        FROM copia_avaliacao c
+        JOIN comentario_dimensao cd ON cd.id_avaliacao = c.id_origem AND cd.data_avaliacao = c.data_avaliacao
+    """)
+    cursor.execute("ANALYZE avaliacao, resposta_dimensao, comentario_dimensao")
+
+
+def medir_consulta(cursor, query, repeticoes):
+    """Retorna a mediana do tempo de execução da consulta em ms"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        cursor.execute(query)
+        cursor.fetchall()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def formatar_bytes(valor):
+    """Formata bytes em kB/MB"""
+    if valor >= 1024 * 1024:
+        return f"{valor / (1024 * 1024):.1f} MB"
+    return f"{valor / 1024:.1f} kB"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark do armazenamento compacto de respostas (migration 003_compact_scores.sql)."
+    )
+    parser.add_argument("escala", type=int, nargs="?", default=1, help="Multiplicador do volume de avaliações")
+    parser.add_argument("repeticoes", type=int, nargs="?", default=20, help="Repetições de cada consulta")
+    args = parser.parse_args()
+    escala = args.escala
+    repeticoes = args.repeticoes
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        if escala > 1:
+            print(f"🔄 Replicando avaliações (escala {escala}x)...")
+            replicar_avaliacoes(cursor, escala)
+
+        cursor.execute("SELECT COUNT(*) FROM avaliacao")
+        total_avaliacoes = cursor.fetchone()[0]
+        cursor.execute(TAMANHO_NORMALIZADO)
+        tamanho_normalizado = cursor.fetchone()[0]
+        cursor.execute(TAMANHO_COMPACTO)
+        tamanho_compacto = cursor.fetchone()[0]
+
+        print(f"\n📊 Avaliações: {total_avaliacoes}")
+        print("\n💾 Tamanho em disco")
+        print(f"   - resposta_dimensao (tabela + índices): {formatar_bytes(tamanho_normalizado)}")
+        print(f"   - valores_dimensao + comentario_dimensao: {formatar_bytes(tamanho_compacto)}")
+
+        print(f"\n⏱️  Tempo de consulta (mediana de {repeticoes} execuções)")
+        for descricao, normalizada, compacta in CONSULTAS:
+            tempo_normalizado = medir_consulta(cursor, normalizada, repeticoes)
+            tempo_compacto = medir_consulta(cursor, compacta, repeticoes)
+            print(f"   - {descricao}: {tempo_normalizado:.1f} ms -> {tempo_compacto:.1f} ms")
+    finally:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark das facetas da listagem de funcionários (GET /funcionarios/facets).
+Compara a consulta única com GROUPING SETS (FuncionarioRepository.query_facetas)
+com uma consulta GROUP BY por faceta, e mede as facetas com filtros aplicados.
+
+Uso: python scripts/benchmark_facetas.py [funcionarios] [repeticoes]
+
+Os funcionários existentes (e suas avaliações) são replicados até o total pedido
+(padrão 1.000.000) dentro de uma transação desfeita ao final (ROLLBACK): o banco
+não é alterado.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import psycopg2
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.repositories.funcionario_repository import FACETAS, SCORES_AVALIACAO, FuncionarioRepository
+
+
+# Uma consulta por faceta, como seria sem GROUPING SETS (cada uma agrega os scores de novo)
+POR_FACETA = """
+    SELECT {coluna} AS id, COUNT(*)
+    FROM funcionario f
+    LEFT JOIN (
+        {scores}
+    ) scores ON scores.id_funcionario = f.id_funcionario
+    WHERE f.ativo = true
+    GROUP BY 1
+"""
+
+
+def get_connection():
+    """Cria conexão com o banco de dados"""
+    return psycopg2.connect(
+        host=os.getenv("DB_HOST", "db"),
+        port=os.getenv("DB_PORT", "5432"),
+        database=os.getenv("DB_NAME", "tech_db"),
+        user=os.getenv("DB_USER", "tech_user"),
+        password=os.getenv("DB_PASSWORD", "tech_password"),
+    )
+
+
+def replicar_funcionarios(cursor, total):
+    """Replica funcionários e avaliações até `total` funcionários, sem disparar triggers"""
+    cursor.execute("SET LOCAL session_replication_role = replica")
+    cursor.execute("SELECT COUNT(*) FROM funcionario")
+    existentes = cursor.fetchone()[0]
+    copias = -(-total // existentes) - 1
+    # Campos únicos (email, cpf) ficam nulos nas cópias
+    cursor.execute(
+        """
+        CREATE TEMP TABLE copia_funcionario ON COMMIT DROP AS
+        SELECT f.id_funcionario AS id_origem, gen_random_uuid() AS id_funcionario
+        FROM funcionario f
+        CROSS JOIN generate_series(1, %s)
+        LIMIT %s
+    """,
+        (copias, total - existentes),
+    )
+    cursor.execute("""
+        INSERT INTO funcionario (
+            id_funcionario, nome_funcionario, id_area_detalhe, id_cargo, id_genero_catgo, id_geracao_catgo,
+            id_tempo_empresa_catgo, id_localidade, data_admissao, ativo
+        )
+        SELECT c.id_funcionario, f.nome_funcionario, f.id_area_detalhe, f.id_cargo, f.id_genero_catgo,
+               f.id_geracao_catgo, f.id_tempo_empresa_catgo, f.id_localidade, f.data_admissao, f.ativo
+        FROM copia_funcionario c
+        JOIN funcionario f ON f.id_funcionario = c.id_origem
+    """)
+    cursor.execute("""
+        INSERT INTO avaliacao (id_funcionario, data_avaliacao, periodo_avaliacao, valores_dimensao)
+        SELECT c.id_funcionario, av.data_avaliacao, av.periodo_avaliacao, av.valores_dimensao
+        FROM copia_funcionario c
+        JOIN avaliacao av ON av.id_funcionario = c.id_origem
+    """)
+    cursor.execute("ANALYZE funcionario, avaliacao")
+
+
+def medir_consultas(cursor, consultas, repeticoes):
+    """Retorna a mediana do tempo (ms) de executar todas as consultas (query, params) em sequência"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for query, params in consultas:
+            cursor.execute(query, params)
+            cursor.fetchall()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark das facetas da listagem de funcionários (GET /funcionarios/facets)."
+    )
+    parser.add_argument("funcionarios", type=int, nargs="?", default=1_000_000, help="Funcionários na base sintética")
+    parser.add_argument("repeticoes", type=int, nargs="?", default=5, help="Repetições de cada consulta")
+    args = parser.parse_args()
+    total = args.funcionarios
+    repeticoes = args.repeticoes
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT COUNT(*) FROM funcionario")
+        if cursor.fetchone()[0] < total:
+            print(f"🔄 Replicando funcionários até {total}...")
+            replicar_funcionarios(cursor, total)
+
+        cursor.execute("SELECT COUNT(*) FROM funcionario WHERE ativo = true")
+        print(f"\n📊 Funcionários ativos: {cursor.fetchone()[0]}")
+
+        cursor.execute("SELECT id_area_detalhe, id_cargo FROM funcionario LIMIT 1")
+        area, cargo = cursor.fetchone()
+        cenarios = [
+            ("Sem filtros", {}),
+            ("Área + eNPS", {"areas": [area], "enps_status": "detrator"}),
+            ("Cargo + faixa de score", {"cargos": [cargo], "score_min": 3.0, "score_max": 6.0}),
+        ]
+
+        print(f"\n⏱️  Tempo (mediana de {repeticoes} execuções)")
+        separadas = [(POR_FACETA.format(coluna=coluna, scores=SCORES_AVALIACAO), None) for coluna in FACETAS.values()]
+        tempo_separadas = medir_consultas(cursor, separadas, repeticoes)
+        tempo_unica = medir_consultas(cursor, [FuncionarioRepository.query_facetas(None)], repeticoes)
+        print(f"   - {len(separadas)} consultas GROUP BY: {tempo_separadas:.1f} ms")
+        print(f"   - 1 consulta GROUPING SETS: {tempo_unica:.1f} ms")
+
+        for descricao, filtros in cenarios:
+            tempo = medir_consultas(cursor, [FuncionarioRepository.query_facetas(None, **filtros)], repeticoes)
+            print(f"   - Facetas ({descricao}): {tempo:.1f} ms")
+    finally:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos caminhos de leitura do BaseRepository em um resultado analítico grande.
+Compara tempo e pico de memória (tracemalloc) para ~100 mil linhas de respostas
+por dimensão (avaliações replicadas com generate_series, sem alterar o banco):
+
+- dict copiado: RealDictCursor + dict(row) por linha (caminho anterior)
+- execute_query: RealDictCursor, linhas devolvidas sem cópia
+- execute_rows: tuplas + mapa de colunas compartilhado
+- iter_rows: tuplas em lotes (agregação sem materializar o resultado)
+
+Uso: python scripts/benchmark_fetch.py [linhas] [repeticoes]
+
+Usa o banco das variáveis DB_* (mesma configuração da aplicação).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import DatabaseConnection
+from app.repositories.base_repository import BaseRepository
+
+
+QUERY = """
+    SELECT av.id_funcionario, av.data_avaliacao, rv.posicao, rv.valor_resposta
+    FROM avaliacao av
+    CROSS JOIN generate_series(1, %s) AS r(replica)
+    CROSS JOIN LATERAL unnest(av.valores_dimensao) WITH ORDINALITY AS rv(valor_resposta, posicao)
+    LIMIT %s
+"""
+
+
+def media_por_posicao(linhas, posicao, valor):
+    """Agregação típica de service: média das respostas por dimensão"""
+    somas, contagens = {}, {}
+    for linha in linhas:
+        if linha[valor] is not None:
+            somas[linha[posicao]] = somas.get(linha[posicao], 0) + linha[valor]
+            contagens[linha[posicao]] = contagens.get(linha[posicao], 0) + 1
+    return {p: round(somas[p] / contagens[p], 2) for p in somas}
+
+
+def medir(chamada, repeticoes):
+    """(mediana em ms, pico de memória em MB)"""
+    chamada()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        chamada()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tracemalloc.start()
+    chamada()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(tempos), pico / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark dos caminhos de leitura do BaseRepository em um resultado analítico grande."
+    )
+    parser.add_argument("linhas", type=int, nargs="?", default=100_000, help="Linhas lidas por consulta")
+    parser.add_argument("repeticoes", type=int, nargs="?", default=5, help="Repetições de cada leitura")
+    args = parser.parse_args()
+    total = args.linhas
+    repeticoes = args.repeticoes
+    repo = BaseRepository()
+
+    respostas = repo.execute_scalar("SELECT SUM(cardinality(valores_dimensao)) FROM avaliacao") or 0
+    if not respostas:
+        print("❌ Banco sem avaliações: importe o CSV antes do benchmark")
+        sys.exit(1)
+    params = (-(-total // respostas), total)
+
+    def dict_copiado():
+        return media_por_posicao([dict(row) for row in repo.execute_query(QUERY, params)], "posicao", "valor_resposta")
+
+    def dicts():
+        return media_por_posicao(repo.execute_query(QUERY, params), "posicao", "valor_resposta")
+
+    def tuplas():
+        colunas, linhas = repo.execute_rows(QUERY, params)
+        return media_por_posicao(linhas, colunas["posicao"], colunas["valor_resposta"])
+
+    def gerador():
+        return media_por_posicao(repo.iter_rows(QUERY, params), 2, 3)
+
+    caminhos = [
+        ("dict copiado ", dict_copiado),
+        ("execute_query", dicts),
+        ("execute_rows ", tuplas),
+        ("iter_rows    ", gerador),
+    ]
+    assert len({str(chamada()) for _, chamada in caminhos}) == 1, "caminhos com resultados diferentes"
+
+    print(f"📊 {total} linhas x 4 colunas, {repeticoes} repetições (média por dimensão no Python)")
+    base = None
+    for descricao, chamada in caminhos:
+        tempo, pico = medir(chamada, repeticoes)
+        base = base or (tempo, pico)
+        print(
+            f"   - {descricao}: {tempo:7.1f} ms ({tempo / base[0]:.2f}x), pico {pico:6.1f} MB ({pico / base[1]:.2f}x)"
+        )
+
+    DatabaseConnection.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos prepared statements dos repositórios (DB_PREPARED_STATEMENTS).
+Executa a listagem de funcionários (get_funcionarios_paginado) com e sem
+PREPARE/EXECUTE e compara a latência e o tempo de planejamento do Postgres
+(EXPLAIN ANALYZE da query direta vs EXECUTE do statement preparado).
+
+Uso: python scripts/benchmark_prepared.py [repeticoes]
+
+Usa o banco das variáveis DB_* (mesma configuração da aplicação).
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database.connection import DatabaseConnection
+from app.repositories.base_repository import BaseRepository, PreparedStatements, normalizar_query, prepared_statements
+from app.repositories.funcionario_repository import FuncionarioRepository
+
+
+PLANNING = re.compile(r"Planning Time: ([\d.]+) ms")
+
+
+def capturar_queries(chamada):
+    """Executa a chamada registrando as queries de leitura enviadas"""
+    queries = []
+    original = BaseRepository._execute_read
+
+    def registrar(self, conn, cursor, query, params):
+        queries.append((query, params))
+        return original(self, conn, cursor, query, params)
+
+    BaseRepository._execute_read = registrar
+    try:
+        chamada()
+    finally:
+        BaseRepository._execute_read = original
+    return queries
+
+
+def latencia(chamada, repeticoes):
+    """Mediana em ms de N execuções após aquecimento"""
+    for _ in range(5):
+        chamada()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        chamada()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def planejamento(cursor, sql, params, repeticoes):
+    """Mediana do Planning Time reportado pelo EXPLAIN ANALYZE"""
+    tempos = []
+    for _ in range(repeticoes):
+        cursor.execute(f"EXPLAIN (ANALYZE, TIMING OFF) {sql}", params)
+        plano = "\n".join(next(iter(linha.values())) for linha in cursor.fetchall())
+        tempos.append(float(PLANNING.search(plano).group(1)))
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark dos prepared statements dos repositórios (DB_PREPARED_STATEMENTS)."
+    )
+    parser.add_argument("repeticoes", type=int, nargs="?", default=50, help="Repetições de cada consulta")
+    args = parser.parse_args()
+    repeticoes = args.repeticoes
+    repo = FuncionarioRepository()
+
+    def listar():
+        return repo.get_funcionarios_paginado(None, 1, 20)
+
+    DatabaseConnection.init_pool()
+    print(f"📊 get_funcionarios_paginado (página 1, 20 itens): {repeticoes} repetições")
+
+    resultados = {}
+    for ligado in (False, True):
+        settings.DB_PREPARED_STATEMENTS = ligado
+        prepared_statements.reset_metricas()
+        resultados[ligado] = latencia(listar, repeticoes)
+        descricao = "PREPARE/EXECUTE" if ligado else "query direta   "
+        print(f"   - {descricao}: {resultados[ligado]:.2f} ms por chamada")
+    print(f"   - Ganho: {(1 - resultados[True] / resultados[False]) * 100:.1f}%")
+    print(f"   - Métricas: {prepared_statements.metricas()}")
+
+    print("\n📊 Tempo de planejamento por query (EXPLAIN ANALYZE)")
+    with DatabaseConnection.get_connection() as conn:
+        cursor = conn.cursor()
+        for query, params in capturar_queries(listar):
+            sql, parametros = normalizar_query(query, params or ())
+            nome = PreparedStatements.nome(sql)
+            cursor.execute(f"PREPARE bench_{nome} AS {sql}")
+            marcadores = ", ".join(["%s"] * len(parametros))
+            executar = f"EXECUTE bench_{nome}" + (f" ({marcadores})" if parametros else "")
+            # As primeiras execuções usam plano customizado; depois o plano genérico fica em cache
+            for _ in range(6):
+                cursor.execute(executar, parametros)
+                cursor.fetchall()
+            direta = planejamento(cursor, query, params or (), repeticoes)
+            preparada = planejamento(cursor, executar, parametros, repeticoes)
+            resumo = " ".join(query.split())[:60]
+            print(f"   - {resumo}...: direta {direta:.3f} ms, EXECUTE {preparada:.3f} ms")
+        cursor.execute("DEALLOCATE ALL")
+        cursor.close()
+
+    DatabaseConnection.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark de serialização das respostas grandes (tempo por 10k linhas).
+Compara o caminho padrão do FastAPI (modelos Pydantic + response_model + json)
+com o caminho rápido (linhas do repositório direto para orjson).
+
+Uso: python scripts/benchmark_serializacao.py [linhas] [repeticoes]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.responses import ORJSONResponse
+from app.schemas.schemas import FuncionarioPaginada, FuncionarioResponse
+from app.services.analytics_service import AnalyticsService
+
+
+DIMENSOES = [
+    "Interesse no Cargo",
+    "Contribuição",
+    "Aprendizado e Desenvolvimento",
+    "Feedback",
+    "Interação com Gestor",
+    "Clareza sobre Possibilidades de Carreira",
+    "Expectativa de Permanência",
+]
+
+
+def gerar_funcionarios(linhas, numerico):
+    """Linhas no formato de FuncionarioRepository.get_funcionarios_paginado"""
+    return [
+        {
+            "id": uuid4(),
+            "nome": f"Funcionário {i}",
+            "email": f"func{i}@email.com",
+            "email_corporativo": f"func{i}@empresa.com",
+            "funcao": "profissional",
+            "empresa_id": uuid4(),
+            "area_detalhe_id": uuid4(),
+            "cargo_id": uuid4(),
+            "genero_id": uuid4(),
+            "geracao_id": uuid4(),
+            "tempo_empresa_id": uuid4(),
+            "localidade_id": uuid4(),
+            "ativo": True,
+            "created_at": datetime(2025, 1, 1, 12, 0, 0, 123456),
+            "cargo_nome": "Analista",
+            "area_nome": "Área",
+            "localidade_nome": "Brasília",
+            "genero_nome": "feminino",
+            "geracao_nome": "geração z",
+            "tempo_empresa_nome": "entre 1 e 2 anos",
+            "score_medio_geral": numerico("5.43"),
+            "expectativa_permanencia": numerico("4.00"),
+        }
+        for i in range(linhas)
+    ]
+
+
+def gerar_areas(linhas, numerico):
+    """Linhas no formato de AnalyticsRepository.get_areas_scores_comparison (uma linha por área e dimensão)"""
+    return [
+        {
+            "id_area_detalhe": uuid4() if i % 7 == 0 else None,
+            "area_nome": f"Área {i // 7}",
+            "nome_coordenacao": "Coordenação",
+            "nome_gerencia": "Gerência",
+            "nome_diretoria": "Diretoria",
+            "dimensao": DIMENSOES[i % 7],
+            "score_medio": numerico("5.43"),
+            "total_respostas": 12,
+            "total_funcionarios": 12,
+        }
+        for i in range(linhas)
+    ]
+
+
+def preencher_ids_area(linhas):
+    """Repete o id da área nas 7 linhas de dimensão"""
+    atual = None
+    for row in linhas:
+        atual = row["id_area_detalhe"] or atual
+        row["id_area_detalhe"] = atual
+    return linhas
+
+
+def medir(func, repeticoes):
+    """Mediana do tempo de execução em ms"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de serialização das respostas grandes (tempo por 10k linhas)."
+    )
+    parser.add_argument("linhas", type=int, nargs="?", default=10000, help="Linhas por resposta")
+    parser.add_argument("repeticoes", type=int, nargs="?", default=10, help="Repetições de cada serialização")
+    args = parser.parse_args()
+    linhas = args.linhas
+    repeticoes = args.repeticoes
+
+    paginada = TypeAdapter(FuncionarioPaginada)
+    funcionarios_decimal = gerar_funcionarios(linhas, Decimal)
+    funcionarios_float = gerar_funcionarios(linhas, float)
+
+    def funcionarios_padrao():
+        # Service valida cada linha; response_model revalida e serializa; JSONResponse usa json.dumps
+        items = [FuncionarioResponse(**row) for row in funcionarios_decimal]
+        resposta = FuncionarioPaginada(items=items, total=linhas, page=1, page_size=linhas, total_pages=1)
+        conteudo = paginada.dump_python(paginada.validate_python(resposta), mode="json")
+        json.dumps(conteudo, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def funcionarios_rapido():
+        conteudo = {"items": funcionarios_float, "total": linhas, "page": 1, "page_size": linhas, "total_pages": 1}
+        ORJSONResponse(conteudo)
+
+    service = AnalyticsService()
+    areas_decimal = preencher_ids_area(gerar_areas(linhas, Decimal))
+    areas_float = preencher_ids_area(gerar_areas(linhas, float))
+
+    def areas(rows):
+        service.repository.get_areas_scores_comparison = lambda *_: rows
+        return service.get_areas_scores_comparison()
+
+    def areas_padrao():
+        # Decimal -> float no service e jsonable_encoder antes do json.dumps
+        conteudo = jsonable_encoder(areas(areas_decimal))
+        json.dumps(conteudo, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def areas_rapido():
+        ORJSONResponse(areas(areas_float))
+
+    print(f"📊 Serialização de {linhas} linhas (mediana de {repeticoes} execuções)")
+    for descricao, padrao, rapido in [
+        ("Funcionários paginados", funcionarios_padrao, funcionarios_rapido),
+        ("Comparação de scores por área", areas_padrao, areas_rapido),
+    ]:
+        tempo_padrao = medir(padrao, repeticoes)
+        tempo_rapido = medir(rapido, repeticoes)
+        print(f"   - {descricao}: {tempo_padrao:.1f} ms -> {tempo_rapido:.1f} ms ({tempo_padrao / tempo_rapido:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
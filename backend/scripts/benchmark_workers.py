@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark de throughput do servidor por número de workers (modo produção).
+Sobe o uvicorn com 1, 2, 4 e 8 workers (cada um com seu pool, dimensionado por
+WEB_CONCURRENCY) e mede requisições/s e latência com clientes HTTP concorrentes.
+
+Uso: python scripts/benchmark_workers.py [caminho] [duracao_s] [conexoes] [workers]
+     python scripts/benchmark_workers.py /api/v1/funcionarios 10 16 1,2,4,8
+
+Usa o banco das variáveis DB_* (mesma configuração da aplicação).
+"""
+
+import argparse
+import http.client
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def porta_livre():
+    """Porta TCP livre em localhost"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(workers, porta):
+    """uvicorn em modo produção; retorna o processo quando /health responde"""
+    env = {**os.environ, "ENVIRONMENT": "production", "WEB_CONCURRENCY": str(workers), "LOG_LEVEL": "WARNING"}
+    processo = subprocess.Popen(
+        [
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(porta),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    limite = time.perf_counter() + 30
+    while time.perf_counter() < limite:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", porta, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == HTTPStatus.OK:
+                return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.kill()
+    raise RuntimeError(f"servidor com {workers} workers não respondeu em 30s")
+
+
+def parar_servidor(processo):
+    """SIGTERM: o servidor drena as requisições e fecha os pools"""
+    processo.send_signal(signal.SIGTERM)
+    processo.wait(timeout=60)
+
+
+def cliente(porta, caminho, duracao):
+    """Requisições sequenciais numa conexão keep-alive; retorna as latências em ms"""
+    conn = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+    latencias = []
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        inicio = time.perf_counter()
+        conn.request("GET", caminho)
+        resposta = conn.getresponse()
+        resposta.read()
+        if resposta.status != HTTPStatus.OK:
+            raise RuntimeError(f"{caminho} respondeu {resposta.status}")
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return latencias
+
+
+def medir(porta, caminho, duracao, conexoes):
+    """Carga com N clientes em processos separados; retorna (req/s, p50, p99)"""
+    with ProcessPoolExecutor(max_workers=conexoes) as pool:
+        # Aquecimento: pools, planos e caches de cada worker
+        list(pool.map(cliente, [porta] * conexoes, [caminho] * conexoes, [1] * conexoes))
+        resultados = list(pool.map(cliente, [porta] * conexoes, [caminho] * conexoes, [duracao] * conexoes))
+    latencias = sorted(lat for resultado in resultados for lat in resultado)
+    return len(latencias) / duracao, statistics.median(latencias), latencias[int(len(latencias) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de throughput do servidor por número de workers (modo produção)."
+    )
+    parser.add_argument("caminho", nargs="?", default="/api/v1/funcionarios", help="Endpoint medido")
+    parser.add_argument("duracao", type=float, nargs="?", default=10, help="Segundos de carga por configuração")
+    parser.add_argument("conexoes", type=int, nargs="?", default=16, help="Clientes HTTP concorrentes")
+    parser.add_argument("workers", nargs="?", default="1,2,4,8", help="Números de workers, separados por vírgula")
+    args = parser.parse_args()
+    caminho, duracao, conexoes = args.caminho, args.duracao, args.conexoes
+    workers = [int(n) for n in args.workers.split(",")]
+
+    print(f"📊 GET {caminho}: {conexoes} conexões, {duracao:.0f}s por configuração ({os.cpu_count()} CPUs)")
+    base = None
+    for n in workers:
+        porta = porta_livre()
+        processo = iniciar_servidor(n, porta)
+        try:
+            rps, p50, p99 = medir(porta, caminho, duracao, conexoes)
+        finally:
+            parar_servidor(processo)
+        base = base or rps
+        print(f"   - {n} worker(s): {rps:.0f} req/s ({rps / base:.1f}x), p50 {p50:.1f} ms, p99 {p99:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,140 +2,148 @@
 """
 Entrypoint script for backend container
 Compatible with both Windows and Linux
+
+Startup uses a single psycopg2 connection (no psql subprocesses):
+wait for the database with exponential backoff, apply pending migrations
+in one transaction under an advisory lock (safe with several replicas),
+optionally import the CSV and exec the application server.
 """
+
+import glob
 import os
+import re
 import sys
 import time
-import subprocess
-import glob
+
+import psycopg2
+
+
+START = time.perf_counter()
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "database", "migrations")
+
+# BEGIN;/COMMIT; of each file: all pending migrations run in a single transaction
+TRANSACTION_CONTROL = re.compile(r"^\s*(BEGIN|COMMIT)\s*;\s*$", re.IGNORECASE | re.MULTILINE)
+
 
 def wait_for_database():
-    """Wait for PostgreSQL to be ready"""
+    """Connect to PostgreSQL with exponential backoff and return the connection"""
     print("Aguardando banco de dados...")
-    
-    db_host = os.environ.get('DB_HOST', 'postgres')
-    db_user = os.environ.get('DB_USER', 'tech_user')
-    db_password = os.environ.get('DB_PASSWORD', 'tech_password')
-    db_name = os.environ.get('DB_NAME', 'tech_playground')
-    
-    env = os.environ.copy()
-    env['PGPASSWORD'] = db_password
-    
-    cmd = f'psql -h {db_host} -U {db_user} -d {db_name} -c "SELECT 1"'
-    
+
+    timeout = float(os.environ.get("DB_WAIT_TIMEOUT", "60"))
+    deadline = time.perf_counter() + timeout
+    delay = 0.1
+
     while True:
-        result = subprocess.run(
-            cmd,
-            shell=True,
-            env=env,
-            capture_output=True,
-            text=True
-        )
-        if result.returncode == 0:
+        try:
+            conn = psycopg2.connect(
+                host=os.environ.get("DB_HOST", "postgres"),
+                port=os.environ.get("DB_PORT", "5432"),
+                user=os.environ.get("DB_USER", "tech_user"),
+                password=os.environ.get("DB_PASSWORD", "tech_password"),
+                dbname=os.environ.get("DB_NAME", "tech_playground"),
+                connect_timeout=5,
+            )
             break
-        time.sleep(1)
-    
+        except psycopg2.OperationalError as e:
+            if time.perf_counter() + delay > deadline:
+                raise RuntimeError(f"banco de dados indisponível após {timeout:.0f}s") from e
+            time.sleep(delay)
+            delay = min(delay * 2, 2.0)
+
     print("Banco de dados disponível!")
+    return conn
+
 
-def create_migration_table():
-    """Create migration history table"""
-    print("Criando tabela de controle de migrations...")
-    
-    db_host = os.environ.get('DB_HOST', 'postgres')
-    db_user = os.environ.get('DB_USER', 'tech_user')
-    db_password = os.environ.get('DB_PASSWORD', 'tech_password')
-    db_name = os.environ.get('DB_NAME', 'tech_playground')
-    
-    env = os.environ.copy()
-    env['PGPASSWORD'] = db_password
-    
-    sql = """CREATE TABLE IF NOT EXISTS migration_history (
-        id SERIAL PRIMARY KEY,
-        filename VARCHAR(255) UNIQUE NOT NULL,
-        executed_at TIMESTAMP DEFAULT NOW()
-    )"""
-    
-    cmd = f'psql -h {db_host} -U {db_user} -d {db_name} -c "{sql}"'
-    
-    subprocess.run(cmd, shell=True, env=env, check=True, capture_output=True)
-
-def run_migrations():
-    """Execute SQL migrations"""
+def run_migrations(conn):
+    """Execute pending SQL migrations in one transaction, serialized by an advisory lock"""
     print("Executando migrações...")
-    
-    db_host = os.environ.get('DB_HOST', 'postgres')
-    db_user = os.environ.get('DB_USER', 'tech_user')
-    db_password = os.environ.get('DB_PASSWORD', 'tech_password')
-    db_name = os.environ.get('DB_NAME', 'tech_playground')
-    
-    env = os.environ.copy()
-    env['PGPASSWORD'] = db_password
-    
-    migrations_dir = "/app/database/migrations"
-    
-    if not os.path.isdir(migrations_dir):
+
+    if not os.path.isdir(MIGRATIONS_DIR):
         print("⚠️  Diretório de migrations não encontrado")
         return
-    
-    migration_files = sorted(glob.glob(f"{migrations_dir}/*.sql"))
-    
-    for migration_file in migration_files:
-        filename = os.path.basename(migration_file)
-        
-        # Check if migration was already executed
-        check_cmd = f"psql -h {db_host} -U {db_user} -d {db_name} -t -c \"SELECT COUNT(*) FROM migration_history WHERE filename='{filename}'\""
-        result = subprocess.run(check_cmd, shell=True, env=env, capture_output=True, text=True)
-        
-        already_run = int(result.stdout.strip())
-        
-        if already_run == 0:
+
+    migration_files = sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql")))
+
+    with conn, conn.cursor() as cursor:
+        # Other replicas wait here and find the migrations already registered
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext('migration_history'))")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS migration_history (
+                id SERIAL PRIMARY KEY,
+                filename VARCHAR(255) UNIQUE NOT NULL,
+                executed_at TIMESTAMP DEFAULT NOW()
+            )
+        """)
+        cursor.execute("SELECT filename FROM migration_history")
+        executed = {row[0] for row in cursor.fetchall()}
+
+        pending = [f for f in migration_files if os.path.basename(f) not in executed]
+        for migration_file in pending:
+            filename = os.path.basename(migration_file)
             print(f"▶️  Executando {filename}...")
-            
-            # Execute migration
-            exec_cmd = f'psql -h {db_host} -U {db_user} -d {db_name} -f {migration_file}'
-            subprocess.run(exec_cmd, shell=True, env=env, check=True)
-            
-            # Register migration
-            register_cmd = f"psql -h {db_host} -U {db_user} -d {db_name} -c \"INSERT INTO migration_history (filename) VALUES ('{filename}')\""
-            subprocess.run(register_cmd, shell=True, env=env, capture_output=True)
-            
+
+            with open(migration_file, encoding="utf-8") as f:
+                cursor.execute(TRANSACTION_CONTROL.sub("", f.read()))
+            cursor.execute("INSERT INTO migration_history (filename) VALUES (%s)", (filename,))
+
             print(f"✅ {filename} concluída")
-        else:
-            print(f"⏭️  {filename} já executada, pulando...")
-    
-    print("Migrações concluídas!")
+
+    print(f"Migrações concluídas! ({len(pending)} executadas, {len(migration_files) - len(pending)} já aplicadas)")
+
 
 def import_csv():
     """Import data from CSV if enabled"""
-    import_csv_enabled = os.environ.get('IMPORT_CSV', 'false').lower() == 'true'
+    import_csv_enabled = os.environ.get("IMPORT_CSV", "false").lower() == "true"
     csv_file = "/app/data.csv"
-    
+
     if import_csv_enabled and os.path.isfile(csv_file):
         print("Importando dados do CSV...")
-        subprocess.run(
-            f'python /app/scripts/import_csv.py {csv_file}',
-            shell=True,
-            check=True
-        )
+        # Same interpreter: no second Python startup; the checkpoint skips files already imported
+        from import_csv import import_csv_data
+
+        import_csv_data(csv_file)
         print("Importação do CSV concluída!")
 
+
 def start_application():
-    """Start the FastAPI application"""
+    """Exec the FastAPI application (auto-reload only in development)"""
     print("Iniciando aplicação...")
-    os.execvp("uvicorn", [
-        "uvicorn",
-        "app.main:app",
-        "--host", "0.0.0.0",
-        "--port", "8000",
-        "--reload"
-    ])
+    args = ["uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8000"]
+    if os.environ.get("ENVIRONMENT", "production") == "development":
+        args.append("--reload")
+    else:
+        # Each worker opens its own pool in the lifespan (sized by WEB_CONCURRENCY)
+        args += [
+            "--workers",
+            os.environ.get("WEB_CONCURRENCY", "1"),
+            "--timeout-graceful-shutdown",
+            os.environ.get("SHUTDOWN_TIMEOUT", "30"),
+        ]
+    os.execvp("uvicorn", args)
+
+
+def timed(phases, name, step, *args):
+    """Run a startup step recording its duration"""
+    inicio = time.perf_counter()
+    result = step(*args)
+    phases[name] = time.perf_counter() - inicio
+    return result
+
 
 if __name__ == "__main__":
     try:
-        wait_for_database()
-        create_migration_table()
-        run_migrations()
-        import_csv()
+        phases = {}
+        conn = timed(phases, "banco", wait_for_database)
+        try:
+            timed(phases, "migrações", run_migrations, conn)
+        finally:
+            conn.close()
+        timed(phases, "importação", import_csv)
+
+        detalhes = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in phases.items())
+        print(f"⏱️  Inicialização em {time.perf_counter() - START:.2f}s ({detalhes})")
+        sys.stdout.flush()
         start_application()
     except KeyboardInterrupt:
         print("\n⚠️  Interrompido pelo usuário")
@@ -143,5 +151,6 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"❌ Erro: {e}", file=sys.stderr)
         import traceback
+
         traceback.print_exc()
         sys.exit(1)
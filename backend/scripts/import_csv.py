@@ -2,14 +2,55 @@
 """
 Script para importar dados do CSV de funcionários para o banco de dados.
 Cria empresa, hierarquias, lookups e funcionários com avaliações completas.
+
+A importação é um pipeline:
+  1. Mapa de chaves: empresa, hierarquias, lookups, dimensões e partições (upsert por nível)
+  2. Leitura: a entrada é dividida em blocos de registros (bytes, sem parse)
+  3. Parse: um pool de processos normaliza os blocos e resolve as chaves no mapa compartilhado
+  4. Escrita: N conexões inserem os blocos em lote, concorrentemente
+
+Cada bloco gravado avança o checkpoint (importacao_checkpoint) na mesma transação:
+uma importação interrompida retoma do último bloco gravado.
+
+A entrada pode ser um arquivo .csv, .csv.gz, .csv.zst ou '-' (stdin); encoding e
+delimitador são detectados. Entradas comprimidas e stdin são lidas numa única
+passada (sem pré-processamento) com memória limitada, e o mapa de chaves cresce
+bloco a bloco.
+
+Com --delta, a entrada é uma nova onda da pesquisa: funcionários já cadastrados têm
+área, cargo e tempo de casa atualizados e recebem só as avaliações ainda não
+importadas (funcionário + data da resposta). Cada bloco fica visível no commit.
+
+Com --validate-only, nada é gravado no banco: a entrada é carregada em colunas,
+validada (notas, datas, emails, colunas e hierarquia) e os erros vão para um
+relatório CSV/JSON com o número de cada linha.
+
+Uso: python import_csv.py <caminho_do_csv | -> [--workers N] [--writers N] [--chunk-size N] [--restart] [--delta]
+     python import_csv.py <caminho_do_csv | -> --validate-only [--report erros.json|erros.csv]
 """
 import sys
 import csv
+import io
+import gzip
+import codecs
+import hashlib
+import json
 import os
+import time
+import queue
+import argparse
+import threading
 import psycopg2
+from psycopg2.extras import execute_values
 from uuid import uuid4
-from datetime import datetime
-from collections import defaultdict
+from datetime import date, datetime
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # Mapeamento dos campos do CSV para o schema
 FIELD_MAPPING = {
@@ -43,6 +84,31 @@ DIMENSOES = [
     ('Expectativa de Permanência', 'Expectativa de Permanência')
 ]
 
+# Lookups simples: (tabela, coluna do nome, coluna do CSV)
+LOOKUPS = [
+    ('cargo', 'nome_cargo', 'cargo'),
+    ('genero_catgo', 'nome_genero', 'genero'),
+    ('geracao_catgo', 'nome_geracao', 'geracao'),
+    ('tempo_empresa_catgo', 'nome_tempo_empresa', 'tempo_de_empresa'),
+    ('localidade', 'nome_localidade', 'localidade')
+]
+
+# Níveis da hierarquia abaixo da empresa: (tabela, coluna do nome, coluna do nível pai)
+HIERARQUIA = [
+    ('diretoria', 'nome_diretoria', 'id_empresa'),
+    ('gerencia', 'nome_gerencia', 'id_diretoria'),
+    ('coordenacao', 'nome_coordenacao', 'id_gerencia'),
+    ('area_detalhe', 'nome_area_detalhe', 'id_coordenacao')
+]
+
+# Delimitadores aceitos (detectado pelo que mais aparece no cabeçalho)
+DELIMITADORES = [';', ',', '\t', '|']
+
+# Paralelismo padrão (sobrescrito por --workers/--writers/--chunk-size)
+DEFAULT_WORKERS = int(os.getenv('IMPORT_WORKERS', os.cpu_count() or 1))
+DEFAULT_WRITERS = int(os.getenv('IMPORT_WRITERS', '4'))
+DEFAULT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '1000'))
+
 def get_db_connection():
     """Estabelece conexão com o banco de dados."""
     return psycopg2.connect(
@@ -57,158 +123,55 @@ def normalize_text(text):
     """Normaliza texto para comparação (lowercase, strip)."""
     return text.lower().strip() if text else ''
 
-def get_or_create_lookup(cursor, table, field, value, cache):
-    """Busca ou cria entrada em tabela de lookup."""
-    cache_key = (table, normalize_text(value))
-    
-    if cache_key in cache:
-        return cache[cache_key]
-    
-    normalized = normalize_text(value)
-    
-    # Determinar nome da coluna ID baseado no nome da tabela
-    id_col = f'id_{table}' if not table.endswith('_catgo') else f'id_{table}'
-    
-    # Buscar existente
-    cursor.execute(f"SELECT {id_col} FROM {table} WHERE LOWER(TRIM({field})) = %s", (normalized,))
-    result = cursor.fetchone()
-    
-    if result:
-        cache[cache_key] = result[0]
-        return result[0]
-    
-    # Criar novo
-    new_id = str(uuid4())
-    cursor.execute(f"INSERT INTO {table} ({id_col}, {field}) VALUES (%s, %s) RETURNING {id_col}", (new_id, value))
-    cache[cache_key] = new_id
-    return new_id
-
-def get_or_create_empresa(cursor, nome_empresa, cache):
-    """Busca ou cria empresa."""
-    normalized = normalize_text(nome_empresa)
-    
-    if normalized in cache:
-        return cache[normalized]
-    
-    cursor.execute("SELECT id_empresa FROM empresa WHERE LOWER(TRIM(nome_empresa)) = %s", (normalized,))
-    result = cursor.fetchone()
-    
-    if result:
-        cache[normalized] = result[0]
-        return result[0]
-    
-    # Criar nova empresa
-    empresa_id = str(uuid4())
-    cursor.execute(
-        "INSERT INTO empresa (id_empresa, nome_empresa, ativo) VALUES (%s, %s, true) RETURNING id_empresa",
-        (empresa_id, nome_empresa)
-    )
-    cache[normalized] = empresa_id
-    print(f"  ✓ Empresa criada: {nome_empresa}")
-    return empresa_id
-
-def get_or_create_hierarchy(cursor, empresa_id, diretoria, gerencia, coordenacao, area_detalhe, cache):
-    """Busca ou cria hierarquia completa (diretoria → gerência → coordenação → área)."""
-    # Normalizar valores
-    dir_norm = normalize_text(diretoria)
-    ger_norm = normalize_text(gerencia)
-    coord_norm = normalize_text(coordenacao)
-    area_norm = normalize_text(area_detalhe)
-    
-    cache_key = (empresa_id, dir_norm, ger_norm, coord_norm, area_norm)
-    
-    if cache_key in cache:
-        return cache[cache_key]
-    
-    # 1. Diretoria
-    cursor.execute(
-        "SELECT id_diretoria FROM diretoria WHERE id_empresa = %s AND LOWER(TRIM(nome_diretoria)) = %s",
-        (empresa_id, dir_norm)
-    )
-    result = cursor.fetchone()
-    if result:
-        diretoria_id = result[0]
-    else:
-        diretoria_id = str(uuid4())
-        cursor.execute(
-            "INSERT INTO diretoria (id_diretoria, id_empresa, nome_diretoria) VALUES (%s, %s, %s)",
-            (diretoria_id, empresa_id, diretoria)
-        )
-    
-    # 2. Gerência
-    cursor.execute(
-        "SELECT id_gerencia FROM gerencia WHERE id_diretoria = %s AND LOWER(TRIM(nome_gerencia)) = %s",
-        (diretoria_id, ger_norm)
-    )
-    result = cursor.fetchone()
-    if result:
-        gerencia_id = result[0]
-    else:
-        gerencia_id = str(uuid4())
-        cursor.execute(
-            "INSERT INTO gerencia (id_gerencia, id_diretoria, nome_gerencia) VALUES (%s, %s, %s)",
-            (gerencia_id, diretoria_id, gerencia)
-        )
-    
-    # 3. Coordenação
-    cursor.execute(
-        "SELECT id_coordenacao FROM coordenacao WHERE id_gerencia = %s AND LOWER(TRIM(nome_coordenacao)) = %s",
-        (gerencia_id, coord_norm)
-    )
-    result = cursor.fetchone()
-    if result:
-        coordenacao_id = result[0]
-    else:
-        coordenacao_id = str(uuid4())
-        cursor.execute(
-            "INSERT INTO coordenacao (id_coordenacao, id_gerencia, nome_coordenacao) VALUES (%s, %s, %s)",
-            (coordenacao_id, gerencia_id, coordenacao)
-        )
-    
-    # 4. Área
-    cursor.execute(
-        "SELECT id_area_detalhe FROM area_detalhe WHERE id_coordenacao = %s AND LOWER(TRIM(nome_area_detalhe)) = %s",
-        (coordenacao_id, area_norm)
-    )
-    result = cursor.fetchone()
-    if result:
-        area_id = result[0]
-    else:
-        area_id = str(uuid4())
-        cursor.execute(
-            "INSERT INTO area_detalhe (id_area_detalhe, id_coordenacao, nome_area_detalhe) VALUES (%s, %s, %s)",
-            (area_id, coordenacao_id, area_detalhe)
-        )
-    
-    cache[cache_key] = area_id
-    return area_id
-
-def get_dimensao_id(cursor, nome_dimensao, cache):
-    """Busca ID de dimensão de avaliação (deve existir no banco via migration)."""
-    normalized = normalize_text(nome_dimensao)
-    
-    if normalized in cache:
-        return cache[normalized]
-    
-    cursor.execute(
-        "SELECT id_dimensao_avaliacao FROM dimensao_avaliacao WHERE LOWER(TRIM(nome_dimensao)) = %s",
-        (normalized,)
-    )
-    result = cursor.fetchone()
-    
-    if result:
-        cache[normalized] = result[0]
-        return result[0]
-    
-    # Criar nova dimensão se não existir
-    new_id = str(uuid4())
-    cursor.execute(
-        "INSERT INTO dimensao_avaliacao (id_dimensao_avaliacao, nome_dimensao, ativa) VALUES (%s, %s, true) RETURNING id_dimensao_avaliacao",
-        (new_id, nome_dimensao)
-    )
-    result = cursor.fetchone()
-    cache[normalized] = result[0]
-    return result[0]
+def upsert_names(cursor, table, field, valores, parent_col=None):
+    """
+    Upsert set-based de uma tabela de nomes (lookup ou nível da hierarquia).
+    Uma única instrução: INSERT ... ON CONFLICT DO NOTHING RETURNING para os novos
+    e leitura dos existentes pelo índice único de LOWER(TRIM(nome)), repetida só
+    para as chaves inseridas por uma importação concorrente no meio do caminho.
+    valores: {(id_pai, normalizado): nome} (id_pai é None em tabelas sem nível pai)
+    Retorna {(id_pai, normalizado): id}.
+    """
+    if not valores:
+        return {}
+
+    id_col = f'id_{table}'
+    pai_coluna = f'{parent_col}, ' if parent_col else ''
+    pai_valor = 'id_pai, ' if parent_col else ''
+
+    def mesmo_nome(alias):
+        pai_igual = f'{alias}.{parent_col} = v.id_pai AND ' if parent_col else ''
+        return f'{pai_igual}LOWER(TRIM({alias}.{field})) = LOWER(TRIM(v.nome))'
+
+    # Com importações concorrentes, um nome inserido por outra transação ainda não
+    # commitada é ignorado pelo ON CONFLICT e não aparece no snapshot desta instrução:
+    # as chaves que faltam são buscadas de novo, já com o commit da outra visível
+    ids = {}
+    pendentes = dict(valores)
+    while pendentes:
+        chaves = list(pendentes)
+        cursor.execute(f"""
+            WITH valores (id_pai, chave, nome) AS (
+                SELECT * FROM unnest(%s::uuid[], %s::text[], %s::text[])
+            ),
+            inseridos AS (
+                INSERT INTO {table} ({pai_coluna}{field})
+                SELECT {pai_valor}nome FROM valores
+                ON CONFLICT ({pai_coluna}(LOWER(TRIM({field})))) DO NOTHING
+                RETURNING *
+            )
+            SELECT i.{id_col}, v.id_pai, v.chave FROM inseridos i JOIN valores v ON {mesmo_nome('i')}
+            UNION ALL
+            SELECT t.{id_col}, v.id_pai, v.chave FROM valores v JOIN {table} t ON {mesmo_nome('t')}
+        """, ([pai for pai, _ in chaves], [chave for _, chave in chaves], [pendentes[k] for k in chaves]))
+
+        resolvidos = {(id_pai, chave): id_registro for id_registro, id_pai, chave in cursor.fetchall()}
+        if not resolvidos:
+            raise RuntimeError(f"{table}: não foi possível resolver {len(pendentes)} nome(s), ex.: {next(iter(pendentes.values()))!r}")
+        ids.update(resolvidos)
+        pendentes = {chave: nome for chave, nome in pendentes.items() if chave not in ids}
+
+    return ids
 
 def parse_date(date_str):
     """Converte string de data DD/MM/YYYY para YYYY-MM-DD."""
@@ -220,167 +183,1001 @@ def parse_date(date_str):
     except:
         return None
 
-def import_csv_data(csv_file_path):
-    """Importa dados do CSV para o banco de dados."""
-    print(f"\n🚀 Iniciando importação do CSV: {csv_file_path}")
-    
-    conn = get_db_connection()
+def empresa_nome(row):
+    """Nome da empresa da linha (padrão 'Empresa')."""
+    return row.get('n0_empresa', '').strip() or 'Empresa'
+
+def hierarchy_values(row):
+    """Níveis da hierarquia da linha (diretoria, gerência, coordenação, área)."""
+    return (
+        row.get('n1_diretoria', '').strip(),
+        row.get('n2_gerencia', '').strip(),
+        row.get('n3_coordenacao', '').strip(),
+        row.get('n4_area', '').strip()
+    )
+
+def data_resposta(row):
+    """Data da avaliação (chave de partição); sem data válida usa o dia atual."""
+    return parse_date(row.get('Data da Resposta', '')) or date.today().isoformat()
+
+def is_streaming(csv_source):
+    """Entradas sem releitura barata (stdin, comprimidas) são lidas numa única passada."""
+    return csv_source == '-' or csv_source.endswith(('.gz', '.zst'))
+
+def open_source(csv_source):
+    """
+    Abre a entrada como stream binário: '-' lê do stdin; .gz e .zst são
+    descomprimidos em streaming (nada é gravado em disco).
+    """
+    if csv_source == '-':
+        return sys.stdin.buffer
+    if csv_source.endswith('.gz'):
+        return gzip.open(csv_source, 'rb')
+    if csv_source.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("arquivos .zst exigem o pacote zstandard")
+        # O arquivo é fechado junto com o leitor (closefd)
+        arquivo = open(csv_source, 'rb')  # noqa: SIM115
+        leitor = zstandard.ZstdDecompressor().stream_reader(arquivo, read_across_frames=True)
+        # BufferedReader: leitura por linhas e peek() sobre o conteúdo descomprimido
+        return io.BufferedReader(leitor, buffer_size=1024 * 1024)
+    return open(csv_source, 'rb')
+
+def skip_to(stream, posicao, destino):
+    """Avança o stream até o byte destino (seek quando possível; senão lê e descarta)."""
+    if stream.seekable():
+        stream.seek(destino)
+        return
+    restante = destino - posicao
+    while restante > 0:
+        lido = stream.read(min(restante, 1024 * 1024))
+        if not lido:
+            break
+        restante -= len(lido)
+
+def detect_encoding(amostra):
+    """Encoding da entrada: UTF-8 (com ou sem BOM) ou cp1252 (exportações do Excel)."""
+    if amostra.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        amostra.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A amostra pode terminar no meio de um caractere multibyte
+        if e.start < len(amostra) - 3:
+            return 'cp1252'
+    return 'utf-8'
+
+def read_header(stream):
+    """
+    Lê o cabeçalho e detecta o formato da entrada (encoding e delimitador).
+    Retorna (formato, cabeçalho, tamanho em bytes do cabeçalho = offset do primeiro registro).
+    """
+    encoding = detect_encoding(stream.peek(64 * 1024)[:64 * 1024])
+    primeira = stream.readline()
+    texto = primeira.decode(encoding).rstrip('\r\n')
+    delimitador = max(DELIMITADORES, key=texto.count)
+
+    # O BOM só existe no cabeçalho: os blocos seguintes são UTF-8 simples
+    formato = {'encoding': 'utf-8' if encoding == 'utf-8-sig' else encoding, 'delimiter': delimitador}
+    return formato, next(csv.reader([texto], delimiter=delimitador)), len(primeira)
+
+def file_hash(csv_file_path):
+    """SHA-256 do arquivo: identifica o checkpoint pelo conteúdo, independente do caminho."""
+    sha = hashlib.sha256()
+    with open(csv_file_path, 'rb') as csvfile:
+        for bloco in iter(lambda: csvfile.read(1024 * 1024), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+def load_checkpoint(cursor, hash_arquivo, csv_file_path, offset_inicial, restart=False):
+    """
+    Busca (ou cria) o checkpoint do arquivo.
+    Retorna (byte_offset, ultima_linha, concluida_em).
+    """
+    if restart:
+        cursor.execute("DELETE FROM importacao_checkpoint WHERE hash_arquivo = %s", (hash_arquivo,))
+
+    cursor.execute("""
+        SELECT byte_offset, ultima_linha, concluida_em FROM importacao_checkpoint
+        WHERE hash_arquivo = %s
+    """, (hash_arquivo,))
+    result = cursor.fetchone()
+    if result:
+        return result
+
+    cursor.execute("""
+        INSERT INTO importacao_checkpoint (hash_arquivo, caminho_arquivo, byte_offset, ultima_linha)
+        VALUES (%s, %s, %s, 1)
+    """, (hash_arquivo, csv_file_path, offset_inicial))
+    return offset_inicial, 1, None
+
+def save_checkpoint(cursor, hash_arquivo, byte_offset, ultima_linha):
+    """Avança o checkpoint (chamado na transação do bloco, antes do commit)."""
+    cursor.execute("""
+        UPDATE importacao_checkpoint SET byte_offset = %s, ultima_linha = %s
+        WHERE hash_arquivo = %s
+    """, (byte_offset, ultima_linha, hash_arquivo))
+
+def new_key_map(cursor):
+    """Mapa de chaves vazio, só com as dimensões (criadas pela migration; upsert cobre dimensões novas)."""
+    dimensao_ids = upsert_names(
+        cursor, 'dimensao_avaliacao', 'nome_dimensao',
+        {(None, normalize_text(dimensao_key)): dimensao_key for _, dimensao_key in DIMENSOES}
+    )
+    return {
+        'empresas': {},
+        'hierarquias': {},
+        'lookups': {},
+        'dimensoes': [(dimensao_csv, dimensao_ids[(None, normalize_text(dimensao_key))]) for dimensao_csv, dimensao_key in DIMENSOES],
+        'anos': set()
+    }
+
+def new_key_set():
+    """Valores distintos coletados das linhas (normalizado -> nome original)."""
+    return {
+        'empresas': {},
+        'caminhos': {},  # (empresa, diretoria, gerência, coordenação, área) normalizados -> nomes originais
+        'lookups': {table: {} for table, _, _ in LOOKUPS},
+        'anos': set()
+    }
+
+def collect_keys(row, chaves):
+    """Acumula empresa, caminho da hierarquia, lookups e ano da linha."""
+    nome = empresa_nome(row)
+    chaves['empresas'].setdefault(normalize_text(nome), nome)
+    niveis = hierarchy_values(row)
+    chaves['caminhos'].setdefault((normalize_text(nome), *map(normalize_text, niveis)), niveis)
+    for table, _, coluna in LOOKUPS:
+        valor = row.get(coluna, '').strip()
+        chaves['lookups'][table].setdefault(normalize_text(valor), valor)
+    chaves['anos'].add(int(data_resposta(row)[:4]))
+
+def resolve_keys(cursor, mapa, chaves):
+    """
+    Resolve no banco os valores que ainda não estão no mapa: um upsert por nível,
+    então o número de instruções é constante independente da quantidade de valores.
+    Também garante as partições dos anos novos.
+    """
+    # 1. Empresas
+    empresas = {(None, chave): nome for chave, nome in chaves['empresas'].items() if chave not in mapa['empresas']}
+    ids = upsert_names(cursor, 'empresa', 'nome_empresa', empresas)
+    mapa['empresas'].update({chave: id_empresa for (_, chave), id_empresa in ids.items()})
+
+    # 2. Hierarquia: um upsert por nível, usando os ids do nível anterior como pai
+    caminhos = {
+        caminho: nomes for caminho, nomes in chaves['caminhos'].items()
+        if (mapa['empresas'][caminho[0]], *caminho[1:]) not in mapa['hierarquias']
+    }
+    pais = {caminho: mapa['empresas'][caminho[0]] for caminho in caminhos}
+    for nivel, (table, field, parent_col) in enumerate(HIERARQUIA, start=1):
+        valores = {(pais[caminho], caminho[nivel]): nomes[nivel - 1] for caminho, nomes in caminhos.items()}
+        ids = upsert_names(cursor, table, field, valores, parent_col)
+        pais = {caminho: ids[(pais[caminho], caminho[nivel])] for caminho in caminhos}
+    mapa['hierarquias'].update({(mapa['empresas'][caminho[0]], *caminho[1:]): area_id for caminho, area_id in pais.items()})
+
+    # 3. Lookups
+    for table, field, _ in LOOKUPS:
+        valores = {(None, chave): valor for chave, valor in chaves['lookups'][table].items() if (table, chave) not in mapa['lookups']}
+        ids = upsert_names(cursor, table, field, valores)
+        mapa['lookups'].update({(table, chave): id_lookup for (_, chave), id_lookup in ids.items()})
+
+    # 4. Partições anuais de avaliacao/resposta_dimensao/comentario_dimensao
+    anos = sorted(chaves['anos'] - mapa['anos'])
+    if anos:
+        cursor.execute("SELECT criar_particoes_avaliacao(ano) FROM unnest(%s::int[]) AS ano", (anos,))
+        mapa['anos'].update(anos)
+
+def build_key_map(cursor, csv_file_path, formato, cabecalho, byte_offset):
+    """
+    Pré-processamento de arquivos comuns: uma passada sobre as linhas ainda não
+    importadas (a partir de byte_offset) coleta os valores distintos, resolvidos
+    de uma vez por resolve_keys.
+    O mapa resultante é compartilhado com os workers, que resolvem as chaves em memória.
+    """
+    mapa = new_key_map(cursor)
+    chaves = new_key_set()
+
+    with open(csv_file_path, 'rb') as raw:
+        raw.seek(byte_offset)
+        csvfile = io.TextIOWrapper(raw, encoding=formato['encoding'], newline='')
+        for row in csv.DictReader(csvfile, fieldnames=cabecalho, delimiter=formato['delimiter']):
+            collect_keys(row, chaves)
+
+    resolve_keys(cursor, mapa, chaves)
+    return mapa
+
+def read_chunks(stream, byte_offset, linha_inicial, chunk_size, tempos):
+    """
+    Leitura: divide o stream (posicionado em byte_offset) em blocos de até chunk_size
+    registros, sem parse. Um registro só termina em quebra de linha fora de aspas,
+    então campos multilinha nunca são cortados entre dois blocos.
+    Cada bloco leva sua sequência e o byte/linha onde termina (usados no checkpoint).
+    A memória fica limitada ao bloco atual, qualquer que seja o tamanho da entrada.
+    """
+    seq = 0
+    posicao = byte_offset
+    bloco = []
+    registros = 0
+    entre_aspas = False
+    inicio = time.perf_counter()
+
+    for raw in stream:
+        posicao += len(raw)
+        if not entre_aspas and raw in (b'\n', b'\r\n'):
+            continue  # Linhas vazias são ignoradas pelo csv.DictReader
+        bloco.append(raw)
+        if raw.count(b'"') % 2:
+            entre_aspas = not entre_aspas
+        if entre_aspas:
+            continue
+
+        registros += 1
+        if registros == chunk_size:
+            tempos['leitura'] += time.perf_counter() - inicio
+            yield {'seq': seq, 'linha_inicial': linha_inicial, 'registros': registros, 'byte_fim': posicao, 'dados': b''.join(bloco)}
+            seq += 1
+            linha_inicial += registros
+            bloco = []
+            registros = 0
+            inicio = time.perf_counter()
+
+    tempos['leitura'] += time.perf_counter() - inicio
+    if bloco:
+        yield {'seq': seq, 'linha_inicial': linha_inicial, 'registros': registros, 'byte_fim': posicao, 'dados': b''.join(bloco)}
+
+class CommitOrdenado:
+    """
+    Serializa os commits das conexões de escrita na ordem dos blocos.
+    Os INSERTs continuam concorrentes; só o commit (com o checkpoint) espera a vez,
+    então o checkpoint gravado é sempre um prefixo contíguo do arquivo.
+
+    Dois blocos em voo podem tocar o mesmo funcionário (email repetido, ou o mesmo
+    funcionário em mais de uma onda no modo delta). Se o bloco posterior gravou
+    primeiro, o anterior fica esperando o lock dele, que por sua vez espera a vez do
+    commit. Enquanto aguarda, cada conexão verifica se segura um lock que um bloco
+    anterior espera; nesse caso desfaz a transação e refaz o bloco na sua vez.
+    """
+
+    def __init__(self):
+        self.proximo = 0
+        self.interrompido = False
+        self.gravando = {}  # seq -> pid da conexão que está gravando o bloco
+        self.condicao = threading.Condition()
+
+    def iniciar(self, seq, pid):
+        with self.condicao:
+            self.gravando[seq] = pid
+
+    def aguardar(self, seq, bloqueando=None):
+        """
+        Espera a vez do bloco. bloqueando(pids) informa se a conexão do bloco segura
+        locks esperados por essas conexões; retorna False quando isso acontece.
+        """
+        while True:
+            with self.condicao:
+                if self.condicao.wait_for(lambda: self.proximo == seq, timeout=0.2 if bloqueando else None):
+                    return True
+                anteriores = [pid for s, pid in self.gravando.items() if s < seq]
+            if anteriores and bloqueando(anteriores):
+                return False
+
+    def liberar(self, seq):
+        with self.condicao:
+            self.proximo += 1
+            self.gravando.pop(seq, None)
+            self.condicao.notify_all()
+
+# Estado de cada processo do pool (preenchido uma única vez pelo initializer)
+_worker_state = {}
+
+def init_worker(formato, cabecalho, mapa_chaves):
+    """Recebe o formato, o cabeçalho e o mapa de chaves pré-construído (copiado uma vez por processo)."""
+    _worker_state['formato'] = formato
+    _worker_state['cabecalho'] = cabecalho
+    _worker_state['mapa'] = mapa_chaves
+
+def funcionario_tuple(mapa, base, chave):
+    """Tupla de funcionario com as chaves estrangeiras resolvidas no mapa (KeyError se faltar alguma)."""
+    empresa_id = mapa['empresas'][chave[0]]
+    area_id = mapa['hierarquias'][(empresa_id, *chave[1:5])]
+    lookup_ids = [mapa['lookups'][(table, valor)] for (table, _, _), valor in zip(LOOKUPS, chave[5:], strict=True)]
+    return (*base, area_id, *lookup_ids)
+
+def parse_chunk(chunk):
+    """
+    Parse: normaliza as linhas do bloco e resolve as chaves no mapa compartilhado.
+    Devolve um registro por funcionário com as tuplas prontas para inserção em lote.
+    Linhas com valores fora do mapa (entrada em streaming, sem pré-processamento)
+    voltam com as chaves naturais para o processo principal resolver.
+    """
+    inicio = time.perf_counter()
+    formato = _worker_state['formato']
+    mapa = _worker_state['mapa']
+
+    resultado = {
+        'seq': chunk['seq'],
+        'linha_inicial': chunk['linha_inicial'],
+        'linhas': chunk['registros'],
+        'byte_fim': chunk['byte_fim'],
+        'registros': [],
+        'chaves': None,
+        'anos': set(),
+        'erros': []
+    }
+
+    texto = io.StringIO(chunk['dados'].decode(formato['encoding']), newline='')
+    reader = csv.DictReader(texto, fieldnames=_worker_state['cabecalho'], delimiter=formato['delimiter'])
+
+    for row_num, row in enumerate(reader, start=chunk['linha_inicial']):
+        try:
+            # 1. Chaves naturais (normalizadas): empresa, hierarquia e lookups
+            chave = (
+                normalize_text(empresa_nome(row)),
+                *map(normalize_text, hierarchy_values(row)),
+                *(normalize_text(row.get(coluna, '').strip()) for _, _, coluna in LOOKUPS)
+            )
+
+            # 2. Funcionário
+            email = row.get('email', '').strip()
+            email_corporativo = row.get('email_corporativo', '').strip()
+            base = (str(uuid4()), row.get('nome', '').strip(), email, email_corporativo)
+            try:
+                funcionario = funcionario_tuple(mapa, base, chave)
+            except KeyError:
+                funcionario = None
+                if resultado['chaves'] is None:
+                    resultado['chaves'] = new_key_set()
+                collect_keys(row, resultado['chaves'])
+
+            # 3. Avaliação (data_avaliacao é a chave de partição de avaliacao e resposta_dimensao)
+            data_avaliacao = data_resposta(row)
+            resultado['anos'].add(int(data_avaliacao[:4]))
+            enps_comentario = row.get('[Aberta] eNPS', '').strip() or None
+            avaliacao_id = str(uuid4())
+            avaliacao = (avaliacao_id, base[0], data_avaliacao, enps_comentario)
+
+            # 4. Respostas das dimensões
+            respostas = []
+            for dimensao_csv, dimensao_id in mapa['dimensoes']:
+                valor_str = row.get(dimensao_csv, '').strip()
+                valor = int(valor_str) if valor_str and valor_str.isdigit() else None
+                if valor is None:
+                    continue
+
+                comentario = row.get(f'Comentários - {dimensao_csv}', '').strip() or None
+                if comentario == '-':
+                    comentario = None
+
+                respostas.append((str(uuid4()), avaliacao_id, data_avaliacao, dimensao_id, valor, comentario))
+
+            resultado['registros'].append({
+                'linha': row_num,
+                'email': email,
+                'email_corporativo': email_corporativo,
+                'base': base,
+                'chave': chave,
+                'funcionario': funcionario,
+                'avaliacao': avaliacao,
+                'respostas': respostas
+            })
+
+        except Exception as e:
+            resultado['erros'].append((row_num, str(e)))
+
+    resultado['tempo'] = time.perf_counter() - inicio
+    return resultado
+
+def complete_chunk(cursor, mapa, bloco):
+    """
+    Processo principal, antes da escrita: resolve as chaves que os workers não
+    encontraram no mapa e as partições dos anos do bloco.
+    Emails repetidos são resolvidos na escrita (ON CONFLICT), então a memória não
+    cresce com o tamanho da entrada.
+    """
+    chaves = bloco['chaves'] or new_key_set()
+    chaves['anos'] |= bloco['anos']
+    resolve_keys(cursor, mapa, chaves)
+
+    for registro in bloco['registros']:
+        if registro['funcionario'] is None:
+            registro['funcionario'] = funcionario_tuple(mapa, registro['base'], registro['chave'])
+
+# Posições em funcionario_tuple dos atributos que mudam entre ondas (área, cargo, tempo de casa)
+ATRIBUTOS_DELTA = (4, 5, 8)
+
+def write_chunk(cursor, bloco, delta=False):
+    """
+    Escrita: insere um bloco em lote (uma instrução por tabela).
+    Carga completa: funcionários que já existem no banco (email ou email corporativo)
+    são ignorados pelo ON CONFLICT, junto com suas avaliações e respostas.
+    Delta: funcionários existentes (por email) têm área, cargo e tempo de casa
+    atualizados quando mudaram, e recebem só as avaliações novas, identificadas por
+    funcionário + data da resposta.
+    Retorna as contagens do bloco.
+    """
+    contagem = {'funcionarios': 0, 'atualizados': 0, 'avaliacoes': 0, 'respostas': 0, 'existentes': 0}
+    registros = bloco['registros']
+    if not registros:
+        return contagem
+
+    # 1. Funcionários já cadastrados (delta)
+    cadastrados = {}
+    if delta:
+        cursor.execute("""
+            SELECT email, id_funcionario, id_area_detalhe, id_cargo, id_tempo_empresa_catgo
+            FROM funcionario
+            WHERE email = ANY(%s)
+        """, (list({r['email'] for r in registros}),))
+        cadastrados = {row[0]: (str(row[1]), tuple(str(v) for v in row[2:])) for row in cursor.fetchall()}
+
+    # 2. Funcionários novos
+    novos = [r['funcionario'] for r in registros if r['email'] not in cadastrados]
+    inseridos = []
+    if novos:
+        inseridos = execute_values(cursor, """
+            INSERT INTO funcionario (
+                id_funcionario, nome_funcionario, email, email_corporativo,
+                id_area_detalhe, id_cargo, id_genero_catgo, id_geracao_catgo,
+                id_tempo_empresa_catgo, id_localidade, data_admissao
+            ) VALUES %s
+            ON CONFLICT DO NOTHING
+            RETURNING id_funcionario, email
+        """, novos, template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_DATE)", page_size=1000, fetch=True)
+    contagem['funcionarios'] = len(inseridos)
+
+    if delta:
+        # Avaliações vão para o funcionário do email, novo ou já cadastrado
+        ids = {email: id_funcionario for email, (id_funcionario, _) in cadastrados.items()}
+        ids.update((row[1], str(row[0])) for row in inseridos)
+
+        # 3. Atributos alterados desde a última onda (a última linha do bloco prevalece)
+        alterados = {}
+        for r in registros:
+            if r['email'] in cadastrados:
+                id_funcionario, atuais = cadastrados[r['email']]
+                atributos = tuple(r['funcionario'][i] for i in ATRIBUTOS_DELTA)
+                if atributos != atuais:
+                    alterados[id_funcionario] = atributos
+        if alterados:
+            execute_values(cursor, """
+                UPDATE funcionario f
+                SET id_area_detalhe = v.id_area_detalhe::uuid,
+                    id_cargo = v.id_cargo::uuid,
+                    id_tempo_empresa_catgo = v.id_tempo_empresa_catgo::uuid
+                FROM (VALUES %s) AS v (id_funcionario, id_area_detalhe, id_cargo, id_tempo_empresa_catgo)
+                WHERE f.id_funcionario = v.id_funcionario::uuid
+            """, [(id_funcionario, *atributos) for id_funcionario, atributos in alterados.items()], page_size=1000)
+        contagem['atualizados'] = len(alterados)
+
+        avaliacoes = [(r['avaliacao'][0], ids[r['email']], *r['avaliacao'][2:]) for r in registros if r['email'] in ids]
+    else:
+        ids_inseridos = {str(row[0]) for row in inseridos}
+        avaliacoes = [r['avaliacao'] for r in registros if r['funcionario'][0] in ids_inseridos]
+
+    # 4. Avaliações (no delta, as já importadas numa onda anterior são ignoradas)
+    ids_avaliacoes = set()
+    if avaliacoes:
+        ids_avaliacoes = {str(row[0]) for row in execute_values(cursor, """
+            INSERT INTO avaliacao (id_avaliacao, id_funcionario, data_avaliacao, comentario_geral) VALUES %s
+            ON CONFLICT (id_funcionario, data_avaliacao) DO NOTHING
+            RETURNING id_avaliacao
+        """, avaliacoes, page_size=1000, fetch=True)}
+    contagem['avaliacoes'] = len(ids_avaliacoes)
+    contagem['existentes'] = len(registros) - contagem['avaliacoes']
+
+    # 5. Respostas das avaliações gravadas
+    respostas = [resposta for r in registros if r['avaliacao'][0] in ids_avaliacoes for resposta in r['respostas']]
+    if respostas:
+        execute_values(cursor, """
+            INSERT INTO resposta_dimensao (
+                id_resposta_dimensao, id_avaliacao, data_avaliacao,
+                id_dimensao_avaliacao, valor_resposta, comentario
+            ) VALUES %s
+        """, respostas, page_size=1000)
+    contagem['respostas'] = len(respostas)
+
+    return contagem
+
+def write_rows(cursor, bloco, delta=False):
+    """
+    Escrita linha a linha, depois de uma falha no lote: cada registro grava no seu
+    SAVEPOINT, então só as linhas com erro ficam de fora e o bloco pode avançar o checkpoint.
+    Retorna (contagens, [(linha, erro)]).
+    """
+    contagem = defaultdict(int)
+    erros = []
+    for registro in bloco['registros']:
+        cursor.execute("SAVEPOINT linha")
+        try:
+            parcial = write_chunk(cursor, {'registros': [registro]}, delta)
+        except Exception as e:
+            # Se a conexão caiu, o ROLLBACK TO também falha e a exceção sobe para o bloco
+            cursor.execute("ROLLBACK TO SAVEPOINT linha")
+            erros.append((registro['linha'], str(e).strip()))
+            continue
+        cursor.execute("RELEASE SAVEPOINT linha")
+        for chave, valor in parcial.items():
+            contagem[chave] += valor
+    return dict(contagem), erros
+
+def write_block(conn, cursor, bloco, delta=False):
+    """
+    Grava o bloco em lote; se o lote falhar, refaz linha a linha (write_rows).
+    Retorna (contagens, erros por linha, falha). falha é um erro fora dos dados
+    (conexão, servidor): nada do bloco foi gravado e o checkpoint não pode avançar.
+    """
+    try:
+        return write_chunk(cursor, bloco, delta), [], None
+    except Exception:
+        pass  # Refeito linha a linha abaixo
+    try:
+        conn.rollback()
+        return (*write_rows(cursor, bloco, delta), None)
+    except Exception as e:
+        return {}, [], e
+
+def account_block(stats, bloco, contagem, erros):
+    """Soma as contagens do bloco gravado nas estatísticas (chamado sob o lock)."""
+    for chave, valor in contagem.items():
+        stats[chave] += valor
+    stats['processadas'] += bloco['linhas']
+    for row_num, erro in erros:
+        stats['erros'] += 1
+        print(f"  ❌ Erro na linha {row_num}: {erro}")
+    print(f"  ⏳ Processados {stats['processadas']} funcionários...")
+
+def writer_loop(conn, fila, hash_arquivo, ordem, delta, stats, tempos, lock):
+    """
+    Consome blocos da fila e grava cada um em sua própria transação, junto com o
+    avanço do checkpoint. Erros nos dados descartam só as linhas afetadas (refeitas
+    uma a uma); se a gravação ou o commit falharem de outra forma, a importação é
+    interrompida e o checkpoint fica no último bloco gravado.
+    """
+    cursor = conn.cursor()
+    pid = conn.get_backend_pid()
+
+    def bloqueando(pids):
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM unnest(%s::int[]) AS p(pid) WHERE %s = ANY(pg_blocking_pids(p.pid)))",
+            (pids, pid)
+        )
+        return cursor.fetchone()[0]
+
+    try:
+        while True:
+            bloco = fila.get()
+            if bloco is None:
+                break
+
+            ultima_linha = bloco['linha_inicial'] + bloco['linhas'] - 1
+            inicio = time.perf_counter()
+            ordem.iniciar(bloco['seq'], pid)
+            contagem, erros, falha = write_block(conn, cursor, bloco, delta)
+            tempo = time.perf_counter() - inicio
+
+            # Commit na ordem do arquivo: o checkpoint só avança sobre blocos contíguos
+            if not ordem.aguardar(bloco['seq'], bloqueando if falha is None else None):
+                # Um bloco anterior espera um lock desta transação: libera e refaz na vez do bloco
+                conn.rollback()
+                ordem.aguardar(bloco['seq'])
+                inicio = time.perf_counter()
+                contagem, erros, falha = write_block(conn, cursor, bloco, delta)
+                tempo += time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            try:
+                if falha is not None:
+                    raise falha
+                if ordem.interrompido:
+                    conn.rollback()
+                    continue
+                if hash_arquivo:
+                    save_checkpoint(cursor, hash_arquivo, bloco['byte_fim'], ultima_linha)
+                conn.commit()
+            except Exception as e:
+                ordem.interrompido = True
+                print(f"  ❌ Falha ao gravar o bloco das linhas {bloco['linha_inicial']}-{ultima_linha}: {str(e)}")
+                if not conn.closed:
+                    conn.rollback()
+                continue
+            finally:
+                ordem.liberar(bloco['seq'])
+            tempo += time.perf_counter() - inicio
+
+            with lock:
+                tempos['escrita'] += tempo
+                account_block(stats, bloco, contagem, erros)
+    finally:
+        cursor.close()
+
+def run_pipeline(stream, conn, hash_arquivo, formato, cabecalho, mapa_chaves, byte_offset, linha_inicial, opcoes, stats, tempos):
+    """
+    Leitura → pool de parse → processo principal (chaves novas) → conexões de escrita.
+    Retorna False se a importação foi interrompida por falha de commit.
+    """
+    workers, writers, chunk_size, delta = opcoes
     cursor = conn.cursor()
-    
-    # Caches para evitar lookups repetidos
-    lookup_cache = {}
-    empresa_cache = {}
-    hierarchy_cache = {}
-    dimensao_cache = {}
-    
+
+    # Conexões de escrita abertas antes do pipeline: falha de conexão aborta cedo
+    conexoes = [get_db_connection() for _ in range(writers)]
+    fila = queue.Queue(maxsize=writers * 2)
+    ordem = CommitOrdenado()
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=writer_loop, args=(c, fila, hash_arquivo, ordem, delta, stats, tempos, lock), daemon=True)
+        for c in conexoes
+    ]
+    for thread in threads:
+        thread.start()
+
+    def enviar(future):
+        bloco = future.result()
+        tempos['parse'] += bloco['tempo']
+        for row_num, erro in bloco['erros']:
+            stats['erros'] += 1
+            print(f"  ❌ Erro na linha {row_num}: {erro}")
+
+        inicio = time.perf_counter()
+        complete_chunk(cursor, mapa_chaves, bloco)
+        conn.commit()  # Chaves novas visíveis para as conexões de escrita
+        tempos['mapa'] += time.perf_counter() - inicio
+
+        fila.put(bloco)  # Bloqueia quando a escrita está atrasada (backpressure)
+
+    try:
+        # No máximo 2 blocos em voo por worker
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(formato, cabecalho, mapa_chaves)) as pool:
+            pendentes = deque()
+            for chunk in read_chunks(stream, byte_offset, linha_inicial, chunk_size, tempos):
+                if ordem.interrompido:
+                    break
+                pendentes.append(pool.submit(parse_chunk, chunk))
+                if len(pendentes) >= workers * 2:
+                    enviar(pendentes.popleft())
+            while pendentes:
+                enviar(pendentes.popleft())
+    finally:
+        for _ in threads:
+            fila.put(None)
+        for thread in threads:
+            thread.join()
+        for c in conexoes:
+            c.close()
+        cursor.close()
+
+    return not ordem.interrompido
+
+def print_stats(stats, delta):
+    """Contagens da importação (no delta, atualizados e avaliações já importadas)."""
+    print("   📊 Estatísticas:")
+    print(f"      - Empresas: {stats['empresas']}")
+    print(f"      - Funcionários importados: {stats['funcionarios']}")
+    print(f"      - Avaliações criadas: {stats['avaliacoes']}")
+    print(f"      - Respostas registradas: {stats['respostas']}")
+    if delta:
+        print(f"      - Funcionários atualizados: {stats['atualizados']}")
+        if stats['existentes']:
+            print(f"      - Avaliações já importadas (ignoradas): {stats['existentes']}")
+    elif stats['existentes']:
+        print(f"      - Funcionários já existentes (ignorados): {stats['existentes']}")
+    if stats['erros'] > 0:
+        print(f"      - Erros encontrados: {stats['erros']}")
+
+def import_csv_data(csv_source, workers=DEFAULT_WORKERS, writers=DEFAULT_WRITERS, chunk_size=DEFAULT_CHUNK_SIZE, restart=False, delta=False):
+    """
+    Importa dados do CSV para o banco de dados (pipeline leitura → parse → escrita).
+    csv_source: caminho (.csv, .csv.gz, .csv.zst) ou '-' para stdin.
+    Retoma do checkpoint quando o mesmo arquivo já foi parcialmente importado.
+    delta: atualiza funcionários existentes e acrescenta só as avaliações novas.
+    """
+    streaming = is_streaming(csv_source)
+    print(f"\n🚀 Iniciando importação do CSV: {'stdin' if csv_source == '-' else csv_source}")
+    print(f"   ⚙️  {workers} workers, {writers} conexões de escrita, blocos de {chunk_size} linhas{', modo delta' if delta else ''}")
+
+    inicio_total = time.perf_counter()
+    tempos = {'hash': 0.0, 'mapa': 0.0, 'leitura': 0.0, 'parse': 0.0, 'escrita': 0.0}
+
     stats = {
         'empresas': 0,
         'funcionarios': 0,
         'avaliacoes': 0,
         'respostas': 0,
+        'atualizados': 0,
+        'existentes': 0,
+        'processadas': 0,
         'erros': 0
     }
-    
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    stream = None
+
     try:
-        with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile, delimiter=';')
-            
-            for row_num, row in enumerate(reader, start=2):  # Start at 2 (1 = header)
-                try:
-                    # 1. Empresa
-                    empresa_nome = row.get('n0_empresa', '').strip() or 'Empresa'
-                    empresa_id = get_or_create_empresa(cursor, empresa_nome, empresa_cache)
-                    if empresa_id not in empresa_cache.values():
-                        stats['empresas'] += 1
-                    
-                    # 2. Hierarquia
-                    area_id = get_or_create_hierarchy(
-                        cursor, empresa_id,
-                        row.get('n1_diretoria', '').strip(),
-                        row.get('n2_gerencia', '').strip(),
-                        row.get('n3_coordenacao', '').strip(),
-                        row.get('n4_area', '').strip(),
-                        hierarchy_cache
-                    )
-                    
-                    # 3. Lookups
-                    cargo_id = get_or_create_lookup(cursor, 'cargo', 'nome_cargo', row.get('cargo', '').strip(), lookup_cache)
-                    genero_id = get_or_create_lookup(cursor, 'genero_catgo', 'nome_genero', row.get('genero', '').strip(), lookup_cache)
-                    geracao_id = get_or_create_lookup(cursor, 'geracao_catgo', 'nome_geracao', row.get('geracao', '').strip(), lookup_cache)
-                    tempo_id = get_or_create_lookup(cursor, 'tempo_empresa_catgo', 'nome_tempo_empresa', row.get('tempo_de_empresa', '').strip(), lookup_cache)
-                    localidade_id = get_or_create_lookup(cursor, 'localidade', 'nome_localidade', row.get('localidade', '').strip(), lookup_cache)
-                    
-                    # 4. Funcionário - Verificar se já existe pelo email
-                    email = row.get('email', '').strip()
-                    email_corporativo = row.get('email_corporativo', '').strip()
-                    
-                    cursor.execute("""
-                        SELECT id_funcionario FROM funcionario 
-                        WHERE email = %s OR email_corporativo = %s
-                    """, (email, email_corporativo))
-                    
-                    existing_func = cursor.fetchone()
-                    if existing_func:
-                        funcionario_id = existing_func[0]
-                        print(f"  ⏭️  Funcionário {row.get('nome', '').strip()} já existe, pulando...")
-                        continue  # Pula para o próximo registro
-                    
-                    funcionario_id = str(uuid4())
-                    cursor.execute("""
-                        INSERT INTO funcionario (
-                            id_funcionario, nome_funcionario, email, email_corporativo,
-                            id_area_detalhe, id_cargo, id_genero_catgo, id_geracao_catgo, 
-                            id_tempo_empresa_catgo, id_localidade, data_admissao
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_DATE)
-                    """, (
-                        funcionario_id,
-                        row.get('nome', '').strip(),
-                        email,
-                        email_corporativo,
-                        area_id, cargo_id, genero_id, geracao_id, tempo_id, localidade_id
-                    ))
-                    stats['funcionarios'] += 1
-                    
-                    # 5. Avaliação
-                    data_resposta = parse_date(row.get('Data da Resposta', ''))
-                    enps_value = row.get('eNPS', '').strip()
-                    enps_comentario = row.get('[Aberta] eNPS', '').strip() or None
-                    
-                    avaliacao_id = str(uuid4())
-                    cursor.execute("""
-                        INSERT INTO avaliacao (
-                            id_avaliacao, id_funcionario, data_avaliacao, comentario_geral
-                        ) VALUES (%s, %s, %s, %s)
-                    """, (avaliacao_id, funcionario_id, data_resposta or 'CURRENT_DATE', enps_comentario))
-                    stats['avaliacoes'] += 1
-                    
-                    # 6. Respostas das dimensões
-                    for dimensao_csv, dimensao_key in DIMENSOES:
-                        dimensao_id = get_dimensao_id(cursor, dimensao_key, dimensao_cache)
-                        if not dimensao_id:
-                            continue
-                        
-                        valor_str = row.get(dimensao_csv, '').strip()
-                        valor = int(valor_str) if valor_str and valor_str.isdigit() else None
-                        
-                        comentario_col = f'Comentários - {dimensao_csv}'
-                        comentario = row.get(comentario_col, '').strip() or None
-                        if comentario == '-':
-                            comentario = None
-                        
-                        if valor is not None:
-                            resposta_id = str(uuid4())
-                            cursor.execute("""
-                                INSERT INTO resposta_dimensao (
-                                    id_resposta_dimensao, id_avaliacao, id_dimensao_avaliacao, valor_resposta, comentario
-                                ) VALUES (%s, %s, %s, %s, %s)
-                            """, (resposta_id, avaliacao_id, dimensao_id, valor, comentario))
-                            stats['respostas'] += 1
-                    
-                    # Commit a cada 50 registros
-                    if row_num % 50 == 0:
-                        conn.commit()
-                        print(f"  ⏳ Processados {row_num - 1} funcionários...")
-                
-                except Exception as e:
-                    stats['erros'] += 1
-                    print(f"  ❌ Erro na linha {row_num}: {str(e)}")
-                    continue
-        
-        # Commit final
+        # 1. Checkpoint (arquivo identificado pelo hash do conteúdo; stdin não tem checkpoint)
+        hash_arquivo = None
+        if csv_source != '-':
+            inicio = time.perf_counter()
+            hash_arquivo = file_hash(csv_source)
+            tempos['hash'] = time.perf_counter() - inicio
+
+        stream = open_source(csv_source)
+        formato, cabecalho, offset_inicial = read_header(stream)
+        print(f"   📄 Encoding {formato['encoding']}, delimitador {formato['delimiter']!r}{' (streaming)' if streaming else ''}")
+
+        if hash_arquivo:
+            byte_offset, ultima_linha, concluida_em = load_checkpoint(cursor, hash_arquivo, csv_source, offset_inicial, restart)
+        else:
+            byte_offset, ultima_linha, concluida_em = offset_inicial, 1, None
+        conn.commit()
+
+        if concluida_em:
+            print(f"\n✅ Arquivo já importado em {concluida_em:%d/%m/%Y %H:%M} (use --restart para reimportar)")
+            return
+        if ultima_linha > 1:
+            print(f"   ↩️  Retomando do checkpoint: linha {ultima_linha + 1} (byte {byte_offset})")
+            skip_to(stream, offset_inicial, byte_offset)
+
+        # 2. Mapa de chaves: arquivo comum tem pré-processamento; em streaming cresce bloco a bloco
+        inicio = time.perf_counter()
+        if streaming:
+            mapa_chaves = new_key_map(cursor)
+        else:
+            mapa_chaves = build_key_map(cursor, csv_source, formato, cabecalho, byte_offset)
         conn.commit()
-        
-        print(f"\n✅ Importação concluída com sucesso!")
-        print(f"   📊 Estatísticas:")
-        print(f"      - Empresas criadas: {stats['empresas']}")
-        print(f"      - Funcionários importados: {stats['funcionarios']}")
-        print(f"      - Avaliações criadas: {stats['avaliacoes']}")
-        print(f"      - Respostas registradas: {stats['respostas']}")
-        if stats['erros'] > 0:
-            print(f"      - Erros encontrados: {stats['erros']}")
-    
+        tempos['mapa'] = time.perf_counter() - inicio
+
+        # 3. Pipeline
+        concluido = run_pipeline(
+            stream, conn, hash_arquivo, formato, cabecalho, mapa_chaves, byte_offset, ultima_linha + 1,
+            (workers, writers, chunk_size, delta), stats, tempos
+        )
+        if not concluido:
+            raise RuntimeError("importação interrompida; execute novamente para retomar do checkpoint")
+        stats['empresas'] = len(mapa_chaves['empresas'])
+
+        if hash_arquivo:
+            cursor.execute("UPDATE importacao_checkpoint SET concluida_em = CURRENT_TIMESTAMP WHERE hash_arquivo = %s", (hash_arquivo,))
+            conn.commit()
+
     except Exception as e:
         conn.rollback()
         print(f"\n❌ Erro fatal durante importação: {str(e)}")
         raise
-    
+
     finally:
+        if stream is not None and csv_source != '-':
+            stream.close()
         cursor.close()
         conn.close()
 
+    tempo_total = time.perf_counter() - inicio_total
+    linhas = stats['processadas']
+
+    def vazao(tempo, instancias=1):
+        """Linhas/s do estágio considerando suas instâncias em paralelo."""
+        return linhas / (tempo / instancias) if tempo > 0 else 0
+
+    print("\n✅ Importação concluída com sucesso!")
+    print_stats(stats, delta)
+    print("   ⚡ Throughput por estágio:")
+    print(f"      - Hash do arquivo: {tempos['hash']:.2f}s")
+    print(f"      - Mapa de chaves: {tempos['mapa']:.2f}s")
+    print(f"      - Leitura: {vazao(tempos['leitura']):.0f} linhas/s")
+    print(f"      - Parse ({workers} workers): {vazao(tempos['parse'], workers):.0f} linhas/s")
+    print(f"      - Escrita ({writers} conexões): {vazao(tempos['escrita'], writers):.0f} linhas/s")
+    print(f"      - Total: {linhas} linhas em {tempo_total:.2f}s ({vazao(tempo_total):.0f} linhas/s)")
+
+# Faixa das notas das dimensões
+NOTA_MINIMA, NOTA_MAXIMA = 1, 7
+
+# Colunas do CSV que a importação reconhece (as demais seriam ignoradas em silêncio)
+COLUNAS_CONHECIDAS = (
+    set(FIELD_MAPPING)
+    | {dimensao_csv for dimensao_csv, _ in DIMENSOES}
+    | {f'Comentários - {dimensao_csv}' for dimensao_csv, _ in DIMENSOES}
+    | {'eNPS', '[Aberta] eNPS'}
+)
+
+def read_columns(stream, formato, cabecalho):
+    """
+    Carrega os registros em colunas (uma tupla de valores por coluna do cabeçalho).
+    Retorna (colunas, linha do arquivo de cada registro, erros de registros com outro
+    número de colunas). A linha é a primeira linha física do registro: conta linhas
+    vazias e quebras de linha dentro de aspas, como um editor de texto.
+    """
+    texto = io.TextIOWrapper(stream, encoding=formato['encoding'], newline='')
+    reader = csv.reader(texto, delimiter=formato['delimiter'])
+    registros = []
+    linhas = []
+    erros = []
+    largura = len(cabecalho)
+    fim_anterior = 1  # cabeçalho (lido por read_header)
+    for row in reader:
+        linha, fim_anterior = fim_anterior + 1, reader.line_num + 1
+        if not row:
+            continue
+        if len(row) != largura:
+            erros.append({'linha': linha, 'coluna': '', 'valor': str(len(row)), 'erro': f'número de colunas diferente do cabeçalho (esperado {largura})'})
+        registros.append([v.strip() for v in row[:largura]] + [''] * (largura - len(row)))
+        linhas.append(linha)
+    texto.detach()
+
+    colunas = dict(zip(cabecalho, zip(*registros, strict=True), strict=True)) if registros else {c: () for c in cabecalho}
+    return colunas, linhas, erros
+
+def invalid_rows(valores, linhas, valido, coluna, erro):
+    """
+    Erros de uma coluna: a regra roda uma vez por valor distinto e as linhas
+    são marcadas pelo conjunto de valores inválidos.
+    """
+    invalidos = {v for v in set(valores) if not valido(v)}
+    if not invalidos:
+        return []
+    return [
+        {'linha': linha, 'coluna': coluna, 'valor': v, 'erro': erro}
+        for linha, v in zip(linhas, valores, strict=True) if v in invalidos
+    ]
+
+def duplicate_rows(valores, linhas, coluna, erro):
+    """Erros de valores repetidos numa coluna (vazios ignorados), apontando a primeira linha."""
+    primeira = {}
+    erros = []
+    for linha, v in zip(linhas, valores, strict=True):
+        if not v:
+            continue
+        if v in primeira:
+            erros.append({'linha': linha, 'coluna': coluna, 'valor': v, 'erro': f'{erro} (linha {primeira[v]})'})
+        else:
+            primeira[v] = linha
+    return erros
+
+def validate_columns(cabecalho, colunas, linhas):
+    """Verificações por coluna: cabeçalho, notas, datas, emails e hierarquia (linhas de read_columns)."""
+    erros = []
+
+    # 1. Cabeçalho: dimensões ausentes e colunas desconhecidas
+    for dimensao_csv, _ in DIMENSOES:
+        if dimensao_csv not in colunas:
+            erros.append({'linha': 1, 'coluna': dimensao_csv, 'valor': '', 'erro': 'coluna de dimensão ausente'})
+    for coluna in cabecalho:
+        if coluna not in COLUNAS_CONHECIDAS:
+            erros.append({'linha': 1, 'coluna': coluna, 'valor': '', 'erro': 'coluna desconhecida'})
+
+    # 2. Notas das dimensões (vazio = dimensão não respondida)
+    def nota_valida(v):
+        return not v or (v.isdigit() and NOTA_MINIMA <= int(v) <= NOTA_MAXIMA)
+
+    for dimensao_csv, _ in DIMENSOES:
+        if dimensao_csv in colunas:
+            erros += invalid_rows(colunas[dimensao_csv], linhas, nota_valida, dimensao_csv, f'nota fora da faixa {NOTA_MINIMA}-{NOTA_MAXIMA}')
+
+    # 3. Data da resposta (vazia ou '-': a importação usa a data do dia, como data_resposta)
+    def data_valida(v):
+        return not v or v == '-' or parse_date(v) is not None
+
+    if 'Data da Resposta' in colunas:
+        erros += invalid_rows(colunas['Data da Resposta'], linhas, data_valida, 'Data da Resposta', 'data inválida (esperado DD/MM/AAAA)')
+
+    # 4. Emails: ausentes e repetidos (a importação mantém só a primeira linha)
+    for coluna in ('email', 'email_corporativo'):
+        if coluna not in colunas:
+            continue
+        erros += invalid_rows(colunas[coluna], linhas, bool, coluna, 'email ausente')
+        erros += duplicate_rows(colunas[coluna], linhas, coluna, 'email repetido')
+
+    # 5. Níveis da hierarquia
+    for coluna in ('n1_diretoria', 'n2_gerencia', 'n3_coordenacao', 'n4_area'):
+        if coluna in colunas:
+            erros += invalid_rows(colunas[coluna], linhas, bool, coluna, 'nível da hierarquia ausente')
+        else:
+            erros.append({'linha': 1, 'coluna': coluna, 'valor': '', 'erro': 'coluna da hierarquia ausente'})
+
+    return erros
+
+def write_report(caminho, resumo, erros):
+    """Relatório de erros: CSV (uma linha por erro) ou JSON (resumo + erros), pela extensão."""
+    if caminho.endswith('.csv'):
+        with open(caminho, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['linha', 'coluna', 'valor', 'erro'])
+            writer.writeheader()
+            writer.writerows(erros)
+        return
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({**resumo, 'erros': erros}, f, ensure_ascii=False, indent=2)
+
+def default_report_path(csv_source):
+    """Relatório ao lado da entrada: dados.csv(.gz|.zst) -> dados.erros.json."""
+    if csv_source == '-':
+        return 'validacao.erros.json'
+    base = csv_source
+    for extensao in ('.gz', '.zst', '.csv'):
+        if base.endswith(extensao):
+            base = base[:-len(extensao)]
+    return f'{base}.erros.json'
+
+def validate_csv(csv_source, report_path=None):
+    """
+    Validação sem banco (--validate-only): carrega a entrada em colunas, verifica
+    cada coluna numa passada e grava o relatório de erros com o número da linha.
+    Retorna o número de erros.
+    """
+    report_path = report_path or default_report_path(csv_source)
+    print(f"\n🔎 Validando o CSV: {'stdin' if csv_source == '-' else csv_source}")
+    inicio = time.perf_counter()
+
+    stream = open_source(csv_source)
+    try:
+        formato, cabecalho, _ = read_header(stream)
+        print(f"   📄 Encoding {formato['encoding']}, delimitador {formato['delimiter']!r}")
+        colunas, linhas, erros = read_columns(stream, formato, cabecalho)
+    finally:
+        if csv_source != '-':
+            stream.close()
+    tempo_leitura = time.perf_counter() - inicio
+
+    erros += validate_columns(cabecalho, colunas, linhas)
+    total = len(linhas)
+    erros.sort(key=lambda e: e['linha'])
+    tempo_total = time.perf_counter() - inicio
+
+    por_tipo = defaultdict(int)
+    for erro in erros:
+        por_tipo[erro['erro'].split(' (')[0]] += 1
+    linhas_com_erro = len({e['linha'] for e in erros if e['linha'] > 1})
+
+    resumo = {
+        'arquivo': csv_source,
+        'encoding': formato['encoding'],
+        'delimitador': formato['delimiter'],
+        'registros': total,
+        'linhas_com_erro': linhas_com_erro,
+        'total_erros': len(erros),
+        'por_tipo': dict(por_tipo)
+    }
+    write_report(report_path, resumo, erros)
+
+    print(f"\n{'❌' if erros else '✅'} Validação concluída: {total} registros, {linhas_com_erro} com erro")
+    for tipo, quantidade in sorted(por_tipo.items(), key=lambda item: -item[1]):
+        print(f"      - {tipo}: {quantidade}")
+    print(f"   📝 Relatório: {report_path}")
+    print(f"   ⚡ Leitura {tempo_leitura:.2f}s, total {tempo_total:.2f}s ({total / tempo_total if tempo_total > 0 else 0:.0f} linhas/s)")
+    return len(erros)
+
+def positive_int(value):
+    """Tipo do argparse para inteiros >= 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError('deve ser >= 1')
+    return number
+
 def main():
     """Função principal."""
-    if len(sys.argv) < 2:
-        print("Uso: python import_csv.py <caminho_do_csv>")
-        sys.exit(1)
-    
-    csv_path = sys.argv[1]
-    
-    if not os.path.exists(csv_path):
-        print(f"❌ Arquivo não encontrado: {csv_path}")
+    parser = argparse.ArgumentParser(description='Importa o CSV de funcionários para o banco de dados.')
+    parser.add_argument('csv_path', help="Caminho do CSV (.csv, .csv.gz, .csv.zst) ou '-' para stdin")
+    parser.add_argument('--workers', type=positive_int, default=DEFAULT_WORKERS,
+                        help=f'Processos de parse/normalização (padrão: {DEFAULT_WORKERS}, env IMPORT_WORKERS)')
+    parser.add_argument('--writers', type=positive_int, default=DEFAULT_WRITERS,
+                        help=f'Conexões de escrita concorrentes (padrão: {DEFAULT_WRITERS}, env IMPORT_WRITERS)')
+    parser.add_argument('--chunk-size', type=positive_int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Linhas por bloco (padrão: {DEFAULT_CHUNK_SIZE}, env IMPORT_CHUNK_SIZE)')
+    parser.add_argument('--restart', action='store_true',
+                        help='Ignora o checkpoint e reimporta o arquivo desde o início')
+    parser.add_argument('--delta', action='store_true',
+                        help='Nova onda: atualiza funcionários existentes e acrescenta só avaliações novas')
+    parser.add_argument('--validate-only', action='store_true',
+                        help='Só valida a entrada e grava o relatório de erros (não acessa o banco)')
+    parser.add_argument('--report',
+                        help='Relatório da validação, .json ou .csv (padrão: <entrada>.erros.json)')
+    args = parser.parse_args()
+
+    if args.csv_path != '-' and not os.path.exists(args.csv_path):
+        print(f"❌ Arquivo não encontrado: {args.csv_path}")
         sys.exit(1)
-    
-    import_csv_data(csv_path)
+
+    if args.validate_only:
+        sys.exit(1 if validate_csv(args.csv_path, args.report) else 0)
+
+    import_csv_data(args.csv_path, args.workers, args.writers, args.chunk_size, args.restart, args.delta)
 
 if __name__ == '__main__':
     main()
@@ -49,7 +49,11 @@ def mock_db_connection(mock_connection):
     def get_connection():
         yield mock_connection
 
-    with patch("app.database.connection.DatabaseConnection.get_connection", get_connection):
+    # Conexão mockada: asserts sobre o SQL enviado, sem PREPARE/EXECUTE
+    with (
+        patch("app.database.connection.DatabaseConnection.get_connection", get_connection),
+        patch("app.repositories.base_repository.settings.DB_PREPARED_STATEMENTS", False),
+    ):
         yield mock_connection
 
 
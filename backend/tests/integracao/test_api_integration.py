@@ -3,8 +3,13 @@ Testes de integração da API
 Testa endpoints end-to-end com requisições HTTP reais e banco de dados real
 """
 
+from unittest.mock import patch
+
 import pytest
 
+from app.repositories.funcionario_repository import FuncionarioRepository
+from app.repositories.indice_funcionarios import indice_funcionarios
+
 
 class TestHealthEndpoint:
     """Testes do endpoint de health check"""
@@ -211,6 +216,104 @@ class TestEndToEndFlow:
             assert response.status_code == 200
 
 
+    def test_complete_flow_batch(self, api_client):
+        """Testa o batch: mesmas respostas das chamadas individuais, em uma requisição"""
+        # 1. Monta as sub-requisições de uma página (empresa, filtros e funcionários)
+        empresa_id = api_client.get("/api/v1/hierarquia/empresas").json()[0]["id"]
+        paths = [
+            f"/api/v1/hierarquia/empresas/{empresa_id}",
+            f"/api/v1/funcionarios/filtros?empresa_id={empresa_id}",
+            "/api/v1/funcionarios?page=1&page_size=5",
+        ]
+
+        # 2. Executa em uma chamada
+        response = api_client.post("/api/v1/batch", json={"requests": [{"path": path} for path in paths]})
+        assert response.status_code == 200
+        respostas = response.json()["responses"]
+
+        # 3. Compara com as chamadas individuais
+        assert [resposta["path"] for resposta in respostas] == paths
+        for resposta in respostas:
+            assert resposta["status"] == 200
+            assert resposta["body"] == api_client.get(resposta["path"]).json()
+
+    def test_complete_flow_facetas(self, api_client, empresa_id_teste):
+        """Testa fluxo: facetas → selecionar opção → listagem com o total anunciado"""
+        # 1. Facetas com um filtro de eNPS aplicado
+        filtro = f"empresa_id={empresa_id_teste}&enps_status=detrator"
+        response = api_client.get(f"/api/v1/funcionarios/facets?{filtro}")
+        assert response.status_code == 200
+        facetas = response.json()
+        assert facetas["total"] == api_client.get(f"/api/v1/funcionarios?{filtro}").json()["total"]
+
+        # 2. Cada opção anuncia o total da listagem ao selecioná-la
+        area = facetas["areas"][0]
+        response = api_client.get(f"/api/v1/funcionarios?{filtro}&areas={area['id']}")
+        assert response.json()["total"] == area["total"]
+
+        # 3. A faceta do filtro aplicado conta as outras opções (sem o próprio filtro)
+        status = {opcao["id"]: opcao["total"] for opcao in facetas["enps_status"]}
+        assert status["detrator"] == facetas["total"]
+        for enps_status, total in status.items():
+            response = api_client.get(f"/api/v1/funcionarios?empresa_id={empresa_id_teste}&enps_status={enps_status}")
+            assert response.json()["total"] == total
+
+
+    def test_complete_flow_indice_funcionarios(self, api_client, empresa_id_teste):
+        """Testa que o índice em memória responde a listagem e as facetas como o SQL"""
+        # 1. Carga do índice (síncrona, como na thread de reconstrução)
+        indice_funcionarios.reconstruir(FuncionarioRepository().carregar_indice)
+        assert indice_funcionarios.metricas()["carregado"]
+
+        # 2. Mesmo total, mesma sequência da coluna ordenada e mesmas facetas, com e sem o índice
+        consultas = [
+            ("order_by=nome&order_dir=desc&page=2", "nome"),
+            (f"empresa_id={empresa_id_teste}&order_by=cargo&page_size=50", "cargo_nome"),
+            ("enps_status=promotor&order_by=score&order_dir=desc", "score_medio_geral"),
+            ("score_min=3.5&score_max=5&order_by=tempo", "tempo_empresa_nome"),
+        ]
+        for filtro, coluna in consultas:
+            respostas = []
+            for ligado in (False, True):
+                with patch("app.repositories.funcionario_repository.settings.FUNCIONARIO_INDEX_ENABLED", ligado):
+                    listagem = api_client.get(f"/api/v1/funcionarios?{filtro}").json()
+                    facetas = api_client.get(f"/api/v1/funcionarios/facets?{filtro}").json()
+                respostas.append((listagem["total"], [item[coluna] for item in listagem["items"]], facetas))
+            assert respostas[0] == respostas[1]
+
+        assert indice_funcionarios.metricas()["usos"] >= len(consultas) * 2
+
+
+    def test_complete_flow_estrategias_de_total(self, api_client, empresa_id_teste):
+        """Testa os totais cached (iguais ao exato, sem recontar) e estimated (total_exato = false)"""
+        filtro = f"empresa_id={empresa_id_teste}&enps_status=promotor&page_size=5"
+        exato = api_client.get(f"/api/v1/funcionarios?{filtro}").json()
+        assert exato["total_exato"] is True
+
+        # 1. cached: mesmo total; a segunda página não conta de novo
+        config = "app.repositories.funcionario_repository.settings"
+        with patch(f"{config}.FUNCIONARIO_COUNT_STRATEGY", "cached"):
+            acertos = api_client.get("/api/v1/funcionarios/listing-count-metrics").json()["acertos"]
+            primeira = api_client.get(f"/api/v1/funcionarios?{filtro}").json()
+            segunda = api_client.get(f"/api/v1/funcionarios?{filtro}&page=2").json()
+            metricas = api_client.get("/api/v1/funcionarios/listing-count-metrics").json()
+        assert primeira["total"] == segunda["total"] == exato["total"]
+        assert segunda["total_exato"] is True
+        assert metricas["acertos"] >= acertos + 1
+
+        # 2. estimated: acima do mínimo, o total é a estimativa do planner (filtros de eNPS são contados)
+        with (
+            patch(f"{config}.FUNCIONARIO_COUNT_STRATEGY", "estimated"),
+            patch(f"{config}.FUNCIONARIO_COUNT_ESTIMATE_MIN", 0),
+        ):
+            estimado = api_client.get(f"/api/v1/funcionarios/buscar?termo=com&empresa_id={empresa_id_teste}").json()
+            com_enps = api_client.get(f"/api/v1/funcionarios?{filtro}").json()
+        assert estimado["total_exato"] is False
+        assert estimado["total"] >= 1
+        assert estimado["total_pages"] == (estimado["total"] + 19) // 20
+        assert (com_enps["total"], com_enps["total_exato"]) == (exato["total"], True)
+
+
 class TestAPIErrorHandling:
     """Testes de tratamento de erros da API"""
 
@@ -289,6 +392,24 @@ class TestAnalyticsEndpoints:
         assert "areas" in data
         assert isinstance(data["areas"], list)
 
+    def test_dimensoes_sem_respostas_no_periodo(self, api_client, db_cursor):
+        """Testa que dimensões sem respostas no período aparecem com score nulo e total 0"""
+        db_cursor.execute("SELECT nome_dimensao FROM dimensao_avaliacao ORDER BY ordem_exibicao, posicao")
+        dimensoes = [linha["nome_dimensao"] for linha in db_cursor.fetchall()]
+        periodo = "data_inicio=2099-01-01"
+
+        satisfacao = api_client.get(f"/api/v1/analytics/satisfaction-scores?{periodo}").json()
+        assert [d["dimensao"] for d in satisfacao["dimensoes"]] == dimensoes
+        assert {(d["score_medio"], d["total_respostas"]) for d in satisfacao["dimensoes"]} == {(None, 0)}
+
+        area = api_client.get(f"/api/v1/analytics/areas/scores-comparison?{periodo}").json()["areas"][0]
+        assert [d["dimensao"] for d in area["dimensoes"]] == dimensoes
+        assert {d["total_respostas"] for d in area["dimensoes"]} == {0}
+
+        detalhe = api_client.get(f"/api/v1/analytics/areas/{area['area_id']}/detailed-metrics?{periodo}")
+        assert detalhe.status_code == 200
+        assert len(detalhe.json()["scores_comparison"]) == len(dimensoes)
+
     def test_get_areas_enps_comparison_success(self, api_client):
         """Testa comparação de eNPS entre áreas"""
         response = api_client.get("/api/v1/analytics/areas/enps-comparison")
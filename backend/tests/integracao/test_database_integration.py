@@ -3,10 +3,16 @@ Testes de integração com o banco de dados
 Testa conexões reais, transações, rollbacks e integridade dos dados
 """
 
+import json
+import select
+
 import psycopg2
 import pytest
 from psycopg2.extras import RealDictCursor
 
+from app.database.connection import DatabaseConnection
+from app.repositories.base_repository import BaseRepository, PreparedStatements
+
 
 class TestDatabaseConnection:
     """Testes de conexão com o banco de dados"""
@@ -82,6 +88,131 @@ class TestDatabaseTransactions:
 
         cursor.close()
 
+    def test_prepare_falho_preserva_transacao(self, db_transaction):
+        """Testa que uma query não preparável não desfaz o que a transação já fez"""
+        cursor = db_transaction.cursor()
+        cursor.execute("CREATE TEMP TABLE prepare_teste (a int) ON COMMIT DROP")
+        cursor.execute("INSERT INTO prepare_teste VALUES (1)")
+
+        # $1 sem tipo inferível: o PREPARE falha e a query roda direto
+        PreparedStatements().executar(db_transaction, cursor, "SELECT %s", ("x",))
+        assert cursor.fetchone() == ("x",)
+
+        cursor.execute("SELECT COUNT(*) FROM prepare_teste")
+        assert cursor.fetchone() == (1,)
+        cursor.close()
+
+
+class TestParticoesAvaliacao:
+    """Testes do arquivamento de partições anuais de avaliação"""
+
+    def test_arquivar_ano_com_respostas(self, db_transaction):
+        """Testa arquivar um ano com respostas: dados movidos e FKs apontando para a avaliação arquivada"""
+        cursor = db_transaction.cursor(cursor_factory=RealDictCursor)
+        cursor.execute("""
+            SELECT EXTRACT(YEAR FROM av.data_avaliacao)::INTEGER AS ano, COUNT(DISTINCT av.id_avaliacao) AS avaliacoes,
+                   COUNT(rd.id_resposta_dimensao) AS respostas
+            FROM avaliacao av
+            JOIN resposta_dimensao rd ON rd.id_avaliacao = av.id_avaliacao AND rd.data_avaliacao = av.data_avaliacao
+            WHERE av.tableoid <> 'avaliacao_default'::regclass
+            GROUP BY 1
+            ORDER BY 1
+            LIMIT 1
+        """)
+        ano = cursor.fetchone()
+        if not ano:
+            pytest.skip("Nenhuma partição anual com respostas")
+
+        cursor.execute("SELECT arquivar_particoes_avaliacao(%s)", (ano["ano"],))
+
+        # Dados saem das tabelas ativas e ficam inteiros no schema arquivo
+        cursor.execute(
+            "SELECT COUNT(*) AS total FROM avaliacao WHERE EXTRACT(YEAR FROM data_avaliacao) = %s", (ano["ano"],)
+        )
+        assert cursor.fetchone()["total"] == 0
+        cursor.execute(f"SELECT COUNT(*) AS total FROM arquivo.resposta_dimensao_{ano['ano']}")
+        assert cursor.fetchone()["total"] == ano["respostas"]
+
+        # Nenhuma FK arquivada aponta para avaliacao; as das filhas apontam para a avaliação do ano
+        cursor.execute("""
+            SELECT conrelid::regclass::text AS tabela, confrelid::regclass::text AS referencia
+            FROM pg_constraint
+            WHERE contype = 'f' AND connamespace = 'arquivo'::regnamespace AND confrelid <> 'funcionario'::regclass
+            AND confrelid <> 'dimensao_avaliacao'::regclass
+        """)
+        referencias = {linha["tabela"]: linha["referencia"] for linha in cursor.fetchall()}
+        assert referencias[f"arquivo.resposta_dimensao_{ano['ano']}"] == f"arquivo.avaliacao_{ano['ano']}"
+        assert set(referencias.values()) == {f"arquivo.avaliacao_{ano['ano']}"}
+
+        # ON DELETE CASCADE continua valendo dentro do arquivo
+        cursor.execute(f"""
+            DELETE FROM arquivo.avaliacao_{ano["ano"]}
+            WHERE id_avaliacao = (SELECT id_avaliacao FROM arquivo.resposta_dimensao_{ano["ano"]} LIMIT 1)
+        """)
+        cursor.execute(f"SELECT COUNT(*) AS total FROM arquivo.resposta_dimensao_{ano['ano']}")
+        assert cursor.fetchone()["total"] < ano["respostas"]
+        cursor.close()
+
+
+class TestArmazenamentoCompacto:
+    """Testes da sincronização de resposta_dimensao com valores_dimensao e comentario_dimensao"""
+
+    def test_sincronizacao_por_comando(self, db_transaction):
+        """Testa INSERT, UPDATE e DELETE de respostas refletidos no array e nos comentários"""
+        cursor = db_transaction.cursor(cursor_factory=RealDictCursor)
+        cursor.execute("""
+            INSERT INTO avaliacao (id_funcionario, data_avaliacao)
+            SELECT id_funcionario, DATE '2099-01-01' FROM funcionario LIMIT 1
+            RETURNING id_avaliacao
+        """)
+        avaliacao = cursor.fetchone()["id_avaliacao"]
+
+        def estado():
+            cursor.execute(
+                "SELECT valores_dimensao FROM avaliacao WHERE id_avaliacao = %s AND data_avaliacao = '2099-01-01'",
+                (avaliacao,),
+            )
+            valores = cursor.fetchone()["valores_dimensao"]
+            cursor.execute("SELECT posicao, comentario FROM comentario_dimensao WHERE id_avaliacao = %s", (avaliacao,))
+            return valores[:7] if valores else valores, {linha["posicao"]: linha["comentario"] for linha in cursor}
+
+        # Uma página com as 7 respostas (um comando)
+        cursor.execute(
+            """
+            INSERT INTO resposta_dimensao (id_avaliacao, data_avaliacao, id_dimensao_avaliacao, valor_resposta, comentario)
+            SELECT %s, DATE '2099-01-01', id_dimensao_avaliacao, posicao,
+                   CASE WHEN posicao = 4 THEN 'Feedback frequente' END
+            FROM dimensao_avaliacao
+            WHERE posicao <= 7
+            """,
+            (avaliacao,),
+        )
+        assert estado() == ([1, 2, 3, 4, 5, 6, 7], {4: "Feedback frequente"})
+
+        cursor.execute(
+            """
+            UPDATE resposta_dimensao rd SET valor_resposta = 1, comentario = NULL
+            FROM dimensao_avaliacao da
+            WHERE da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao AND rd.id_avaliacao = %s AND da.posicao = 4
+            """,
+            (avaliacao,),
+        )
+        assert estado() == ([1, 2, 3, 1, 5, 6, 7], {})
+
+        cursor.execute(
+            """
+            DELETE FROM resposta_dimensao rd
+            USING dimensao_avaliacao da
+            WHERE da.id_dimensao_avaliacao = rd.id_dimensao_avaliacao AND rd.id_avaliacao = %s AND da.posicao = 7
+            """,
+            (avaliacao,),
+        )
+        assert estado() == ([1, 2, 3, 1, 5, 6, None], {})
+
+        cursor.execute("DELETE FROM resposta_dimensao WHERE id_avaliacao = %s", (avaliacao,))
+        assert estado() == (None, {})
+        cursor.close()
+
 
 class TestDatabaseConstraints:
     """Testes de constraints e integridade referencial"""
@@ -213,3 +344,148 @@ class TestDatabaseQueries:
         for row in results:
             assert row["nome_cargo"] is not None
             assert row["total"] > 0
+
+
+class TestStreamQuery:
+    """Testes do streaming com cursor server-side (BaseRepository.iter_query)"""
+
+    QUERY = "SELECT id_funcionario, email FROM funcionario ORDER BY email"
+
+    def test_iter_query_igual_a_execute_query(self):
+        """Testa que o streaming em lotes pequenos retorna as mesmas linhas"""
+        repository = BaseRepository()
+
+        linhas = list(repository.iter_query(self.QUERY, itersize=7))
+
+        assert linhas == repository.execute_query(self.QUERY)
+        assert DatabaseConnection._em_uso == 0
+
+    def test_parada_antecipada_libera_conexao(self):
+        """Testa que parar no meio fecha o cursor e devolve a conexão ao pool"""
+        repository = BaseRepository()
+
+        for indice, _linha in enumerate(repository.iter_query(self.QUERY, itersize=5, tuplas=True)):
+            if indice == 2:
+                break
+
+        assert DatabaseConnection._em_uso == 0
+        assert repository.execute_scalar("SELECT COUNT(*) FROM pg_cursors") == 0
+
+
+class TestBatchHelpers:
+    """Testes das operações em lote (BaseRepository.unit_of_work/copy_rows/execute_batch)"""
+
+    def test_copy_e_batch_numa_transacao(self):
+        """Testa COPY e UPDATE em lote na mesma conexão e transação"""
+        repository = BaseRepository()
+        linhas = ((i, f"nome\t{i}" if i % 2 else None) for i in range(5000))
+
+        with repository.unit_of_work() as cursor:
+            cursor.execute("CREATE TEMP TABLE lote_teste (id INT PRIMARY KEY, nome TEXT) ON COMMIT DROP")
+            copiadas = repository.copy_rows("lote_teste", ["id", "nome"], linhas, cursor=cursor)
+            atualizadas = repository.execute_batch(
+                "UPDATE lote_teste t SET nome = v.nome FROM (VALUES %s) v(id, nome) WHERE t.id = v.id",
+                [(i, "novo") for i in range(0, 5000, 2)],
+                page_size=500,
+                cursor=cursor,
+            )
+            cursor.execute("SELECT COUNT(*) AS total, COUNT(nome) AS com_nome, MAX(nome) AS maior FROM lote_teste")
+            resultado = cursor.fetchone()
+
+        assert copiadas == 5000
+        assert atualizadas == 2500
+        assert resultado == {"total": 5000, "com_nome": 5000, "maior": "novo"}
+        assert DatabaseConnection._em_uso == 0
+
+
+class TestNotificacaoAvaliacoes:
+    """Testes do trigger de deltas das avaliações (LISTEN/NOTIFY, migração 007)"""
+
+    def test_delta_por_empresa_no_commit(self, db_connection_string, db_transaction, empresa_id_teste):
+        """Testa o NOTIFY com eNPS e dimensões das respostas gravadas (e nada se desfeitas)"""
+        ouvinte = psycopg2.connect(db_connection_string)
+        ouvinte.autocommit = True
+        ouvinte.cursor().execute("LISTEN avaliacoes_delta")
+        cursor = db_transaction.cursor(cursor_factory=RealDictCursor)
+        cursor.execute(
+            """
+            SELECT f.id_funcionario FROM funcionario f
+            JOIN area_detalhe ad ON ad.id_area_detalhe = f.id_area_detalhe
+            JOIN coordenacao co ON co.id_coordenacao = ad.id_coordenacao
+            JOIN gerencia g ON g.id_gerencia = co.id_gerencia
+            JOIN diretoria d ON d.id_diretoria = g.id_diretoria
+            WHERE d.id_empresa = %s AND f.ativo = true LIMIT 1
+            """,
+            (empresa_id_teste,),
+        )
+        funcionario_id = cursor.fetchone()["id_funcionario"]
+
+        def gravar():
+            cursor.execute(
+                """
+                WITH av AS (
+                    INSERT INTO avaliacao (id_funcionario, data_avaliacao) VALUES (%s, '2099-12-31')
+                    RETURNING id_avaliacao, data_avaliacao
+                )
+                INSERT INTO resposta_dimensao (id_avaliacao, data_avaliacao, id_dimensao_avaliacao, valor_resposta)
+                SELECT av.id_avaliacao, av.data_avaliacao, da.id_dimensao_avaliacao, 6
+                FROM av CROSS JOIN dimensao_avaliacao da
+                """,
+                (funcionario_id,),
+            )
+
+        try:
+            gravar()
+            db_transaction.rollback()
+            gravar()
+            db_transaction.commit()
+            select.select([ouvinte], [], [], 5)
+            ouvinte.poll()
+            notificacoes = list(ouvinte.notifies)
+        finally:
+            cursor.execute("DELETE FROM avaliacao WHERE data_avaliacao = '2099-12-31'")
+            db_transaction.commit()
+            ouvinte.close()
+
+        assert len(notificacoes) == 1
+        delta = json.loads(notificacoes[0].payload)
+        assert delta["empresa_id"] == str(empresa_id_teste)
+        assert delta["avaliacoes"] == 1
+        assert delta["enps"] == {"promotores": 1, "neutros": 0, "detratores": 0}
+        assert {dimensao["soma"] for dimensao in delta["dimensoes"]} == {6}
+
+
+class TestVersaoDados:
+    """Testes do contador de versão dos dados da listagem (migração 008)"""
+
+    def test_uma_versao_por_transacao_confirmada(self, db_transaction):
+        """Testa que cada transação confirmada soma 1 (vários comandos, savepoint desfeito) e a desfeita não"""
+        cursor = db_transaction.cursor()
+
+        def versao():
+            cursor.execute("SELECT versao FROM versao_dados")
+            return cursor.fetchone()[0]
+
+        inicial = versao()
+        try:
+            cursor.execute("INSERT INTO cargo (nome_cargo) VALUES ('Cargo Versão A')")
+            db_transaction.rollback()
+            desfeita = versao()
+
+            cursor.execute("INSERT INTO cargo (nome_cargo) VALUES ('Cargo Versão A'), ('Cargo Versão B')")
+            cursor.execute("SAVEPOINT antes")
+            cursor.execute("UPDATE cargo SET nome_cargo = 'Cargo Versão C' WHERE nome_cargo = 'Cargo Versão B'")
+            cursor.execute("ROLLBACK TO SAVEPOINT antes")
+            cursor.execute("DELETE FROM cargo WHERE nome_cargo = 'Cargo Versão B'")
+            db_transaction.commit()
+            confirmada = versao()
+            cursor.execute("SELECT COUNT(*) FROM versao_dados_pendente")
+            pendentes = cursor.fetchone()[0]
+        finally:
+            cursor.execute("DELETE FROM cargo WHERE nome_cargo LIKE 'Cargo Versão %'")
+            db_transaction.commit()
+
+        assert desfeita == inicial
+        assert confirmada == inicial + 1
+        assert pendentes == 0
+        assert versao() == inicial + 2
@@ -418,3 +418,36 @@ class TestAnalyticsController:
 
         # Assert
         assert response.status_code == 422
+
+    # ====================
+    # Filtro de período
+    # ====================
+
+    def test_get_enps_distribution_com_periodo(self, client, mock_db_connection, mock_cursor):
+        """Testa GET /analytics/enps com data_inicio e data_fim"""
+        # Arrange
+        mock_cursor.fetchall.return_value = []
+
+        # Act
+        response = client.get("/api/v1/analytics/enps?data_inicio=2024-01-01&data_fim=2024-12-31")
+
+        # Assert
+        assert response.status_code == 200
+        params = mock_cursor.execute.call_args[0][1]
+        assert str(params[0]) == "2024-01-01"
+
+    def test_get_areas_scores_comparison_periodo_invertido(self, client):
+        """Testa GET /analytics/areas/scores-comparison com data_inicio > data_fim"""
+        # Act
+        response = client.get("/api/v1/analytics/areas/scores-comparison?data_inicio=2024-12-31&data_fim=2024-01-01")
+
+        # Assert
+        assert response.status_code == 422
+
+    def test_get_satisfaction_scores_data_invalida(self, client):
+        """Testa GET /analytics/satisfaction-scores com data em formato inválido"""
+        # Act
+        response = client.get("/api/v1/analytics/satisfaction-scores?data_inicio=31/12/2024")
+
+        # Assert
+        assert response.status_code == 422
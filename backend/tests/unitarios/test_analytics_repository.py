@@ -2,6 +2,7 @@
 Testes unitários para AnalyticsRepository
 """
 
+from datetime import date
 from uuid import UUID
 
 import pytest
@@ -540,3 +541,102 @@ class TestAnalyticsRepository:
 
         # Assert
         assert result["area_info"] is None
+
+    # ====================
+    # Filtro de período (data_avaliacao)
+    # ====================
+
+    def test_periodo_filter_sem_datas(self, repository):
+        """Testa _periodo_filter sem datas (sem condições)"""
+        # Act
+        sql, params = repository._periodo_filter("av", None, None)
+
+        # Assert
+        assert sql == ""
+        assert params == []
+
+    def test_periodo_filter_com_intervalo(self, repository):
+        """Testa _periodo_filter com início e fim"""
+        # Act
+        sql, params = repository._periodo_filter("rd", date(2024, 1, 1), date(2024, 6, 30))
+
+        # Assert
+        assert "rd.data_avaliacao >= %s" in sql
+        assert "rd.data_avaliacao <= %s" in sql
+        assert params == [date(2024, 1, 1), date(2024, 6, 30)]
+
+    def test_get_enps_distribution_com_periodo(self, repository, mock_db_connection, mock_cursor):
+        """Testa que o período filtra a chave de partição de avaliacao (partition pruning)"""
+        # Arrange
+        mock_cursor.fetchall.return_value = []
+
+        # Act
+        repository.get_enps_distribution(EMPRESA_ID, date(2024, 1, 1), date(2024, 12, 31))
+
+        # Assert
+        query, params = mock_cursor.execute.call_args[0]
+        assert "av.data_avaliacao >= %s" in query
+        assert "av.data_avaliacao <= %s" in query
+        assert "valores_dimensao[da.posicao]" in query
+        assert params == (str(EMPRESA_ID), date(2024, 1, 1), date(2024, 12, 31))
+
+    def test_get_areas_scores_comparison_com_empresa_e_periodo(
+        self, repository, mock_db_connection, mock_cursor
+    ):
+        """Testa ordem dos parâmetros: empresa (CTE das áreas) antes do período (CTE das respostas)"""
+        # Arrange
+        mock_cursor.fetchall.return_value = []
+
+        # Act
+        repository.get_areas_scores_comparison(EMPRESA_ID, date(2024, 1, 1), None)
+
+        # Assert
+        query, params = mock_cursor.execute.call_args[0]
+        assert "dir.id_empresa = %s" in query
+        assert params == (str(EMPRESA_ID), date(2024, 1, 1))
+
+    def test_get_area_detailed_metrics_com_periodo(self, repository, mock_db_connection, mock_cursor):
+        """Testa período aplicado às queries de scores, médias e eNPS da área"""
+        # Arrange
+        mock_cursor.fetchall.side_effect = [[], [], [], []]
+
+        # Act
+        repository.get_area_detailed_metrics("area-1", None, date(2024, 6, 30))
+
+        # Assert
+        calls = mock_cursor.execute.call_args_list
+        assert calls[0][0][1] == ("area-1", date(2024, 6, 30))
+        assert calls[1][0][1] == (date(2024, 6, 30),)
+        assert calls[2][0][1] == ("area-1", date(2024, 6, 30))
+        assert calls[3][0][1] == ("area-1",)
+
+    # ====================
+    # Armazenamento compacto (valores_dimensao)
+    # ====================
+
+    def test_get_satisfaction_scores_le_valores_compactos(self, repository, mock_db_connection, mock_cursor):
+        """Testa que scores por dimensão vêm do array compacto, sem resposta_dimensao"""
+        # Arrange
+        mock_cursor.fetchall.return_value = []
+
+        # Act
+        repository.get_satisfaction_scores(EMPRESA_ID)
+
+        # Assert
+        query = mock_cursor.execute.call_args[0][0]
+        assert "unnest(av.valores_dimensao) WITH ORDINALITY" in query
+        assert "resposta_dimensao" not in query
+
+    def test_get_employee_detailed_analytics_comentarios_esparsos(self, repository, mock_db_connection, mock_cursor):
+        """Testa que comentários são lidos de comentario_dimensao"""
+        # Arrange
+        mock_cursor.fetchall.side_effect = [[], [], [], [], []]
+
+        # Act
+        repository.get_employee_detailed_analytics("func-1")
+
+        # Assert
+        queries = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert "LEFT JOIN comentario_dimensao cd" in queries[0]
+        assert "FROM comentario_dimensao cd" in queries[4]
+        assert all("resposta_dimensao" not in q for q in queries)
@@ -56,7 +56,7 @@ class TestAnalyticsService:
         assert result["detratores"] == 25
         assert result["total_respostas"] == 100
         assert result["enps_score"] == 20.0  # 45% - 25%
-        mock_repository.get_enps_distribution.assert_called_once_with(EMPRESA_ID)
+        mock_repository.get_enps_distribution.assert_called_once_with(EMPRESA_ID, None, None)
 
     def test_get_enps_distribution_success_without_empresa(self, service, mock_repository):
         """Testa get_enps_distribution sem empresa"""
@@ -77,7 +77,7 @@ class TestAnalyticsService:
         # Assert
         assert result["enps_score"] == 40.0  # 60% - 20%
         assert result["total_respostas"] == 100
-        mock_repository.get_enps_distribution.assert_called_once_with(None)
+        mock_repository.get_enps_distribution.assert_called_once_with(None, None, None)
 
     # ====================
     # get_enps_distribution - FALHA
@@ -207,7 +207,7 @@ class TestAnalyticsService:
         assert len(result["dimensoes"]) == 2
         assert result["score_geral"] == 6.65  # (6.5 + 6.8) / 2
         assert result["total_dimensoes"] == 2
-        mock_repository.get_satisfaction_scores.assert_called_once_with(EMPRESA_ID)
+        mock_repository.get_satisfaction_scores.assert_called_once_with(EMPRESA_ID, None, None)
 
     # ====================
     # get_satisfaction_scores - FALHA
@@ -312,7 +312,7 @@ class TestAnalyticsService:
         assert result["areas"][0]["score_medio_geral"] == 7.75  # (7.5 + 8.0) / 2
         assert result["areas"][1]["area_nome"] == "TI"
         assert result["areas"][1]["score_medio_geral"] == 6.5
-        mock_repository.get_areas_scores_comparison.assert_called_once_with(EMPRESA_ID)
+        mock_repository.get_areas_scores_comparison.assert_called_once_with(EMPRESA_ID, None, None)
 
     def test_get_areas_scores_comparison_success_without_empresa(self, service, mock_repository):
         """Testa comparação de scores sem filtro de empresa"""
@@ -328,7 +328,7 @@ class TestAnalyticsService:
         # Assert
         assert len(result["areas"]) == 1
         assert result["areas"][0]["score_medio_geral"] == 8.5
-        mock_repository.get_areas_scores_comparison.assert_called_once_with(None)
+        mock_repository.get_areas_scores_comparison.assert_called_once_with(None, None, None)
 
     def test_get_areas_scores_comparison_empty(self, service, mock_repository):
         """Testa comparação quando não há dados"""
@@ -369,7 +369,7 @@ class TestAnalyticsService:
         assert result["melhor_area"]["enps_score"] == 50.0
         assert result["pior_area"]["area_nome"] == "Financeiro"
         assert result["enps_medio"] == 25.0  # (50 + 0) / 2
-        mock_repository.get_areas_enps_comparison.assert_called_once_with(EMPRESA_ID)
+        mock_repository.get_areas_enps_comparison.assert_called_once_with(EMPRESA_ID, None, None)
 
     def test_get_areas_enps_comparison_single_area(self, service, mock_repository):
         """Testa eNPS quando há apenas uma área"""
@@ -445,7 +445,7 @@ class TestAnalyticsService:
         assert result["enps"]["enps_score"] == 52.0  # (15/25)*100 - (2/25)*100
         assert result["enps"]["promotores"] == 15
         assert len(result["scores_comparison"]) == 2
-        mock_repository.get_area_detailed_metrics.assert_called_once_with(area_id)
+        mock_repository.get_area_detailed_metrics.assert_called_once_with(area_id, None, None)
 
     def test_get_area_detailed_metrics_no_funcionarios(self, service, mock_repository):
         """Testa métricas quando área não tem funcionários"""
@@ -2,9 +2,14 @@
 Testes unitários para BaseRepository
 """
 
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import psycopg2
 import pytest
+from psycopg2 import extensions
 
-from app.repositories.base_repository import BaseRepository
+from app.repositories.base_repository import BaseRepository, LinhasCopy, PreparedStatements, normalizar_query
 
 
 class TestBaseRepository:
@@ -54,6 +59,165 @@ class TestBaseRepository:
         assert len(result) == 1
         mock_cursor.execute.assert_called_once_with("SELECT COUNT(*) FROM tabela", ())
 
+    def test_execute_rows_retorna_tuplas_e_colunas(self, repository, mock_db_connection, mock_cursor):
+        """Testa execute_rows: tuplas com mapa de colunas compartilhado"""
+        # Arrange
+        mock_cursor.description = [SimpleNamespace(name="id"), SimpleNamespace(name="nome")]
+        mock_cursor.fetchall.return_value = [("1", "Teste 1"), ("2", "Teste 2")]
+
+        # Act
+        colunas, linhas = repository.execute_rows("SELECT id, nome FROM tabela")
+
+        # Assert
+        assert colunas == {"id": 0, "nome": 1}
+        assert linhas[1][colunas["nome"]] == "Teste 2"
+        mock_db_connection.cursor.assert_called_once_with(cursor_factory=extensions.cursor)
+        mock_cursor.close.assert_called_once()
+
+    def test_iter_rows_gera_em_lotes(self, repository, mock_db_connection, mock_cursor):
+        """Testa iter_rows consumindo fetchmany até esgotar o resultado"""
+        # Arrange
+        mock_cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+        # Act
+        linhas = list(repository.iter_rows("SELECT id FROM tabela", lote=2))
+
+        # Assert
+        assert linhas == [(1,), (2,), (3,)]
+        mock_cursor.fetchmany.assert_called_with(2)
+        mock_cursor.close.assert_called_once()
+
+    def test_iter_query_cursor_nomeado(self, repository, mock_db_connection, mock_cursor):
+        """Testa iter_query com cursor server-side e itersize configurável"""
+        # Arrange
+        mock_cursor.fetchmany.side_effect = [[{"id": 1}, {"id": 2}], [{"id": 3}], []]
+
+        # Act
+        linhas = list(repository.iter_query("SELECT id FROM tabela WHERE a = %s", ("x",), itersize=2))
+
+        # Assert
+        assert linhas == [{"id": 1}, {"id": 2}, {"id": 3}]
+        assert mock_db_connection.cursor.call_args.kwargs["name"].startswith("stream_")
+        assert mock_cursor.itersize == 2
+        mock_cursor.execute.assert_called_once_with("SELECT id FROM tabela WHERE a = %s", ("x",))
+        mock_cursor.close.assert_called_once()
+        mock_db_connection.rollback.assert_called_once()
+
+    def test_iter_query_consumidor_para_antes(self, repository, mock_db_connection, mock_cursor):
+        """Testa que fechar o gerador no meio libera cursor e transação"""
+        # Arrange
+        mock_cursor.fetchmany.return_value = [(1,), (2,)]
+        linhas = repository.iter_query("SELECT id FROM tabela", itersize=2, tuplas=True)
+
+        # Act
+        primeira = next(linhas)
+        linhas.close()
+
+        # Assert
+        assert primeira == (1,)
+        assert mock_db_connection.cursor.call_args.kwargs["cursor_factory"] is extensions.cursor
+        mock_cursor.close.assert_called_once()
+        mock_db_connection.rollback.assert_called_once()
+
+    def test_stream_query_lotes_e_erro(self, repository, mock_db_connection, mock_cursor):
+        """Testa stream_query em lotes e liberação quando a query falha"""
+        # Arrange
+        mock_cursor.fetchmany.side_effect = [[(1,), (2,)], []]
+
+        # Act
+        with repository.stream_query("SELECT id FROM tabela", itersize=2) as lotes:
+            resultado = list(lotes)
+        mock_cursor.execute.side_effect = psycopg2.Error("syntax error")
+        with pytest.raises(psycopg2.Error), repository.stream_query("SELEC id"):
+            pass
+
+        # Assert
+        assert resultado == [[(1,), (2,)]]
+        assert mock_cursor.close.call_count == 2
+        assert mock_db_connection.rollback.call_count == 2
+
+    def test_unit_of_work_commit_unico(self, repository, mock_db_connection, mock_cursor):
+        """Testa várias operações numa conexão e num commit"""
+        # Act
+        with repository.unit_of_work() as cursor:
+            cursor.execute("UPDATE a SET x = 1")
+            cursor.execute("UPDATE b SET y = 2")
+
+        # Assert
+        assert mock_cursor.execute.call_count == 2
+        mock_db_connection.commit.assert_called_once()
+        mock_db_connection.rollback.assert_not_called()
+        mock_cursor.close.assert_called_once()
+
+    def test_unit_of_work_rollback_em_erro(self, repository, mock_db_connection, mock_cursor):
+        """Testa rollback de toda a unidade quando uma operação falha"""
+        # Act
+        with pytest.raises(psycopg2.Error), repository.unit_of_work() as cursor:
+            cursor.execute("UPDATE a SET x = 1")
+            raise psycopg2.Error("violação de FK")
+
+        # Assert
+        mock_db_connection.commit.assert_not_called()
+        mock_db_connection.rollback.assert_called()
+
+    def test_execute_batch_paginas_e_rowcount(self, repository, mock_db_connection, mock_cursor):
+        """Testa execute_batch somando o rowcount de cada página"""
+        # Arrange
+        mock_cursor.rowcount = 2
+        rows = [(i,) for i in range(5)]
+
+        # Act
+        with patch("app.repositories.base_repository.execute_values") as execute_values:
+            total = repository.execute_batch("UPDATE t SET a = v.a FROM (VALUES %s) v(a)", rows, page_size=2)
+
+        # Assert
+        assert [len(c.args[2]) for c in execute_values.call_args_list] == [2, 2, 1]
+        assert total == 6
+        mock_db_connection.commit.assert_called_once()
+
+    def test_execute_batch_fetch_na_unidade(self, repository, mock_db_connection, mock_cursor):
+        """Testa execute_batch com RETURNING dentro de uma unidade de trabalho"""
+        # Act
+        with (
+            patch("app.repositories.base_repository.execute_values", return_value=[{"id": "1"}, {"id": "2"}]),
+            repository.unit_of_work() as cursor,
+        ):
+            result = repository.execute_batch(
+                "INSERT INTO t (a) VALUES %s RETURNING id", [(1,), (2,)], fetch=True, cursor=cursor
+            )
+
+        # Assert
+        assert result == [{"id": "1"}, {"id": "2"}]
+        mock_db_connection.commit.assert_called_once()
+
+    def test_copy_rows(self, repository, mock_db_connection, mock_cursor):
+        """Testa COPY FROM STDIN com o buffer gerado das linhas"""
+        # Arrange
+        mock_cursor.rowcount = 2
+        copiado = []
+        mock_cursor.copy_expert.side_effect = lambda _query, arquivo: copiado.append(arquivo.read())
+
+        # Act
+        total = repository.copy_rows("tabela", ["a", "b"], [(1, None), ("x\ty", True)])
+
+        # Assert
+        assert total == 2
+        assert copiado == ["1\t\\N\nx\\ty\tt\n"]
+        mock_db_connection.commit.assert_called_once()
+
+    def test_linhas_copy_le_em_blocos(self):
+        """Testa que o buffer do COPY é gerado sob demanda, bloco a bloco"""
+        # Arrange
+        linhas = LinhasCopy(("linha", i) for i in range(3))
+
+        # Act
+        blocos = [linhas.read(8) for _ in range(4)]
+
+        # Assert
+        assert "".join(blocos) == "linha\t0\nlinha\t1\nlinha\t2\n"
+        assert all(len(bloco) <= 8 for bloco in blocos)
+        assert linhas.read(8) == ""
+
     def test_execute_one_success(self, repository, mock_db_connection, mock_cursor):
         """Testa execute_one retornando um registro"""
         # Arrange
@@ -322,3 +486,111 @@ class TestBaseRepository:
             repository.execute_scalar("SELECT nonexistent FROM tabela")
 
         assert "does not exist" in str(exc_info.value)
+
+
+class TestNormalizarQuery:
+    """Testes para a normalização de queries do PREPARE"""
+
+    def test_placeholders_viram_parametros_numerados(self):
+        """Testa %s -> $n e %% -> %"""
+        # Act
+        sql, params = normalizar_query("SELECT * FROM t WHERE a = %s AND b LIKE 'x%%' LIMIT %s", ("1", 20))
+
+        # Assert
+        assert sql == "SELECT * FROM t WHERE a = $1 AND b LIKE 'x%' LIMIT $2"
+        assert params == ["1", 20]
+
+    def test_listas_in_viram_um_parametro_array(self):
+        """Testa que o formato não depende da quantidade de valores do filtro"""
+        # Act
+        sql_um, params_um = normalizar_query("SELECT 1 FROM t WHERE a IN (%s) AND b = %s", ("x", 1))
+        sql_tres, params_tres = normalizar_query(
+            "SELECT 1 FROM t WHERE a IN (%s,%s,%s) AND b = %s", ("x", "y", 'z"', 1)
+        )
+
+        # Assert
+        assert sql_um == sql_tres == "SELECT 1 FROM t WHERE a = ANY($1) AND b = $2"
+        assert params_um == ['{"x"}', 1]
+        assert params_tres == ['{"x","y","z\\""}', 1]
+
+    def test_not_in_e_join(self):
+        """Testa NOT IN -> <> ALL, sem confundir com JOIN ("""
+        # Act
+        sql, _ = normalizar_query("SELECT 1 FROM t LEFT JOIN (SELECT 1) s ON true WHERE a NOT IN (%s)", ("x",))
+
+        # Assert
+        assert sql == "SELECT 1 FROM t LEFT JOIN (SELECT 1) s ON true WHERE a <> ALL($1)"
+
+
+class TestPreparedStatements:
+    """Testes para o registro de prepared statements"""
+
+    @pytest.fixture
+    def registro(self):
+        """Registro isolado do global"""
+        return PreparedStatements()
+
+    def test_prepara_uma_vez_por_conexao(self, registro, mock_connection, mock_cursor):
+        """Testa PREPARE na primeira execução e só EXECUTE nas seguintes"""
+        # Act
+        registro.executar(mock_connection, mock_cursor, "SELECT * FROM t WHERE a IN (%s,%s)", ("x", "y"))
+        registro.executar(mock_connection, mock_cursor, "SELECT * FROM t WHERE a IN (%s)", ("z",))
+
+        # Assert
+        nome = PreparedStatements.nome("SELECT * FROM t WHERE a = ANY($1)")
+        chamadas = [c.args for c in mock_cursor.execute.call_args_list]
+        assert chamadas == [
+            ("SAVEPOINT preparar",),
+            (f"PREPARE {nome} AS SELECT * FROM t WHERE a = ANY($1)",),
+            ("RELEASE SAVEPOINT preparar",),
+            (f"EXECUTE {nome} (%s)", ['{"x","y"}']),
+            (f"EXECUTE {nome} (%s)", ['{"z"}']),
+        ]
+        assert registro.metricas() == {
+            "formatos": 1,
+            "prepares": 1,
+            "executes": 2,
+            "execucoes_diretas": 0,
+            "nao_preparaveis": 0,
+        }
+
+    def test_prepara_em_cada_conexao(self, registro, mock_cursor):
+        """Testa que o statement é preparado em cada conexão do pool"""
+        # Act
+        for conexao in (MagicMock(), MagicMock()):
+            registro.executar(conexao, mock_cursor, "SELECT 1", None)
+
+        # Assert
+        assert registro.metricas()["formatos"] == 1
+        assert registro.metricas()["prepares"] == 2
+        mock_cursor.execute.assert_called_with(f"EXECUTE {PreparedStatements.nome('SELECT 1')}")
+
+    def test_query_nao_preparavel_executa_direto(self, registro, mock_connection, mock_cursor):
+        """Testa fallback quando o Postgres não infere o tipo de um parâmetro, sem desfazer a transação"""
+        # Arrange
+        erro = psycopg2.Error("could not determine data type of parameter $1")
+        mock_cursor.execute.side_effect = [None, erro, None, None, None]
+
+        # Act
+        registro.executar(mock_connection, mock_cursor, "SELECT %s", ("x",))
+        registro.executar(mock_connection, mock_cursor, "SELECT %s", ("y",))
+
+        # Assert
+        mock_connection.rollback.assert_not_called()
+        assert mock_cursor.execute.call_args_list[2].args == ("ROLLBACK TO SAVEPOINT preparar",)
+        mock_cursor.execute.assert_called_with("SELECT %s", ("y",))
+        assert registro.metricas()["nao_preparaveis"] == 1
+        assert registro.metricas()["execucoes_diretas"] == 2
+
+    def test_execute_query_usa_registro(self, mock_db_connection, mock_cursor):
+        """Testa BaseRepository com DB_PREPARED_STATEMENTS ligado"""
+        # Arrange
+        mock_cursor.fetchall.return_value = [{"id": "1"}]
+
+        # Act
+        with patch("app.repositories.base_repository.settings.DB_PREPARED_STATEMENTS", True):
+            result = BaseRepository().execute_query("SELECT * FROM tabela WHERE id = %s", ("1",))
+
+        # Assert
+        assert result == [{"id": "1"}]
+        assert mock_cursor.execute.call_args.args[0].startswith("EXECUTE ps_")
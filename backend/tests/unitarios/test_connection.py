@@ -0,0 +1,242 @@
+"""
+Testes unitários para DatabaseConnection (pool por worker)
+"""
+
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from psycopg2 import extensions
+
+from app.database.connection import DatabaseConnection, contexto_sem_escopo, pool_size, request_connection
+
+
+class TestPoolSize:
+    """Testes para o dimensionamento do pool por worker"""
+
+    def test_divide_conexoes_entre_workers(self):
+        """Testa (max_connections - reservadas) / workers"""
+        assert pool_size(100, workers=8, reserved=10, minconn=2, maxconn=20) == 11
+
+    def test_limitado_pelo_maximo(self):
+        """Testa teto DB_POOL_MAX com poucos workers"""
+        assert pool_size(100, workers=1, reserved=10, minconn=2, maxconn=10) == 10
+
+    def test_nunca_abaixo_do_minimo(self):
+        """Testa piso minconn com muitos workers"""
+        assert pool_size(100, workers=64, reserved=10, minconn=2, maxconn=10) == 2
+
+
+class TestDatabaseConnection:
+    """Testes para o ciclo de vida do pool"""
+
+    @pytest.fixture(autouse=True)
+    def estado_isolado(self):
+        """Preserva o estado de classe do DatabaseConnection entre os testes"""
+        atributos = ("_pool", "_pid", "_em_uso", "_livre")
+        estado = {nome: getattr(DatabaseConnection, nome) for nome in atributos}
+        DatabaseConnection._reset_after_fork()
+        yield
+        for nome, valor in estado.items():
+            setattr(DatabaseConnection, nome, valor)
+
+    @pytest.fixture
+    def pool_factory(self):
+        """ThreadedConnectionPool mockado (um pool novo por chamada)"""
+        with (
+            patch(
+                "app.database.connection.pool.ThreadedConnectionPool", side_effect=lambda *_args, **_kwargs: MagicMock()
+            ) as factory,
+            patch.object(DatabaseConnection, "_max_por_worker", return_value=10),
+        ):
+            yield factory
+
+    def test_init_pool_por_processo(self, pool_factory):
+        """Testa que init_pool cria o pool uma vez por processo"""
+        # Act
+        DatabaseConnection.init_pool()
+        DatabaseConnection.init_pool()
+
+        # Assert
+        assert pool_factory.call_count == 1
+        assert pool_factory.call_args.args[:2] == (2, 10)
+
+    def test_pool_herdado_via_fork_e_recriado(self, pool_factory):
+        """Testa que o filho não reutiliza nem fecha o pool do pai"""
+        # Arrange
+        DatabaseConnection.init_pool()
+        pool_pai = DatabaseConnection._pool
+
+        # Act
+        with patch("app.database.connection.os.getpid", return_value=-1), DatabaseConnection.get_connection():
+            pass
+
+        # Assert
+        assert pool_factory.call_count == 2
+        assert DatabaseConnection._pool is not pool_pai
+        pool_pai.closeall.assert_not_called()
+
+    def test_close_all_drena_conexoes_em_uso(self, pool_factory):
+        """Testa que close_all aguarda a conexão em uso voltar ao pool"""
+        # Arrange
+        DatabaseConnection.init_pool()
+        pool_atual = DatabaseConnection._pool
+        em_uso = threading.Event()
+
+        def requisicao():
+            with DatabaseConnection.get_connection():
+                em_uso.set()
+                time.sleep(0.2)
+
+        thread = threading.Thread(target=requisicao)
+        thread.start()
+        em_uso.wait(timeout=5)
+
+        # Act
+        DatabaseConnection.close_all(timeout=5)
+
+        # Assert
+        thread.join()
+        pool_atual.putconn.assert_called_once()
+        pool_atual.closeall.assert_called_once()
+        assert DatabaseConnection._pool is None
+
+    def test_close_all_respeita_timeout(self, pool_factory):
+        """Testa fechamento forçado quando a drenagem excede o timeout"""
+        # Arrange
+        DatabaseConnection.init_pool()
+        pool_atual = DatabaseConnection._pool
+        DatabaseConnection._em_uso = 1
+
+        # Act
+        DatabaseConnection.close_all(timeout=0.05)
+
+        # Assert
+        pool_atual.closeall.assert_called_once()
+
+
+class TestRequestScope:
+    """Testes para a conexão por requisição (request_scope)"""
+
+    @pytest.fixture
+    def pool_atual(self):
+        """Pool mockado no estado de classe do DatabaseConnection"""
+        atributos = ("_pool", "_pid", "_em_uso", "_livre")
+        estado = {nome: getattr(DatabaseConnection, nome) for nome in atributos}
+        DatabaseConnection._reset_after_fork()
+        DatabaseConnection._pool = MagicMock()
+        DatabaseConnection._pid = os.getpid()
+        DatabaseConnection.reset_metricas()
+        yield DatabaseConnection._pool
+        DatabaseConnection.reset_metricas()
+        for nome, valor in estado.items():
+            setattr(DatabaseConnection, nome, valor)
+
+    def test_um_checkout_e_um_snapshot(self, pool_atual):
+        """Testa várias consultas com uma conexão em REPEATABLE READ READ ONLY"""
+        # Act
+        with DatabaseConnection.request_scope():
+            for _ in range(3):
+                with DatabaseConnection.get_connection() as conn:
+                    conn.cursor().execute("SELECT 1")
+
+        # Assert
+        pool_atual.getconn.assert_called_once()
+        conn.set_session.assert_any_call(isolation_level=extensions.ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+        conn.set_session.assert_called_with(isolation_level="DEFAULT", readonly="DEFAULT")
+        conn.rollback.assert_called_once()
+        pool_atual.putconn.assert_called_once_with(conn, close=False)
+        assert DatabaseConnection.metricas() == {
+            "checkouts": 1,
+            "requisicoes": 1,
+            "checkouts_por_requisicao": 1.0,
+            "consultas_por_requisicao": 3.0,
+            "em_uso": 0,
+            "leituras_replica_no_primario": 0,
+            "replicas": [],
+        }
+
+    def test_sem_consultas_nao_faz_checkout(self, pool_atual):
+        """Testa o checkout lazy: requisição sem consultas não retira conexão"""
+        # Act
+        with DatabaseConnection.request_scope():
+            pass
+
+        # Assert
+        pool_atual.getconn.assert_not_called()
+        assert DatabaseConnection.metricas()["checkouts_por_requisicao"] == 0
+
+    def test_conexao_quebrada_descartada(self, pool_atual):
+        """Testa que a conexão é fechada se o reset ao final falhar"""
+        # Arrange
+        conn = pool_atual.getconn.return_value
+        conn.rollback.side_effect = extensions.QueryCanceledError("conexão perdida")
+
+        # Act
+        with DatabaseConnection.request_scope(), DatabaseConnection.get_connection():
+            pass
+
+        # Assert
+        pool_atual.putconn.assert_called_once_with(conn, close=True)
+        assert DatabaseConnection._em_uso == 0
+
+    def test_escopo_aninhado_reaproveitado(self, pool_atual):
+        """Testa que um escopo aninhado (sub-requisições do batch) usa a conexão do externo"""
+        # Act
+        with DatabaseConnection.request_scope() as externo:
+            with DatabaseConnection.get_connection():
+                pass
+            with DatabaseConnection.request_scope() as interno, DatabaseConnection.get_connection():
+                pass
+
+        # Assert
+        assert interno is externo
+        pool_atual.getconn.assert_called_once()
+        assert DatabaseConnection.metricas()["requisicoes"] == 1
+        assert DatabaseConnection.metricas()["consultas_por_requisicao"] == 2.0
+
+    def test_contexto_sem_escopo(self, pool_atual):
+        """Testa a cópia do contexto sem a conexão da requisição"""
+        # Act
+        with DatabaseConnection.request_scope():
+            resultado = contexto_sem_escopo().run(DatabaseConnection.em_escopo)
+
+        # Assert
+        assert resultado is False
+
+    def test_valor_lido_uma_vez_por_requisicao(self, pool_atual):
+        """Testa valor_da_requisicao: uma leitura por escopo, a cada uso fora dele"""
+        # Arrange
+        carregar = MagicMock(side_effect=[7, 8, 9])
+
+        # Act
+        with DatabaseConnection.request_scope():
+            dentro = [DatabaseConnection.valor_da_requisicao("versao", carregar) for _ in range(3)]
+        fora = [DatabaseConnection.valor_da_requisicao("versao", carregar) for _ in range(2)]
+
+        # Assert
+        assert dentro == [7, 7, 7]
+        assert fora == [8, 9]
+
+    def test_dependency_so_em_leituras(self, pool_atual):
+        """Testa request_connection: escopo em GET, checkout por operação nas escritas"""
+        # Arrange
+        app = FastAPI(dependencies=[Depends(request_connection)])
+
+        @app.get("/")
+        @app.post("/")
+        async def rota():
+            return {"escopo": DatabaseConnection.em_escopo()}
+
+        # Act
+        cliente = TestClient(app)
+        leitura = cliente.get("/").json()
+        escrita = cliente.post("/").json()
+
+        # Assert
+        assert leitura == {"escopo": True}
+        assert escrita == {"escopo": False}
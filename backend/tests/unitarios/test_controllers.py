@@ -2,11 +2,14 @@
 Testes unitários para Controllers
 """
 
+import asyncio
+from unittest.mock import patch
 from uuid import UUID
 
 import pytest
 from fastapi.testclient import TestClient
 
+from app.database.connection import DatabaseConnection
 from app.main import app
 from tests.conftest import AREA_ID, CARGO_ID, EMPRESA_ID, FUNCIONARIO_ID
 
@@ -409,6 +412,34 @@ class TestFuncionarioController:
         assert len(data["areas"]) == 1
         assert data["areas"][0]["nome"] == "AWS"
 
+    def test_obter_facetas(self, client, mock_db_connection, mock_cursor):
+        """Testa GET /api/v1/funcionarios/facets"""
+        # Arrange
+        mock_cursor.fetchall.return_value = [
+            {"faceta": "cargo", "id": str(CARGO_ID), "nome": "DevOps Engineer", "total": 7},
+            {"faceta": "total", "id": None, "nome": None, "total": 7},
+        ]
+
+        # Act
+        response = client.get(f"/api/v1/funcionarios/facets?empresa_id={EMPRESA_ID}&enps_status=neutro")
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 7
+        assert data["cargos"] == [{"id": str(CARGO_ID), "nome": "DevOps Engineer", "total": 7}]
+        assert data["areas"] == []
+        mock_cursor.execute.assert_called_once()
+
+    def test_obter_metricas_indice(self, client):
+        """Testa GET /api/v1/funcionarios/employee-index-metrics (antes da rota /{funcionario_id})"""
+        # Act
+        response = client.get("/api/v1/funcionarios/employee-index-metrics")
+
+        # Assert
+        assert response.status_code == 200
+        assert {"carregado", "versao", "usos", "fallbacks"} <= response.json().keys()
+
     def test_pagination_validation(self, client, mock_db_connection, mock_cursor):
         """Testa validação de paginação"""
         # Arrange
@@ -429,6 +460,152 @@ class TestFuncionarioController:
         # Assert
         assert response.status_code == 422  # Validation error
 
+    def test_criar_funcionarios_lote(self, client, mock_db_connection, mock_cursor, funcionario_data):
+        """Testa POST /api/v1/funcionarios/lote"""
+        # Arrange
+        lote = {"funcionarios": [funcionario_data, {**funcionario_data, "email": "outro@email.com"}]}
+
+        # Act
+        with patch("app.repositories.base_repository.execute_values", return_value=[{"id": "id-1"}, {"id": "id-2"}]):
+            response = client.post("/api/v1/funcionarios/lote", json=lote)
+
+        # Assert
+        assert response.status_code == 201
+        assert response.json()["ids"] == ["id-1", "id-2"]
+        assert response.json()["total"] == 2
+        mock_db_connection.commit.assert_called_once()
+
+    def test_criar_funcionarios_lote_vazio(self, client):
+        """Testa validação de lote vazio"""
+        # Act
+        response = client.post("/api/v1/funcionarios/lote", json={"funcionarios": []})
+
+        # Assert
+        assert response.status_code == 422
+
+
+class TestBatchController:
+    """Testes para POST /api/v1/batch"""
+
+    def test_batch_varias_rotas(self, client, mock_db_connection, mock_cursor, empresa_data):
+        """Testa sub-requisições com status e corpo próprios, na ordem do pedido"""
+        # Arrange
+        mock_cursor.fetchall.return_value = [empresa_data]
+        lote = {
+            "requests": [
+                {"id": "empresas", "path": "/api/v1/hierarquia/empresas"},
+                {"id": "inexistente", "path": "/api/v1/nao-existe"},
+                {"path": "/api/v1/funcionarios?empresa_id=invalid-uuid"},
+            ]
+        }
+
+        # Act
+        response = client.post("/api/v1/batch", json=lote)
+
+        # Assert
+        assert response.status_code == 200
+        empresas, inexistente, invalido = response.json()["responses"]
+        assert empresas["id"] == "empresas"
+        assert empresas["status"] == 200
+        assert empresas["body"][0]["nome"] == "CloudServices XYZ"
+        assert inexistente == {
+            "id": "inexistente",
+            "path": "/api/v1/nao-existe",
+            "status": 404,
+            "body": {"detail": "Not Found"},
+        }
+        assert invalido["id"] is None
+        assert invalido["status"] == 422
+
+    def test_batch_escopo_das_sub_requisicoes(self, client, mock_db_connection, empresa_data):
+        """Testa que só as leituras fora do single-flight usam o escopo (snapshot) do batch"""
+        # Arrange
+        escopos = {}
+
+        def empresas(_self):
+            escopos["hierarquia"] = DatabaseConnection.em_escopo()
+            return [empresa_data]
+
+        def enps(_self, *args):
+            escopos["analytics"] = DatabaseConnection.em_escopo()
+            return {"promotores": 0, "neutros": 0, "detratores": 0, "total": 0, "enps_score": 0}
+
+        lote = {"requests": [{"path": "/api/v1/hierarquia/empresas"}, {"path": "/api/v1/analytics/enps"}]}
+
+        # Act
+        with (
+            patch("app.services.hierarquia_service.HierarquiaService.get_all_empresas", empresas),
+            patch("app.services.analytics_service.AnalyticsService.get_enps_distribution", enps),
+        ):
+            response = client.post("/api/v1/batch", json=lote)
+
+        # Assert
+        assert [item["status"] for item in response.json()["responses"]] == [200, 200]
+        assert escopos == {"hierarquia": True, "analytics": False}
+
+    def test_batch_erro_em_uma_sub_requisicao(self, client, mock_db_connection, mock_cursor, empresa_data):
+        """Testa que a falha de uma sub-requisição não afeta as demais"""
+        # Arrange
+        mock_cursor.fetchall.return_value = [empresa_data]
+        lote = {"requests": [{"path": "/api/v1/hierarquia/empresas"}, {"path": "/api/v1/funcionarios/filtros"}]}
+
+        # Act
+        with patch(
+            "app.services.funcionario_service.FuncionarioService.obter_filtros_disponiveis",
+            side_effect=RuntimeError("falha"),
+        ):
+            response = client.post("/api/v1/batch", json=lote)
+
+        # Assert
+        assert response.status_code == 200
+        assert [item["status"] for item in response.json()["responses"]] == [200, 500]
+
+    def test_batch_sub_requisicao_sem_fim(self, client, mock_db_connection, mock_cursor, empresa_data):
+        """Testa que uma resposta que não termina recebe 504 no tempo limite sem travar as demais"""
+        # Arrange
+        mock_cursor.fetchall.return_value = [empresa_data]
+
+        async def eventos(_empresa_id):
+            while True:
+                yield b": ping\n\n"
+                await asyncio.sleep(0.01)
+
+        lote = {"requests": [{"path": "/api/v1/analytics/stream"}, {"path": "/api/v1/hierarquia/empresas"}]}
+
+        # Act
+        with (
+            patch("app.schemas.batch.ROTAS_EXCLUIDAS", ("/api/v1/batch",)),
+            patch("app.controllers.batch_controller.settings.BATCH_SUBREQUEST_TIMEOUT", 0.2),
+            patch("app.controllers.analytics_controller.ouvinte_avaliacoes.eventos", eventos),
+        ):
+            response = client.post("/api/v1/batch", json=lote)
+
+        # Assert
+        stream, empresas = response.json()["responses"]
+        assert stream["status"] == 504
+        assert stream["body"] == {"detail": "Tempo esgotado"}
+        assert empresas["status"] == 200
+
+    @pytest.mark.parametrize(
+        "requests",
+        [
+            [],
+            [{"path": "/health"}],
+            [{"path": "/api/v1/batch"}],
+            [{"path": "/api/v1/analytics/stream?empresa_id=1"}],
+            [{"method": "POST", "path": "/api/v1/funcionarios"}],
+            [{"path": "/api/v1/hierarquia/empresas"}] * 21,
+        ],
+        ids=["vazio", "fora-da-api", "recursivo", "stream", "escrita", "acima-do-limite"],
+    )
+    def test_batch_validacao(self, client, requests):
+        """Testa os limites do batch: só leituras da API e até BATCH_MAX_REQUESTS"""
+        # Act
+        response = client.post("/api/v1/batch", json={"requests": requests})
+
+        # Assert
+        assert response.status_code == 422
+
 
 class TestErrorHandlingControllers:
     """Testes de tratamento de erros e validações HTTP"""
@@ -0,0 +1,349 @@
+"""
+Testes unitários para o pipeline de importação do CSV (leitura, parse, ordem dos commits e checkpoint)
+"""
+
+import io
+import queue
+import threading
+from collections import defaultdict
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+import pytest
+
+from scripts import import_csv
+from scripts.import_csv import (
+    CommitOrdenado,
+    init_worker,
+    load_checkpoint,
+    parse_chunk,
+    read_chunks,
+    read_columns,
+    read_header,
+    skip_to,
+    upsert_names,
+    validate_columns,
+    writer_loop,
+)
+
+
+CABECALHO = (
+    "nome;email;email_corporativo;cargo;genero;geracao;tempo_de_empresa;localidade;"
+    "n0_empresa;n1_diretoria;n2_gerencia;n3_coordenacao;n4_area;Data da Resposta;Feedback;Comentários - Feedback\r\n"
+).encode()
+
+
+def linha(nome, area="TI", comentario="-"):
+    """Registro do CSV (o comentário pode ter aspas e quebras de linha)"""
+    return (
+        f"{nome};{nome}@email.com;{nome}@acme.com;Analista;Feminino;Millennials;1 a 2 anos;Recife;"
+        f"Acme;Diretoria;Gerência;Coordenação;{area};15/03/2024;5;{comentario}\r\n"
+    ).encode()
+
+
+REGISTROS = [
+    linha("ana"),
+    b"\r\n",
+    linha("bruno", comentario='"primeira linha\r\nsegunda; com ""aspas"""'),
+    linha("carla", area="Nova"),
+]
+ENTRADA = CABECALHO + b"".join(REGISTROS)
+
+
+class SemSeek(io.BytesIO):
+    """Stream sem seek (stdin, entrada comprimida)"""
+
+    def seekable(self):
+        return False
+
+
+def abrir(conteudo=ENTRADA):
+    """Entrada posicionada no primeiro registro, como em import_csv_data"""
+    stream = io.BufferedReader(io.BytesIO(conteudo))
+    formato, cabecalho, offset = read_header(stream)
+    return stream, formato, cabecalho, offset
+
+
+def ler_blocos(stream, offset, linha_inicial=2, chunk_size=2):
+    return list(read_chunks(stream, offset, linha_inicial, chunk_size, defaultdict(float)))
+
+
+class TestReadChunks:
+    """Testes para a divisão da entrada em blocos"""
+
+    def test_campo_multilinha_entre_aspas_nao_e_cortado(self):
+        """Testa que a quebra de linha entre aspas não encerra o registro e que linhas vazias são ignoradas"""
+        # Arrange
+        stream, _, _, offset = abrir()
+
+        # Act
+        blocos = ler_blocos(stream, offset)
+
+        # Assert
+        assert [(b["seq"], b["linha_inicial"], b["registros"]) for b in blocos] == [(0, 2, 2), (1, 4, 1)]
+        assert blocos[0]["dados"] == REGISTROS[0] + REGISTROS[2]
+        assert blocos[0]["byte_fim"] == offset + len(b"".join(REGISTROS[:3]))
+        assert blocos[1]["byte_fim"] == len(ENTRADA)
+
+    @pytest.mark.parametrize("tipo_stream", [io.BytesIO, SemSeek])
+    def test_retomada_do_checkpoint(self, tipo_stream):
+        """Testa que retomar de byte_fim/linha do primeiro bloco produz os mesmos blocos seguintes"""
+        # Arrange
+        stream, _, _, offset = abrir()
+        primeiro, segundo = ler_blocos(stream, offset)
+        ultima_linha = primeiro["linha_inicial"] + primeiro["registros"] - 1
+        retomada = tipo_stream(ENTRADA)
+        retomada.read(offset)
+
+        # Act
+        skip_to(retomada, offset, primeiro["byte_fim"])
+        blocos = ler_blocos(retomada, primeiro["byte_fim"], ultima_linha + 1)
+
+        # Assert
+        assert len(blocos) == 1
+        assert blocos[0] | {"seq": segundo["seq"]} == segundo
+
+
+class TestValidacao:
+    """Testes para a validação sem banco (--validate-only)"""
+
+    def test_linhas_do_arquivo_no_relatorio(self):
+        """Testa que os erros apontam a linha física (após linha vazia e campo multilinha) e aceitam data vazia"""
+        # Arrange
+        entrada = (
+            ENTRADA
+            + linha("ana")
+            + linha("dora").replace(b"15/03/2024", b"")
+            + linha("eva").replace(b"15/03/2024", b"31/02/2024")
+        )
+        stream, formato, cabecalho, _ = abrir(entrada)
+
+        # Act
+        colunas, linhas, erros = read_columns(stream, formato, cabecalho)
+        erros += validate_columns(cabecalho, colunas, linhas)
+
+        # Assert
+        assert linhas == [2, 4, 6, 7, 8, 9]
+        assert sorted((e["linha"], e["coluna"], e["erro"]) for e in erros if e["linha"] > 1) == [
+            (7, "email", "email repetido (linha 2)"),
+            (7, "email_corporativo", "email repetido (linha 2)"),
+            (9, "Data da Resposta", "data inválida (esperado DD/MM/AAAA)"),
+        ]
+
+
+@pytest.fixture
+def mapa():
+    """Mapa de chaves com a hierarquia de TI (a área Nova fica fora)"""
+    lookups = {"cargo": "analista", "genero_catgo": "feminino", "geracao_catgo": "millennials"}
+    lookups |= {"tempo_empresa_catgo": "1 a 2 anos", "localidade": "recife"}
+    return {
+        "empresas": {"acme": "E1"},
+        "hierarquias": {("E1", "diretoria", "gerência", "coordenação", "ti"): "A1"},
+        "lookups": {(table, valor): f"id-{table}" for table, valor in lookups.items()},
+        "dimensoes": [("Feedback", "D1")],
+        "anos": {2024},
+    }
+
+
+@pytest.fixture
+def worker(mapa):
+    """Estado do processo de parse (init_worker), limpo ao final"""
+    _, formato, cabecalho, _ = abrir()
+    init_worker(formato, cabecalho, mapa)
+    yield
+    import_csv._worker_state.clear()
+
+
+class TestParseChunk:
+    """Testes para o parse de um bloco"""
+
+    def test_resolve_chaves_no_mapa(self, worker):
+        """Testa as tuplas prontas para inserção e as chaves que ficam para o processo principal"""
+        # Arrange
+        stream, _, _, offset = abrir()
+        bloco = ler_blocos(stream, offset, chunk_size=10)[0]
+
+        # Act
+        resultado = parse_chunk(bloco)
+
+        # Assert
+        ana, bruno, carla = resultado["registros"]
+        assert [r["linha"] for r in resultado["registros"]] == [2, 3, 4]
+        assert ana["funcionario"][1:] == (
+            "ana",
+            "ana@email.com",
+            "ana@acme.com",
+            "A1",
+            "id-cargo",
+            "id-genero_catgo",
+            "id-geracao_catgo",
+            "id-tempo_empresa_catgo",
+            "id-localidade",
+        )
+        assert ana["avaliacao"][1:] == (ana["funcionario"][0], "2024-03-15", None)
+        assert [r[2:] for r in ana["respostas"]] == [("2024-03-15", "D1", 5, None)]
+        assert bruno["respostas"][0][5] == 'primeira linha\r\nsegunda; com "aspas"'
+        assert carla["funcionario"] is None
+        assert list(resultado["chaves"]["caminhos"]) == [("acme", "diretoria", "gerência", "coordenação", "nova")]
+        assert resultado["anos"] == {2024}
+        assert resultado["erros"] == []
+
+
+class TestUpsertNames:
+    """Testes para o upsert set-based das tabelas de nomes"""
+
+    def test_rebusca_chaves_de_importacao_concorrente(self, mock_cursor):
+        """Testa que chaves inseridas por outra transação no meio da instrução são buscadas de novo"""
+        # Arrange
+        valores = {("D1", "ti"): "TI", ("D1", "rh"): "RH"}
+        mock_cursor.fetchall.side_effect = [[("G1", "D1", "ti")], [("G2", "D1", "rh")]]
+
+        # Act
+        ids = upsert_names(mock_cursor, "gerencia", "nome_gerencia", valores, "id_diretoria")
+
+        # Assert
+        assert ids == {("D1", "ti"): "G1", ("D1", "rh"): "G2"}
+        assert mock_cursor.execute.call_count == 2
+        assert mock_cursor.execute.call_args[0][1] == (["D1"], ["rh"], ["RH"])
+
+    def test_chave_sem_resolucao(self, mock_cursor):
+        """Testa que uma rodada sem nenhuma chave resolvida interrompe em vez de repetir para sempre"""
+        # Act / Assert
+        with pytest.raises(RuntimeError, match="cargo"):
+            upsert_names(mock_cursor, "cargo", "nome_cargo", {(None, "analista"): "Analista"})
+
+
+class TestCommitOrdenado:
+    """Testes para a serialização dos commits na ordem dos blocos"""
+
+    def test_commits_na_ordem_dos_blocos(self):
+        """Testa que blocos prontos fora de ordem fazem commit na ordem do arquivo"""
+        # Arrange
+        ordem = CommitOrdenado()
+        commits = []
+
+        def gravar(seq):
+            ordem.iniciar(seq, seq)
+            ordem.aguardar(seq)
+            commits.append(seq)
+            ordem.liberar(seq)
+
+        # Act
+        threads = [threading.Thread(target=gravar, args=(seq,)) for seq in (2, 1, 0)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        # Assert
+        assert commits == [0, 1, 2]
+        assert ordem.gravando == {}
+
+    def test_desiste_quando_bloqueia_bloco_anterior(self):
+        """Testa que o bloco desiste da vez quando segura um lock esperado por um bloco anterior"""
+        # Arrange
+        ordem = CommitOrdenado()
+        ordem.iniciar(0, 100)
+        ordem.iniciar(1, 200)
+        bloqueando = MagicMock(return_value=True)
+
+        # Act
+        resultado = ordem.aguardar(1, bloqueando)
+
+        # Assert
+        assert resultado is False
+        bloqueando.assert_called_once_with([100])
+
+
+class TestCheckpoint:
+    """Testes para o checkpoint da importação"""
+
+    def test_checkpoint_existente(self, mock_cursor):
+        """Testa a retomada do offset gravado"""
+        # Arrange
+        mock_cursor.fetchone.return_value = (4096, 120, None)
+
+        # Act
+        resultado = load_checkpoint(mock_cursor, "hash", "dados.csv", 300)
+
+        # Assert
+        assert resultado == (4096, 120, None)
+        assert mock_cursor.execute.call_count == 1
+
+    def test_restart_recomeca_do_cabecalho(self, mock_cursor):
+        """Testa que --restart descarta o checkpoint e recomeça no primeiro registro"""
+        # Act
+        resultado = load_checkpoint(mock_cursor, "hash", "dados.csv", 300, restart=True)
+
+        # Assert
+        assert resultado == (300, 1, None)
+        assert "DELETE FROM importacao_checkpoint" in mock_cursor.execute.call_args_list[0][0][0]
+        assert mock_cursor.execute.call_args_list[2][0][1] == ("hash", "dados.csv", 300)
+
+
+BLOCO = {
+    "seq": 0,
+    "linha_inicial": 2,
+    "linhas": 2,
+    "byte_fim": 900,
+    "registros": [{"linha": 2, "email": "ana@email.com"}, {"linha": 3, "email": "bruno@email.com"}],
+}
+
+
+def executar_writer(conn, bloco):
+    """Roda writer_loop sobre um único bloco"""
+    fila = queue.Queue()
+    fila.put(bloco)
+    fila.put(None)
+    ordem = CommitOrdenado()
+    stats = defaultdict(int)
+    writer_loop(conn, fila, "hash", ordem, False, stats, defaultdict(float), threading.Lock())
+    return ordem, stats
+
+
+def sql_executado(cursor):
+    return [c[0][0].strip() for c in cursor.execute.call_args_list]
+
+
+class TestWriterLoop:
+    """Testes para a gravação dos blocos e o avanço do checkpoint"""
+
+    @patch("scripts.import_csv.write_chunk")
+    def test_erro_nos_dados_descarta_so_a_linha(self, write_chunk, mock_connection, mock_cursor):
+        """Testa que o bloco com erro é refeito linha a linha e o checkpoint avança com as linhas válidas"""
+        # Arrange
+        write_chunk.side_effect = [
+            psycopg2.DataError("valor inválido"),
+            {"funcionarios": 1, "avaliacoes": 1},
+            psycopg2.DataError("valor inválido"),
+        ]
+
+        # Act
+        ordem, stats = executar_writer(mock_connection, BLOCO)
+
+        # Assert
+        sql = sql_executado(mock_cursor)
+        assert sql.count("SAVEPOINT linha") == 2
+        assert sql.count("ROLLBACK TO SAVEPOINT linha") == 1
+        assert mock_cursor.execute.call_args_list[-1][0][1] == (900, 3, "hash")
+        mock_connection.commit.assert_called_once()
+        assert (stats["funcionarios"], stats["erros"], stats["processadas"]) == (1, 1, 2)
+        assert ordem.interrompido is False
+
+    @patch("scripts.import_csv.write_chunk")
+    def test_falha_de_conexao_nao_avanca_checkpoint(self, write_chunk, mock_connection, mock_cursor):
+        """Testa que uma falha fora dos dados interrompe a importação sem gravar o checkpoint"""
+        # Arrange
+        write_chunk.side_effect = psycopg2.OperationalError("server closed the connection")
+        mock_connection.rollback.side_effect = [psycopg2.InterfaceError("connection already closed"), None]
+        mock_connection.closed = 0
+
+        # Act
+        ordem, stats = executar_writer(mock_connection, BLOCO)
+
+        # Assert
+        assert not any("importacao_checkpoint" in sql for sql in sql_executado(mock_cursor))
+        mock_connection.commit.assert_not_called()
+        assert ordem.interrompido is True
+        assert ordem.proximo == 1
+        assert stats["processadas"] == 0
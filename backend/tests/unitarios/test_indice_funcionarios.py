@@ -0,0 +1,205 @@
+"""
+Testes unitários para o índice em memória da listagem de funcionários
+"""
+
+from unittest.mock import MagicMock, patch
+from uuid import UUID
+
+import pytest
+
+from app.repositories.indice_funcionarios import CacheIndice, IndiceFuncionarios, bitmap, posicoes_ligadas
+
+
+EMPRESA, OUTRA_EMPRESA = "e1", "e2"
+COMERCIAL, TI = "a1", "a2"
+ANALISTA, GERENTE = "c1", "c2"
+IDS = [str(UUID(int=i + 1)) for i in range(4)]
+
+CATEGORIAS = [
+    ("cargo", ANALISTA, "Analista"),
+    ("area", COMERCIAL, "Comercial"),
+    ("cargo", GERENTE, "Gerente"),
+    ("localidade", "l1", "Recife"),
+    ("area", TI, "TI"),
+    ("tempo_casa", "t1", "entre 1 e 2 anos"),
+]
+
+# (id, empresa, área, cargo, localidade, tempo de casa, score, status eNPS), em ordem de nome
+LINHAS = [
+    (IDS[0], EMPRESA, COMERCIAL, GERENTE, "l1", "t1", 4.5, "promotor"),
+    (IDS[1], EMPRESA, TI, ANALISTA, "l1", "t1", 3.0, "detrator"),
+    (IDS[2], OUTRA_EMPRESA, COMERCIAL, ANALISTA, "l1", None, None, None),
+    (IDS[3], EMPRESA, TI, GERENTE, "l1", "t1", 4.5, "neutro"),
+]
+
+
+@pytest.fixture
+def indice():
+    """Índice com quatro funcionários"""
+    return IndiceFuncionarios(7, CATEGORIAS, LINHAS)
+
+
+class TestBitmaps:
+    """Testes para bitmap e posicoes_ligadas"""
+
+    def test_posicoes_em_blocos_diferentes(self):
+        """Testa a paginação de posições que atravessa blocos (blocos sem a página são pulados)"""
+        # Arrange
+        bits = bitmap([0, 5000, 9000], 10000)
+
+        # Act
+        crescente = posicoes_ligadas(bits, 1, 2)
+        decrescente = posicoes_ligadas(bits, 0, 2, decrescente=True)
+
+        # Assert
+        assert bits.bit_count() == 3
+        assert crescente == [5000, 9000]
+        assert decrescente == [9000, 5000]
+
+
+class TestIndiceFuncionarios:
+    """Testes para IndiceFuncionarios"""
+
+    def test_filtros_e_contagem(self, indice):
+        """Testa a interseção dos filtros (união dos valores de cada filtro) e a contagem"""
+        # Act
+        por_area = indice.filtrar(indice.mascaras(areas=[COMERCIAL]))
+        combinados = indice.filtrar(indice.mascaras(empresa_id=EMPRESA, areas=[COMERCIAL, TI], score_min=4.0))
+        enps = indice.filtrar(indice.mascaras(enps_status="detrator"))
+
+        # Assert
+        assert indice.total == 4
+        assert por_area.bit_count() == 2
+        assert indice.pagina(combinados, "nome", "asc", 0, 10) == [IDS[0], IDS[3]]
+        assert indice.pagina(enps, "nome", "asc", 0, 10) == [IDS[1]]
+
+    @pytest.mark.parametrize(
+        "order_by,order_dir,esperado",
+        [
+            ("nome", "asc", [1, 2]),
+            ("nome", "desc", [2, 1]),
+            ("cargo", "asc", [2, 0]),
+            ("cargo", "desc", [0, 2]),
+            ("score", "asc", [0, 3]),
+            ("score", "desc", [3, 0]),
+            ("tempo", "asc", [1, 3]),
+        ],
+    )
+    def test_paginas_por_ordenacao(self, indice, order_by, order_dir, esperado):
+        """Testa a segunda posição em diante de cada ordenação (grupos na ordem do banco, nulos por último)"""
+        # Act
+        ids = indice.pagina(indice.todos, order_by, order_dir, 1, 2)
+
+        # Assert
+        assert ids == [IDS[posicao] for posicao in esperado]
+
+    def test_facetas_sem_o_proprio_filtro(self, indice):
+        """Testa que cada faceta conta sem o próprio filtro, no formato de get_facetas"""
+        # Act
+        linhas = indice.facetas(indice.mascaras(areas=[COMERCIAL]))
+
+        # Assert
+        contagens = {(linha["faceta"], linha["nome"]): linha["total"] for linha in linhas}
+        assert contagens[("total", None)] == 2
+        assert contagens[("area", "Comercial")] == 2
+        assert contagens[("area", "TI")] == 2
+        assert contagens[("cargo", "Analista")] == 1
+        assert contagens[("enps_status", None)] == 1
+        assert ("tempo_casa", "entre 1 e 2 anos") in contagens
+
+    def test_score_sem_indice(self):
+        """Testa que filtro e ordenação por score ficam com o SQL acima do limite de valores distintos"""
+        # Arrange
+        with patch("app.repositories.indice_funcionarios.MAX_VALORES_SCORE", 1):
+            indice = IndiceFuncionarios(7, CATEGORIAS, LINHAS)
+
+        # Act / Assert
+        assert indice.mascaras(score_max=4.0) is None
+        assert indice.pagina(indice.todos, "score", "asc", 0, 10) is None
+        assert indice.pagina(indice.todos, "nome", "asc", 0, 1) == [IDS[0]]
+
+
+class TestCacheIndice:
+    """Testes para CacheIndice"""
+
+    @patch("app.repositories.indice_funcionarios.threading.Thread")
+    def test_desatualizado_agenda_uma_reconstrucao(self, thread, indice):
+        """Testa o fallback com o índice desatualizado e uma única reconstrução em andamento"""
+        # Arrange
+        cache = CacheIndice()
+        construir = MagicMock(return_value=indice)
+
+        # Act
+        primeiro = cache.obter(7, construir)
+        segundo = cache.obter(7, construir)
+        cache.reconstruir(construir)
+        atual = cache.obter(7, construir)
+
+        # Assert
+        assert primeiro is None and segundo is None
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+        assert atual is indice
+        assert cache.metricas() | {"duracao_ultima_carga": None} == {
+            "carregado": True,
+            "versao": 7,
+            "funcionarios": 4,
+            "score_indexado": True,
+            "usos": 1,
+            "usos_desatualizado": 0,
+            "fallbacks": 2,
+            "reconstrucoes": 1,
+            "erros": 0,
+            "duracao_ultima_carga": None,
+        }
+
+    @patch("app.repositories.indice_funcionarios.threading.Thread")
+    def test_nova_versao_descarta_indice(self, thread, indice):
+        """Testa que, sem tolerância, uma escrita (nova versão) descarta o índice carregado"""
+        # Arrange
+        cache = CacheIndice()
+        cache.reconstruir(lambda: indice)
+
+        # Act
+        resultado = cache.obter(8, lambda: indice)
+
+        # Assert
+        assert resultado is None
+        assert cache.metricas()["carregado"] is False
+        thread.return_value.start.assert_called_once()
+
+    @patch("app.repositories.indice_funcionarios.time.monotonic")
+    @patch("app.repositories.indice_funcionarios.threading.Thread")
+    def test_indice_anterior_dentro_da_tolerancia(self, thread, monotonic, indice):
+        """Testa que o índice anterior serve dentro da tolerância e que as recargas respeitam o intervalo"""
+        # Arrange
+        cache = CacheIndice(tolerancia=10)
+        cache.reconstruir(lambda: indice)
+
+        # Act
+        monotonic.return_value = 100.0
+        anterior = cache.obter(8, lambda: indice)
+        cache.reconstruir(lambda: indice)
+        monotonic.return_value = 105.0
+        ainda_anterior = cache.obter(9, lambda: indice)
+        monotonic.return_value = 115.0
+        expirado = cache.obter(9, lambda: indice)
+
+        # Assert
+        assert anterior is indice and ainda_anterior is indice
+        assert expirado is None
+        assert thread.return_value.start.call_count == 2
+        assert cache.metricas()["carregado"] is True
+        assert (cache.usos_desatualizado, cache.fallbacks) == (2, 1)
+
+    def test_falha_na_carga(self):
+        """Testa que uma falha na carga é contada e libera a próxima reconstrução"""
+        # Arrange
+        cache = CacheIndice()
+
+        # Act
+        cache.reconstruir(MagicMock(side_effect=RuntimeError("conexão perdida")))
+
+        # Assert
+        assert cache.metricas()["erros"] == 1
+        assert cache._construindo is False
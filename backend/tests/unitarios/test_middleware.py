@@ -0,0 +1,228 @@
+"""
+Testes unitários para CompressionMiddleware
+"""
+
+import gzip
+from unittest.mock import patch
+
+import brotli
+import pytest
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+from starlette.concurrency import run_in_threadpool
+
+from app.middleware import CompressionMiddleware, escolher_encoding
+from app.responses import ORJSONResponse
+
+
+PAYLOAD = {"areas": [{"area_nome": f"Área {i}", "score_medio": 5.43} for i in range(200)]}
+
+
+@pytest.fixture
+def middleware_app():
+    """App mínima com o middleware de compressão"""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, cache_size=2)
+
+    @app.get("/grande")
+    async def grande():
+        return ORJSONResponse(PAYLOAD)
+
+    @app.get("/pequeno")
+    async def pequeno():
+        return ORJSONResponse({"ok": True})
+
+    @app.get("/binario")
+    async def binario():
+        return Response(b"\x00" * 2000, media_type="application/octet-stream")
+
+    @app.get("/ja-comprimido")
+    async def ja_comprimido():
+        return PlainTextResponse(gzip.compress(b"a" * 2000), headers={"Content-Encoding": "gzip"})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield b"x" * 1000
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+
+@pytest.fixture
+def middleware(middleware_app):
+    """Instância do middleware registrada na app"""
+    client = TestClient(middleware_app)
+    client.get("/pequeno")  # força a construção da pilha de middlewares
+    stack = middleware_app.middleware_stack
+    while not isinstance(stack, CompressionMiddleware):
+        stack = stack.app
+    return stack
+
+
+def get(app, path, accept_encoding):
+    """GET retornando o corpo bruto (sem a descompressão automática do httpx)"""
+    client = TestClient(app)
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        response.raw = b"".join(response.iter_raw())
+    return response
+
+
+class TestEscolherEncoding:
+    """Testes para a negociação do Accept-Encoding"""
+
+    def test_preferencia_do_servidor_em_empate(self):
+        """Testa zstd > br > gzip com mesmo q-value"""
+        assert escolher_encoding("gzip, br, zstd") == "zstd"
+        assert escolher_encoding("gzip, deflate, br") == "br"
+
+    def test_q_value_maior_vence(self):
+        """Testa q-value explícito do cliente"""
+        assert escolher_encoding("zstd;q=0.5, gzip;q=0.9") == "gzip"
+
+    def test_q_zero_exclui_encoding(self):
+        """Testa encoding recusado com q=0"""
+        assert escolher_encoding("zstd;q=0, br;q=0, gzip") == "gzip"
+
+    def test_curinga(self):
+        """Testa * aceitando qualquer encoding"""
+        assert escolher_encoding("*") == "zstd"
+
+    def test_sem_encoding_suportado(self):
+        """Testa identity / header vazio"""
+        assert escolher_encoding("") is None
+        assert escolher_encoding("identity, deflate") is None
+
+    def test_q_value_invalido(self):
+        """Testa q-value malformado tratado como recusa"""
+        assert escolher_encoding("br;q=abc, gzip") == "gzip"
+
+
+class TestCompressionMiddleware:
+    """Testes para CompressionMiddleware"""
+
+    @pytest.mark.parametrize(
+        ("encoding", "descomprimir"),
+        [
+            ("gzip", gzip.decompress),
+            ("br", brotli.decompress),
+            ("zstd", lambda corpo: zstandard.ZstdDecompressor().decompress(corpo)),
+        ],
+    )
+    def test_comprime_resposta_grande(self, middleware_app, encoding, descomprimir):
+        """Testa compressão com cada encoding suportado"""
+        # Act
+        response = get(middleware_app, "/grande", encoding)
+
+        # Assert
+        assert response.headers["content-encoding"] == encoding
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) == len(response.raw)
+        assert descomprimir(response.raw) == ORJSONResponse(PAYLOAD).body
+
+    def test_resposta_abaixo_do_limite_nao_comprime(self, middleware_app):
+        """Testa minimum_size"""
+        # Act
+        response = get(middleware_app, "/pequeno", "gzip")
+
+        # Assert
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.raw == b'{"ok":true}'
+
+    def test_sem_accept_encoding_nao_comprime(self, middleware_app):
+        """Testa cliente sem suporte a compressão"""
+        # Act
+        response = get(middleware_app, "/grande", "identity")
+
+        # Assert
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.raw == ORJSONResponse(PAYLOAD).body
+
+    def test_tipo_binario_nao_comprime(self, middleware_app):
+        """Testa content-type não compressível"""
+        # Act
+        response = get(middleware_app, "/binario", "gzip")
+
+        # Assert
+        assert "content-encoding" not in response.headers
+        assert "vary" not in response.headers
+        assert len(response.raw) == 2000
+
+    def test_resposta_ja_comprimida_repassada(self, middleware_app):
+        """Testa que Content-Encoding existente não é recomprimido"""
+        # Act
+        response = get(middleware_app, "/ja-comprimido", "br")
+
+        # Assert
+        assert response.headers["content-encoding"] == "gzip"
+
+    def test_streaming_repassado(self, middleware_app):
+        """Testa que respostas em streaming não são bufferizadas"""
+        # Act
+        response = get(middleware_app, "/stream", "gzip")
+
+        # Assert
+        assert "content-encoding" not in response.headers
+        assert response.raw == b"x" * 3000
+
+    def test_corpo_grande_comprimido_no_threadpool(self, middleware_app, middleware):
+        """Testa que corpos a partir de threadpool_min_size não são comprimidos no event loop"""
+        # Arrange
+        middleware.threadpool_min_size = 1000
+
+        # Act
+        with patch("app.middleware.run_in_threadpool", wraps=run_in_threadpool) as threadpool:
+            response = get(middleware_app, "/grande", "zstd")
+            get(middleware_app, "/grande", "br")
+            get(middleware_app, "/grande", "br")
+
+        # Assert
+        assert threadpool.call_count == 2
+        assert zstandard.ZstdDecompressor().decompress(response.raw) == ORJSONResponse(PAYLOAD).body
+
+    def test_corpo_abaixo_do_limite_do_threadpool(self, middleware_app, middleware):
+        """Testa que corpos menores são comprimidos direto no event loop"""
+        # Act
+        with patch("app.middleware.run_in_threadpool") as threadpool:
+            response = get(middleware_app, "/grande", "gzip")
+
+        # Assert
+        threadpool.assert_not_called()
+        assert response.headers["content-encoding"] == "gzip"
+
+    def test_cache_reaproveita_corpo_identico(self, middleware_app, middleware):
+        """Testa que a mesma versão dos dados é comprimida uma única vez"""
+        # Act
+        primeira = get(middleware_app, "/grande", "br")
+        segunda = get(middleware_app, "/grande", "br")
+
+        # Assert
+        assert primeira.raw == segunda.raw
+        assert middleware.cache_misses == 1
+        assert middleware.cache_hits == 1
+
+    def test_cache_separado_por_encoding(self, middleware_app, middleware):
+        """Testa uma entrada de cache por encoding"""
+        # Act
+        get(middleware_app, "/grande", "br")
+        get(middleware_app, "/grande", "gzip")
+
+        # Assert
+        assert middleware.cache_misses == 2
+        assert middleware.cache_hits == 0
+
+    def test_cache_lru_limitado(self, middleware_app, middleware):
+        """Testa descarte da entrada mais antiga ao exceder cache_size"""
+        # Act
+        for encoding in ("br", "gzip", "zstd", "br"):
+            get(middleware_app, "/grande", encoding)
+
+        # Assert
+        assert middleware.cache_misses == 4
+        assert len(middleware._cache) == 2
@@ -0,0 +1,124 @@
+"""
+Testes unitários para o stream de atualizações (LISTEN/NOTIFY → SSE)
+"""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import orjson
+import psycopg2
+import pytest
+
+from app.services.notificacoes import OuvinteAvaliacoes
+from tests.conftest import EMPRESA_ID as EMPRESA_UUID
+
+
+EMPRESA_ID = str(EMPRESA_UUID)
+OUTRA_EMPRESA = "00000000-0000-0000-0000-000000000000"
+
+
+def delta(empresa_id: str = EMPRESA_ID, promotores: int = 1) -> str:
+    """Payload no formato do trigger notificar_respostas_avaliacao"""
+    return orjson.dumps(
+        {
+            "empresa_id": empresa_id,
+            "avaliacoes": 1,
+            "enps": {"promotores": promotores, "neutros": 0, "detratores": 0},
+            "dimensoes": [{"dimensao": "Feedback", "soma": 6, "total_respostas": 1}],
+        }
+    ).decode()
+
+
+@pytest.fixture
+def conexao():
+    """Conexão LISTEN mockada (psycopg2.connect)"""
+    conn = MagicMock(notifies=[])
+    with patch("app.services.notificacoes.psycopg2.connect", return_value=conn) as connect:
+        yield connect
+
+
+@pytest.fixture
+def ouvinte(conexao):
+    """Ouvinte isolado (os testes não registram o descritor mockado no event loop)"""
+    ouvinte = OuvinteAvaliacoes(tamanho_fila=2)
+    yield ouvinte
+    ouvinte._conn = None
+    ouvinte.fechar()
+
+
+class TestOuvinteAvaliacoes:
+    """Testes para OuvinteAvaliacoes"""
+
+    async def test_uma_conexao_para_varios_assinantes(self, ouvinte, conexao):
+        """Testa o fan-out: uma conexão LISTEN, deltas filtrados por empresa"""
+        # Arrange
+        with patch.object(asyncio.get_running_loop(), "add_reader") as add_reader:
+            da_empresa = ouvinte.assinar(EMPRESA_ID)
+            todas = ouvinte.assinar()
+            outra = ouvinte.assinar(OUTRA_EMPRESA)
+
+        # Act
+        ouvinte.distribuir(delta())
+
+        # Assert
+        conexao.assert_called_once()
+        add_reader.assert_called_once()
+        conexao.return_value.cursor.return_value.__enter__.return_value.execute.assert_called_once_with(
+            "LISTEN avaliacoes_delta"
+        )
+        assert da_empresa.get_nowait() == ("delta", delta())
+        assert todas.get_nowait() == ("delta", delta())
+        assert outra.empty()
+
+    async def test_assinante_lento_recebe_resync(self, ouvinte):
+        """Testa que a fila cheia é trocada por um pedido de recarga"""
+        # Arrange
+        with patch.object(asyncio.get_running_loop(), "add_reader"):
+            fila = ouvinte.assinar(EMPRESA_ID)
+
+        # Act
+        for promotores in range(3):
+            ouvinte.distribuir(delta(promotores=promotores))
+
+        # Assert
+        assert fila.get_nowait() == ("resync", "{}")
+        assert fila.empty()
+        assert ouvinte.metricas()["resyncs"] == 1
+
+    async def test_conexao_perdida_reconecta(self, ouvinte, conexao):
+        """Testa resync dos assinantes e reconexão agendada quando a conexão LISTEN cai"""
+        # Arrange
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, "add_reader"):
+            fila = ouvinte.assinar()
+        conexao.return_value.poll.side_effect = psycopg2.OperationalError("server closed the connection")
+
+        # Act
+        with patch.object(loop, "remove_reader") as remove_reader, patch.object(loop, "call_later") as call_later:
+            ouvinte._ler()
+
+        # Assert
+        remove_reader.assert_called_once()
+        conexao.return_value.close.assert_called_once()
+        call_later.assert_called_once()
+        assert fila.get_nowait() == ("resync", "{}")
+        assert ouvinte.metricas()["conectado"] is False
+        assert ouvinte.metricas()["reconexoes"] == 1
+
+    async def test_eventos_sse(self, ouvinte, conexao):
+        """Testa o formato do stream e o fim da assinatura com o cliente"""
+        # Arrange
+        conexao.return_value.notifies = [MagicMock(payload=delta())]
+        with patch.object(asyncio.get_running_loop(), "add_reader"):
+            stream = ouvinte.eventos(EMPRESA_ID)
+            inicio = await anext(stream)
+
+        # Act
+        ouvinte._ler()
+        evento = await anext(stream)
+        await stream.aclose()
+
+        # Assert
+        assert inicio == "retry: 5000\n\n"
+        assert evento == f"event: delta\ndata: {delta()}\n\n"
+        assert ouvinte.metricas()["assinantes"] == 0
@@ -0,0 +1,196 @@
+"""
+Testes unitários para as réplicas de leitura (roteamento, atraso e fallback)
+"""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+import pytest
+
+from app.database.connection import DatabaseConnection
+from app.database.replicas import INTERVALO_ATRASO, FalhaReplica, Replica
+from app.repositories.analytics_repository import AnalyticsRepository
+
+
+DSN = "host=replica-{n} port=5432 dbname=tech_playground user=tech_user"
+
+
+@pytest.fixture
+def pools():
+    """ThreadedConnectionPool mockado: um pool novo (com conexões abertas) por chamada"""
+
+    def novo_pool(*_args, **_kwargs):
+        novo = MagicMock(closed=False)
+        novo.getconn.side_effect = lambda: MagicMock(closed=0)
+        return novo
+
+    with patch("app.database.replicas.pool.ThreadedConnectionPool", side_effect=novo_pool) as factory:
+        yield factory
+
+
+@pytest.fixture
+def replicas(pools):
+    """DatabaseConnection com pool primário mockado e duas réplicas"""
+    atributos = ("_pool", "_pid", "_em_uso", "_livre", "_replicas", "_maxconn")
+    estado = {nome: getattr(DatabaseConnection, nome) for nome in atributos}
+    DatabaseConnection._reset_after_fork()
+    DatabaseConnection._pool = MagicMock()
+    DatabaseConnection._pid = os.getpid()
+    DatabaseConnection._replicas = [Replica(DSN.format(n=1)), Replica(DSN.format(n=2))]
+    DatabaseConnection.reset_metricas()
+    yield DatabaseConnection._replicas
+    DatabaseConnection.reset_metricas()
+    for nome, valor in estado.items():
+        setattr(DatabaseConnection, nome, valor)
+
+
+class TestReplica:
+    """Testes para o estado de uma réplica"""
+
+    def test_pool_aberto_no_primeiro_uso(self, pools):
+        """Testa que criar a réplica não conecta (réplica fora do ar não impede o startup)"""
+        # Arrange
+        replica = Replica(DSN.format(n=1))
+
+        # Act
+        pools.assert_not_called()
+        conn = replica.checkout(1, 5, limite=0)
+
+        # Assert
+        assert replica.nome == "replica-1:5432/tech_playground"
+        assert conn is not None
+        pools.assert_called_once()
+
+    def test_atraso_acima_do_limite(self, pools):
+        """Testa que a réplica atrasada devolve a conexão e sai da seleção"""
+        # Arrange
+        replica = Replica(DSN.format(n=1))
+        replica.pool = MagicMock(closed=False)
+        cursor = replica.pool.getconn.return_value.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = {"atraso": 12.0}
+
+        # Act
+        conn = replica.checkout(1, 5, limite=5)
+
+        # Assert
+        assert conn is None
+        assert replica.atraso == 12.0
+        replica.pool.putconn.assert_called_once()
+        assert replica.dentro_do_atraso(replica._atraso_em, limite=5) is False
+        # Medição desatualizada: a réplica volta a ser candidata e o atraso é medido de novo
+        assert replica.dentro_do_atraso(replica._atraso_em + INTERVALO_ATRASO, limite=5) is True
+
+    def test_falha_descarta_pool(self, pools):
+        """Testa que a falha tira a réplica do rodízio e fecha as conexões antigas"""
+        # Arrange
+        replica = Replica(DSN.format(n=1))
+        conn = replica.checkout(1, 5, limite=0)
+        antigo = replica.pool
+
+        # Act
+        replica.marcar_falha(30, RuntimeError("servidor caiu"))
+        antigo.closed = True
+        replica.devolver(conn)
+
+        # Assert
+        assert replica.pool is None
+        assert replica.disponivel(0) is False
+        antigo.closeall.assert_called_once()
+        conn.close.assert_called_once()
+        antigo.putconn.assert_not_called()
+
+
+class TestRoteamentoLeitura:
+    """Testes para DatabaseConnection.get_read_connection"""
+
+    def test_sem_replicas_usa_primario(self, replicas):
+        """Testa que sem DB_REPLICAS a leitura vai para get_connection"""
+        # Arrange
+        DatabaseConnection._replicas = []
+
+        # Act
+        with DatabaseConnection.get_read_connection() as conn:
+            pass
+
+        # Assert
+        assert conn is DatabaseConnection._pool.getconn.return_value
+
+    def test_menos_ocupada_primeiro(self, replicas):
+        """Testa a seleção least-busy entre as réplicas"""
+        # Arrange
+        replicas[0].em_uso = 3
+
+        # Act
+        with DatabaseConnection.get_read_connection():
+            em_uso = [replica.em_uso for replica in replicas]
+
+        # Assert
+        assert em_uso == [3, 1]
+        assert replicas[1].leituras == 1
+        assert replicas[1].em_uso == 0
+
+    def test_rodizio_nos_empates(self, replicas):
+        """Testa que réplicas igualmente ocupadas se alternam"""
+        # Act
+        for _ in range(4):
+            with DatabaseConnection.get_read_connection():
+                pass
+
+        # Assert
+        assert [replica.leituras for replica in replicas] == [2, 2]
+
+    def test_fallback_para_primario(self, replicas, pools):
+        """Testa leitura no primário quando nenhuma réplica conecta"""
+        # Arrange
+        pools.side_effect = psycopg2.OperationalError("connection refused")
+
+        # Act
+        with DatabaseConnection.get_read_connection() as conn:
+            pass
+
+        # Assert
+        assert conn is DatabaseConnection._pool.getconn.return_value
+        assert all(not replica.disponivel(0) for replica in replicas)
+        assert DatabaseConnection.metricas()["leituras_replica_no_primario"] == 1
+
+    def test_conexao_perdida_lanca_falha_replica(self, replicas):
+        """Testa que a queda da réplica durante a consulta permite repetir a leitura"""
+        # Act
+        with pytest.raises(FalhaReplica), DatabaseConnection.get_read_connection() as conn:
+            conn.closed = 2
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+        # Assert
+        assert sum(replica.falhas for replica in replicas) == 1
+        assert DatabaseConnection._em_uso == 0
+
+    def test_erro_de_consulta_nao_derruba_replica(self, replicas):
+        """Testa que erro com a conexão viva (ex.: statement timeout) não tira a réplica do rodízio"""
+        # Act
+        with pytest.raises(psycopg2.extensions.QueryCanceledError), DatabaseConnection.get_read_connection() as conn:
+            raise psycopg2.extensions.QueryCanceledError("canceling statement due to statement timeout")
+
+        # Assert
+        conn.rollback.assert_called_once()
+        assert all(replica.falhas == 0 for replica in replicas)
+
+    def test_repositorio_repete_leitura(self, replicas):
+        """Testa AnalyticsRepository repetindo a leitura após a queda de uma réplica"""
+        # Arrange
+        chamadas = []
+
+        def executar(conn, cursor, query, params):
+            chamadas.append(conn)
+            if len(chamadas) == 1:
+                conn.closed = 2
+                raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+        # Act
+        with patch.object(AnalyticsRepository, "_execute_read", side_effect=executar):
+            AnalyticsRepository().execute_query("SELECT 1")
+
+        # Assert
+        assert len(chamadas) == 2
+        assert chamadas[0] is not chamadas[1]
+        assert sum(replica.falhas for replica in replicas) == 1
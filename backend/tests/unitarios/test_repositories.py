@@ -2,12 +2,15 @@
 Testes unitários para FuncionarioRepository e HierarquiaRepository
 """
 
+from unittest.mock import patch
 from uuid import UUID
 
 import pytest
 
-from app.repositories.funcionario_repository import FuncionarioRepository
+from app.database.connection import DatabaseConnection
+from app.repositories.funcionario_repository import CacheTotais, FuncionarioRepository
 from app.repositories.hierarquia_repository import HierarquiaRepository
+from app.repositories.indice_funcionarios import IndiceFuncionarios
 from tests.conftest import AREA_ID, CARGO_ID, EMPRESA_ID, FUNCIONARIO_ID
 
 
@@ -28,13 +31,102 @@ class TestFuncionarioRepository:
         mock_cursor.fetchall.return_value = fake_funcionarios_list
 
         # Act
-        result, total = repository.get_funcionarios_paginado(empresa_id=EMPRESA_ID, page=1, page_size=10)
+        result, total, total_exato = repository.get_funcionarios_paginado(empresa_id=EMPRESA_ID, page=1, page_size=10)
 
         # Assert
         assert total == 5
+        assert total_exato is True
         assert len(result) == 5
         assert mock_cursor.execute.call_count == 2  # COUNT + SELECT
 
+    def test_get_funcionarios_paginado_total_em_cache(self, repository, mock_db_connection, mock_cursor):
+        """Testa a estratégia cached: páginas seguintes dos mesmos filtros não contam de novo"""
+        # Arrange
+        mock_cursor.fetchone.return_value = {"count": 5}  # versão dos dados e COUNT
+
+        # Act
+        with (
+            patch("app.repositories.funcionario_repository.settings.FUNCIONARIO_COUNT_STRATEGY", "cached"),
+            patch("app.repositories.funcionario_repository.totais_listagem", CacheTotais(8)) as totais,
+        ):
+            repository.get_funcionarios_paginado(empresa_id=EMPRESA_ID, page=1, page_size=2)
+            _, total, total_exato = repository.get_funcionarios_paginado(
+                empresa_id=EMPRESA_ID, page=2, page_size=2, order_by="cargo"
+            )
+
+        # Assert
+        assert (total, total_exato) == (5, True)
+        contagens = [call for call in mock_cursor.execute.call_args_list if "COUNT(*)\n" in call.args[0]]
+        assert len(contagens) == 1
+        assert mock_cursor.execute.call_count == 5  # versão + COUNT + SELECT, versão + SELECT
+        assert totais.metricas() | {"estrategia": None} == {
+            "estrategia": None,
+            "entradas": 1,
+            "acertos": 1,
+            "faltas": 1,
+            "estimativas": 0,
+        }
+
+    def test_get_funcionarios_paginado_total_por_filtros(self, repository, mock_db_connection, mock_cursor):
+        """Testa que a chave do total são os filtros normalizados (mesma seleção em outra ordem)"""
+        # Arrange
+        outra_area = UUID("00000000-0000-0000-0000-0000000000aa")
+        mock_cursor.fetchone.return_value = {"count": 3}
+
+        # Act
+        with (
+            patch("app.repositories.funcionario_repository.settings.FUNCIONARIO_COUNT_STRATEGY", "cached"),
+            patch("app.repositories.funcionario_repository.totais_listagem", CacheTotais(8)) as totais,
+            DatabaseConnection.request_scope(),
+        ):
+            repository.get_funcionarios_paginado(empresa_id=None, page=1, page_size=2, areas=[AREA_ID, outra_area])
+            repository.get_funcionarios_paginado(empresa_id=None, page=2, page_size=2, areas=[outra_area, AREA_ID])
+
+        # Assert
+        queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        assert sum("COUNT(*)\n" in query for query in queries) == 1
+        assert sum("FROM versao_dados" in query for query in queries) == 1
+        assert (totais.acertos, totais.faltas) == (1, 1)
+
+    def test_get_funcionarios_paginado_total_estimado(self, repository, mock_db_connection, mock_cursor):
+        """Testa a estratégia estimated: resultado grande usa o EXPLAIN no lugar do COUNT"""
+        # Arrange
+        mock_cursor.fetchone.side_effect = [{"count": 1}, ([{"Plan": {"Plan Rows": 50000}}],)]
+
+        # Act
+        with (
+            patch("app.repositories.funcionario_repository.settings.FUNCIONARIO_COUNT_STRATEGY", "estimated"),
+            patch("app.repositories.funcionario_repository.totais_listagem", CacheTotais(8)),
+        ):
+            _, total, total_exato = repository.get_funcionarios_paginado(
+                empresa_id=None, page=1, page_size=20, areas=[AREA_ID]
+            )
+
+        # Assert
+        assert (total, total_exato) == (50000, False)
+        queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        assert queries[1].startswith("EXPLAIN (FORMAT JSON) \n            SELECT 1\n")
+        assert not any("COUNT(*)\n" in query for query in queries)
+
+    def test_get_funcionarios_paginado_score_sem_estimativa(self, repository, mock_db_connection, mock_cursor):
+        """Testa que filtros de score e eNPS são sempre contados (o planner não estima o agregado)"""
+        # Arrange
+        mock_cursor.fetchone.return_value = {"count": 7}
+
+        # Act
+        with (
+            patch("app.repositories.funcionario_repository.settings.FUNCIONARIO_COUNT_STRATEGY", "estimated"),
+            patch("app.repositories.funcionario_repository.settings.FUNCIONARIO_COUNT_ESTIMATE_MIN", 0),
+            patch("app.repositories.funcionario_repository.totais_listagem", CacheTotais(8)),
+        ):
+            _, total, total_exato = repository.get_funcionarios_paginado(
+                empresa_id=None, page=1, page_size=20, enps_status="neutro"
+            )
+
+        # Assert
+        assert (total, total_exato) == (7, True)
+        assert not any("EXPLAIN" in call.args[0] for call in mock_cursor.execute.call_args_list)
+
     def test_get_funcionarios_paginado_with_filters(
         self, repository, mock_db_connection, mock_cursor, funcionario_data
     ):
@@ -47,7 +139,7 @@ class TestFuncionarioRepository:
         cargos = [CARGO_ID]
 
         # Act
-        result, total = repository.get_funcionarios_paginado(
+        result, total, total_exato = repository.get_funcionarios_paginado(
             empresa_id=EMPRESA_ID, page=1, page_size=20, areas=areas, cargos=cargos
         )
 
@@ -66,7 +158,7 @@ class TestFuncionarioRepository:
         mock_cursor.fetchall.return_value = []
 
         # Act
-        result, total = repository.get_funcionarios_paginado(empresa_id=EMPRESA_ID, page=1, page_size=10)
+        result, total, total_exato = repository.get_funcionarios_paginado(empresa_id=EMPRESA_ID, page=1, page_size=10)
 
         # Assert
         assert total == 0
@@ -83,7 +175,7 @@ class TestFuncionarioRepository:
         localidade_id = UUID("23ab9902-15a0-417a-9d60-b0bca3d8dde2")
 
         # Act
-        result, total = repository.get_funcionarios_paginado(
+        result, total, total_exato = repository.get_funcionarios_paginado(
             empresa_id=EMPRESA_ID, page=2, page_size=5, areas=[AREA_ID], cargos=[CARGO_ID], localidades=[localidade_id]
         )
 
@@ -98,7 +190,7 @@ class TestFuncionarioRepository:
         mock_cursor.fetchall.return_value = [funcionario_data]
 
         # Act
-        result, total = repository.buscar_funcionarios(
+        result, total, total_exato = repository.buscar_funcionarios(
             empresa_id=EMPRESA_ID, termo_busca="Patricia", page=1, page_size=10
         )
 
@@ -116,7 +208,7 @@ class TestFuncionarioRepository:
         mock_cursor.fetchall.return_value = [funcionario_data]
 
         # Act
-        result, total = repository.buscar_funcionarios(
+        result, total, total_exato = repository.buscar_funcionarios(
             empresa_id=EMPRESA_ID, termo_busca="email.com", page=1, page_size=10
         )
 
@@ -131,7 +223,7 @@ class TestFuncionarioRepository:
         mock_cursor.fetchall.return_value = []
 
         # Act
-        result, total = repository.buscar_funcionarios(
+        result, total, total_exato = repository.buscar_funcionarios(
             empresa_id=EMPRESA_ID, termo_busca="NaoExiste", page=1, page_size=10
         )
 
@@ -237,6 +329,66 @@ class TestFuncionarioRepository:
         mock_cursor.execute.assert_called_once()
         mock_db_connection.commit.assert_called_once()
 
+    def test_criar_funcionarios_em_lote(self, repository, mock_db_connection, mock_cursor, funcionario_data):
+        """Testa criar_funcionarios com um INSERT multi-linha e um commit"""
+        # Arrange
+        lista = [funcionario_data, {**funcionario_data, "email": "outro@email.com"}]
+
+        # Act
+        with patch(
+            "app.repositories.base_repository.execute_values", return_value=[{"id": "id-1"}, {"id": "id-2"}]
+        ) as execute_values:
+            result = repository.criar_funcionarios(lista)
+
+        # Assert
+        assert result == ["id-1", "id-2"]
+        query, rows = execute_values.call_args.args[1:3]
+        assert "VALUES %s" in query
+        assert [row[1] for row in rows] == ["patricia.lima@email.com", "outro@email.com"]
+        assert execute_values.call_args.args[3] == repository.TEMPLATE_INSERT
+        mock_db_connection.commit.assert_called_once()
+
+    def test_get_facetas_uma_consulta(self, repository, mock_db_connection, mock_cursor):
+        """Testa get_facetas: GROUPING SETS em uma query, cada faceta sem o próprio filtro"""
+        # Arrange
+        mock_cursor.fetchall.return_value = [{"faceta": "total", "id": None, "nome": None, "total": 3}]
+
+        # Act
+        result = repository.get_facetas(empresa_id=EMPRESA_ID, areas=[AREA_ID], enps_status="promotor", score_min=4.0)
+
+        # Assert
+        assert result[0]["total"] == 3
+        mock_cursor.execute.assert_called_once()
+        query, params = mock_cursor.execute.call_args.args
+        assert "GROUPING SETS" in query
+        assert "WHEN GROUPING(area) = 0 THEN COUNT(*) FILTER (WHERE ok_cargo AND ok_localidade" in query
+        assert params == (str(AREA_ID), "promotor", str(EMPRESA_ID), 4.0)
+
+    def test_get_funcionarios_paginado_pelo_indice(self, repository, mock_db_connection, mock_cursor, funcionario_data):
+        """Testa a listagem pelo índice em memória: total do índice, só a página vai ao banco"""
+        # Arrange
+        linha = (FUNCIONARIO_ID, EMPRESA_ID, AREA_ID, CARGO_ID, None, None, None, None)
+        indice = IndiceFuncionarios(3, [], [linha])
+        mock_cursor.fetchone.return_value = {"count": 3}
+        mock_cursor.fetchall.return_value = [funcionario_data]
+
+        # Act
+        with (
+            patch("app.repositories.funcionario_repository.settings.FUNCIONARIO_INDEX_ENABLED", True),
+            patch("app.repositories.funcionario_repository.indice_funcionarios.obter", return_value=indice) as obter,
+        ):
+            result, total, total_exato = repository.get_funcionarios_paginado(
+                empresa_id=EMPRESA_ID, page=1, page_size=10, areas=[AREA_ID]
+            )
+
+        # Assert
+        assert (total, total_exato) == (1, True)
+        assert result == [funcionario_data]
+        assert obter.call_args.args[0] == 3
+        query, params = mock_cursor.execute.call_args.args
+        assert "f.id_funcionario = ANY(%s::uuid[])" in query
+        assert params == (f'{{"{FUNCIONARIO_ID}"}}',) * 2
+
 
 class TestHierarquiaRepository:
     """Testes para HierarquiaRepository"""
@@ -0,0 +1,86 @@
+"""
+Testes unitários para serialização JSON (ORJSONResponse) e conversão NUMERIC no cursor
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.database.connection import DEC2FLOAT
+from app.responses import ORJSONResponse
+from app.schemas.schemas import FiltroOpcao
+from tests.conftest import AREA_ID, EMPRESA_ID
+
+
+class TestORJSONResponse:
+    """Testes para ORJSONResponse"""
+
+    def test_serializa_tipos_nativos(self):
+        """Testa UUID, datetime e date serializados como o jsonable_encoder"""
+        # Arrange
+        content = {
+            "id": EMPRESA_ID,
+            "created_at": datetime(2025, 12, 12, 15, 29, 22, 498878),
+            "data_avaliacao": date(2024, 6, 30),
+        }
+
+        # Act
+        body = json.loads(ORJSONResponse(content).body)
+
+        # Assert
+        assert body == {
+            "id": str(EMPRESA_ID),
+            "created_at": "2025-12-12T15:29:22.498878",
+            "data_avaliacao": "2024-06-30",
+        }
+
+    def test_serializa_decimal_como_float(self):
+        """Testa Decimal convertido para float"""
+        # Act
+        body = json.loads(ORJSONResponse({"score_medio": Decimal("5.43")}).body)
+
+        # Assert
+        assert body == {"score_medio": 5.43}
+
+    def test_serializa_modelo_pydantic(self):
+        """Testa fallback para modelos Pydantic"""
+        # Act
+        body = json.loads(ORJSONResponse([FiltroOpcao(id=AREA_ID, nome="Área A")]).body)
+
+        # Assert
+        assert body == [{"id": str(AREA_ID), "nome": "Área A"}]
+
+    def test_tipo_nao_serializavel(self):
+        """Testa erro para tipos desconhecidos"""
+        # Act / Assert
+        with pytest.raises(TypeError):
+            ORJSONResponse({"valor": object()})
+
+    def test_media_type(self):
+        """Testa content-type JSON"""
+        # Act
+        response = ORJSONResponse({"ok": True})
+
+        # Assert
+        assert response.media_type == "application/json"
+        assert response.body == b'{"ok":true}'
+
+
+class TestDecimalCursor:
+    """Testes para o typecaster NUMERIC -> float"""
+
+    def test_numeric_convertido_para_float(self):
+        """Testa conversão do valor textual do NUMERIC"""
+        # Act
+        valor = DEC2FLOAT("5.43", None)
+
+        # Assert
+        assert valor == 5.43
+        assert isinstance(valor, float)
+
+    def test_numeric_nulo(self):
+        """Testa NULL preservado"""
+        # Act / Assert
+        assert DEC2FLOAT(None, None) is None
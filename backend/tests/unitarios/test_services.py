@@ -29,17 +29,18 @@ class TestFuncionarioService:
     def test_listar_funcionarios_success(self, service, mock_repository, fake_funcionarios_list):
         """Testa listar_funcionarios com sucesso"""
         # Arrange
-        mock_repository.get_funcionarios_paginado.return_value = (fake_funcionarios_list, 5)
+        mock_repository.get_funcionarios_paginado.return_value = (fake_funcionarios_list, 5, True)
 
         # Act
         result = service.listar_funcionarios(empresa_id=EMPRESA_ID, page=1, page_size=10)
 
         # Assert
-        assert result.total == 5
-        assert result.page == 1
-        assert result.page_size == 10
-        assert result.total_pages == 1
-        assert len(result.items) == 5
+        assert result["total"] == 5
+        assert result["total_exato"] is True
+        assert result["page"] == 1
+        assert result["page_size"] == 10
+        assert result["total_pages"] == 1
+        assert result["items"] == fake_funcionarios_list  # linhas do repositório sem revalidação
         mock_repository.get_funcionarios_paginado.assert_called_once_with(
             empresa_id=EMPRESA_ID, 
             page=1, 
@@ -58,7 +59,7 @@ class TestFuncionarioService:
     def test_listar_funcionarios_with_filters(self, service, mock_repository, funcionario_data):
         """Testa listar_funcionarios com filtros"""
         # Arrange
-        mock_repository.get_funcionarios_paginado.return_value = ([funcionario_data], 1)
+        mock_repository.get_funcionarios_paginado.return_value = ([funcionario_data], 1, True)
         areas = [AREA_ID]
         cargos = [CARGO_ID]
         localidades = [UUID(int=5)]
@@ -69,8 +70,8 @@ class TestFuncionarioService:
         )
 
         # Assert
-        assert result.total == 1
-        assert len(result.items) == 1
+        assert result["total"] == 1
+        assert len(result["items"]) == 1
         mock_repository.get_funcionarios_paginado.assert_called_once_with(
             empresa_id=EMPRESA_ID, 
             page=1, 
@@ -89,55 +90,55 @@ class TestFuncionarioService:
     def test_listar_funcionarios_empty(self, service, mock_repository):
         """Testa listar_funcionarios sem resultados"""
         # Arrange
-        mock_repository.get_funcionarios_paginado.return_value = ([], 0)
+        mock_repository.get_funcionarios_paginado.return_value = ([], 0, True)
 
         # Act
         result = service.listar_funcionarios(empresa_id=EMPRESA_ID, page=1, page_size=10)
 
         # Assert
-        assert result.total == 0
-        assert result.total_pages == 0
-        assert len(result.items) == 0
+        assert result["total"] == 0
+        assert result["total_pages"] == 0
+        assert len(result["items"]) == 0
 
     def test_listar_funcionarios_pagination_calculation(self, service, mock_repository, fake_funcionarios_list):
         """Testa cálculo de paginação"""
         # Arrange
-        mock_repository.get_funcionarios_paginado.return_value = (fake_funcionarios_list[:3], 23)
+        mock_repository.get_funcionarios_paginado.return_value = (fake_funcionarios_list[:3], 23, True)
 
         # Act
         result = service.listar_funcionarios(empresa_id=EMPRESA_ID, page=2, page_size=10)
 
         # Assert
-        assert result.total == 23
-        assert result.page == 2
-        assert result.page_size == 10
-        assert result.total_pages == 3  # 23 / 10 = 3 páginas
+        assert result["total"] == 23
+        assert result["page"] == 2
+        assert result["page_size"] == 10
+        assert result["total_pages"] == 3  # 23 / 10 = 3 páginas
 
     def test_buscar_funcionarios_success(self, service, mock_repository, funcionario_data):
         """Testa buscar_funcionarios com sucesso"""
         # Arrange
-        mock_repository.buscar_funcionarios.return_value = ([funcionario_data], 1)
+        mock_repository.buscar_funcionarios.return_value = ([funcionario_data], 1, True)
 
         # Act
         result = service.buscar_funcionarios(empresa_id=EMPRESA_ID, termo="Patricia", page=1, page_size=10)
 
         # Assert
-        assert result.total == 1
-        assert len(result.items) == 1
-        assert result.items[0].nome == "Patricia Lima"
+        assert result["total"] == 1
+        assert len(result["items"]) == 1
+        assert result["items"][0]["nome"] == "Patricia Lima"
         mock_repository.buscar_funcionarios.assert_called_once()
 
     def test_buscar_funcionarios_no_results(self, service, mock_repository):
         """Testa buscar_funcionarios sem resultados"""
         # Arrange
-        mock_repository.buscar_funcionarios.return_value = ([], 0)
+        mock_repository.buscar_funcionarios.return_value = ([], 0, True)
 
         # Act
         result = service.buscar_funcionarios(empresa_id=EMPRESA_ID, termo="NaoExiste", page=1, page_size=10)
 
         # Assert
-        assert result.total == 0
-        assert len(result.items) == 0
+        assert result["total"] == 0
+        assert len(result["items"]) == 0
 
     def test_obter_funcionario_found(self, service, mock_repository, funcionario_data):
         """Testa obter_funcionario encontrando funcionário"""
@@ -187,6 +188,25 @@ class TestFuncionarioService:
         assert len(result["localidades"]) == 1
         assert result["areas"][0].nome == "AWS"
 
+    def test_obter_facetas(self, service, mock_repository):
+        """Testa obter_facetas agrupando as linhas do repositório por faceta"""
+        # Arrange
+        mock_repository.get_facetas.return_value = [
+            {"faceta": "area", "id": str(AREA_ID), "nome": "AWS", "total": 4},
+            {"faceta": "enps_status", "id": "promotor", "nome": None, "total": 2},
+            {"faceta": "total", "id": None, "nome": None, "total": 4},
+        ]
+
+        # Act
+        result = service.obter_facetas(EMPRESA_ID, cargos=[CARGO_ID])
+
+        # Assert
+        assert result["total"] == 4
+        assert result["areas"][0].nome == "AWS"
+        assert result["enps_status"][0].nome == "Promotor"
+        assert result["cargos"] == []
+        assert mock_repository.get_facetas.call_args.kwargs["cargos"] == [CARGO_ID]
+
     def test_criar_funcionario_success(self, service, mock_repository):
         """Testa criar_funcionario com sucesso"""
         # Arrange
@@ -217,6 +237,23 @@ class TestFuncionarioService:
         mock_repository.criar_funcionario.assert_called_once()
 
 
+    def test_criar_funcionarios_em_lote(self, service, mock_repository, funcionario_data):
+        """Testa criar_funcionarios repassando o lote ao repositório"""
+        # Arrange
+        from app.schemas.schemas import FuncionarioLoteCreate
+
+        lote = FuncionarioLoteCreate(funcionarios=[funcionario_data, {**funcionario_data, "email": "outro@email.com"}])
+        mock_repository.criar_funcionarios.return_value = ["id-1", "id-2"]
+
+        # Act
+        result = service.criar_funcionarios(lote)
+
+        # Assert
+        assert result == ["id-1", "id-2"]
+        enviados = mock_repository.criar_funcionarios.call_args.args[0]
+        assert [dados["email"] for dados in enviados] == ["patricia.lima@email.com", "outro@email.com"]
+
+
 class TestHierarquiaService:
     """Testes para HierarquiaService"""
 
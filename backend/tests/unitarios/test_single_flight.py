@@ -0,0 +1,204 @@
+"""
+Testes unitários para SingleFlight (coalescência de requisições)
+"""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database.connection import DatabaseConnection
+from app.main import app
+from app.services.analytics_service import AnalyticsService, single_flight
+from app.services.single_flight import SingleFlight
+from tests.conftest import EMPRESA_ID
+
+
+class TestSingleFlight:
+    """Testes para SingleFlight"""
+
+    @pytest.fixture
+    def sf(self):
+        """Instância isolada do SingleFlight"""
+        return SingleFlight()
+
+    @pytest.fixture
+    def liberar(self):
+        """Evento que segura a execução até todas as chamadas chegarem"""
+        evento = threading.Event()
+        yield evento
+        evento.set()
+
+    async def test_chamadas_concorrentes_identicas_executam_uma_vez(self, sf, liberar):
+        """Testa que chamadas com a mesma chave compartilham uma execução"""
+        # Arrange
+        execucoes = []
+
+        def consulta(valor):
+            execucoes.append(valor)
+            liberar.wait(timeout=5)
+            return {"valor": valor}
+
+        # Act
+        tarefas = [asyncio.ensure_future(sf.executar(("consulta", 1), consulta, 1)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        liberar.set()
+        resultados = await asyncio.gather(*tarefas)
+
+        # Assert
+        assert execucoes == [1]
+        assert all(r == {"valor": 1} for r in resultados)
+        assert sf.metricas() == {"chamadas": 5, "execucoes": 1, "coalescidas": 4, "em_andamento": 0}
+
+    async def test_chaves_diferentes_executam_separadamente(self, sf):
+        """Testa que argumentos diferentes não são coalescidos"""
+        # Act
+        resultados = await asyncio.gather(
+            sf.executar(("consulta", 1), lambda v: v * 10, 1),
+            sf.executar(("consulta", 2), lambda v: v * 10, 2),
+        )
+
+        # Assert
+        assert resultados == [10, 20]
+        assert sf.metricas()["execucoes"] == 2
+        assert sf.metricas()["coalescidas"] == 0
+
+    async def test_execucao_fora_do_escopo_da_requisicao(self, sf):
+        """Testa que a execução compartilhada não usa a conexão da requisição que a iniciou"""
+        # Act
+        with DatabaseConnection.request_scope():
+            dentro = DatabaseConnection.em_escopo()
+            na_execucao = await sf.executar("chave", DatabaseConnection.em_escopo)
+
+        # Assert
+        assert dentro is True
+        assert na_execucao is False
+
+    async def test_resultado_nao_fica_em_cache(self, sf):
+        """Testa que após a conclusão uma nova chamada executa de novo"""
+        # Arrange
+        execucoes = []
+
+        # Act
+        await sf.executar("chave", execucoes.append, 1)
+        await sf.executar("chave", execucoes.append, 2)
+
+        # Assert
+        assert execucoes == [1, 2]
+        assert sf.metricas()["em_andamento"] == 0
+
+    async def test_excecao_propagada_para_todas_as_chamadas(self, sf, liberar):
+        """Testa que a exceção da execução chega a todas as chamadas coalescidas"""
+
+        # Arrange
+        def consulta():
+            liberar.wait(timeout=5)
+            raise ValueError("falha no banco")
+
+        # Act
+        tarefas = [asyncio.ensure_future(sf.executar("chave", consulta)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        liberar.set()
+        resultados = await asyncio.gather(*tarefas, return_exceptions=True)
+
+        # Assert
+        assert all(isinstance(r, ValueError) for r in resultados)
+        assert sf.metricas()["execucoes"] == 1
+        assert sf.metricas()["em_andamento"] == 0
+
+    async def test_cancelamento_nao_afeta_demais_chamadas(self, sf, liberar):
+        """Testa que cancelar a primeira chamada não cancela a execução compartilhada"""
+
+        # Arrange
+        def consulta():
+            liberar.wait(timeout=5)
+            return "ok"
+
+        primeira = asyncio.ensure_future(sf.executar("chave", consulta))
+        await asyncio.sleep(0.01)
+        segunda = asyncio.ensure_future(sf.executar("chave", consulta))
+        await asyncio.sleep(0.01)
+
+        # Act
+        primeira.cancel()
+        liberar.set()
+
+        # Assert
+        assert await segunda == "ok"
+        assert primeira.cancelled()
+
+    def test_reset_metricas(self, sf):
+        """Testa que reset zera os contadores"""
+        # Arrange
+        asyncio.run(sf.executar("chave", lambda: None))
+
+        # Act
+        sf.reset_metricas()
+
+        # Assert
+        assert sf.metricas() == {"chamadas": 0, "execucoes": 0, "coalescidas": 0, "em_andamento": 0}
+
+
+class TestAnalyticsServiceCoalescer:
+    """Testes do single-flight aplicado ao AnalyticsService"""
+
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        """Zera as métricas do single-flight compartilhado"""
+        single_flight.reset_metricas()
+        yield
+        single_flight.reset_metricas()
+
+    async def test_coalescer_chama_metodo_do_servico(self):
+        """Testa que coalescer delega para o método com os mesmos argumentos"""
+        # Arrange
+        service = AnalyticsService()
+
+        # Act
+        with patch.object(service, "get_areas_scores_comparison", return_value={"areas": []}) as mock_metodo:
+            result = await service.coalescer("get_areas_scores_comparison", EMPRESA_ID, None, None)
+
+        # Assert
+        assert result == {"areas": []}
+        mock_metodo.assert_called_once_with(EMPRESA_ID, None, None)
+
+    async def test_coalescer_compartilha_entre_instancias(self):
+        """Testa que requisições diferentes (instâncias diferentes) são coalescidas"""
+        # Arrange
+        liberar = threading.Event()
+        execucoes = []
+
+        def consulta(empresa_id, data_inicio, data_fim):
+            execucoes.append(empresa_id)
+            liberar.wait(timeout=5)
+            return {"areas": []}
+
+        services = [AnalyticsService() for _ in range(3)]
+
+        # Act
+        with patch.object(AnalyticsService, "get_areas_scores_comparison", side_effect=consulta):
+            tarefas = [
+                asyncio.ensure_future(s.coalescer("get_areas_scores_comparison", EMPRESA_ID, None, None))
+                for s in services
+            ]
+            await asyncio.sleep(0.05)
+            liberar.set()
+            await asyncio.gather(*tarefas)
+
+        # Assert
+        assert execucoes == [EMPRESA_ID]
+        assert single_flight.metricas()["coalescidas"] == 2
+
+    def test_get_coalescing_metrics_endpoint(self):
+        """Testa GET /analytics/coalescing-metrics"""
+        # Arrange
+        client = TestClient(app)
+
+        # Act
+        response = client.get("/api/v1/analytics/coalescing-metrics")
+
+        # Assert
+        assert response.status_code == 200
+        assert set(response.json()) == {"chamadas", "execucoes", "coalescidas", "em_andamento"}
@@ -0,0 +1,113 @@
+"""
+Testes unitários para o warm-up do startup e o endpoint /ready
+"""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.analytics_service import AnalyticsService
+from app.services.warmup import ANALISES_EMPRESA, Warmup, warmup
+from tests.conftest import EMPRESA_ID
+
+
+@pytest.fixture
+def dependencias():
+    """Pool, empresas e análises mockados"""
+    with (
+        patch("app.services.warmup.DatabaseConnection.warm_up", return_value=2) as warm_up,
+        patch(
+            "app.services.warmup.HierarquiaRepository.get_all_empresas",
+            return_value=[{"id": str(EMPRESA_ID), "nome": "Empresa"}],
+        ),
+        patch.multiple(AnalyticsService, **{metodo: lambda *_args: {} for metodo, _ in ANALISES_EMPRESA}),
+    ):
+        yield warm_up
+
+
+class TestWarmup:
+    """Testes para Warmup"""
+
+    async def test_aquece_visao_geral_e_cada_empresa(self, dependencias):
+        """Testa análises da visão geral + empresas ativas"""
+        # Arrange
+        aquecimento = Warmup()
+
+        # Act
+        await aquecimento.executar()
+
+        # Assert
+        dependencias.assert_called_once()
+        assert aquecimento.pronto is True
+        assert aquecimento.conexoes == 2
+        assert aquecimento.empresas == 1
+        assert aquecimento.analises == 2 * len(ANALISES_EMPRESA)
+        assert aquecimento.erros == 0
+
+    async def test_falha_de_analise_nao_impede_prontidao(self, dependencias):
+        """Testa que erro numa análise é contado e o worker fica pronto"""
+        # Arrange
+        aquecimento = Warmup()
+
+        def falha(*_args):
+            raise RuntimeError("timeout")
+
+        # Act
+        with patch.object(AnalyticsService, "get_tenure_distribution", falha):
+            await aquecimento.executar()
+
+        # Assert
+        assert aquecimento.pronto is True
+        assert aquecimento.erros == 2
+        assert aquecimento.analises == 2 * (len(ANALISES_EMPRESA) - 1)
+
+    async def test_falha_no_pool_nao_impede_prontidao(self, dependencias):
+        """Testa warm-up interrompido (banco indisponível)"""
+        # Arrange
+        aquecimento = Warmup()
+        dependencias.side_effect = RuntimeError("conexão recusada")
+
+        # Act
+        await aquecimento.executar()
+
+        # Assert
+        assert aquecimento.pronto is True
+        assert aquecimento.erros == 1
+        assert aquecimento.analises == 0
+
+
+class TestReadyEndpoint:
+    """Testes para GET /ready"""
+
+    @pytest.fixture(autouse=True)
+    def estado_isolado(self):
+        """Preserva o estado global do warm-up"""
+        pronto = warmup.pronto
+        yield
+        warmup.pronto = pronto
+
+    def test_aquecendo_retorna_503(self):
+        """Testa worker ainda em warm-up"""
+        # Arrange
+        warmup.pronto = False
+
+        # Act
+        response = TestClient(app).get("/ready")
+
+        # Assert
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming_up"
+
+    def test_pronto_retorna_200(self):
+        """Testa worker aquecido"""
+        # Arrange
+        warmup.pronto = True
+
+        # Act
+        response = TestClient(app).get("/ready")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
@@ -255,7 +255,7 @@ const EmployeeListPage = () => {
             Funcionários
           </Typography>
           <Typography variant="body1" color="text.secondary">
-            {data?.total || 0} colaboradores ativos
+            {data?.total_exato === false ? '~' : ''}{data?.total || 0} colaboradores ativos
           </Typography>
         </Box>
         <Button
@@ -464,7 +464,7 @@ const EmployeeListPage = () => {
           }}>
             <Box>
               <Typography variant="body2" color="text.secondary">
-                Mostrando <strong>{data?.items?.length || 0}</strong> de <strong>{data?.total || 0}</strong> funcionários
+                Mostrando <strong>{data?.items?.length || 0}</strong> de <strong>{data?.total_exato === false ? '~' : ''}{data?.total || 0}</strong> funcionários
                 {searchTerm.trim().length >= 2 && (
                   <Chip 
                     label={`Buscando: "${searchTerm}"`} 
@@ -49,4 +49,19 @@ export const getAreaDetailedMetrics = async (areaId: string) => {
   return data;
 };
 
+// ========== Batch ==========
+// Várias leituras em uma chamada: paths relativos a /api/v1 (ex.: '/funcionarios/filtros')
+export interface BatchResponse<T = unknown> {
+  id: string | null;
+  path: string;
+  status: number;
+  body: T;
+}
+
+export const batch = async (paths: Record<string, string>): Promise<Record<string, BatchResponse>> => {
+  const requests = Object.entries(paths).map(([id, path]) => ({ id, path: `/api/v1${path}` }));
+  const { data } = await api.post<{ responses: BatchResponse[] }>('/batch', { requests });
+  return Object.fromEntries(data.responses.map((resposta) => [resposta.id as string, resposta]));
+};
+
 export default api;
@@ -34,6 +34,7 @@ export interface FuncionarioResponse {
 export interface FuncionarioPaginada {
   items: FuncionarioResponse[];
   total: number;
+  total_exato?: boolean;
   page: number;
   page_size: number;
   total_pages: number;